@@ -0,0 +1,232 @@
+"""Test the value adapter of toml-schema."""
+
+import datetime
+from collections.abc import Iterator, Mapping, Sequence
+from typing import Optional, cast
+
+import pytest
+
+import toml_schema
+
+SCHEMA = """
+name = "string"
+count = "integer = { min = 0 }"
+ratio = "float"
+enabled = "boolean"
+created = "offset-date-time"
+updated = "local-date-time"
+day = "date"
+alarm = "time"
+tags = [ "string", "min-items = 1", "unique-items = true" ]
+color = "enum = ['red', 'green']"
+[users."*"]
+id = "integer"
+"""
+
+
+class Text(str):
+    """String subclass, like the strings of tomlkit."""
+
+    __slots__ = ()
+
+
+class Number(int):
+    """Integer subclass."""
+
+
+class Real(float):
+    """Float subclass."""
+
+
+class DateTime(datetime.datetime):
+    """Date-time subclass."""
+
+
+class Date(datetime.date):
+    """Date subclass."""
+
+
+class Time(datetime.time):
+    """Time subclass."""
+
+
+class Record(Mapping[str, object]):
+    """Read-only mapping wrapper, which is not a dict."""
+
+    def __init__(self, items: dict[str, object]) -> None:
+        self._items = items
+
+    def __getitem__(self, key: str) -> object:
+        """Get the value of key."""
+        return self._items[key]
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over the keys."""
+        return iter(self._items)
+
+    def __len__(self) -> int:
+        """Get the number of keys."""
+        return len(self._items)
+
+    def __repr__(self) -> str:
+        """Represent the wrapper as its dict."""
+        return repr(self._items)
+
+
+def wrapped_document(**changes: object) -> Record:
+    """Get a document of wrapped values, with optional changes."""
+    utc = datetime.timezone.utc
+    values: dict[str, object] = {
+        "name": Text("joe"),
+        "count": Number(3),
+        "ratio": Real(0.5),
+        "enabled": True,
+        "created": DateTime(2025, 1, 2, 3, 4, 5, tzinfo=utc),
+        "updated": DateTime(2025, 1, 2, 3, 4, 5),
+        "day": Date(2025, 1, 2),
+        "alarm": Time(7, 30),
+        "tags": (Text("a"), "b"),
+        "color": Text("red"),
+        "users": Record({"joe": Record({"id": Number(1)})}),
+    }
+    values.update(changes)
+    return Record(values)
+
+
+def plain_document(value: object) -> toml_schema.TOMLValue:
+    """Deep copy a wrapped document into the plain tomllib types."""
+    adapter = toml_schema.ValueAdapter()
+    table = adapter.table(value)
+    if table is not None:
+        return {key: plain_document(element) for key, element in table.items()}
+    array = adapter.array(value)
+    if array is not None:
+        return [plain_document(element) for element in array]
+    return adapter.scalar(value)
+
+
+def validation_error(
+    schema: toml_schema.Table,
+    document: object,
+    *,
+    adapter: Optional[toml_schema.ValueAdapter] = None,
+) -> Optional[str]:
+    """Get the validation error of a document, or None if it is valid."""
+    try:
+        schema.validate_with(cast(toml_schema.TOMLValue, document), adapter=adapter)
+    except toml_schema.SchemaError as ex:
+        return str(ex)
+    return None
+
+
+def test_adapter() -> None:
+    """Test validating wrapped values without copying them."""
+    schema = toml_schema.loads(SCHEMA)
+    adapter = toml_schema.ValueAdapter()
+    document = wrapped_document()
+    assert validation_error(schema, document, adapter=adapter) is None
+    plain = cast(dict[str, toml_schema.TOMLValue], plain_document(document))
+    assert {key: type(value) for key, value in plain.items()} == {
+        "name": str,
+        "count": int,
+        "ratio": float,
+        "enabled": bool,
+        "created": datetime.datetime,
+        "updated": datetime.datetime,
+        "day": datetime.date,
+        "alarm": datetime.time,
+        "tags": list,
+        "color": str,
+        "users": dict,
+    }
+    assert plain["users"] == document["users"]
+    assert validation_error(schema, plain) is None
+    assert validation_error(schema, plain, adapter=adapter) is None
+    # Without an adapter only the plain tomllib types are accepted:
+    assert (
+        validation_error(schema, document) == f"root: Value {document} is not: {schema}"
+    )
+    assert validation_error(schema, {"name": Text("joe")}) == (
+        "'name': Value joe is not: \"string\""
+    )
+
+
+@pytest.mark.parametrize(
+    ("key", "value"),
+    [
+        ("name", Number(1)),
+        ("count", Number(-1)),
+        ("ratio", Text("0.5")),
+        ("created", DateTime(2025, 1, 2)),
+        ("updated", DateTime(2025, 1, 2, tzinfo=datetime.timezone.utc)),
+        ("day", DateTime(2025, 1, 2)),
+        ("alarm", Date(2025, 1, 2)),
+        ("tags", ()),
+        ("tags", ("a", Text("a"))),
+        ("tags", Text("a")),
+        ("color", Text("blue")),
+        ("users", Text("joe")),
+        ("users", Record({"joe": Record({"id": Text("1")})})),
+        ("users", Record({"joe": Record({"ID": 1})})),
+    ],
+)
+def test_adapter_errors(key: str, value: object) -> None:
+    """Test that the errors of wrapped values are the errors of plain values."""
+    schema = toml_schema.loads(SCHEMA)
+    document = wrapped_document(**{key: value})
+    error = validation_error(schema, plain_document(document))
+    assert error is not None
+    adapter = toml_schema.ValueAdapter()
+    assert validation_error(schema, document, adapter=adapter) == error
+
+
+def test_adapter_path_and_profiler() -> None:
+    """Test the adapter with a dotted path and with a profiler."""
+    schema = toml_schema.loads(SCHEMA)
+    adapter = toml_schema.ValueAdapter()
+    document = cast(toml_schema.TOMLValue, wrapped_document())
+    schema.validate_with(document, path="users.joe", adapter=adapter)
+    adapter.validate(schema, document)
+    profiler = toml_schema.Profiler()
+    schema.validate_with(document, profiler=profiler, adapter=adapter)
+    schema.validate_with(document, path="tags", profiler=profiler, adapter=adapter)
+    assert any(
+        stats.address == "tags" and stats.calls == 2
+        for stats in profiler.stats.values()
+    )
+    with pytest.raises(toml_schema.SchemaError) as exc_info:
+        schema.validate_with(document, path="users.joe")
+    assert (
+        str(exc_info.value)
+        == "'users.joe': Value {'id': 1} is not: { id = \"integer\" }"
+    )
+
+
+class ItemsAdapter(toml_schema.ValueAdapter):
+    """Adapter of objects with an items attribute, which are arrays."""
+
+    def array(self, value: object) -> Optional[Sequence[toml_schema.TOMLValue]]:
+        """Get the items of a value, if it has them."""
+        items = cast(object, getattr(value, "items", None))
+        if isinstance(items, list):
+            return cast(list[toml_schema.TOMLValue], items)
+        return super().array(value)
+
+
+class Bag:
+    """Container which is not a sequence."""
+
+    def __init__(self, *items: toml_schema.TOMLValue) -> None:
+        self.items = list(items)
+
+
+def test_adapter_subclass() -> None:
+    """Test adapting other types by overriding the adapter methods."""
+    schema = toml_schema.loads(SCHEMA)
+    assert validation_error(schema, wrapped_document(), adapter=ItemsAdapter()) is None
+    document = wrapped_document(tags=Bag("a", "b"))
+    assert validation_error(schema, document, adapter=ItemsAdapter()) is None
+    document = wrapped_document(tags=Bag("a", "a"))
+    assert validation_error(schema, document, adapter=ItemsAdapter()) == (
+        "'tags': Array has duplicate values."
+    )
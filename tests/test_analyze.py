@@ -0,0 +1,132 @@
+"""Test the static cost model of toml-schema."""
+
+import json
+import pathlib
+
+import toml_schema
+from toml_schema._analyze import MAX_ROUTES
+
+SCHEMA = """
+    name = "string"
+    port.union = [
+        "integer",
+        "string",
+        { host = "string", port = { union = [ "integer", "string" ] } },
+    ]
+    tags = [ "string", "max-items = 3" ]
+    tree = "ref = 'def.tree'"
+    user = "file = 'user.schema.toml'"
+    "pattern = '^x-'" = "integer"
+    "ref = 'def.key'" = "boolean"
+
+    ["def = { hidden = true }"]
+    tree = { value = "integer", children = [ "ref = 'def.tree'" ] }
+    key.union = [ "pattern = '^a'", "ref = 'def.b'", "enum = [ 'c' ]" ]
+    b = "pattern = '^b'"
+"""
+
+
+def test_analyze(tmp_path: pathlib.Path) -> None:
+    """Test the cost report of a schema."""
+    (tmp_path / "user.schema.toml").write_text('name = "string"')
+    (tmp_path / "main.schema.toml").write_text(SCHEMA)
+    schema = toml_schema.from_file(str(tmp_path / "main.schema.toml"))
+    report = toml_schema.analyze(schema)
+    assert report.metrics() == {
+        "nodes": 29,
+        "depth": 3,
+        "fan-out": 6,
+        "key-regexes": 3,
+        "checks": 3,
+    }
+    assert report.node_counts["union"] == 3
+    assert report.node_counts["file"] == 1
+    assert report.key_regexes == {"": 3}
+    assert [
+        (cost.path, cost.checks, cost.fan_out) for cost in report.sorted_paths()[:3]
+    ] == [("port", 3, 3), ("port.port", 2, 6), ("port.host", 1, 3)]
+    assert report.paths["user.name"] == toml_schema.PathCost("user.name", 1, 1)
+    assert report.paths["tree.children[]"] == toml_schema.PathCost(
+        "tree.children[]", 0, 1, recursive=True
+    )
+    assert "\"pattern = '^x-'\"" in report.paths
+
+    assert report.over_budget({"nodes": 29, "fan-out": 4, "checks": 2}) == [
+        "Schema worst-case product of union options along a path (fan-out) is 6, "
+        "over the budget of 4.",
+        "Schema maximum schema nodes tried for the value of a document key "
+        "(checks) is 3, over the budget of 2.",
+    ]
+
+    lines = report.report(limit=2).splitlines()
+    assert lines[0] == "       nodes  29  (distinct schema nodes)"
+    assert lines[-3:] == [
+        "  checks  fan-out  path",
+        "       3        3  port",
+        "       2        6  port.port",
+    ]
+    assert (
+        report.report().splitlines()[-1]
+        == "       0        1  tree.children[] (recursive)"
+    )
+
+    json_report: dict[str, object] = json.loads(report.to_json())
+    assert json_report["metrics"] == report.metrics()
+    assert json_report["key_regexes"] == {"": 3}
+    json_paths: list[dict[str, object]] = json_report["paths"]  # type: ignore[assignment]
+    assert json_paths[0] == {
+        "path": "port",
+        "checks": 3,
+        "fan_out": 3,
+        "recursive": False,
+    }
+
+
+def test_analyze_lazy_files(tmp_path: pathlib.Path) -> None:
+    """Test that schema files which are not loaded are not analyzed."""
+    (tmp_path / "main.schema.toml").write_text(
+        "user = \"file = 'no-such.schema.toml'\""
+    )
+    schema = toml_schema.from_file(str(tmp_path / "main.schema.toml"), lazy_files=True)
+    report = toml_schema.analyze(schema)
+    assert sorted(report.paths) == ["", "user"]
+    assert report.paths["user"].checks == 0
+    assert report.metrics()["key-regexes"] == 0
+
+
+def shared_levels(count: int) -> str:
+    """Schema of levels, where each level refers twice to the next level."""
+    levels = [
+        f"l{i} = {{ a = \"ref = 'd.l{i + 1}'\", b = \"ref = 'd.l{i + 1}'\" }}"
+        for i in range(count)
+    ]
+    return "\n".join(
+        [
+            "root = \"ref = 'd.l0'\"",
+            '["d = { hidden = true }"]',
+            *levels,
+            f'l{count} = "integer"',
+        ]
+    )
+
+
+def test_analyze_truncated() -> None:
+    """Test that the walk of exponentially many routes is truncated."""
+    report = toml_schema.analyze(toml_schema.loads(shared_levels(10)))
+    assert not report.truncated
+    assert len(report.paths) == 2**11
+    assert report.over_budget({"nodes": 100}) == []
+
+    report = toml_schema.analyze(toml_schema.loads(shared_levels(18)))
+    assert report.truncated
+    assert len(report.paths) <= MAX_ROUTES
+    assert report.metrics()["nodes"] == 58
+    assert report.over_budget({}) == []
+    assert report.over_budget({"nodes": 100}) == [
+        "Schema has more than 100000 routes to analyze."
+    ]
+    assert report.report().splitlines()[5] == (
+        "Truncated after 100000 routes, the metrics are lower bounds."
+    )
+    json_report: dict[str, object] = json.loads(report.to_json())
+    assert json_report["truncated"] is True
@@ -0,0 +1,198 @@
+"""Test the asyncio API of toml-schema."""
+
+import asyncio
+import concurrent.futures
+import os
+import pathlib
+import sys
+from typing import Optional
+
+if sys.version_info >= (3, 11):
+    import tomllib
+else:
+    import tomli as tomllib
+
+import pytest
+
+import toml_schema
+
+
+def write_files(tmp_path: pathlib.Path) -> list[pathlib.Path]:
+    """Write a schema with a file reference and the TOML files to validate."""
+    (tmp_path / "user.schema.toml").write_text('name = "string"')
+    (tmp_path / "main.schema.toml").write_text("user = \"file = 'user.schema.toml'\"")
+    data_path = tmp_path / "data"
+    data_path.mkdir()
+    for index in range(10):
+        (data_path / f"good-{index}.toml").write_text(f'user.name = "user {index}"')
+    (data_path / "bad.toml").write_text("user.name = 3")
+    (data_path / "syntax.toml").write_text("user.name = ")
+    return sorted(data_path.glob("*.toml"))
+
+
+def test_avalidate_file(tmp_path: pathlib.Path) -> None:
+    """Test validating a single file."""
+    write_files(tmp_path)
+    data_path = tmp_path / "data"
+
+    async def validate() -> None:
+        schema = await toml_schema.afrom_file(str(tmp_path / "main.schema.toml"))
+        await toml_schema.avalidate_file(schema, data_path / "good-0.toml")
+        with pytest.raises(toml_schema.SchemaError) as exc_info:
+            await toml_schema.avalidate_file(schema, str(data_path / "bad.toml"))
+        assert str(exc_info.value) == "'user.name': Value 3 is not: \"string\""
+        with pytest.raises(tomllib.TOMLDecodeError):
+            await toml_schema.avalidate_file(schema, data_path / "syntax.toml")
+        with pytest.raises(FileNotFoundError):
+            await toml_schema.avalidate_file(schema, data_path / "no-such.toml")
+
+    asyncio.run(validate())
+
+
+def test_avalidate_files(tmp_path: pathlib.Path) -> None:
+    """Test validating many files concurrently."""
+    (tmp_path / "latin.toml").write_bytes(b'name = "\xe9"')
+    paths = [*write_files(tmp_path), tmp_path / "latin.toml", tmp_path / "no-such.toml"]
+
+    async def validate() -> list[toml_schema.FileResult]:
+        with concurrent.futures.ThreadPoolExecutor(4) as executor:
+            schema = await toml_schema.afrom_file(
+                str(tmp_path / "main.schema.toml"), executor=executor
+            )
+            return [
+                result
+                async for result in toml_schema.avalidate_files(
+                    schema, paths, executor=executor, concurrency=3
+                )
+            ]
+
+    results = asyncio.run(validate())
+    assert sorted(result.path for result in results) == sorted(paths)
+    errors = {
+        result.path.name: type(result.error) for result in results if not result.valid
+    }
+    assert errors == {
+        "bad.toml": toml_schema.SchemaError,
+        "syntax.toml": tomllib.TOMLDecodeError,
+        "latin.toml": UnicodeDecodeError,
+        "no-such.toml": FileNotFoundError,
+    }
+
+    async def validate_none() -> None:
+        schema = toml_schema.loads('name = "string"')
+        async for _ in toml_schema.avalidate_files(schema, [], concurrency=0):
+            pass  # pragma: no cover
+
+    with pytest.raises(ValueError, match="concurrency must be at least 1: 0"):
+        asyncio.run(validate_none())
+
+
+def test_avalidate_file_process_pool(tmp_path: pathlib.Path) -> None:
+    """Test validating in a process pool, which gets a pickled schema."""
+    write_files(tmp_path)
+    data_path = tmp_path / "data"
+
+    async def validate() -> None:
+        with concurrent.futures.ProcessPoolExecutor(2) as executor:
+            schema = await toml_schema.afrom_file(
+                str(tmp_path / "main.schema.toml"), executor=executor
+            )
+            await toml_schema.avalidate_file(
+                schema, data_path / "good-0.toml", executor=executor
+            )
+            with pytest.raises(toml_schema.SchemaError) as exc_info:
+                await toml_schema.avalidate_file(
+                    schema, data_path / "bad.toml", executor=executor
+                )
+            assert str(exc_info.value) == "'user.name': Value 3 is not: \"string\""
+
+    asyncio.run(validate())
+
+
+def test_avalidate_files_process_pool(tmp_path: pathlib.Path) -> None:
+    """Test validating many files in a process pool, with a union schema."""
+    (tmp_path / "id.schema.toml").write_text(
+        'id = { union = [ "integer", [ "string" ] ] }'
+    )
+    (tmp_path / "main.schema.toml").write_text("user = \"file = 'id.schema.toml'\"")
+    paths = []
+    for index, value in enumerate(["1", '["a"]', '"a"', "1.5"]):
+        paths.append(tmp_path / f"user-{index}.toml")
+        paths[-1].write_text(f"user.id = {value}")
+
+    async def validate() -> dict[str, str]:
+        with concurrent.futures.ProcessPoolExecutor(2) as executor:
+            schema = toml_schema.from_file(
+                str(tmp_path / "main.schema.toml"), lazy_files=True
+            )
+            return {
+                result.path.name: str(result.error)
+                async for result in toml_schema.avalidate_files(
+                    schema, paths, executor=executor
+                )
+                if not result.valid
+            }
+
+    assert asyncio.run(validate()) == {
+        "user-2.toml": "'user.id': Value a not in: "
+        '{ union = [ "integer", [ "string" ] ] }',
+        "user-3.toml": "'user.id': Value 1.5 not in: "
+        '{ union = [ "integer", [ "string" ] ] }',
+    }
+
+
+def test_avalidate_files_backpressure(tmp_path: pathlib.Path) -> None:
+    """Test that paths are only taken when there is room for them."""
+    paths = write_files(tmp_path)
+    taken: list[pathlib.Path] = []
+
+    def take_path(path: pathlib.Path) -> pathlib.Path:
+        taken.append(path)
+        return path
+
+    async def validate_first() -> None:
+        schema = await toml_schema.afrom_file(str(tmp_path / "main.schema.toml"))
+        results = toml_schema.avalidate_files(
+            schema, map(take_path, paths), concurrency=2
+        )
+        async for _ in results:  # pragma: no branch
+            break
+        # The generator is closed by asyncio.run(), when shutting down the loop.
+
+    asyncio.run(validate_first())
+    assert len(taken) == 2
+
+
+@pytest.mark.skipif(not hasattr(os, "mkfifo"), reason="Requires named pipes.")
+def test_avalidate_files_cancel(tmp_path: pathlib.Path) -> None:
+    """Test that cancelling the consumer cancels the files in flight."""
+    fifo_paths = [tmp_path / f"fifo-{index}.toml" for index in range(3)]
+    for fifo_path in fifo_paths:
+        os.mkfifo(fifo_path)
+    executor = concurrent.futures.ThreadPoolExecutor(3)
+
+    async def consume() -> None:
+        schema = toml_schema.loads('name = "string"')
+        async for _ in toml_schema.avalidate_files(
+            schema, fifo_paths, executor=executor
+        ):
+            pass  # pragma: no cover
+
+    async def cancel_consumer() -> set["asyncio.Task[object]"]:
+        consumer = asyncio.ensure_future(consume())
+        await asyncio.sleep(0.05)
+        consumer.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await consumer
+        tasks: set[asyncio.Task[object]] = asyncio.all_tasks()
+        current_task: Optional[asyncio.Task[object]] = asyncio.current_task()
+        return {task for task in tasks if task is not current_task}
+
+    try:
+        assert asyncio.run(cancel_consumer()) == set()
+    finally:
+        # Unblock the reading threads:
+        for fifo_path in fifo_paths:
+            with fifo_path.open("w"):
+                pass
+        executor.shutdown()
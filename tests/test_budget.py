@@ -0,0 +1,107 @@
+"""Test the validation budgets of toml-schema."""
+
+import pytest
+
+import toml_schema
+
+SCHEMA = """
+name = "string"
+matrix = [ [ [ "integer" ] ] ]
+point.union = [ { x = { y = "integer" } }, { x = "integer" } ]
+[users]
+"*" = "ref = 'def.user'"
+["def = { hidden = true }".user]
+id = "integer"
+"""
+
+
+def budget_error(
+    document: dict[str, toml_schema.TOMLValue], budget: toml_schema.Budget
+) -> str:
+    """Get the error of validating document with budget."""
+    schema = toml_schema.loads(SCHEMA)
+    with pytest.raises(toml_schema.SchemaBudgetExceeded) as exc_info:
+        schema.validate_with(document, budget=budget)
+    return str(exc_info.value)
+
+
+def test_budget() -> None:
+    """Test validation within budget."""
+    schema = toml_schema.loads(SCHEMA)
+    document: dict[str, toml_schema.TOMLValue] = {
+        "name": "joe",
+        "matrix": [[[1, 2]]],
+        "users": {"joe": {"id": 1}},
+    }
+    # The root, name, matrix with its 3 arrays and 2 integers, users, ref and user:
+    budget = toml_schema.Budget(max_nodes=11, max_depth=4, max_seconds=10.0)
+    schema.validate_with(document, budget=budget)
+    schema.validate_with(document, budget=toml_schema.Budget())
+    document["name"] = 1
+    with pytest.raises(toml_schema.SchemaError) as exc_info:
+        schema.validate_with(document, budget=budget)
+    assert str(exc_info.value) == "'name': Value 1 is not: \"string\""
+
+
+def test_budget_exceeded() -> None:
+    """Test that validation stops when a limit is reached."""
+    document: dict[str, toml_schema.TOMLValue] = {
+        "name": "joe",
+        "matrix": [[[1, 2]]],
+        "users": {"joe": {"id": 1}},
+    }
+    assert budget_error(document, toml_schema.Budget(max_nodes=10)) == (
+        "'users.joe.id': Validation visited more than 10 schema nodes."
+    )
+    assert budget_error(document, toml_schema.Budget(max_depth=3)) == (
+        "'matrix[0][0]': Document is nested deeper than 3 levels."
+    )
+    assert budget_error(document, toml_schema.Budget(max_depth=0)) == (
+        "root: Document is nested deeper than 0 levels."
+    )
+    document = {"matrix": [[list(range(2000))]]}
+    schema = toml_schema.loads(SCHEMA)
+    schema.validate_with(document, budget=toml_schema.Budget(max_seconds=10.0))
+    assert budget_error(document, toml_schema.Budget(max_seconds=0.0)) == (
+        "'matrix[0][0][1019]': Validation took more than 0.0 seconds."
+    )
+    budget = toml_schema.Budget(max_nodes=2000, max_seconds=0.0)
+    assert budget_error(document, budget) == (
+        "'matrix[0][0][1019]': Validation took more than 0.0 seconds."
+    )
+
+
+def test_budget_union() -> None:
+    """Test that a budget exceeded in a union option is not an option failure."""
+    schema = toml_schema.loads(SCHEMA)
+    document: dict[str, toml_schema.TOMLValue] = {"point": {"x": 1}}
+    schema.validate_with(document, budget=toml_schema.Budget(max_depth=2))
+    document = {"point": {"x": {"y": 1}}}
+    schema.validate_with(document, budget=toml_schema.Budget(max_depth=3))
+    assert budget_error(document, toml_schema.Budget(max_depth=2)) == (
+        "'point.x': Document is nested deeper than 2 levels."
+    )
+
+
+def test_budget_walkers() -> None:
+    """Test budgets with a path, an adapter, a profiler and a memo."""
+    schema = toml_schema.loads(SCHEMA)
+    users: dict[str, toml_schema.TOMLValue] = {name: {"id": 1} for name in "abcdef"}
+    document: dict[str, toml_schema.TOMLValue] = {"users": users}
+    budget = toml_schema.Budget(max_nodes=3)
+    with pytest.raises(toml_schema.SchemaBudgetExceeded) as exc_info:
+        schema.validate_with(document, path="users", budget=budget)
+    assert exc_info.value.context == "users.a.id"
+    adapter = toml_schema.ValueAdapter()
+    with pytest.raises(toml_schema.SchemaBudgetExceeded) as exc_info:
+        schema.validate_with(document, adapter=adapter, budget=budget)
+    assert exc_info.value.context == "users.a"
+    profiler = toml_schema.Profiler()
+    with pytest.raises(toml_schema.SchemaBudgetExceeded):
+        schema.validate_with(document, profiler=profiler, budget=budget)
+    # The counters are reset for each validation:
+    schema.validate_with(document, profiler=profiler)
+    # Cached subtrees are not visited again:
+    memo = toml_schema.ValidationMemo()
+    schema.validate_with(document, memo=memo, budget=toml_schema.Budget(max_nodes=10))
+    assert memo.hits == 5
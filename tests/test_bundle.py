@@ -0,0 +1,198 @@
+"""Test the schema bundle of toml-schema."""
+
+import pathlib
+from typing import Optional
+
+import pytest
+
+import toml_schema
+from toml_schema import _bundle
+from toml_schema._toml_schema import Array, File, SchemaElement, Table, Union
+
+
+def write_schemas(tmp_path: pathlib.Path) -> pathlib.Path:
+    """Write a catalog with schema files which reference each other."""
+    (tmp_path / "schemas" / "sub").mkdir(parents=True)
+    catalog_path = tmp_path / "schemas" / "catalog.toml"
+    catalog_path.write_text("""
+        "main.schema.toml" = [ "main.toml" ]
+        "user.schema.toml" = [ "*.user.toml" ]
+    """)
+    (tmp_path / "schemas" / "main.schema.toml").write_text("""
+        user = "file = 'user.schema.toml'"
+        group = "file = 'sub/group.schema.toml'"
+    """)
+    (tmp_path / "schemas" / "user.schema.toml").write_text('name = "string"')
+    (tmp_path / "schemas" / "sub" / "group.schema.toml").write_text("""
+        members = [ "file = '../user.schema.toml'" ]
+    """)
+    return catalog_path
+
+
+def test_bundle(tmp_path: pathlib.Path) -> None:
+    """Test writing a bundle and loading its schemas lazily."""
+    catalog_path = write_schemas(tmp_path)
+    bundle_path = tmp_path / "schemas.bundle"
+    assert toml_schema.write_bundle(str(bundle_path), str(catalog_path)) == [
+        "main.schema.toml",
+        "sub/group.schema.toml",
+        "user.schema.toml",
+    ]
+    # The bundle does not need the schema files:
+    (tmp_path / "schemas" / "user.schema.toml").unlink()
+
+    with toml_schema.Bundle(str(bundle_path)) as bundle:
+        assert bundle.catalog == {
+            "main.schema.toml": ["main.toml"],
+            "user.schema.toml": ["*.user.toml"],
+        }
+        assert "sub/../user.schema.toml" in bundle
+        assert "catalog.toml" not in bundle
+        schema = bundle.load_schema("main.schema.toml")
+        assert bundle.load_schema("./main.schema.toml") is schema
+        group = schema.get_sub_schema("group")
+        assert isinstance(group, File)
+        # Referenced schema files are compiled only when they are needed:
+        assert group._ref_schema is None  # noqa: SLF001
+        schema.validate({"group": {"members": [{"name": "joe"}]}})
+        assert group._ref_schema is bundle.load_schema(  # noqa: SLF001
+            "sub/group.schema.toml"
+        )
+        with pytest.raises(toml_schema.SchemaError) as exc_info:
+            schema.validate({"user": {"name": 1}})
+        assert str(exc_info.value) == "'user.name': Value 1 is not: \"string\""
+
+        with pytest.raises(toml_schema.SchemaError) as exc_info:
+            bundle.load_schema("no-such.schema.toml")
+        assert str(exc_info.value) == (
+            f"root: 'no-such.schema.toml' is not in the bundle '{bundle_path}'."
+        )
+
+
+def node_addresses(schema: SchemaElement) -> list[tuple[str, str]]:
+    """List the type and address of every node, without following references."""
+    addresses = [(type(schema).__name__, schema._address)]  # noqa: SLF001
+    if isinstance(schema, Table):
+        for schema_key, schema_value in schema.items():
+            addresses.append(("SchemaKey", schema_key._address))  # noqa: SLF001
+            addresses.extend(node_addresses(schema_value))
+    elif isinstance(schema, (Array, Union)):
+        for schema_value in schema:
+            addresses.extend(node_addresses(schema_value))
+    return addresses
+
+
+def test_bundle_schemastore(tmp_path: pathlib.Path) -> None:
+    """Test that the bundled schemas are the compiled schema files."""
+    bundle_path = tmp_path / "schemas.bundle"
+    names = toml_schema.write_bundle(str(bundle_path), "schemastore/catalog.toml")
+    assert "partial-setuptools.schema.toml" in names
+    with toml_schema.Bundle(str(bundle_path)) as bundle:
+        for name in names:
+            schema = bundle.load_schema(name)
+            compiled = toml_schema.from_file(f"schemastore/{name}", lazy_files=True)
+            assert str(schema) == str(compiled)
+            assert node_addresses(schema) == node_addresses(compiled)
+
+
+def test_bundle_closed(tmp_path: pathlib.Path) -> None:
+    """Test that schema files cannot be loaded after the bundle is closed."""
+    catalog_path = write_schemas(tmp_path)
+    bundle_path = tmp_path / "schemas.bundle"
+    toml_schema.write_bundle(str(bundle_path), str(catalog_path))
+
+    with toml_schema.Bundle(str(bundle_path)) as bundle:
+        schema = bundle.load_schema("main.schema.toml")
+        schema.validate({"user": {"name": "joe"}})
+    # The schema files which were loaded are still usable:
+    schema.validate({"user": {"name": "al"}})
+    with pytest.raises(toml_schema.SchemaError) as exc_info:
+        schema.validate({"group": {"members": []}})
+    assert str(exc_info.value) == (
+        "'group': Error reading 'sub/group.schema.toml': "
+        f"root: Bundle '{bundle_path}' is closed."
+    )
+    with pytest.raises(toml_schema.SchemaError) as exc_info:
+        bundle.load_schema("sub/group.schema.toml")
+    assert str(exc_info.value) == f"root: Bundle '{bundle_path}' is closed."
+
+
+def test_bundle_catalog(tmp_path: pathlib.Path) -> None:
+    """Test selecting the schemas of TOML files from a bundle."""
+    catalog_path = write_schemas(tmp_path)
+    bundle_path = tmp_path / "schemas.bundle"
+    toml_schema.write_bundle(str(bundle_path), str(catalog_path))
+    (tmp_path / "other.schema.toml").write_text('name = "integer"')
+
+    with toml_schema.Bundle(str(bundle_path)) as bundle:
+        catalog = bundle.as_catalog()
+        schema = catalog.schema_for("a/b.user.toml")
+        assert schema is bundle.load_schema("user.schema.toml")
+        # Schemastore names in schema directives are found in the bundle:
+        assert catalog.schema_for("x.toml", "#:schema ./main.json") is (
+            bundle.load_schema("main.schema.toml")
+        )
+        # Other schema directives are loaded from the file system:
+        other_schema = catalog.schema_for(
+            str(tmp_path / "x.toml"), "#:schema other.schema.toml"
+        )
+        assert other_schema is not None
+        other_schema.validate({"name": 1})
+
+
+def test_bundle_errors(tmp_path: pathlib.Path) -> None:
+    """Test the errors of writing and reading bundles."""
+    catalog_path = write_schemas(tmp_path)
+    bundle_path = tmp_path / "schemas.bundle"
+
+    (tmp_path / "schemas" / "main.schema.toml").write_text("user = ")
+    with pytest.raises(toml_schema.SchemaError) as exc_info:
+        toml_schema.write_bundle(str(bundle_path), str(catalog_path))
+    assert str(exc_info.value) == (
+        f"root: Error reading '{tmp_path}/schemas/main.schema.toml': "
+        "Invalid value (at end of document)"
+    )
+
+    (tmp_path / "user.schema.toml").write_text('name = "string"')
+    (tmp_path / "schemas" / "main.schema.toml").write_text(
+        "user = \"file = '../user.schema.toml'\""
+    )
+    with pytest.raises(toml_schema.SchemaError) as exc_info:
+        toml_schema.write_bundle(str(bundle_path), str(catalog_path))
+    assert str(exc_info.value) == (
+        f"'user': Schema file '{tmp_path}/schemas/../user.schema.toml' "
+        "is not in the folder of the catalog."
+    )
+    assert not bundle_path.exists()
+
+    bundle_path.write_bytes(b"toml-schema")
+    with pytest.raises(toml_schema.SchemaError) as exc_info:
+        toml_schema.Bundle(str(bundle_path))
+    assert str(exc_info.value) == f"root: '{bundle_path}' is not a schema bundle."
+
+
+@pytest.mark.parametrize(
+    "header",
+    [
+        None,  # Truncated header.
+        b'{"catalog": {}, "schemas": ',
+        b'["catalog", "schemas"]',
+        b'{"catalog": {}}',
+        b'{"catalog": 1, "schemas": {}}',
+        b"\xff",
+    ],
+)
+def test_bundle_corrupt_header(tmp_path: pathlib.Path, header: Optional[bytes]) -> None:
+    """Test that a bundle with a corrupt header is not opened."""
+    bundle_path = tmp_path / "schemas.bundle"
+    toml_schema.write_bundle(str(bundle_path), str(write_schemas(tmp_path)))
+    prefix_size = len(_bundle.MAGIC) + _bundle._HEADER_SIZE.size  # noqa: SLF001
+    if header is None:
+        bundle_path.write_bytes(bundle_path.read_bytes()[: prefix_size + 10])
+    else:
+        bundle_path.write_bytes(
+            _bundle.MAGIC + _bundle._HEADER_SIZE.pack(len(header)) + header  # noqa: SLF001
+        )
+    with pytest.raises(toml_schema.SchemaError) as exc_info:
+        toml_schema.Bundle(str(bundle_path))
+    assert str(exc_info.value) == f"root: '{bundle_path}' is not a schema bundle."
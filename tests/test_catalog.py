@@ -0,0 +1,127 @@
+"""Test the schema catalog of toml-schema."""
+
+import pathlib
+
+import pytest
+
+import toml_schema
+from toml_schema._catalog import schema_directive
+
+
+def test_schema_directive() -> None:
+    """Test parsing the schema directive in the first line of a TOML file."""
+    assert schema_directive("#:schema ./my.schema.toml\n") == "./my.schema.toml"
+    assert schema_directive("#:schema  my schema.toml \r\n") == "my schema.toml"
+    assert schema_directive("#:schema") is None
+    assert schema_directive("# schema my.schema.toml") is None
+    assert schema_directive('name = "#:schema x"') is None
+
+
+def test_catalog_match() -> None:
+    """Test selecting schemas by filename."""
+    catalog = toml_schema.Catalog(
+        {
+            "ruff.schema.toml": ["ruff.toml", ".ruff.toml"],
+            "any.schema.toml": ["*.conf.toml", "ruff?.toml"],
+            "special.schema.toml": ["special.conf.toml"],
+        },
+        base_dir="schemas",
+    )
+    assert catalog.match("ruff.toml") == pathlib.Path("schemas/ruff.schema.toml")
+    assert catalog.match("a/b/.ruff.toml") == pathlib.Path("schemas/ruff.schema.toml")
+    assert catalog.match("my.conf.toml") == pathlib.Path("schemas/any.schema.toml")
+    assert catalog.match("ruff2.toml") == pathlib.Path("schemas/any.schema.toml")
+    # Literal filenames take precedence over patterns:
+    assert catalog.match("special.conf.toml") == pathlib.Path(
+        "schemas/special.schema.toml"
+    )
+    assert catalog.match("pyproject.toml") is None
+
+    catalog = toml_schema.Catalog({"ruff.schema.toml": ["ruff.toml"]})
+    assert catalog.match("ruff.toml") == pathlib.Path("ruff.schema.toml")
+    assert catalog.match("ruff.conf.toml") is None
+
+
+def test_catalog_schemastore() -> None:
+    """Test the catalog of the schemastore folder."""
+    catalog = toml_schema.Catalog.from_file("schemastore/catalog.toml")
+    assert catalog.match("pyproject.toml") == pathlib.Path(
+        "schemastore/pyproject.schema.toml"
+    )
+    assert catalog.match(".ruff.toml") == pathlib.Path("schemastore/ruff.schema.toml")
+    # Directives to schemastore JSON schemas use the converted TOML schemas:
+    assert catalog.schema_path(
+        "examples/schemastore/pyproject/hatch.toml",
+        "#:schema ../../schemas/json/pyproject.json\n",
+    ) == pathlib.Path("schemastore/pyproject.schema.toml")
+    schema = catalog.schema_for("ruff.toml")
+    assert schema is not None
+    assert catalog.schema_for("./ruff.toml") is schema
+    schema.validate({"line-length": 88})
+    assert catalog.schema_for("setup.toml") is None
+
+
+def test_catalog_lazy(tmp_path: pathlib.Path) -> None:
+    """Test that only the schemas in use are compiled."""
+    (tmp_path / "good.schema.toml").write_text('name = "string"')
+    (tmp_path / "bad.schema.toml").write_text('name = "no-such-type"')
+    (tmp_path / "other.schema.toml").write_text('other = "integer"')
+    catalog_path = tmp_path / "catalog.toml"
+    catalog_path.write_text("""
+        "good.schema.toml" = [ "good.toml" ]
+        "bad.schema.toml" = [ "bad.toml" ]
+    """)
+    catalog = toml_schema.Catalog.from_file(str(catalog_path))
+    schema = catalog.schema_for("good.toml")
+    assert schema is not None
+    schema.validate({"name": "John"})
+    with pytest.raises(toml_schema.SchemaError) as exc_info:
+        catalog.schema_for("bad.toml")
+    assert str(exc_info.value) == "'name': 'no-such-type' is not a valid keyword type."
+
+    # The schema directive takes precedence over the catalog:
+    data_path = tmp_path / "data"
+    data_path.mkdir()
+    other_schema = catalog.schema_for(
+        str(data_path / "good.toml"), "#:schema ../other.schema.toml"
+    )
+    assert other_schema is not None
+    other_schema.validate({"other": 3})
+
+    # Missing schema file in the directive:
+    with pytest.raises(FileNotFoundError):
+        catalog.schema_for("good.toml", "#:schema ./schemas/no-such.json")
+
+    catalog_path.write_text('"good.schema.toml" = "good.toml"')
+    with pytest.raises(toml_schema.SchemaError) as exc_info:
+        toml_schema.Catalog.from_file(str(catalog_path))
+    assert str(exc_info.value) == (
+        "'good.schema.toml': Value good.toml is not: [ \"string\" ]"
+    )
+
+
+def test_catalog_find_files(tmp_path: pathlib.Path) -> None:
+    """Test finding the TOML files that have a schema."""
+    catalog = toml_schema.Catalog({"ruff.schema.toml": ["ruff.toml"]})
+    (tmp_path / "ruff.toml").write_text("")
+    (tmp_path / "other.toml").write_text("")
+    (tmp_path / "ruff.txt").write_text("")
+    (tmp_path / "b").mkdir()
+    (tmp_path / "b" / "ruff.toml").write_text("")
+    (tmp_path / "b" / "data.toml").write_text("#:schema ../my.schema.toml\n")
+    (tmp_path / "a").mkdir()
+    (tmp_path / "a" / "ruff.toml").write_text("")
+    (tmp_path / ".git").mkdir()
+    (tmp_path / ".git" / "ruff.toml").write_text("")
+    assert [
+        path.relative_to(tmp_path) for path in catalog.find_files(str(tmp_path))
+    ] == [
+        pathlib.Path("ruff.toml"),
+        pathlib.Path("a/ruff.toml"),
+        pathlib.Path("b/data.toml"),
+        pathlib.Path("b/ruff.toml"),
+    ]
+    # Files are always included:
+    assert list(catalog.find_files(str(tmp_path / "other.toml"))) == [
+        tmp_path / "other.toml"
+    ]
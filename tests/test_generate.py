@@ -0,0 +1,202 @@
+"""Test the generation of random documents by toml-schema."""
+
+import sys
+from typing import Optional
+
+import pytest
+
+import toml_schema
+from toml_schema._toml_schema import SchemaElement, SchemaKey, TOMLValue
+
+if sys.version_info >= (3, 11):
+    import tomllib
+else:
+    import tomli as tomllib
+
+SCHEMA = """
+"name = { required = true }" = "string = { min-len = 2, max-len = 8 }"
+kind = "enum = [ 'app', 'lib' ]"
+version = "pattern = '^\\\\d+\\\\.\\\\d+(\\\\.\\\\d+)?$'"
+email = "pattern = '^(?!\\\\.)[\\\\w.]+@[a-z]+\\\\.(com|org)\\\\Z'"
+code = "pattern = '^(?:[A-Z]{2,3}|x{2})-\\\\d{2,}[!-\\\\~]+?$'"
+level = "integer = { min = 1, max = 5 }"
+ratio = "float = { min = 0.0, max = 1.0 }"
+loss = "float = { max = -1.0 }"
+enabled = "boolean"
+created = "offset-date-time"
+updated = "local-date-time"
+day = "date"
+at = "time"
+extra = "any-value"
+tags = [ "string", "min-items = 1", "max-items = 3", "unique-items = true" ]
+sizes = [ "integer = { max = -1 }" ]
+nothing = [ "string", "max-items = 0" ]
+value = { union = [ "integer", "string" ] }
+single = { "union = 'one'" = [ "integer", "float" ] }
+users = [ "ref = 'defs.user'" ]
+[env]
+"pattern = '^[A-Z][A-Z_]*$'" = "string"
+[free]
+"*" = "any-value"
+[mixed]
+"pattern = '^t[a-z]+$'" = { name = "string" }
+"pattern = '^v[a-z]+$'" = "integer"
+[plugins]
+"*" = { version = "string", options = [ "string" ] }
+["defs = { hidden = true }".user]
+"id = { required = true }" = "integer = { min = 0 }"
+groups = [ "enum = [ 'admin', 'dev' ]", "unique-items = true" ]
+"""
+
+
+class CustomElement(SchemaElement):
+    """Schema element which is not known to the generator."""
+
+    def validate(self, value: TOMLValue, /, *, context: str) -> None:
+        """Validate anything."""
+
+
+def validation_error(
+    schema: toml_schema.Table, text: str
+) -> Optional[toml_schema.SchemaError]:
+    """Validate the text of a document, and return its error."""
+    document: dict[str, TOMLValue] = tomllib.loads(text)
+    try:
+        schema.validate(document)
+    except toml_schema.SchemaError as ex:
+        return ex
+    return None
+
+
+def test_generate() -> None:
+    """Test that the generated documents are valid and depend on the seed."""
+    schema = toml_schema.loads(SCHEMA)
+    texts = set()
+    for seed in range(50):
+        generator = toml_schema.DocumentGenerator(schema, seed=seed)
+        text = "".join(generator.generate(2000))
+        assert validation_error(schema, text) is None
+        assert generator.violation is None
+        texts.add(text)
+    assert len(texts) == 50
+    generator = toml_schema.DocumentGenerator(schema, seed=3)
+    assert "".join(generator.generate(2000)) in texts
+
+
+def test_generate_size() -> None:
+    """Test that documents are generated in small chunks, at about the size."""
+    schema = toml_schema.loads(SCHEMA)
+    generator = toml_schema.DocumentGenerator(schema, seed=1)
+    chunks = list(generator.generate(100_000))
+    assert 90_000 < sum(len(chunk.encode()) for chunk in chunks) < 110_000
+    assert max(len(chunk) for chunk in chunks) < 100
+    assert validation_error(schema, "".join(chunks)) is None
+    text = "".join(generator.generate(10))
+    assert len(text) < 100
+    assert validation_error(schema, text) is None
+
+    # The size is in bytes of UTF-8, not in characters:
+    schema = toml_schema.loads("values = [ \"enum = [ 'éééé' ]\" ]")
+    text = "".join(toml_schema.DocumentGenerator(schema, seed=1).generate(10_000))
+    assert 9_000 < len(text.encode()) < 11_000
+
+
+def test_generate_violation() -> None:
+    """Test that each violation is a single error, which is recorded."""
+    schema = toml_schema.loads(SCHEMA)
+    messages = set()
+    for seed in range(300):
+        generator = toml_schema.DocumentGenerator(schema, seed=seed)
+        text = "".join(generator.generate(2000, violation=True))
+        assert generator.violation is not None
+        assert validation_error(schema, text) == generator.violation
+        messages.add(generator.violation.message.split(":")[0])
+    assert {
+        "Missing required key",
+        "Key 'unknown-key' not in schema",
+        "Value out of range",
+        "Array has less than 1 items.",
+        "Array has more than 3 items.",
+        "Array has duplicate values.",
+        "len('xxxxxxxxx') > 8",
+        "'?' does not match pattern",
+        "Value True does not match exactly one in",
+    } <= messages
+
+
+def test_generate_ref_keys() -> None:
+    """Test the generation of keys of reference keys."""
+    schema = toml_schema.loads(
+        """
+        ["names = { required = true }"]
+        "ref = 'defs.name'" = "integer"
+        ["numbers = { required = true }"]
+        "ref = 'defs.number'" = "integer"
+        ["impossible = { required = true }"]
+        "ref = 'defs.impossible'" = "integer"
+        ["defs = { hidden = true }"]
+        name = "enum = [ 'a', 'b', 'c' ]"
+        number = "integer"
+        impossible = "pattern = '^a(?=b)c$'"
+        """
+    )
+    generator = toml_schema.DocumentGenerator(schema)
+    document: dict[str, TOMLValue] = tomllib.loads("".join(generator.generate(10_000)))
+    names = document["names"]
+    assert isinstance(names, dict)
+    assert sorted(names) == ["a", "b", "c"]
+    assert document["numbers"] == {}
+    assert document["impossible"] == {}
+    schema.validate(document)
+
+
+def test_generate_violation_error() -> None:
+    """Test the errors of schemas which cannot be generated or violated."""
+    schema = toml_schema.loads('"*" = "any-value"')
+    generator = toml_schema.DocumentGenerator(schema)
+    assert validation_error(schema, "".join(generator.generate(1000))) is None
+    with pytest.raises(ValueError, match="No violation of the schema is possible"):
+        "".join(generator.generate(1000, violation=True))
+    schema = toml_schema.loads('"id = { required = true }" = "pattern = \'^a(?=b)c$\'"')
+    with pytest.raises(ValueError, match="Cannot generate a value for"):
+        "".join(toml_schema.DocumentGenerator(schema).generate())
+    schema = toml_schema.loads(
+        '"id = { required = true }" = { "union = \'all\'" = [ "integer", "string" ] }'
+    )
+    with pytest.raises(ValueError, match="Cannot generate a value for"):
+        "".join(toml_schema.DocumentGenerator(schema).generate())
+    schema = toml_schema.loads(
+        '"id = { required = true }" = { union = [ "pattern = \'^(?=b)c\'", "date" ] }'
+    )
+    for seed in range(5):
+        generator = toml_schema.DocumentGenerator(schema, seed=seed)
+        assert validation_error(schema, "".join(generator.generate())) is None
+    schema = toml_schema.Table(
+        {SchemaKey(name="id", required=True): CustomElement()}, is_root=True
+    )
+    with pytest.raises(ValueError, match="Cannot generate a value for"):
+        "".join(toml_schema.DocumentGenerator(schema).generate())
+    schema = toml_schema.loads(
+        '"ids = { required = true }" = '
+        '[ "enum = [\'a\', \'b\']", "min-items = 3", "unique-items = true" ]'
+    )
+    with pytest.raises(ValueError, match="Cannot generate unique items"):
+        "".join(toml_schema.DocumentGenerator(schema).generate())
+    schema = toml_schema.loads(
+        """
+        "node = { required = true }" = "ref = 'defs.node'"
+        ["defs = { hidden = true }".node]
+        "next = { required = true }" = "ref = 'defs.node'"
+        """
+    )
+    with pytest.raises(ValueError, match="Schema is too deep"):
+        "".join(toml_schema.DocumentGenerator(schema).generate())
+
+
+def test_generate_pyproject() -> None:
+    """Test documents of the pyproject.toml schema, and the schema files it uses."""
+    schema = toml_schema.from_file("schemastore/pyproject.schema.toml")
+    for seed in range(20):
+        generator = toml_schema.DocumentGenerator(schema, seed=seed)
+        text = "".join(generator.generate(5000, violation=seed % 2 == 1))
+        assert validation_error(schema, text) == generator.violation
@@ -0,0 +1,123 @@
+"""Test the schema graph of toml-schema."""
+
+import pathlib
+
+import pytest
+
+import toml_schema
+
+
+def test_schema_graph(tmp_path: pathlib.Path) -> None:
+    """Test recompiling the changed schema files, and the files referencing them."""
+    (tmp_path / "main.schema.toml").write_text("""
+        user = "file = 'user.schema.toml'"
+        admin = "file = 'user.schema.toml'"
+        group = "file = 'partial/group.schema.toml'"
+    """)
+    (tmp_path / "user.schema.toml").write_text('name = "string"')
+    (tmp_path / "partial").mkdir()
+    group_path = tmp_path / "partial" / "group.schema.toml"
+    group_path.write_text("""
+        name = "string"
+        members = [ "file = '../user.schema.toml'" ]
+    """)
+    graph = toml_schema.SchemaGraph(str(tmp_path / "main.schema.toml"))
+    tables = graph.tables
+    assert tables.keys() == {
+        tmp_path / "main.schema.toml",
+        tmp_path / "user.schema.toml",
+        group_path,
+    }
+    schema = graph.schema
+    document: dict[str, toml_schema.TOMLValue] = {
+        "user": {"name": "joe"},
+        "admin": {"name": "root"},
+        "group": {"members": [{"name": "al"}]},
+    }
+    schema.validate(document)
+
+    # Change the schema file referenced by all the others:
+    (tmp_path / "user.schema.toml").write_text('name = "integer"')
+    assert graph.update(
+        [str(tmp_path / "user.schema.toml"), str(tmp_path / "other.toml")]
+    ) == {tmp_path / "user.schema.toml"}
+    # The old graph is left as it was:
+    assert graph.schema is not schema
+    schema.validate(document)
+    new_tables = graph.tables
+    assert new_tables.keys() == tables.keys()
+    assert not any(new_tables[path] is tables[path] for path in tables)
+    with pytest.raises(toml_schema.SchemaError) as exc_info:
+        graph.schema.validate_with(document, path="admin")
+    assert str(exc_info.value) == "'admin.name': Value root is not: \"integer\""
+    with pytest.raises(toml_schema.SchemaError) as exc_info:
+        graph.schema.validate_with(document, path="group")
+    assert str(exc_info.value) == (
+        "'group.members[0].name': Value al is not: \"integer\""
+    )
+    assert graph.update([]) == set()
+
+    # Only the changed schema file and the files which reference it are recompiled:
+    group_path.write_text("""
+        name = "integer"
+        members = [ "file = '../user.schema.toml'" ]
+    """)
+    assert graph.update([str(group_path)]) == {group_path}
+    assert (
+        graph.tables[tmp_path / "user.schema.toml"]
+        is (new_tables[tmp_path / "user.schema.toml"])
+    )
+    assert graph.tables[group_path] is not new_tables[group_path]
+    assert graph.schema is not new_tables[tmp_path / "main.schema.toml"]
+
+    # Change a schema file together with a schema file it references:
+    (tmp_path / "user.schema.toml").write_text('name = "string"')
+    group_path.write_text("""
+        name = "string"
+        members = [ "file = '../user.schema.toml'" ]
+    """)
+    assert graph.update([str(tmp_path / "user.schema.toml"), str(group_path)]) == {
+        tmp_path / "user.schema.toml",
+        group_path,
+    }
+    graph.schema.validate(document)
+
+
+def test_schema_graph_root(tmp_path: pathlib.Path) -> None:
+    """Test changing the file references of the root schema file."""
+    main_path = tmp_path / "main.schema.toml"
+    main_path.write_text("user = \"file = 'user.schema.toml'\"")
+    (tmp_path / "user.schema.toml").write_text('name = "string"')
+    graph = toml_schema.SchemaGraph(str(main_path))
+    assert graph.tables.keys() == {main_path, tmp_path / "user.schema.toml"}
+    schema = graph.schema
+
+    # A failed update leaves the graph unchanged:
+    main_path.write_text("user = \"file = 'no-such.schema.toml'\"")
+    with pytest.raises(toml_schema.SchemaError) as exc_info:
+        graph.update([str(main_path)])
+    assert str(exc_info.value).startswith(
+        "'user': Error reading 'no-such.schema.toml': [Errno 2]"
+    )
+    assert graph.schema is schema
+
+    # File reference cycles are not allowed:
+    main_path.write_text("group = \"file = 'group.schema.toml'\"")
+    (tmp_path / "group.schema.toml").write_text("""
+        name = "string"
+        sub-group = "file = 'group.schema.toml'"
+    """)
+    with pytest.raises(toml_schema.SchemaError) as exc_info:
+        graph.update([str(main_path)])
+    assert str(exc_info.value) == (
+        f"'group': File reference cycle: {main_path} -> group.schema.toml"
+        " -> group.schema.toml"
+    )
+    assert graph.schema is schema
+
+    # New schema files are compiled and unreferenced ones are dropped:
+    (tmp_path / "group.schema.toml").write_text('name = "string"')
+    graph.update([str(main_path)])
+    assert graph.schema is not schema
+    assert graph.tables.keys() == {main_path, tmp_path / "group.schema.toml"}
+    graph.schema.validate({"group": {"name": "a"}})
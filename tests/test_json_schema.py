@@ -0,0 +1,343 @@
+"""Test the conversion of JSON schemas to TOML schemas."""
+
+import copy
+import json
+import pathlib
+from typing import Any
+
+import pytest
+
+import toml_schema
+
+URI_BASE = "https://json.schemastore.org"
+
+
+@pytest.mark.parametrize(
+    "json_filename",
+    [
+        "maturin.json",
+        "partial-black.json",
+        "partial-mypy.json",
+        "partial-pdm-dockerize.json",
+        "partial-poetry.json",
+        "partial-pytest.json",
+        "partial-repo-review.json",
+        "partial-scikit-build.json",
+        "partial-setuptools-scm.json",
+        "partial-taskipy.json",
+        "partial-tox.json",
+        "ruff.json",
+        "tombi.json",
+        "uv.json",
+    ],
+)
+def test_schemastore(json_filename: str) -> None:
+    """Test that the schemastore JSON schemas convert to the shipped TOML schemas.
+
+    The other JSON schemas of schemastore need the handlers of tools/json_to_toml.
+    """
+    json_path = pathlib.Path("schemastore") / json_filename
+    converter = toml_schema.JSONSchemaConverter(json_filename, uri_base=URI_BASE)
+    toml_text = converter.to_toml(json.loads(json_path.read_text()))
+    assert toml_text == json_path.with_suffix(".schema.toml").read_text()
+
+
+JSON_SCHEMA: dict[str, Any] = {
+    "$schema": "http://json-schema.org/draft-07/schema#",
+    "type": "object",
+    "additionalProperties": False,
+    "required": ["name"],
+    "properties": {
+        "name": {"type": "string", "minLength": 1, "maxLength": 20},
+        "email": {"type": "string", "format": "email"},
+        "home": {"type": "string", "format": "uri"},
+        "date": {"type": "string", "format": "date"},
+        "port": {"type": "integer", "format": "uint16", "minimum": 1.5},
+        "level": {"type": "integer", "format": "uint8", "maximum": 9.5},
+        "count": {"type": "integer", "format": "uint", "minimum": 1},
+        "size": {"type": "integer", "format": "uint8"},
+        "big": {"type": "integer", "format": "int64"},
+        "ratio": {"type": "number", "minimum": 0.0, "maximum": 1.0},
+        "color": {"type": "string", "enum": ["red", "green"]},
+        "kind": {"type": "string", "const": "user"},
+        "code": {"type": "string", "pattern": "^[a-z']+$"},
+        "line": {"type": "string", "pattern": "^a\nb$"},
+        "id": {"type": ["string", "integer", "null"]},
+        "nick": {"type": ["string", "null"]},
+        "tags": {
+            "type": "array",
+            "items": {"type": "string"},
+            "minItems": 1,
+            "maxItems": 3,
+            "uniqueItems": True,
+            "additionalItems": False,
+        },
+        "any-items": {"type": "array"},
+        "nothing": {"not": {"type": "string"}},
+        "both": {"allOf": [{"type": "string"}, {"minLength": 2, "type": "string"}]},
+        "one": {"oneOf": [{"type": "string"}, {"type": "integer"}], "type": "string"},
+        "maybe": {"anyOf": [{"type": "string"}, {"type": "null"}]},
+        "group": {"$ref": "#/definitions/group"},
+        "same": {"$ref": "#/properties/name"},
+        "user": {"$ref": f"{URI_BASE}/user.json"},
+        "dependencies": {},
+        "todo": {},
+        "inline": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {"a": {"type": "string"}},
+                "additionalProperties": True,
+            },
+        },
+        "table": {
+            "type": "object",
+            "patternProperties": {"^x-": {"type": "string"}},
+        },
+        "extra": {
+            "type": "object",
+            "patternProperties": {"^x-": {"type": "string"}},
+            "additionalProperties": {"type": "integer"},
+        },
+        "keys": {
+            "type": "object",
+            "propertyNames": {"$ref": "#/definitions/key"},
+            "additionalProperties": {"type": "integer"},
+        },
+        "names": {
+            "type": "object",
+            "propertyNames": {"type": "string", "minLength": 2},
+            "patternProperties": {"^a": {"type": "integer"}},
+            "additionalProperties": False,
+        },
+        "empty": {"type": "object", "additionalProperties": False},
+    },
+    "definitions": {
+        "group": {
+            "type": "object",
+            "propertyNames": {"pattern": "^m"},
+            "additionalProperties": {"type": "string"},
+        },
+        "key": {"type": "string", "pattern": "^[a-z]+$"},
+    },
+}
+
+
+def test_json_schema_converter() -> None:
+    """Test the conversion of the JSON schema rules, and its messages."""
+    converter = toml_schema.JSONSchemaConverter(
+        "test.json", uri_base=URI_BASE, verbose=4
+    )
+    toml_text = converter.to_toml(copy.deepcopy(JSON_SCHEMA))
+    schema = toml_schema.loads(
+        toml_text, toml_filename="schemas/test.schema.toml", lazy_files=True
+    )
+    assert converter.file_list == ["user.json"]
+    assert converter.issues == {"info": 4, "warning": 3, "todo": 4}
+    assert "TODO: test.json: todo: Missing type in: {}" in converter.messages
+    assert "DEBUG: test.json: get email" in converter.messages
+    schema.validate(
+        {
+            "name": "joe",
+            "email": "joe@example.com",
+            "home": "https://example.com",
+            "date": "2026-10-19",
+            "port": 2,
+            "level": 9,
+            "id": 1,
+            "code": "a'b",
+            "line": "a\nb",
+            "tags": ["a"],
+            "any-items": [1, "a"],
+            "nothing": 1,
+            "both": "ab",
+            "one": 1,
+            "group": {"members": "al"},
+            "same": "al",
+            "inline": [{"a": "b", "c": 1}],
+            "table": {"x-a": "b", "y": 1},
+            "extra": {"x-a": "b", "y": 1},
+            "keys": {"abc": 1},
+            "names": {"ab": 1},
+        }
+    )
+    errors: list[tuple[dict[str, Any], str]] = [
+        ({"name": ""}, "'name': len('') < 1"),
+        ({"name": "a", "port": 0}, "'port': Value out of range: 0 < 1"),
+        ({"name": "a", "level": 10}, "'level': Value out of range: 10 > 9"),
+        ({"name": "a", "count": 0}, "'count': Value out of range: 0 < 1"),
+        ({"name": "a", "size": 256}, "'size': Value out of range: 256 > 255"),
+        ({"name": "a", "kind": "admin"}, "'kind': 'admin' not in: ['user']"),
+        ({"name": "a", "tags": ["a", "a"]}, "'tags': Array has duplicate values."),
+        ({"name": "a", "extra": {"y": "b"}}, "'extra.y': Value b is not: "),
+        ({"name": "a", "nothing": "a"}, "'nothing': Value a does not match none in: "),
+        ({"name": "a", "keys": {"A": 1}}, "'keys': Key 'A' not in schema: "),
+        ({"name": "a", "names": {"bc": 1}}, "'names': Key 'bc' not in schema."),
+        ({"name": "a", "empty": {"a": 1}}, "'empty': Key 'a' not in schema: { }"),
+    ]
+    for document, error in errors:
+        with pytest.raises(toml_schema.SchemaError) as exc_info:
+            schema.validate(document)
+        assert str(exc_info.value).startswith(error)
+
+
+def test_from_json_schema(tmp_path: pathlib.Path) -> None:
+    """Test creating a schema table from a JSON schema, without writing files."""
+    json_object = copy.deepcopy(JSON_SCHEMA)
+    schema = toml_schema.from_json_schema(
+        json_object, uri_base=URI_BASE, toml_filename=str(tmp_path / "test.toml")
+    )
+    assert json_object == JSON_SCHEMA
+    schema.validate({"name": "joe"})
+    # The referenced schema files are loaded when they are first needed:
+    (tmp_path / "user.schema.toml").write_text('id = "integer"')
+    with pytest.raises(toml_schema.SchemaError) as exc_info:
+        schema.validate({"name": "joe", "user": {"id": "1"}})
+    assert str(exc_info.value) == "'user.id': Value 1 is not: \"integer\""
+
+    # Without uri_base references to other JSON schemas are not supported:
+    with pytest.raises(toml_schema.SchemaError) as exc_info:
+        toml_schema.from_json_schema(JSON_SCHEMA)
+    assert str(exc_info.value) == (
+        f"'user': Unsupported reference: {URI_BASE}/user.json"
+    )
+
+
+@pytest.mark.parametrize(
+    ("json_object", "error"),
+    [
+        ({"type": "string"}, 'root: JSON schema is not an object: "string"'),
+        ({"type": "object", "x": 1}, "root: Extra values: {'x': 1}"),
+        ({"type": "string", "x": 1}, "root: Extra keys: {'x': 1}"),
+        ({"type": []}, "root: JSON type array is empty: []"),
+        ({"enum": ["a"], "type": "integer"}, "root: 'enum' of type: integer"),
+        ({"pattern": "a", "type": "integer"}, "root: 'pattern' of type: integer"),
+        ({"const": 1}, "root: 'const' is not a string: 1"),
+        ({"enum": [1, 2]}, "root: 'enum' is not a list of strings: [1, 2]"),
+        ({"enum": "a"}, "root: Not a JSON array: a"),
+        ({"pattern": 1}, "root: Not a JSON string: 1"),
+        ({"type": "object", "properties": []}, "root: Not a JSON object: []"),
+        (
+            {"type": "object", "properties": {"a": True}},
+            "'a': Not a JSON object: True",
+        ),
+        ({"enum": ["a", True]}, "root: 'enum' is not a list of strings: ['a', True]"),
+        (
+            {"type": "object", "properties": {"*": {"type": "string"}}},
+            "root: Property name '*' is a wildcard in TOML schemas.",
+        ),
+        (
+            {"type": "integer", "minimum": "1"},
+            "root: Minimum with non-numeric value: 1",
+        ),
+        (
+            {"type": "integer", "maximum": "1"},
+            "root: Maximum with non-numeric value: 1",
+        ),
+        ({"$ref": "other.json"}, "root: Unsupported reference: other.json"),
+        ({"$ref": "#/other"}, "root: Unsupported reference: #/other"),
+        (
+            {"type": "object", "properties": {}, "propertyNames": {}},
+            "root: 'propertyNames' with more than one property rule.",
+        ),
+        (
+            {"type": "object", "additionalProperties": False, "propertyNames": {}},
+            "root: 'propertyNames' with more than one property rule.",
+        ),
+        (
+            {"type": "object", "definitions": {}, "$defs": {}},
+            "root: 'definitions' and '$defs' both defined.",
+        ),
+        (
+            {"type": "object", "properties": {"a": {"type": "string", "x": 1}}},
+            "'a': Extra keys: {'x': 1}",
+        ),
+        (
+            {"type": "object", "properties": {}, "required": ["a"]},
+            "root: Extra required: ['a']",
+        ),
+        (
+            {"type": "object", "properties": {"a": {"type": "array", "items": []}}},
+            "'a': No support for 'items' list: []",
+        ),
+        (
+            {
+                "type": "object",
+                "properties": {"a": {"type": "array", "additionalItems": True}},
+            },
+            "'a': Unsupported additionalItems = True",
+        ),
+        (
+            {"type": "object", "properties": {"a": {"type": "array", "x": 1}}},
+            "'a': Extra keys: {'x': 1}",
+        ),
+        (
+            {"type": "object", "properties": {"a": {"anyOf": [], "required": []}}},
+            "'a': 'required' in union not supported: []",
+        ),
+        (
+            {"type": "object", "properties": {"a": {"anyOf": [{"x": 1}]}}},
+            "'a[0]': Extra keys: {'x': 1}",
+        ),
+    ],
+)
+def test_json_schema_errors(json_object: dict[str, Any], error: str) -> None:
+    """Test the errors of unsupported JSON schema rules."""
+    with pytest.raises(toml_schema.SchemaError) as exc_info:
+        toml_schema.from_json_schema(json_object)
+    assert str(exc_info.value) == error
+
+
+def test_quoted_names_and_values() -> None:
+    """Test that the property names and the enum and const values are quoted."""
+    names = ["a.b", "a b", "union", "a=b", 'x"y', "\\", "é"]
+    values = ['x"y', "it's", "a\\b", "a\nb", "\\u0041", "'''", '"""', "\x7f"]
+    json_object: dict[str, Any] = {
+        "type": "object",
+        "additionalProperties": False,
+        "required": ["r.s", "union"],
+        "properties": {
+            **{name: {"type": "integer"} for name in names},
+            "r.s": {"type": "integer"},
+            "enum": {"enum": values},
+            **{f"const{i}": {"const": value} for i, value in enumerate(values)},
+        },
+    }
+    schema = toml_schema.from_json_schema(json_object)
+    document: dict[str, Any] = dict.fromkeys([*names, "r.s"], 1)
+    schema.validate(document)
+    for i, value in enumerate(values):
+        schema.validate({**document, "enum": value, f"const{i}": value})
+    with pytest.raises(toml_schema.SchemaError) as exc_info:
+        schema.validate({"union": 1})
+    assert str(exc_info.value) == "root: Missing required key: r.s"
+    with pytest.raises(toml_schema.SchemaError) as exc_info:
+        schema.validate({**document, "a": {"b": 1}})
+    assert str(exc_info.value).startswith("root: Key 'a' not in schema")
+    with pytest.raises(toml_schema.SchemaError) as exc_info:
+        schema.validate({**document, "const2": "ab"})
+    assert str(exc_info.value) == "'const2': 'ab' not in: ['a\\\\b']"
+
+
+def test_one_of_mode() -> None:
+    """Test when oneOf is converted to a union of any option."""
+    converter = toml_schema.JSONSchemaConverter(uri_base=None)
+    modes: list[tuple[list[Any], str]] = [
+        ([{"type": "string"}, {"type": "integer"}], "any"),
+        ([{"type": "string"}, {"$ref": "#/definitions/a"}], "one"),
+        ([{"type": "string", "enum": ["a"]}, {"type": "string", "enum": ["b"]}], "any"),
+        ([{"type": "string", "enum": ["a"]}, {"type": "string", "enum": ["a"]}], "one"),
+        ([{"type": "string", "enum": ["a"]}, {"type": "string"}], "one"),
+        ([{"type": "integer"}, {"type": "integer"}, {"type": "string"}], "one"),
+        ([{"type": ["string", "null"]}, {"type": "integer"}], "any"),
+    ]
+    for union_list, mode in modes:
+        assert converter._one_of_mode("a", union_list) == mode  # noqa: SLF001
+
+
+def test_injected_ref() -> None:
+    """Test that a reference in a list is taken as the TOML value of a handler."""
+    converter = toml_schema.JSONSchemaConverter(uri_base=None)
+    json_object: dict[str, object] = {"$ref": ['"string"']}
+    assert converter.get_toml_ref("a", json_object) == '"string"'
+    assert json_object == {}
@@ -0,0 +1,164 @@
+"""Test the incremental runs of the JSON schema converter."""
+
+import hashlib
+import json
+import os
+import pathlib
+import subprocess
+import sys
+import tarfile
+
+# The tools are not installed, they are run from the source tree:
+SOURCE_DIR = pathlib.Path(__file__).resolve().parent.parent
+
+
+def json_to_toml_process(
+    tmp_path: pathlib.Path, *args: str
+) -> subprocess.CompletedProcess[str]:
+    """Run the converter offline in tmp_path, with the store in tmp_path/store."""
+    return subprocess.run(  # noqa: S603
+        [
+            sys.executable,
+            "-m",
+            "tools.json_to_toml",
+            "--offline",
+            "--store",
+            "store",
+            *args,
+        ],
+        cwd=tmp_path,
+        env={**os.environ, "PYTHONPATH": str(SOURCE_DIR)},
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+
+
+def run_json_to_toml(tmp_path: pathlib.Path) -> list[str]:
+    """Run the converter in tmp_path, seeding the store with its schemastore."""
+    result = json_to_toml_process(tmp_path, "--seed", "schemastore", "--jobs", "1")
+    assert result.returncode == 0, result.stderr
+    return result.stdout.splitlines()
+
+
+def test_state_file(tmp_path: pathlib.Path) -> None:
+    """Test that the state file is not taken as a JSON schema by the next run."""
+    (tmp_path / "schemastore").mkdir()
+    (tmp_path / "schemastore" / "pyproject.json").write_text(
+        '{"type": "object", "properties": {"name": {"type": "string"}}}'
+    )
+    output = run_json_to_toml(tmp_path)
+    assert output[0] == f"1 JSON schemas added to '{tmp_path}/store'."
+    assert output[-1] == "1 of 1 JSON schemas converted."
+    state_paths = [
+        path
+        for path in (tmp_path / "schemastore").iterdir()
+        if path.name.startswith(".json_to_toml")
+    ]
+    assert len(state_paths) == 1
+    state = state_paths[0].read_text()
+    toml_path = tmp_path / "schemastore" / "pyproject.schema.toml"
+    toml_schema = toml_path.read_text()
+
+    # The second run does not seed the state file, and converts nothing:
+    output = run_json_to_toml(tmp_path)
+    assert output[0] == f"1 JSON schemas added to '{tmp_path}/store'."
+    assert output[-1] == "0 of 1 JSON schemas converted."
+    assert state_paths[0].read_text() == state
+    assert toml_path.read_text() == toml_schema
+
+
+def test_converter_changed(tmp_path: pathlib.Path) -> None:
+    """Test that all the files are converted again when the converter changed."""
+    (tmp_path / "schemastore").mkdir()
+    (tmp_path / "schemastore" / "pyproject.json").write_text(
+        '{"type": "object", "properties": {"name": {"type": "string"}}}'
+    )
+    run_json_to_toml(tmp_path)
+    state_path = tmp_path / "schemastore" / ".json_to_toml.state"
+    state: dict[str, object] = json.loads(state_path.read_text())
+    # The converter includes the JSON schema module of toml_schema:
+    converter_files = ["tools/json_to_toml.py", "toml_schema/_json_schema.py"]
+    content = b"".join((SOURCE_DIR / name).read_bytes() for name in converter_files)
+    assert state["converter"] == hashlib.sha256(content).hexdigest()
+
+    state["converter"] = hashlib.sha256(b"old converter").hexdigest()
+    state_path.write_text(json.dumps(state))
+    output = run_json_to_toml(tmp_path)
+    assert output[-1] == "1 of 1 JSON schemas converted."
+
+
+def write_json_schemas(
+    tmp_path: pathlib.Path, references: dict[str, list[str]]
+) -> None:
+    """Write JSON schemas to tmp_path/schemastore, with their references."""
+    (tmp_path / "schemastore").mkdir()
+    for json_filename, json_refs in references.items():
+        properties = {
+            f"key{index}": {"$ref": f"https://json.schemastore.org/{json_ref}"}
+            for index, json_ref in enumerate(json_refs)
+        }
+        json_object = {
+            "type": "object",
+            "additionalProperties": False,
+            "properties": {"name": {"type": "string"}, **properties},
+        }
+        (tmp_path / "schemastore" / json_filename).write_text(json.dumps(json_object))
+
+
+def test_convert_all_order(tmp_path: pathlib.Path) -> None:
+    """Test that the files are listed in the order of their first reference."""
+    write_json_schemas(
+        tmp_path,
+        {
+            "pyproject.json": ["zeta.json", "alpha.json", "mid.json"],
+            "zeta.json": ["beta.json", "alpha.json"],
+            "alpha.json": ["beta.json"],
+            "mid.json": [],
+            "beta.json": [],
+        },
+    )
+    order = ["pyproject.json", "zeta.json", "alpha.json", "mid.json", "beta.json"]
+    for _ in range(3):
+        result = json_to_toml_process(
+            tmp_path, "--seed", "schemastore", "--jobs", "4", "--force"
+        )
+        assert result.returncode == 0, result.stderr
+        output = result.stdout.splitlines()
+        assert [line.split(":")[0] for line in output[1:6]] == order
+        assert output[-1] == "5 of 5 JSON schemas converted."
+
+
+def test_store_tarball(tmp_path: pathlib.Path) -> None:
+    """Test seeding the store from a tarball, which takes only its JSON files."""
+    write_json_schemas(tmp_path, {"pyproject.json": ["user.json"], "user.json": []})
+    (tmp_path / "schemastore" / "notes.txt").write_text("not a schema")
+    with tarfile.open(tmp_path / "schemas.tar.gz", "w:gz") as tar_file:
+        tar_file.add(tmp_path / "schemastore", arcname="schemas")
+    for json_path in (tmp_path / "schemastore").glob("*.json"):
+        json_path.unlink()
+    result = json_to_toml_process(tmp_path, "--seed", "schemas.tar.gz")
+    assert result.returncode == 0, result.stderr
+    output = result.stdout.splitlines()
+    assert output[0] == f"2 JSON schemas added to '{tmp_path}/store'."
+    assert output[-1] == "2 of 2 JSON schemas converted."
+    # The local JSON files are restored from the store:
+    assert (tmp_path / "schemastore" / "user.json").exists()
+    assert (tmp_path / "schemastore" / "user.schema.toml").exists()
+
+
+def test_store_errors(tmp_path: pathlib.Path) -> None:
+    """Test the errors of a file which is not in the store, or does not match it."""
+    write_json_schemas(tmp_path, {"pyproject.json": []})
+    result = json_to_toml_process(tmp_path)
+    assert result.returncode != 0
+    uri = "https://json.schemastore.org/pyproject.json"
+    assert f"{uri}: Not in the schema store, seed it with --seed" in result.stderr
+
+    run_json_to_toml(tmp_path)
+    (object_path,) = (tmp_path / "store" / "objects").iterdir()
+    object_path.write_text("{}")
+    result = json_to_toml_process(tmp_path, "--force")
+    assert result.returncode != 0
+    digest = object_path.name
+    assert f"{uri}: Content does not match hash {digest}" in result.stderr
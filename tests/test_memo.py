@@ -0,0 +1,185 @@
+"""Test the memoized validation of toml-schema."""
+
+import types
+from typing import Optional, cast
+
+import pytest
+
+import toml_schema
+from toml_schema._toml_schema import SchemaElement
+
+SCHEMA = """
+[servers."*"]
+ip = "pattern = '^[0-9]+([.][0-9]+){3}$'"
+"role = { required = true }" = "enum = ['frontend', 'backend']"
+ports = [ "integer", "unique-items = true" ]
+[users]
+"*" = "ref = 'def.user'"
+["def = { hidden = true }".user]
+"id = { required = true }" = "integer"
+contact.union = [ "string", { email = "string" }, { phone = "integer" } ]
+"""
+
+
+def server(
+    ip: toml_schema.TOMLValue = "10.0.0.1",
+    ports: Optional[toml_schema.TOMLValue] = None,
+) -> dict[str, toml_schema.TOMLValue]:
+    """Get a server table."""
+    table: dict[str, toml_schema.TOMLValue] = {"ip": ip, "role": "backend"}
+    if ports is not None:
+        table["ports"] = ports
+    return table
+
+
+def document(
+    count: int = 3, **changes: toml_schema.TOMLValue
+) -> dict[str, toml_schema.TOMLValue]:
+    """Get a document of count identical servers and users, with changes."""
+    user: dict[str, toml_schema.TOMLValue] = {"id": 1, "contact": {"phone": 555}}
+    servers: dict[str, toml_schema.TOMLValue] = {
+        f"server{index}": server(ports=[80, 443]) for index in range(count)
+    }
+    users: dict[str, toml_schema.TOMLValue] = {
+        f"user{index}": dict(user) for index in range(count)
+    }
+    servers.update(changes)
+    return {"servers": servers, "users": users}
+
+
+def validation_error(
+    schema: SchemaElement,
+    value: toml_schema.TOMLValue,
+    memo: Optional[toml_schema.ValidationMemo] = None,
+) -> Optional[str]:
+    """Get the error of validation, or None if value is valid."""
+    try:
+        if memo is None:
+            schema.validate(value, context="")
+        else:
+            memo.validate(schema, value)
+    except toml_schema.SchemaError as ex:
+        return str(ex)
+    return None
+
+
+def test_memo() -> None:
+    """Test that repeated subtrees are validated only once."""
+    schema = toml_schema.loads(SCHEMA)
+    memo = toml_schema.ValidationMemo()
+    assert memo.hit_rate == 0.0
+    schema.validate_with(document(1), memo=memo)
+    misses = memo.misses
+    assert memo.hits == 0
+    schema.validate_with(document(10), memo=memo)
+    # Without keep, the cache of the first validation is cleared:
+    assert memo.misses == 2 * misses
+    assert memo.hits == 2 * 9
+    assert memo.hit_rate == memo.hits / (memo.hits + memo.misses)
+
+    memo = toml_schema.ValidationMemo(keep=True)
+    schema.validate_with(document(10), memo=memo)
+    hits = memo.hits
+    schema.validate_with(document(10), memo=memo)
+    assert memo.hits == hits + 1
+    memo.clear()
+    schema.validate_with(document(10), memo=memo)
+    assert memo.hits == 2 * hits + 1
+    assert len(memo) == misses
+
+
+@pytest.mark.parametrize(
+    "changes",
+    [
+        {},
+        {"bad": server(ip="10.0.0")},
+        {"bad": server(ip=10)},
+        {"bad": server(ports=[80, 80])},
+        {"bad": server(ports=[80, "443"])},
+        {"bad": {"ip": "10.0.0.1"}},
+        {"bad": {"ip": "10.0.0.1", "role": "backend", "name": "bad"}},
+        {"bad": [server()]},
+    ],
+)
+def test_memo_errors(changes: dict[str, toml_schema.TOMLValue]) -> None:
+    """Test that errors are the errors of validation, with the new contexts."""
+    schema = toml_schema.loads(SCHEMA)
+    memo = toml_schema.ValidationMemo(keep=True)
+    for count in range(4):
+        value = document(count, **changes)
+        expected = validation_error(schema, value)
+        assert validation_error(schema, value, memo) == expected
+        renamed = {"other": changes["bad"]} if "bad" in changes else {}
+        value = document(count, **renamed)
+        expected = validation_error(schema, value)
+        assert validation_error(schema, value, memo) == expected
+    assert memo.hits > 0
+
+
+def test_memo_relative_context() -> None:
+    """Test a cached error of a subtree of the root which is reused elsewhere."""
+    schema = toml_schema.loads(SCHEMA)
+    memo = toml_schema.ValidationMemo(keep=True)
+    server_schema = schema.get_sub_schema("servers")
+    assert isinstance(server_schema, toml_schema.Table)
+    servers: toml_schema.TOMLValue = {"bad": server(ip=10)}
+    assert validation_error(server_schema, servers, memo) == (
+        "'bad.ip': Value 10 is not a string."
+    )
+    hits = memo.hits
+    with pytest.raises(toml_schema.SchemaError) as exc_info:
+        schema.validate_with({"servers": servers}, memo=memo)
+    assert memo.hits == hits + 1
+    assert exc_info.value.context == "servers.bad.ip"
+    with pytest.raises(toml_schema.SchemaError) as exc_info:
+        memo.validate(schema, servers)
+    assert str(exc_info.value) == "root: Key 'bad' not in schema."
+    assert validation_error(server_schema, [], memo) == (
+        validation_error(server_schema, [])
+    )
+    assert validation_error(server_schema, [], memo) == (
+        validation_error(server_schema, [])
+    )
+
+
+def test_memo_max_size() -> None:
+    """Test that the least recently used results are evicted."""
+    schema = toml_schema.loads(SCHEMA)
+    memo = toml_schema.ValidationMemo(keep=True, max_size=2)
+    schema.validate_with(document(1), memo=memo)
+    misses = memo.misses
+    assert len(memo) == 2
+    schema.validate_with(document(1), memo=memo)
+    assert memo.hits == 0
+    assert memo.misses == 2 * misses
+    memo = toml_schema.ValidationMemo(keep=True, max_size=1000)
+    schema.validate_with(document(1), memo=memo)
+    schema.validate_with(document(1), memo=memo)
+    assert memo.hits == 1
+
+
+def test_memo_path_adapter_and_profiler() -> None:
+    """Test the memo with a dotted path and with an adapter."""
+    schema = toml_schema.loads(SCHEMA)
+    memo = toml_schema.ValidationMemo()
+    value = document(3)
+    schema.validate_with(value, path="servers", memo=memo)
+    assert memo.hits == 2
+    value["users"] = (value["users"],)  # type: ignore[assignment]
+    with pytest.raises(toml_schema.SchemaError) as exc_info:
+        schema.validate_with(value, memo=memo)
+    assert exc_info.value.context == "users"
+    adapter = toml_schema.ValueAdapter()
+    # Values which are not plain are validated without the cache:
+    user: dict[str, object] = {"id": 1, "contact": ("555",)}
+    users: dict[str, object] = {"a": user, "b": user}
+    adapted_value = cast(toml_schema.TOMLValue, {"users": users})
+    with pytest.raises(toml_schema.SchemaError) as exc_info:
+        schema.validate_with(adapted_value, memo=memo, adapter=adapter)
+    assert exc_info.value.context == "users.a.contact"
+    user["contact"] = types.MappingProxyType({"phone": 555})
+    hits = memo.hits
+    schema.validate_with(adapted_value, memo=memo, adapter=adapter)
+    assert memo.hits == hits
+    with pytest.raises(ValueError, match="profiler and a memo"):
+        schema.validate_with(value, memo=memo, profiler=toml_schema.Profiler())
@@ -0,0 +1,163 @@
+"""Test the schema optimizer of toml-schema."""
+
+import pathlib
+import sys
+
+if sys.version_info >= (3, 11):
+    import tomllib
+else:
+    import tomli as tomllib
+
+import pytest
+
+import toml_schema
+from toml_schema._optimize import TypeSet, count_nodes
+from toml_schema._toml_schema import AnyValue, Integer, Ref, SchemaElement, Union
+
+UNIONS_SCHEMA = """
+    number.union = [ "integer", { union = [ "float", "string" ] }, "enum = ['a']" ]
+    anything.union = [ "string", "ref = 'def.any'" ]
+    mixed.union = [ "integer = { min = 0 }", "string", "boolean", { x = "integer" } ]
+    one = { "union = 'one'" = [ "integer = { min = 0 }", "integer = { max = 9 }" ] }
+    dup = { "union = 'one'" = [ "integer", "ref = 'def.int'" ] }
+    p1 = { x = "integer", y = "string" }
+    p2 = { x = "integer", y = "string" }
+    t1 = "ref = 'def.tree'"
+    t2 = "ref = 'def.tree'"
+    name = "ref = 'def.name'"
+    "ref = 'def.key'" = "boolean"
+
+    ["def = { hidden = true }"]
+    any = "any-value"
+    int = "integer"
+    name = "string = { max-len = 10 }"
+    key = "enum = [ 'Red', 'Green' ]"
+    tree = { value = "integer", children = [ "ref = 'def.tree'" ] }
+"""
+
+
+def sub_schema(schema: toml_schema.Table, key: str) -> SchemaElement:
+    """Get the sub-schema of a key, which must exist."""
+    schema_value = schema.get_sub_schema(key)
+    assert schema_value is not None
+    return schema_value
+
+
+def check_same(
+    schema: toml_schema.Table,
+    optimized: toml_schema.Table,
+    document: dict[str, toml_schema.TOMLValue],
+) -> None:
+    """Check that both schemas accept the document, or that both reject it."""
+    try:
+        schema.validate(document)
+    except toml_schema.SchemaError:
+        with pytest.raises(toml_schema.SchemaError):
+            optimized.validate(document)
+    else:
+        optimized.validate(document)
+
+
+def test_optimize() -> None:
+    """Test the optimizations of a schema."""
+    schema = toml_schema.loads(UNIONS_SCHEMA)
+    result = toml_schema.optimize(schema)
+    optimized = result.schema
+    assert result.nodes_before == count_nodes(schema)
+    assert result.nodes_after == count_nodes(optimized)
+    assert result.nodes_after < result.nodes_before
+
+    number = sub_schema(optimized, "number")
+    assert isinstance(number, TypeSet)
+    assert number.types == {int, float, str}
+    assert isinstance(sub_schema(optimized, "anything"), AnyValue)
+    mixed = sub_schema(optimized, "mixed")
+    assert type(mixed) is Union
+    assert [type(option) for option in mixed] == [Integer, TypeSet, toml_schema.Table]
+    assert isinstance(mixed[1], TypeSet)
+    assert mixed[1].types == {str, bool}
+    assert type(sub_schema(optimized, "one")) is Union
+    # The options of the union would be duplicates:
+    assert sub_schema(optimized, "dup") is sub_schema(schema, "dup")
+    assert sub_schema(optimized, "p1") is sub_schema(optimized, "p2")
+    assert sub_schema(optimized, "t1") is sub_schema(optimized, "t2")
+    assert not isinstance(sub_schema(optimized, "name"), Ref)
+
+    with pytest.raises(toml_schema.SchemaError) as exc_info:
+        optimized.validate({"number": True})
+    assert str(exc_info.value) == (
+        '\'number\': Value True not in: { union = [ "integer", "float", "string" ] }'
+    )
+
+    documents: list[dict[str, toml_schema.TOMLValue]] = [
+        {"number": 1, "anything": [1, {"a": 2}], "mixed": 0},
+        {"number": "b", "mixed": -1},
+        {"number": True},
+        {"mixed": "s", "one": 10},
+        {"mixed": True, "one": 5},
+        {"mixed": {"x": 1}, "one": -1},
+        {"mixed": {"x": "1"}},
+        {"p1": {"x": 1, "y": "s"}, "p2": {"x": 1, "y": 2}},
+        {"t1": {"value": 1, "children": [{"value": 2, "children": []}]}},
+        {"t2": {"value": 1, "children": [{"value": "2"}]}},
+        {"name": "short", "Red": True, "Green": False},
+        {"name": "too long for the name"},
+        {"Blue": True},
+        {"dup": 1},
+    ]
+    for document in documents:
+        check_same(schema, optimized, document)
+
+
+def test_optimize_options() -> None:
+    """Test optimizing without inlining references."""
+    schema = toml_schema.loads(UNIONS_SCHEMA)
+    optimized = toml_schema.optimize(schema, inline_refs=False).schema
+    assert isinstance(sub_schema(optimized, "name"), Ref)
+    anything = sub_schema(optimized, "anything")
+    assert type(anything) is Union
+    optimized.validate({"name": "short", "anything": 3})
+
+    # References are not inlined if Ref.validate was customized:
+    ref_validate = Ref.validate
+
+    def patched_validate(
+        self: Ref, value: toml_schema.TOMLValue, /, *, context: str
+    ) -> None:
+        ref_validate(self, value, context=context)  # pragma: no cover
+
+    Ref.validate = patched_validate  # type: ignore[method-assign]
+    try:
+        optimized = toml_schema.optimize(schema).schema
+    finally:
+        Ref.validate = ref_validate  # type: ignore[method-assign]
+    assert isinstance(sub_schema(optimized, "name"), Ref)
+
+
+def test_optimize_files(tmp_path: pathlib.Path) -> None:
+    """Test optimizing a schema with file references."""
+    (tmp_path / "user.schema.toml").write_text('name = "string"')
+    (tmp_path / "main.schema.toml").write_text("""
+        user = "file = 'user.schema.toml'"
+        admin = "file = 'user.schema.toml'"
+        other = "file = 'no-such-file.schema.toml'"
+    """)
+    schema = toml_schema.from_file(str(tmp_path / "main.schema.toml"), lazy_files=True)
+    schema.validate_with({"user": {"name": "me"}}, path="user")
+    optimized = toml_schema.optimize(schema).schema
+    assert sub_schema(optimized, "user") is not sub_schema(schema, "user")
+    assert sub_schema(optimized, "other") is sub_schema(schema, "other")
+    optimized.validate({"user": {"name": "me"}, "admin": {"name": "root"}})
+    with pytest.raises(toml_schema.SchemaError) as exc_info:
+        optimized.validate({"user": {"name": 1}})
+    assert str(exc_info.value) == "'user.name': Value 1 is not: \"string\""
+
+
+def test_optimize_corpus() -> None:
+    """Test that the optimized schema accepts and rejects the same corpus."""
+    schema = toml_schema.from_file("schemastore/pyproject.schema.toml")
+    optimized = toml_schema.optimize(schema).schema
+    for path in sorted(pathlib.Path("examples").glob("**/*.toml")):
+        with path.open("rb") as toml_file:
+            document: dict[str, toml_schema.TOMLValue] = tomllib.load(toml_file)
+        check_same(schema, optimized, document)
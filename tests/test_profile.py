@@ -0,0 +1,141 @@
+"""Test the validation profiler of toml-schema."""
+
+import json
+import pathlib
+
+import pytest
+
+import toml_schema
+from toml_schema import _walk
+from toml_schema._toml_schema import Ref
+
+
+def test_profiler(tmp_path: pathlib.Path) -> None:
+    """Test the per node statistics of the profiler."""
+    (tmp_path / "user.schema.toml").write_text('name = "string"')
+    schema_path = tmp_path / "main.schema.toml"
+    schema_path.write_text("""
+        user = "file = 'user.schema.toml'"
+        ports = [ "ref = 'def.port'", "min-items = 1" ]
+        value = { union = [ "integer", "string" ] }
+
+        ["def = { hidden = true }"]
+        port = "integer = { min = 0 }"
+    """)
+    schema = toml_schema.from_file(str(schema_path))
+    profiler = toml_schema.Profiler()
+    document: dict[str, toml_schema.TOMLValue] = {
+        "user": {"name": "John"},
+        "ports": [80, 443],
+        "value": "text",
+    }
+    schema.validate_with(document, profiler=profiler)
+    stats = {
+        (stats.schema_file, stats.address, stats.kind): stats
+        for stats in profiler.sorted_stats()
+    }
+    assert sorted(stats) == [
+        ("", "", "table"),
+        ("", "def = { hidden = true }.port", "integer"),
+        ("", "ports", "array"),
+        ("", "ports[0]", "ref"),
+        ("", "user", "file"),
+        ("", "value", "union"),
+        ("", "value[0]", "integer"),
+        ("", "value[1]", "string"),
+        ("user.schema.toml", "", "table"),
+        ("user.schema.toml", "name", "string"),
+    ]
+    assert stats["", "def = { hidden = true }.port", "integer"].calls == 2
+    assert stats["", "ports[0]", "ref"].calls == 2
+    union_stats = stats["", "value", "union"]
+    assert union_stats.union_tried == 2
+    assert union_stats.union_failed == 1
+    assert stats["user.schema.toml", "name", "string"].node == (
+        "user.schema.toml:name (string)"
+    )
+    root_stats = stats["", "", "table"]
+    assert root_stats.node == "root (table)"
+    assert root_stats.calls == 1
+    assert all(
+        0 <= node_stats.self_time <= node_stats.cumulative <= root_stats.cumulative
+        for node_stats in stats.values()
+    )
+    assert sum(node_stats.self_time for node_stats in stats.values()) == (
+        pytest.approx(root_stats.cumulative)
+    )
+
+    # Statistics accumulate over validations:
+    schema.validate_with(document, profiler=profiler)
+    assert root_stats.calls == 2
+    assert stats["", "def = { hidden = true }.port", "integer"].calls == 4
+
+    report = profiler.report(limit=3).splitlines()
+    assert report[0] == "   calls   cumul ms    self ms   tried  failed  node"
+    assert len(report) == 4
+
+    # A patched validate method is profiled as a leaf:
+    def patched_validate(
+        self: Ref, value: toml_schema.TOMLValue, /, *, context: str
+    ) -> None:
+        _walk._REF_VALIDATE(self, value, context=context)  # noqa: SLF001
+
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(Ref, "validate", patched_validate)
+        leaf_profiler = toml_schema.Profiler()
+        schema.validate_with(document, profiler=leaf_profiler)
+    assert ("", "ports[0]", "ref") in leaf_profiler.stats
+    assert ("", "def = { hidden = true }.port", "integer") not in leaf_profiler.stats
+
+    # Dropped addresses are rebuilt for the statistics:
+    dropped = toml_schema.from_file(str(schema_path), addresses=False)
+    dropped_profiler = toml_schema.Profiler()
+    dropped.validate_with(document, profiler=dropped_profiler)
+    assert sorted(dropped_profiler.stats) == sorted(stats)
+
+    json_stats: list[dict[str, object]] = json.loads(profiler.to_json())
+    assert len(json_stats) == len(stats)
+    assert set(json_stats[0]) == {
+        "schema_file",
+        "address",
+        "kind",
+        "calls",
+        "cumulative",
+        "self_time",
+        "union_tried",
+        "union_failed",
+    }
+
+
+def test_profiler_errors() -> None:
+    """Test that profiled validation reports the same errors."""
+    schema = toml_schema.loads("""
+        numbers = [ "integer", "max-items = 2" ]
+        "name = { required = true }" = "string"
+        one = { "union = 'one'" = [ "integer", "integer = { min = 0 }" ] }
+        none = { "union = 'none'" = [ "string" ] }
+    """)
+    documents: list[toml_schema.TOMLValue] = [
+        [],
+        {"numbers": [1, 2, 3], "name": "x"},
+        {"numbers": 3, "name": "x"},
+        {"numbers": [1, "2"], "name": "x"},
+        {"numbers": [1]},
+        {"nothing": 3, "name": "x"},
+        {"name": "x", "one": 3},
+        {"name": "x", "none": "string"},
+    ]
+    for document in documents:
+        with pytest.raises(toml_schema.SchemaError) as exc_info:
+            schema.validate(document)
+        profiler = toml_schema.Profiler()
+        with pytest.raises(toml_schema.SchemaError) as profile_exc_info:
+            schema.validate_with(document, profiler=profiler)
+        assert profile_exc_info.value == exc_info.value
+        assert profiler.stats["", "", "table"].calls == 1
+
+    profiler = toml_schema.Profiler()
+    schema.validate_with({"name": "x", "one": -1, "none": 3}, profiler=profiler)
+    assert profiler.stats["", "one", "union"].union_tried == 2
+    assert profiler.stats["", "one", "union"].union_failed == 1
+    assert profiler.stats["", "none", "union"].union_failed == 1
@@ -22,7 +22,7 @@ from toml_schema._toml_schema import Ref
 WRITE_ERROR_FILES = False
 
 # The following is a method to handle special checks for "ref = 'format.*'" strings.
-# It works by monkey-patching the Ref.validate method.
+# It works by monkey-patching the Ref.validate method, in the tests of this module.
 
 # This example uses the functions in validate_project.formats for the special checks.
 # For example,  "ref = 'format.python-module-name-relaxed'" is checked with
@@ -44,7 +44,10 @@ def ref_validate(self: Ref, value: toml_schema.TOMLValue, /, *, context: str) ->
             raise toml_schema.SchemaError(f"Invalid format {self.ref}", context)
 
 
-Ref.validate = ref_validate  # type: ignore[method-assign]
+@pytest.fixture(autouse=True)
+def format_ref_validate(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Check the format references with ref_validate."""
+    monkeypatch.setattr(Ref, "validate", ref_validate)
 
 
 def list_toml_files() -> Generator[tuple[toml_schema.Table, pathlib.Path]]:
@@ -0,0 +1,234 @@
+"""Test the validating reader of toml-schema."""
+
+import io
+import pathlib
+import sys
+from typing import Union
+
+import pytest
+
+if sys.version_info >= (3, 11):
+    import tomllib
+else:
+    import tomli as tomllib
+
+import toml_schema
+from toml_schema._toml_schema import Table
+
+SCHEMA = """
+title = "string"
+text = "string"
+literal = "string"
+numbers = [ [ "integer" ] ]
+"ratio = { required = false }" = "float"
+products = [ { "name = { required = true }" = "string" }, "min-items = 2" ]
+["owner = { required = true }"]
+name = "string"
+[servers."*"]
+ip = "string"
+["users = { required = false }"]
+"*" = "ref = 'def.user'"
+[tool."*"]
+"*" = "any-value"
+[point]
+x.union = [ "integer", { value = "integer" } ]
+[tags]
+"*" = [ "any-value", "max-items = 1" ]
+["def = { hidden = true }".user]
+"id = { required = true }" = "integer"
+"""
+
+DOCUMENT = """\
+title = "TOML" # [not a header]
+text = \"\"\"
+[not a header]
+with \\\"\"\" quotes \\\\\"\"\"\"
+numbers = [
+    [1, 2], # ]
+    [3],
+]
+'literal' = '''
+[not a header]'''''
+
+[owner]
+name = 'Tom'
+
+  [ servers . alpha ]
+ip = "10.0.0.1"
+
+["servers"."beta.2"]
+ip = "10.0.0.2"
+
+[[products]]
+name = "Hammer"
+
+[[ "products" ]]
+name = "Nail"
+
+[users.joe]
+id = 1
+
+[tool.ruff]
+line-length = 88
+[tool.ruff.lint]
+select = [ "ALL" ]
+
+[point.x]
+value = 1
+
+[[tags.colors]]
+"""
+
+
+def read_result(
+    schema: Table, document: str, *, skip_any_values: bool = False
+) -> Union[dict[str, toml_schema.TOMLValue], str]:
+    """Get the document read with the validating reader, or its error."""
+    try:
+        return toml_schema.validate_loads(
+            schema, document, skip_any_values=skip_any_values
+        )
+    except (toml_schema.SchemaError, tomllib.TOMLDecodeError) as ex:
+        return f"{type(ex).__name__}: {ex}"
+
+
+def parse_result(
+    schema: Table, document: str
+) -> Union[dict[str, toml_schema.TOMLValue], str]:
+    """Get the document parsed and then validated, or its error."""
+    try:
+        toml_table: dict[str, toml_schema.TOMLValue] = tomllib.loads(document)
+        schema.validate(toml_table)
+    except (toml_schema.SchemaError, tomllib.TOMLDecodeError) as ex:
+        return f"{type(ex).__name__}: {ex}"
+    return toml_table
+
+
+def test_reader() -> None:
+    """Test that documents are read as tomllib reads them."""
+    schema = toml_schema.loads(SCHEMA.replace('"*" = "any-value"', ""))
+    toml_table: dict[str, toml_schema.TOMLValue] = tomllib.loads(DOCUMENT)
+    with pytest.raises(toml_schema.SchemaError):
+        schema.validate(toml_table)
+    schema = toml_schema.loads(SCHEMA)
+    expected = parse_result(schema, DOCUMENT)
+    assert isinstance(expected, dict)
+    assert read_result(schema, DOCUMENT) == expected
+    assert read_result(schema, DOCUMENT.replace("\n", "\r\n")) == expected
+    toml_file = io.BytesIO(DOCUMENT.encode())
+    assert toml_schema.validate_load(schema, toml_file) == expected
+
+    # The sections of any-value tables are not parsed:
+    document = DOCUMENT.replace('[ "ALL" ]', "invalid\n[tool.ruff.lint.a]")
+    document += "[[tool.ruff.lint.b]]\n"
+    result = read_result(schema, document, skip_any_values=True)
+    assert isinstance(result, dict)
+    assert result["tool"] == {"ruff": {"line-length": 88, "lint": {"a": {}, "b": [{}]}}}
+    assert read_result(schema, "[owner]\n[tool.ruff]\n", skip_any_values=True) == {
+        "owner": {},
+        "tool": {"ruff": {}},
+    }
+
+
+@pytest.mark.parametrize(
+    ("old", "new"),
+    [
+        # Errors in the root section, in table headers and in sections:
+        ('title = "TOML"', "title = 1"),
+        ('title = "TOML"', "titles = 1"),
+        ("[users.joe]", "[user.joe]"),
+        ("[users.joe]", "[[users.joe]]"),
+        ('ip = "10.0.0.1"', "ip = 1"),
+        ("[tool.ruff.lint]", "[owner.name]"),
+        ("[tool.ruff.lint]", "[title]"),
+        ("[tool.ruff.lint]", "[[title]]"),
+        # Errors found when the document is complete:
+        ("[owner]\nname = 'Tom'", "[owner.name]"),
+        ("id = 1", ""),
+        ('name = "Nail"', ""),
+        ("value = 1", 'value = "1"'),
+        ("[[tags.colors]]", "[[tags.colors]]\n[[tags.colors]]"),
+        ('[[ "products" ]]\nname = "Nail"', ""),
+        # TOML errors:
+        ("[point.x]", "[owner]"),
+        ("[point.x]", "[[owner]]"),
+        ("[point.x]", "[[products.name]]"),
+        ("[point.x]", "[[products]]\nname = 'x'\n[products]"),
+        ("[point.x]", "[numbers]"),
+        ("[point.x]", "[point.x.value]\n[point.x]"),
+        ("[point.x]", "[owner]\nname = 1"),
+        ("value = 1", "value = "),
+        ("[point.x]", "[point.x"),
+        ("[point.x]", "[[point.x]"),
+        ("[point.x]\nvalue = 1", "[point.x.y]\n[point.x]\ny = 1"),
+        ("[point.x]", "[point.x] = 1"),
+    ],
+)
+def test_reader_errors(old: str, new: str) -> None:
+    """Test that the errors are the errors of validating after parsing."""
+    schema = toml_schema.loads(SCHEMA)
+    assert old in DOCUMENT
+    document = DOCUMENT.replace(old, new, 1)
+    expected = parse_result(schema, document)
+    assert isinstance(expected, str)
+    assert read_result(schema, document) == expected
+
+
+def test_reader_files(tmp_path: pathlib.Path) -> None:
+    """Test tables with the schema of another schema file."""
+    (tmp_path / "user.schema.toml").write_text('name = "string"')
+    schema_path = tmp_path / "main.schema.toml"
+    schema_path.write_text("""users."*" = "file = 'user.schema.toml'"\n""")
+    schema = toml_schema.from_file(str(schema_path))
+    assert read_result(schema, "[users.joe]\nname = 'Joe'\n") == {
+        "users": {"joe": {"name": "Joe"}}
+    }
+    assert read_result(schema, "[users.joe]\nname = 1\n[users.bob]\n") == (
+        "SchemaError: 'users.joe.name': Value 1 is not: \"string\""
+    )
+
+
+def test_reader_merge() -> None:
+    """Test sections which are merged by tomllib at the end of the document."""
+    schema = toml_schema.loads("""
+        [a."*"]
+        c = "integer"
+        [a."*".d]
+        e = "integer"
+    """)
+    document = "[a]\nb.c = 1\n[a.b.d]\ne = 1\n[a.x]\nc = 1\n"
+    toml_table: dict[str, toml_schema.TOMLValue] = tomllib.loads(document)
+    assert read_result(schema, document) == toml_table
+    document = "[a.b.d]\ne = 1\n[a]\nb.c = 1\n"
+    assert read_result(schema, document) == {"a": {"b": {"d": {"e": 1}, "c": 1}}}
+    document = document.replace("[a.x]\nc = 1", "[a.x]\nc = '1'")
+    assert read_result(schema, document) == parse_result(schema, document)
+
+
+def test_reader_fail_fast() -> None:
+    """Test that the reader stops at the first section with an error."""
+    schema = toml_schema.loads('["*"]\nid = "integer"')
+    document = "[a]\nid = 1\n[b]\nid = '2'\n[c]\nid = "
+    assert read_result(schema, document) == (
+        "SchemaError: 'b.id': Value 2 is not: \"integer\""
+    )
+    assert parse_result(schema, document) == (
+        "TOMLDecodeError: Invalid value (at end of document)"
+    )
+
+
+def test_reader_custom_validate(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that schemas with a customized validate method are still used."""
+    schema = toml_schema.loads('["*"]\nid = "integer"')
+    contexts: list[str] = []
+    table_validate = Table.validate
+
+    def validate(
+        self: Table, value: toml_schema.TOMLValue, /, *, context: str = ""
+    ) -> None:
+        contexts.append(context)
+        table_validate(self, value, context=context)
+
+    monkeypatch.setattr(Table, "validate", validate)
+    assert read_result(schema, "[a]\nid = 1\n") == {"a": {"id": 1}}
+    assert contexts == ["", "a"]
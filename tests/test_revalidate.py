@@ -0,0 +1,226 @@
+"""Test the incremental revalidation of toml-schema."""
+
+import copy
+import pathlib
+from typing import Optional
+
+import pytest
+
+import toml_schema
+from toml_schema._toml_schema import Pattern, Ref
+
+SCHEMA = """
+"title = { required = true }" = "string"
+tags = [ "string", "unique-items = true" ]
+point.union = [ "integer", { x = "integer", y = "integer" } ]
+[owner]
+"name = { required = true }" = "pattern = '^[A-Z][a-z]+$'"
+age = "integer = { min = 0 }"
+[servers."*"]
+ip = "string"
+"role = { required = true }" = "enum = ['frontend', 'backend']"
+[users]
+"*" = "ref = 'def.user'"
+["def = { hidden = true }".user]
+"id = { required = true }" = "integer"
+groups = [ "string" ]
+[["hosts = { required = false }"]]
+name = "string"
+"""
+
+DOCUMENT: dict[str, toml_schema.TOMLValue] = {
+    "title": "Example",
+    "tags": ["a", "b"],
+    "point": {"x": 1, "y": 2},
+    "owner": {"name": "Tom", "age": 42},
+    "servers": {
+        "alpha": {"ip": "10.0.0.1", "role": "frontend"},
+        "beta": {"ip": "10.0.0.2", "role": "backend"},
+    },
+    "users": {"joe": {"id": 1, "groups": ["admin"]}, "bob": {"id": 2}},
+    "hosts": [{"name": "alpha"}, {"name": "beta"}],
+}
+
+_MISSING = object()
+
+
+def edited(path: str, new_value: object) -> dict[str, toml_schema.TOMLValue]:
+    """Get a copy of DOCUMENT with the value at path replaced or removed."""
+    document = copy.deepcopy(DOCUMENT)
+    *keys, last_key = path.split(".")
+    table = document
+    for key in keys:
+        table = table.setdefault(key, {})  # type: ignore[assignment]
+    if new_value is _MISSING:
+        del table[last_key]
+    else:
+        table[last_key] = new_value  # type: ignore[assignment]
+    return document
+
+
+def validation_error(
+    schema: toml_schema.Table, document: dict[str, toml_schema.TOMLValue]
+) -> Optional[str]:
+    """Get the error of a full validation, or None if document is valid."""
+    try:
+        schema.validate(document)
+    except toml_schema.SchemaError as ex:
+        return str(ex)
+    return None
+
+
+def revalidation_error(
+    schema: toml_schema.Table,
+    document: dict[str, toml_schema.TOMLValue],
+    changed: Optional[list[str]] = None,
+) -> Optional[str]:
+    """Get the error of revalidating an edit of DOCUMENT."""
+    try:
+        if changed is None:
+            schema.revalidate(DOCUMENT, document)
+        else:
+            schema.revalidate_paths(document, changed)
+    except toml_schema.SchemaError as ex:
+        return str(ex)
+    return None
+
+
+@pytest.mark.parametrize(
+    ("path", "new_value"),
+    [
+        ("title", "New title"),
+        ("title", 1),
+        ("title", _MISSING),
+        ("tags", ["a", "a"]),
+        ("tags", ["a", "c"]),
+        ("point", 1),
+        ("point", True),
+        ("point.x", 3),
+        ("point.x", "3"),
+        ("point.z", 3),
+        ("owner.name", "Bob"),
+        ("owner.name", "bob"),
+        ("owner.name", _MISSING),
+        ("owner.age", -1),
+        ("owner.age", 42.0),
+        ("owner.age", True),
+        ("owner.email", "tom@example.com"),
+        ("owner", "Tom"),
+        ("servers.gamma", {"ip": "10.0.0.3", "role": "backend"}),
+        ("servers.gamma", {"ip": "10.0.0.3"}),
+        ("servers.alpha.role", "database"),
+        ("servers.beta.ip", _MISSING),
+        ("servers.beta", _MISSING),
+        ("users.bob.id", _MISSING),
+        ("users.bob.id", 3),
+        ("users.bob.groups", ["staff"]),
+        ("users.bob.groups", [1]),
+        ("users.bob.groups.admin", True),
+        ("users.joe", []),
+        ("hosts", [{"name": "alpha"}, {"name": "gamma"}]),
+        ("hosts", [{"name": "alpha"}, {"name": 1}]),
+        ("hosts", [{"name": "alpha"}, {"name": "beta", "ip": "10.0.0.1"}]),
+        ("version", "1.0"),
+        ("def.user.id", 1),
+    ],
+)
+def test_revalidate(path: str, new_value: object) -> None:
+    """Test that revalidation has the result of a full validation."""
+    schema = toml_schema.loads(SCHEMA)
+    assert validation_error(schema, DOCUMENT) is None
+    document = edited(path, new_value)
+    expected = validation_error(schema, document)
+    assert revalidation_error(schema, document) == expected
+    assert revalidation_error(schema, document, [path]) == expected
+    assert revalidation_error(schema, document, [path, "title"]) == expected
+    assert revalidation_error(schema, document, [path.split(".")[0]]) == expected
+    assert revalidation_error(schema, document, [""]) == expected
+
+
+def test_revalidate_several_changes() -> None:
+    """Test that the first error is the first error of a full validation."""
+    schema = toml_schema.loads(SCHEMA)
+    document = edited("users.joe.id", "1")
+    document["owner"] = {"name": "tom"}
+    document["tags"] = ["a", 1]
+    expected = "'tags[1]': Value 1 is not: \"string\""
+    assert validation_error(schema, document) == expected
+    assert revalidation_error(schema, document) == expected
+    changed = ["users.joe.id", "owner.name", "tags"]
+    assert revalidation_error(schema, document, changed) == expected
+    assert revalidation_error(schema, document, changed[:2]) == (
+        "'owner.name': 'tom' does not match pattern: ^[A-Z][a-z]+$"
+    )
+    assert revalidation_error(schema, document, changed[:1]) == (
+        "'users.joe.id': Value 1 is not: \"integer\""
+    )
+    assert revalidation_error(schema, document, []) is None
+    changed = ["users", "users.joe.id", "owner.name.first"]
+    assert revalidation_error(schema, document, changed) == (
+        "'owner.name': 'tom' does not match pattern: ^[A-Z][a-z]+$"
+    )
+
+
+def test_revalidate_previous_error() -> None:
+    """Test that a document edited from an invalid document is fully validated."""
+    schema = toml_schema.loads(SCHEMA)
+    old_document = edited("owner.age", -1)
+    with pytest.raises(toml_schema.SchemaError) as exc_info:
+        schema.validate(old_document)
+    document = copy.deepcopy(old_document)
+    document["title"] = "New title"
+    schema.revalidate(old_document, document)
+    schema.revalidate_paths(document, ["title"])
+    with pytest.raises(toml_schema.SchemaError) as revalidate_info:
+        schema.revalidate(old_document, document, previous_error=exc_info.value)
+    assert revalidate_info.value == exc_info.value
+    with pytest.raises(toml_schema.SchemaError) as revalidate_info:
+        schema.revalidate_paths(document, ["title"], previous_error=exc_info.value)
+    assert revalidate_info.value == exc_info.value
+
+
+def test_revalidate_checks_only_changes(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that the values which did not change are not validated again."""
+    schema = toml_schema.loads(SCHEMA)
+    contexts: list[str] = []
+    pattern_validate = Pattern.validate
+    ref_validate = Ref.validate
+
+    def validate(
+        self: Pattern, value: toml_schema.TOMLValue, /, *, context: str
+    ) -> None:
+        contexts.append(context)
+        pattern_validate(self, value, context=context)
+
+    def custom_ref_validate(
+        self: Ref, value: toml_schema.TOMLValue, /, *, context: str
+    ) -> None:
+        contexts.append(context)
+        ref_validate(self, value, context=context)
+
+    monkeypatch.setattr(Pattern, "validate", validate)
+    monkeypatch.setattr(Ref, "validate", custom_ref_validate)
+    schema.validate(DOCUMENT)
+    assert contexts == ["owner.name", "users.joe", "users.bob"]
+    contexts.clear()
+    document = edited("users.bob.id", 3)
+    schema.revalidate(DOCUMENT, document)
+    schema.revalidate(DOCUMENT, DOCUMENT)
+    # A customized Ref.validate is called, even though the change is under it:
+    assert contexts == ["users.bob"]
+    contexts.clear()
+    schema.revalidate_paths(edited("owner.name", "Bob"), ["owner.name"])
+    assert contexts == ["owner.name"]
+
+
+def test_revalidate_files(tmp_path: pathlib.Path) -> None:
+    """Test changes under a table of another schema file."""
+    (tmp_path / "user.schema.toml").write_text('name = "string"')
+    schema_path = tmp_path / "main.schema.toml"
+    schema_path.write_text("""users."*" = "file = 'user.schema.toml'"\n""")
+    schema = toml_schema.from_file(str(schema_path))
+    old_document: dict[str, toml_schema.TOMLValue] = {"users": {"joe": {"name": "Joe"}}}
+    document: dict[str, toml_schema.TOMLValue] = {"users": {"joe": {"name": 1}}}
+    with pytest.raises(toml_schema.SchemaError) as exc_info:
+        schema.revalidate(old_document, document)
+    assert str(exc_info.value) == "'users.joe.name': Value 1 is not: \"string\""
@@ -0,0 +1,114 @@
+"""Test the validation by sampling of toml-schema."""
+
+from typing import Optional
+
+import pytest
+
+import toml_schema
+
+SCHEMA = """
+name = "string"
+values = [ "integer", "min-items = 2", "max-items = 5000" ]
+unique = [ "integer", "unique-items = true" ]
+[users]
+"*" = "ref = 'def.user'"
+["def = { hidden = true }".user]
+id = "integer"
+tags = [ "string" ]
+"""
+
+
+def sample_error(
+    document: dict[str, toml_schema.TOMLValue], *, seed: int
+) -> Optional[str]:
+    """Get the context of the error of validating document by sampling."""
+    schema = toml_schema.loads(SCHEMA)
+    try:
+        toml_schema.validate_sample(schema, document, seed=seed)
+    except toml_schema.SchemaError as ex:
+        return ex.context
+    return None
+
+
+def test_sample() -> None:
+    """Test that small arrays are fully validated."""
+    schema = toml_schema.loads(SCHEMA)
+    document: dict[str, toml_schema.TOMLValue] = {
+        "name": "joe",
+        "values": [1, 2, 3],
+        "users": {"joe": {"id": 1, "tags": ["a", "b"]}},
+    }
+    result = toml_schema.validate_sample(schema, document)
+    assert result == toml_schema.SampleResult(arrays=2, items=5, checked_items=5)
+    assert not result.sampled
+    document["values"] = [1, "2", 3]
+    with pytest.raises(toml_schema.SchemaError) as exc_info:
+        toml_schema.validate_sample(schema, document, head=1, tail=1, size=1)
+    assert str(exc_info.value) == "'values[1]': Value 2 is not: \"integer\""
+
+
+def test_sample_large() -> None:
+    """Test that the first, the last and a seeded sample of the items are checked."""
+    schema = toml_schema.loads(SCHEMA)
+    values: list[toml_schema.TOMLValue] = list(range(4000))
+    document: dict[str, toml_schema.TOMLValue] = {"values": values}
+    result = toml_schema.validate_sample(schema, document)
+    assert result == toml_schema.SampleResult(
+        arrays=1, sampled_arrays=1, items=4000, checked_items=1200
+    )
+    assert result.sampled
+    for index in (0, 99, 3900, 3999):
+        values[index] = "bad"
+        with pytest.raises(toml_schema.SchemaError) as exc_info:
+            toml_schema.validate_sample(schema, document)
+        assert exc_info.value.context == f"values[{index}]"
+        values[index] = index
+    # An item in the middle is found only if it is in the sample:
+    values[2000] = "bad"
+    errors = {sample_error(document, seed=seed) for seed in range(20)}
+    assert errors == {None, "values[2000]"}
+    # The sample is the same for the same seed:
+    for seed in range(20):
+        assert sample_error(document, seed=seed) == sample_error(document, seed=seed)
+    with pytest.raises(toml_schema.SchemaError):
+        toml_schema.validate_sample(schema, document, size=3800)
+
+
+def test_sample_array_options() -> None:
+    """Test that min-items and max-items are checked on the whole array."""
+    schema = toml_schema.loads(SCHEMA)
+    document: dict[str, toml_schema.TOMLValue] = {"values": list(range(6000))}
+    with pytest.raises(toml_schema.SchemaError) as exc_info:
+        toml_schema.validate_sample(schema, document, head=1, tail=1, size=1)
+    assert str(exc_info.value) == ("'values': Array has more than 5000 items.")
+    # Unique items are checked only among the sampled items:
+    unique: list[toml_schema.TOMLValue] = list(range(10))
+    document = {"unique": unique}
+    unique[5] = 4
+    with pytest.raises(toml_schema.SchemaError):
+        toml_schema.validate_sample(schema, document)
+    result = toml_schema.validate_sample(schema, document, head=2, tail=2, size=1)
+    assert result.sampled
+
+
+def test_sample_path() -> None:
+    """Test validating by sampling with a path and a budget."""
+    schema = toml_schema.loads(SCHEMA)
+    tags: list[toml_schema.TOMLValue] = [str(index) for index in range(100)]
+    document: dict[str, toml_schema.TOMLValue] = {
+        "name": 1,
+        "users": {"joe": {"id": 1, "tags": tags}},
+    }
+    result = toml_schema.validate_sample(
+        schema, document, path="users.joe", head=5, tail=5, size=10
+    )
+    assert result == toml_schema.SampleResult(
+        arrays=1, sampled_arrays=1, items=100, checked_items=20
+    )
+    # The users table, the ref, the user, its id, tags and 6 sampled tags:
+    budget = toml_schema.Budget(max_nodes=11)
+    with pytest.raises(toml_schema.SchemaBudgetExceeded):
+        toml_schema.validate_sample(schema, document, path="users", budget=budget)
+    toml_schema.validate_sample(
+        schema, document, path="users", head=2, tail=2, size=2, budget=budget
+    )
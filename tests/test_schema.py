@@ -1,9 +1,15 @@
 """Test functionality of toml-schema."""
 
+import copy
+import json
+import os
 import pathlib
+import pickle
 import runpy
+import shutil
+import subprocess
 import sys
-from typing import Optional
+from typing import Optional, cast
 
 if sys.version_info >= (3, 11):
     import tomllib
@@ -1203,6 +1209,63 @@ def test_required_key() -> None:
     schema.validate({"fruit flies": "like an arrow"})
 
 
+def test_key_reconciliation() -> None:
+    """Test that key errors are found before any value is validated."""
+    schema = toml_schema.loads("""
+        "name = { required = true }" = "string"
+        "age = { required = true }" = "integer"
+        city = "string"
+    """)
+    # Missing required keys are reported in schema order:
+    with pytest.raises(toml_schema.SchemaError) as exc_info:
+        schema.validate({"city": 3})
+    assert str(exc_info.value) == "root: Missing required key: name"
+    with pytest.raises(toml_schema.SchemaError) as exc_info:
+        schema.validate({"name": 3})
+    assert str(exc_info.value) == "root: Missing required key: age"
+    # Unknown keys of closed tables are reported in document order:
+    with pytest.raises(toml_schema.SchemaError) as exc_info:
+        schema.validate({"name": 3, "age": 3, "town": 3, "country": 3})
+    assert str(exc_info.value) == "root: Key 'town' not in schema."
+    assert str(schema.get_sub_schema("city")) == '"string"'
+    assert schema.get_sub_schema("town") is None
+    # Tables with pattern keys are not closed:
+    schema = toml_schema.loads("""
+        name = "string"
+        "pattern = '^x-'" = "integer"
+    """)
+    with pytest.raises(toml_schema.SchemaError) as exc_info:
+        schema.validate({"name": 3, "town": 3})
+    assert str(exc_info.value) == "'name': Value 3 is not: \"string\""
+
+
+def test_table_change() -> None:
+    """Test that the precomputed keys follow the changes of a table as a dict."""
+    schema = toml_schema.loads('a = "string"')
+    schema[SchemaKey(name="b")] = private_toml_schema.Integer()
+    schema.validate({"b": 1})
+    schema.update({SchemaKey(name="c", required=True): private_toml_schema.Integer()})
+    with pytest.raises(toml_schema.SchemaError) as exc_info:
+        schema.validate({"b": 1})
+    assert str(exc_info.value) == "root: Missing required key: c"
+    schema |= {SchemaKey(name="d"): private_toml_schema.String()}
+    schema.validate({"c": 1, "d": "x"})
+    assert isinstance(schema, toml_schema.Table)
+    del schema[SchemaKey(name="c", required=True)]
+    schema.validate({"d": "x"})
+    schema.pop(SchemaKey(name="d"))
+    with pytest.raises(toml_schema.SchemaError) as exc_info:
+        schema.validate({"d": "x"})
+    assert str(exc_info.value).startswith("root: Key 'd' not in schema")
+    schema.setdefault(SchemaKey(name="*"), private_toml_schema.Float())
+    schema.validate({"d": 1.5})
+    schema.popitem()
+    assert schema.get_sub_schema("b") is not None
+    schema.clear()
+    assert schema.get_sub_schema("b") is None
+    schema.validate({})
+
+
 def test_hidden_key() -> None:
     """Test hidden keys."""
     schema = toml_schema.loads("""
@@ -1513,6 +1576,260 @@ def test_file_reference(tmp_path: pathlib.Path) -> None:
     )
 
 
+def test_file_reference_loading(tmp_path: pathlib.Path) -> None:
+    """Test loading many schema files referenced by each other."""
+    main_path = tmp_path / "main.schema.toml"
+    main_path.write_text("""
+        user = "file = 'user.schema.toml'"
+        group = "file = 'sub/group.schema.toml'"
+    """)
+    (tmp_path / "user.schema.toml").write_text('name = "string"')
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "sub" / "group.schema.toml").write_text("""
+        leader = "file = '../user.schema.toml'"
+        members = [ "file = '../user.schema.toml'" ]
+    """)
+    schema = toml_schema.from_file(str(main_path))
+    schema.validate({"user": {"name": "a"}, "group": {"members": [{"name": "b"}]}})
+
+    def file_target(table: toml_schema.Table, key: str) -> toml_schema.Table:
+        file = table.get_sub_schema(key)
+        assert isinstance(file, private_toml_schema.File)
+        target = file._target()  # noqa: SLF001
+        assert isinstance(target, toml_schema.Table)
+        return target
+
+    # Each schema file is loaded only once:
+    group_table = file_target(schema, "group")
+    assert file_target(schema, "user") is file_target(group_table, "leader")
+
+    # Errors keep the context of every file reference:
+    (tmp_path / "user.schema.toml").write_text('name = "stringly"')
+    with pytest.raises(toml_schema.SchemaError) as exc_info:
+        toml_schema.from_file(str(main_path))
+    assert str(exc_info.value) == (
+        "'user': Error reading 'user.schema.toml': "
+        "'name': 'stringly' is not a valid keyword type."
+    )
+    (tmp_path / "user.schema.toml").write_text('name = "string"')
+    (tmp_path / "sub" / "group.schema.toml").write_text(
+        "members = [ \"file = 'no-such.schema.toml'\" ]"
+    )
+    with pytest.raises(toml_schema.SchemaError) as exc_info:
+        toml_schema.from_file(str(main_path))
+    assert str(exc_info.value) == (
+        "'group': Error reading 'sub/group.schema.toml': "
+        "'members[0]': Error reading 'no-such.schema.toml': "
+        "[Errno 2] No such file or directory: "
+        f"'{tmp_path}/sub/no-such.schema.toml'"
+    )
+
+    # Reference cycles are reported with the chain of filenames:
+    (tmp_path / "user.schema.toml").write_text(
+        "group = \"file = 'sub/group.schema.toml'\""
+    )
+    (tmp_path / "sub" / "group.schema.toml").write_text(
+        "leader = \"file = '../user.schema.toml'\""
+    )
+    with pytest.raises(toml_schema.SchemaError) as exc_info:
+        toml_schema.from_file(str(main_path))
+    assert str(exc_info.value) == (
+        f"'user': File reference cycle: {main_path} -> user.schema.toml"
+        " -> sub/group.schema.toml -> ../user.schema.toml"
+    )
+    main_path.write_text("main = \"file = 'main.schema.toml'\"")
+    with pytest.raises(toml_schema.SchemaError) as exc_info:
+        toml_schema.from_file(str(main_path))
+    assert str(exc_info.value) == (
+        f"'main': File reference cycle: {main_path} -> main.schema.toml"
+    )
+
+
+def schema_nodes(schema: toml_schema.Table) -> list[private_toml_schema.SchemaElement]:
+    """List the schema nodes of a table, with its keys, in a fixed order."""
+    nodes: list[private_toml_schema.SchemaElement] = [schema]
+    for node in nodes:
+        if isinstance(node, toml_schema.Table):
+            for schema_key, schema_value in node.items():
+                nodes.extend((schema_key, schema_value))
+        elif isinstance(node, (private_toml_schema.Array, private_toml_schema.Union)):
+            nodes.extend(node)
+    return nodes
+
+
+def test_addresses(tmp_path: pathlib.Path) -> None:
+    """Test schemas loaded without the addresses of their nodes."""
+    # Schema elements have no instance dict:
+    if sys.version_info >= (3, 10):
+        assert not hasattr(private_toml_schema.String(), "__dict__")
+    assert not hasattr(toml_schema.loads('a = "string"'), "__dict__")
+
+    (tmp_path / "user.schema.toml").write_text('name = "string"')
+    schema_path = tmp_path / "main.schema.toml"
+    schema_path.write_text("""
+        user = "file = 'user.schema.toml'"
+        ports = [ "ref = 'def.port'", "min-items = 1" ]
+        value = { union = [ "integer", { a = [ "string" ] } ] }
+        "pattern = '^x-'" = "integer"
+        "id = { required = true }" = "integer"
+
+        ["def = { hidden = true }"]
+        port = "integer = { min = 0 }"
+    """)
+    schema = toml_schema.from_file(str(schema_path))
+    dropped = toml_schema.from_file(str(schema_path), addresses=False)
+    assert dropped == schema
+    nodes = schema_nodes(schema)
+    dropped_nodes = schema_nodes(dropped)
+    assert [
+        node._address  # noqa: SLF001
+        for node in dropped_nodes
+        if not isinstance(node, private_toml_schema.File)
+    ] == [""] * (len(nodes) - 1)
+
+    # The addresses are rebuilt, with special keys in their normalized form:
+    addresses = dropped.addresses()
+    assert [addresses[id(node)] for node in dropped_nodes] == [
+        node._address  # noqa: SLF001
+        for node in nodes
+    ]
+    assert schema.addresses() == {
+        id(node): node._address  # noqa: SLF001
+        for node in nodes
+    }
+    assert "pattern = '^x-'" in addresses.values()
+    assert "def = { hidden = true }.port" in addresses.values()
+
+    # The file reference keeps its address for errors, and lazy files
+    # are loaded without addresses:
+    dropped = toml_schema.from_file(str(schema_path), lazy_files=True, addresses=False)
+    dropped.validate({"id": 1, "user": {"name": "me"}})
+    user = dropped.get_sub_schema("user")
+    assert isinstance(user, private_toml_schema.File)
+    assert user._address == "user"  # noqa: SLF001
+    user_table = user._target()  # noqa: SLF001
+    assert isinstance(user_table, toml_schema.Table)
+    assert [node._address for node in schema_nodes(user_table)] == [""] * 3  # noqa: SLF001
+    (tmp_path / "user.schema.toml").unlink()
+    dropped = toml_schema.from_file(str(schema_path), lazy_files=True, addresses=False)
+    with pytest.raises(toml_schema.SchemaError) as exc_info:
+        dropped.validate({"id": 1, "user": {"name": "me"}})
+    assert str(exc_info.value).startswith("'user': Error reading 'user.schema.toml'")
+
+
+def test_pickle(tmp_path: pathlib.Path) -> None:
+    """Test that the frozen schema elements can be pickled and copied."""
+    (tmp_path / "user.schema.toml").write_text('name = "string"')
+    schema_path = tmp_path / "main.schema.toml"
+    schema_path.write_text("""
+        user = "file = 'user.schema.toml'"
+        ports = [ "ref = 'def.port'", "min-items = 1", "unique-items = true" ]
+        value = { union = [ "integer", { a = [ "string" ] } ] }
+        name = "pattern = '^[a-z]+$'"
+        "pattern = '^x-'" = "integer"
+        "ref = 'def.key'" = "float"
+        "id = { required = true }" = "integer"
+
+        ["def = { hidden = true }"]
+        port = "integer = { min = 0 }"
+        key = "pattern = '^y-'"
+    """)
+    document: dict[str, private_toml_schema.TOMLValue] = {
+        "id": 1,
+        "user": {"name": "me"},
+        "ports": [1, 2],
+        "value": {"a": ["b"]},
+        "name": "abc",
+        "x-a": 1,
+        "y-a": 1.5,
+    }
+    for lazy_files, addresses in [(False, True), (True, False)]:
+        schema = toml_schema.from_file(
+            str(schema_path), lazy_files=lazy_files, addresses=addresses
+        )
+        copies: list[toml_schema.Table] = [
+            cast(toml_schema.Table, pickle.loads(pickle.dumps(schema))),  # noqa: S301
+            copy.deepcopy(schema),
+            copy.copy(schema),
+        ]
+        for schema_copy in copies:
+            assert schema_copy == schema
+            assert str(schema_copy) == str(schema)
+            assert sorted(schema_copy.addresses().values()) == sorted(
+                schema.addresses().values()
+            )
+            schema_copy.validate(document)
+            with pytest.raises(toml_schema.SchemaError) as exc_info:
+                schema_copy.validate({**document, "ports": [1, -1]})
+            assert str(exc_info.value) == "'ports[1]': Value out of range: -1 < 0"
+
+
+def test_validate_path(tmp_path: pathlib.Path) -> None:
+    """Test validating only the subtree at a dotted path."""
+    (tmp_path / "ruff.schema.toml").write_text('line-length = "integer"')
+    (tmp_path / "main.schema.toml").write_text("""
+        name = "string"
+        tool.ruff = "file = 'ruff.schema.toml'"
+        tool.other = "file = 'no-such-file.schema.toml'"
+        tool.version = "ref = 'def.version'"
+        "pattern = '^x-'" = "integer"
+        "def = { hidden = true }".version = { major = "integer" }
+    """)
+    with pytest.raises(toml_schema.SchemaError) as exc_info:
+        toml_schema.from_file(str(tmp_path / "main.schema.toml"))
+    assert str(exc_info.value).startswith(
+        "'tool.other': Error reading 'no-such-file.schema.toml': [Errno 2]"
+    )
+    schema = toml_schema.from_file(str(tmp_path / "main.schema.toml"), lazy_files=True)
+    document: dict[str, toml_schema.TOMLValue] = {
+        "name": 3,  # The rest of the document is not validated.
+        "tool": {"ruff": {"line-length": 88}, "version": {"major": 1}},
+        "x-tra": 1,
+    }
+    schema.validate_with(document, path="tool.ruff")
+    schema.validate_with(document, path="tool.ruff.line-length")
+    schema.validate_with(document, path="tool.version")
+    schema.validate_with(document, path="tool.version.major")
+    with pytest.raises(toml_schema.SchemaError) as exc_info:
+        schema.validate(document)
+    assert str(exc_info.value) == "'name': Value 3 is not: \"string\""
+
+    document["tool"] = {"ruff": {"line-length": "88"}, "other": {}}
+    with pytest.raises(toml_schema.SchemaError) as exc_info:
+        schema.validate_with(document, path="tool.ruff")
+    assert (
+        str(exc_info.value) == "'tool.ruff.line-length': Value 88 is not: \"integer\""
+    )
+    with pytest.raises(toml_schema.SchemaError) as exc_info:
+        schema.validate_with(document, path="tool.ruff.line-length")
+    assert (
+        str(exc_info.value) == "'tool.ruff.line-length': Value 88 is not: \"integer\""
+    )
+    # Only the schema file of the path is loaded:
+    with pytest.raises(toml_schema.SchemaError) as exc_info:
+        schema.validate_with(document, path="tool.other")
+    assert str(exc_info.value).startswith(
+        "'tool.other': Error reading 'no-such-file.schema.toml': [Errno 2]"
+    )
+    with pytest.raises(toml_schema.SchemaError) as exc_info:
+        schema.validate_with(document, path="tool.version")
+    assert str(exc_info.value) == "'tool': Missing path key: version"
+    with pytest.raises(toml_schema.SchemaError) as exc_info:
+        schema.validate_with(document, path="tool.rough")
+    assert str(exc_info.value).startswith("'tool': Key 'rough' not in schema")
+    with pytest.raises(toml_schema.SchemaError) as exc_info:
+        schema.validate_with(document, path="name.first")
+    assert str(exc_info.value) == "'name': Path key 'first' not in a table: \"string\""
+    with pytest.raises(toml_schema.SchemaError) as exc_info:
+        schema.validate_with({"tool": []}, path="tool.ruff")
+    assert str(exc_info.value).startswith("'tool': Value [] is not: {")
+    # Keys matching a pattern:
+    schema.validate_with(document, path="x-tra")
+    with pytest.raises(toml_schema.SchemaError) as exc_info:
+        schema.validate_with(document, path="x-tra.a")
+    assert str(exc_info.value) == "'x-tra': Path key 'a' not in a table: \"integer\""
+
+
 def run_toml_schema(*args: str) -> None:
     """Run toml-schema as if it was an executable."""
     with pytest.MonkeyPatch.context() as mp:
@@ -1520,6 +1837,110 @@ def run_toml_schema(*args: str) -> None:
         runpy.run_module("toml_schema", run_name="__main__")
 
 
+def test_lint(tmp_path: pathlib.Path) -> None:
+    """Test finding performance problems in a schema."""
+    (tmp_path / "user.schema.toml").write_text("""
+        name = "pattern = '^(\\\\w+\\\\s?)*$'"
+    """)
+    (tmp_path / "main.schema.toml").write_text("""
+        user = "file = 'user.schema.toml'"
+        version = "pattern = '^[0-9]+(\\\\.[0-9]+)*$'"
+        word = "pattern = '^(a|ab)*$'"
+        value.union = [ "integer", "integer = { min = 1 }", "string" ]
+        tags = [ "ref = 'def.c1'" ]
+        cycle.union = [ "ref = 'def.c2'", "integer" ]
+        admin = "file = 'user.schema.toml'"
+        one = { "union = 'one'" = [ "ref = 'def.any'", "integer" ] }
+        all = { "union = 'all'" = [ "string", "pattern = '^a'" ] }
+        deep = "ref = 'def.r1'"
+        "pattern = '^x-'" = "integer"
+        "pattern = '^x-one$'" = "integer"
+        "pattern = '.*'" = "string"
+        "ref = 'def.key'" = "boolean"
+
+        ["def = { hidden = true }"]
+        any = "any-value"
+        key = "enum = [ 'Red' ]"
+        r1 = "ref = 'def.r2'"
+        r2 = "ref = 'def.r3'"
+        r3 = "ref = 'def.r4'"
+        r4 = "ref = 'def.r5'"
+        r5 = "integer"
+        c1 = "ref = 'def.c2'"
+        c2 = "ref = 'def.c1'"
+    """)
+    schema = toml_schema.from_file(str(tmp_path / "main.schema.toml"))
+    assert [str(finding) for finding in toml_schema.lint(schema)] == [
+        "root: Key \"pattern = '^x-one$'\" is shadowed by \"pattern = '^x-'\".",
+        "root: Key \"ref = 'def.key'\" is shadowed by \"pattern = '.*'\".",
+        "user.schema.toml:'name': Pattern '^(\\w+\\s?)*$' has nested quantifiers.",
+        "'word': Pattern '^(a|ab)*$' repeats alternatives which overlap.",
+        "'value[1]': Union option \"integer = { min = 1 }\" is unreachable "
+        'after "integer".',
+        '\'one[1]\': Union option "integer" is unreachable after "any-value".',
+        "'deep': Reference chain of 5 refs is deeper than 4.",
+        "'def = { hidden = true }.c1': Reference cycle: def.c2 -> def.c1",
+        "'def = { hidden = true }.c2': Reference cycle: def.c1 -> def.c2",
+    ]
+    # Dropped addresses are rebuilt for the findings:
+    assert toml_schema.lint(
+        toml_schema.from_file(str(tmp_path / "main.schema.toml"), addresses=False)
+    ) == toml_schema.lint(schema)
+    deep_finding = toml_schema.LintFinding(
+        "", "deep", "Reference chain of 5 refs is deeper than 4."
+    )
+    assert deep_finding in toml_schema.lint(schema)
+    assert deep_finding not in toml_schema.lint(schema, max_ref_depth=5)
+
+    # Patterns with extensions are scanned:
+    nested = "has nested quantifiers."
+    overlap = "repeats alternatives which overlap."
+    patterns: list[tuple[str, list[str]]] = [
+        ("(?i)(a*)*", [nested]),
+        ("^((a+))+$", [nested]),
+        ("^((ab)+c?)+$", [nested]),
+        ("^x((a+)+)$", [nested]),
+        ("^(?#c)x{,3}[)(]+a{}b{x$", []),
+        ("^(?=b)(?:\\\\x41|\\\\N{DIGIT ONE}|[^]aA1])+a{2,}(b{1,3})*", []),
+        ("^(\\\\w|\\\\d{1})+", [overlap]),
+        ("^x((?:b)|b)+$", [overlap]),
+        ("^(?P<n>a)(b|(?P=n))+$", [overlap]),
+        ("^(a?|a)+$", [overlap]),
+        ("^x((a|a)+)$", [overlap]),
+    ]
+    if sys.version_info >= (3, 11):  # pragma: no branch
+        # Atomic groups and possessive quantifiers do not backtrack:
+        patterns.append(("^(?>a+)+(a++)+$", []))
+    for pattern, findings in patterns:
+        schema = toml_schema.loads(f"name = \"pattern = '{pattern}'\"")
+        assert [
+            finding.message.rsplit("' ", 1)[1] for finding in toml_schema.lint(schema)
+        ] == findings
+
+
+def test_lazy_import() -> None:
+    """Test that the optional modules are imported only when they are used."""
+    code = (
+        "import sys, toml_schema\n"
+        "print(sorted(m for m in sys.modules if m.startswith('toml_schema')))\n"
+        "print('asyncio' in sys.modules)\n"
+        "toml_schema.avalidate_files\n"
+        "print('asyncio' in sys.modules)\n"
+    )
+    result = subprocess.run(  # noqa: S603
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    assert result.stdout.splitlines() == [
+        "['toml_schema', 'toml_schema._toml_schema']",
+        "False",
+        "True",
+    ]
+    assert set(toml_schema.__all__) <= set(dir(toml_schema))
+    assert toml_schema.Catalog is toml_schema._catalog.Catalog  # noqa: SLF001
+    with pytest.raises(AttributeError, match="has no attribute 'no_such_name'"):
+        toml_schema.no_such_name  # noqa: B018
+
+
 def test_main(
     tmp_path: pathlib.Path,
     capsys: pytest.CaptureFixture[str],
@@ -1531,7 +1952,17 @@ def test_main(
     captured = capsys.readouterr()
     assert captured.out == ""
     assert (
-        captured.err == "usage: toml-schema [-h] [--version] schema_file toml_file\n"
+        captured.err
+        == "usage: toml-schema [-h] [--version] [--path DOTTED_KEY] [--fail-fast]\n"
+        "                   [--max-nodes N] [--max-depth N] "
+        "[--max-seconds SECONDS]\n"
+        "                   [--sample] [--profile] [--profile-json JSON_FILE] "
+        "[--lint]\n"
+        "                   [--analyze] [--analyze-json JSON_FILE]\n"
+        "                   [--budget METRIC=LIMIT] [--auto PATH]\n"
+        "                   [--catalog CATALOG_FILE] [--bundle BUNDLE_FILE]\n"
+        "                   [--write-bundle BUNDLE_FILE]\n"
+        "                   [schema_file] [toml_file]\n"
         "toml-schema: error: the following arguments are required: "
         "schema_file, toml_file\n"
     )
@@ -1541,7 +1972,16 @@ def test_main(
         run_toml_schema("--help")
     captured = capsys.readouterr()
     assert captured.out.startswith(
-        "usage: toml-schema [-h] [--version] schema_file toml_file\n"
+        "usage: toml-schema [-h] [--version] [--path DOTTED_KEY] [--fail-fast]\n"
+        "                   [--max-nodes N] [--max-depth N] "
+        "[--max-seconds SECONDS]\n"
+        "                   [--sample] [--profile] [--profile-json JSON_FILE] "
+        "[--lint]\n"
+        "                   [--analyze] [--analyze-json JSON_FILE]\n"
+        "                   [--budget METRIC=LIMIT] [--auto PATH]\n"
+        "                   [--catalog CATALOG_FILE] [--bundle BUNDLE_FILE]\n"
+        "                   [--write-bundle BUNDLE_FILE]\n"
+        "                   [schema_file] [toml_file]\n"
         "\n"
         "positional arguments:\n"
         "  schema_file\n"
@@ -1599,3 +2039,516 @@ def test_main(
         captured.err == f"Error reading '{schema_path}': "
         "Invalid value (at line 1, column 7)\n"
     )
+
+
+def test_main_profile(
+    tmp_path: pathlib.Path,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    """Test profiling with the main entry point."""
+    schema_path = tmp_path / "main.schema.toml"
+    toml_path = tmp_path / "main.toml"
+    json_path = tmp_path / "profile.json"
+    with schema_path.open("w") as schema_file:
+        schema_file.write('name = "string"')
+    with toml_path.open("w") as toml_file:
+        toml_file.write('name = "joe"')
+    run_toml_schema("--profile", str(schema_path), str(toml_path))
+    captured = capsys.readouterr()
+    lines = captured.out.splitlines()
+    assert lines[0] == "   calls   cumul ms    self ms   tried  failed  node"
+    assert sorted(line.rsplit("  ", 1)[1] for line in lines[1:3]) == [
+        "name (string)",
+        "root (table)",
+    ]
+    assert lines[3:] == ["TOML schema validated."]
+    assert captured.err == ""
+
+    # The profile is written even if validation fails:
+    with toml_path.open("w") as toml_file:
+        toml_file.write("name = 3")
+    with pytest.raises(SystemExit, match="1"):
+        run_toml_schema(
+            "--profile-json", str(json_path), str(schema_path), str(toml_path)
+        )
+    captured = capsys.readouterr()
+    assert captured.out == ""
+    assert captured.err == "'name': Value 3 is not: \"string\"\n"
+    with json_path.open() as json_file:
+        assert '"address": "name"' in json_file.read()
+
+
+def test_main_path(
+    tmp_path: pathlib.Path,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    """Test validating only the subtree at a dotted path."""
+    schema_path = tmp_path / "main.schema.toml"
+    toml_path = tmp_path / "main.toml"
+    with schema_path.open("w") as schema_file:
+        schema_file.write("""
+            name = "string"
+            tool.other = "file = 'no-such-file.schema.toml'"
+            tool.ruff = { line-length = "integer" }
+        """)
+    with toml_path.open("w") as toml_file:
+        toml_file.write("name = 3\ntool.ruff.line-length = 88")
+    run_toml_schema(
+        "--path", "tool.ruff", "--profile", str(schema_path), str(toml_path)
+    )
+    captured = capsys.readouterr()
+    assert "tool.ruff.line-length (integer)" in captured.out
+    assert "name" not in captured.out
+    assert captured.out.endswith("TOML schema validated.\n")
+
+    with pytest.raises(SystemExit, match="1"):
+        run_toml_schema("--path", "name", str(schema_path), str(toml_path))
+    captured = capsys.readouterr()
+    assert captured.err == "'name': Value 3 is not: \"string\"\n"
+
+    catalog_path = tmp_path / "catalog.toml"
+    with catalog_path.open("w") as catalog_file:
+        catalog_file.write('"main.schema.toml" = [ "main.toml" ]')
+    with pytest.raises(SystemExit, match="1"):
+        run_toml_schema(
+            "--catalog",
+            str(catalog_path),
+            "--path",
+            "tool.rough",
+            "--auto",
+            str(toml_path),
+        )
+    captured = capsys.readouterr()
+    assert captured.err.startswith(f"{toml_path}: 'tool': Key 'rough' not in schema")
+
+
+def test_main_fail_fast(
+    tmp_path: pathlib.Path,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    """Test validating TOML files while they are read."""
+    schema_path = tmp_path / "main.schema.toml"
+    toml_path = tmp_path / "main.toml"
+    with schema_path.open("w") as schema_file:
+        schema_file.write('name = "string"\n[user]\nid = "integer"')
+    with toml_path.open("w") as toml_file:
+        toml_file.write('name = "joe"\n[user]\nid = 1')
+    run_toml_schema("--fail-fast", str(schema_path), str(toml_path))
+    captured = capsys.readouterr()
+    assert captured.out == "TOML schema validated.\n"
+
+    # The error in the first section is found before the syntax error:
+    with toml_path.open("w") as toml_file:
+        toml_file.write("name = 3\n[user]\nid = ")
+    with pytest.raises(SystemExit, match="1"):
+        run_toml_schema("--fail-fast", str(schema_path), str(toml_path))
+    captured = capsys.readouterr()
+    assert captured.err == "'name': Value 3 is not: \"string\"\n"
+
+    with toml_path.open("w") as toml_file:
+        toml_file.write('name = "joe"\n[user]\nid = ')
+    with pytest.raises(SystemExit, match="1"):
+        run_toml_schema("--fail-fast", str(schema_path), str(toml_path))
+    captured = capsys.readouterr()
+    assert captured.err == (
+        f"Error reading '{toml_path}': Invalid value (at end of document)\n"
+    )
+
+    catalog_path = tmp_path / "catalog.toml"
+    with catalog_path.open("w") as catalog_file:
+        catalog_file.write('"main.schema.toml" = [ "main.toml" ]')
+    with pytest.raises(SystemExit, match="1"):
+        run_toml_schema(
+            "--fail-fast", "--catalog", str(catalog_path), "--auto", str(tmp_path)
+        )
+    captured = capsys.readouterr()
+    assert captured.err == (
+        f"{toml_path}: Error reading '{toml_path}': "
+        "Invalid value (at end of document)\n"
+        "1 of 1 TOML files failed.\n"
+    )
+    with toml_path.open("w") as toml_file:
+        toml_file.write("[user]\nid = 1")
+    run_toml_schema(
+        "--fail-fast", "--catalog", str(catalog_path), "--auto", str(tmp_path)
+    )
+    captured = capsys.readouterr()
+    assert captured.out == "1 TOML files validated.\n"
+
+    for option in ("--path=name", "--profile", "--profile-json=x.json"):
+        with pytest.raises(SystemExit, match="2"):
+            run_toml_schema("--fail-fast", option, str(schema_path), str(toml_path))
+        captured = capsys.readouterr()
+        assert captured.err.endswith(
+            f"toml-schema: error: argument --fail-fast: not allowed with argument "
+            f"{option.split('=')[0]}\n"
+        )
+
+
+def test_main_budget(
+    tmp_path: pathlib.Path,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    """Test validating TOML files within a budget."""
+    schema_path = tmp_path / "main.schema.toml"
+    toml_path = tmp_path / "main.toml"
+    with schema_path.open("w") as schema_file:
+        schema_file.write('name = "string"\n[user]\nid = "integer"')
+    with toml_path.open("w") as toml_file:
+        toml_file.write('name = "joe"\n[user]\nid = 1')
+    budget = ("--max-nodes=4", "--max-depth=2", "--max-seconds=10")
+    run_toml_schema(*budget, str(schema_path), str(toml_path))
+    captured = capsys.readouterr()
+    assert captured.out == "TOML schema validated.\n"
+
+    with pytest.raises(SystemExit, match="1"):
+        run_toml_schema("--max-nodes=3", str(schema_path), str(toml_path))
+    captured = capsys.readouterr()
+    assert captured.err == "'user.id': Validation visited more than 3 schema nodes.\n"
+
+    catalog_path = tmp_path / "catalog.toml"
+    with catalog_path.open("w") as catalog_file:
+        catalog_file.write('"main.schema.toml" = [ "main.toml" ]')
+    with pytest.raises(SystemExit, match="1"):
+        run_toml_schema(
+            "--max-depth=1", "--catalog", str(catalog_path), "--auto", str(tmp_path)
+        )
+    captured = capsys.readouterr()
+    assert captured.err == (
+        f"{toml_path}: 'user': Document is nested deeper than 1 levels.\n"
+        "1 of 1 TOML files failed.\n"
+    )
+
+    with pytest.raises(SystemExit, match="2"):
+        run_toml_schema(
+            "--fail-fast", "--max-seconds=1", str(schema_path), str(toml_path)
+        )
+    captured = capsys.readouterr()
+    assert captured.err.endswith(
+        "toml-schema: error: argument --fail-fast: not allowed with arguments "
+        "--max-nodes, --max-depth and --max-seconds\n"
+    )
+
+
+def test_main_sample(
+    tmp_path: pathlib.Path,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    """Test validating a TOML file by sampling its large arrays."""
+    schema_path = tmp_path / "main.schema.toml"
+    toml_path = tmp_path / "main.toml"
+    with schema_path.open("w") as schema_file:
+        schema_file.write('name = "string"\nvalues = [ "integer" ]')
+    with toml_path.open("w") as toml_file:
+        toml_file.write('name = "joe"\nvalues = [ 1, 2, 3 ]')
+    run_toml_schema("--sample", str(schema_path), str(toml_path))
+    captured = capsys.readouterr()
+    assert captured.out == "TOML schema validated.\n"
+
+    with toml_path.open("w") as toml_file:
+        toml_file.write(f"values = {list(range(2000))}")
+    run_toml_schema("--sample", "--path=values", str(schema_path), str(toml_path))
+    captured = capsys.readouterr()
+    assert captured.out == (
+        "TOML schema validated by sampling: 1200 of 2000 array items checked.\n"
+    )
+
+    with pytest.raises(SystemExit, match="2"):
+        run_toml_schema("--sample", "--fail-fast", str(schema_path), str(toml_path))
+    captured = capsys.readouterr()
+    assert captured.err.endswith(
+        "toml-schema: error: argument --sample: not allowed with argument --fail-fast\n"
+    )
+    with pytest.raises(SystemExit, match="2"):
+        run_toml_schema("--sample", "--auto", str(tmp_path))
+    captured = capsys.readouterr()
+    assert captured.err.endswith(
+        "toml-schema: error: argument --sample: not allowed with argument --auto\n"
+    )
+    with pytest.raises(SystemExit, match="2"):
+        run_toml_schema("--sample", "--profile", str(schema_path), str(toml_path))
+    captured = capsys.readouterr()
+    assert captured.err.endswith(
+        "toml-schema: error: argument --sample: not allowed with argument --profile\n"
+    )
+
+
+def test_main_auto(
+    tmp_path: pathlib.Path,
+    capsys: pytest.CaptureFixture[str],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Test validating files with the schemas selected by a catalog."""
+    with pytest.raises(SystemExit, match="2"):
+        run_toml_schema("--auto", ".", "main.schema.toml")
+    captured = capsys.readouterr()
+    assert captured.err.endswith(
+        "toml-schema: error: argument --auto: not allowed with schema_file\n"
+    )
+    with pytest.raises(SystemExit, match="2"):
+        run_toml_schema("main.schema.toml")
+    captured = capsys.readouterr()
+    assert captured.err.endswith(
+        "toml-schema: error: the following arguments are required: toml_file\n"
+    )
+
+    catalog_path = tmp_path / "catalog.toml"
+    with catalog_path.open("w") as catalog_file:
+        catalog_file.write('"user.schema.toml" = [ "user.toml" ]')
+    with (tmp_path / "user.schema.toml").open("w") as schema_file:
+        schema_file.write('name = "string"')
+    data_path = tmp_path / "data"
+    data_path.mkdir()
+    with (data_path / "user.toml").open("w") as toml_file:
+        toml_file.write('name = "joe"')
+    run_toml_schema("--catalog", str(catalog_path), "--auto", str(tmp_path))
+    captured = capsys.readouterr()
+    assert captured.out == "1 TOML files validated.\n"
+    assert captured.err == ""
+
+    with (data_path / "bad.toml").open("w") as toml_file:
+        toml_file.write("#:schema ../user.schema.toml\nname = 3")
+    with (data_path / "syntax.toml").open("w") as toml_file:
+        toml_file.write("#:schema ../user.schema.toml\nname = ")
+    with (data_path / "no-schema.toml").open("w") as toml_file:
+        toml_file.write("#:schema ../no-such.schema.toml\n")
+    with (data_path / "bad-schema.toml").open("w") as toml_file:
+        toml_file.write("#:schema ../bad.schema.toml\n")
+    with (tmp_path / "bad.schema.toml").open("w") as schema_file:
+        schema_file.write("name = ")
+    with (data_path / "latin.toml").open("wb") as toml_binary_file:
+        toml_binary_file.write(b'#:schema ../user.schema.toml\nname = "\xe9"')
+    with pytest.raises(SystemExit, match="1"):
+        run_toml_schema(
+            "--catalog",
+            str(catalog_path),
+            "--auto",
+            str(data_path),
+            "--auto",
+            str(catalog_path),
+        )
+    captured = capsys.readouterr()
+    assert captured.out == ""
+    assert captured.err.splitlines() == [
+        f"{data_path}/bad-schema.toml: Error reading '{data_path}/../bad.schema.toml':"
+        " Invalid value (at end of document)",
+        f"{data_path}/bad.toml: 'name': Value 3 is not: \"string\"",
+        f"{data_path}/latin.toml: Error reading '{data_path}/latin.toml': "
+        "'utf-8' codec can't decode byte 0xe9 in position 37: "
+        "invalid continuation byte",
+        f"{data_path}/no-schema.toml: [Errno 2] No such file or directory: "
+        f"'{data_path}/../no-such.schema.toml'",
+        f"{data_path}/syntax.toml: Error reading '{data_path}/syntax.toml': "
+        "Invalid value (at end of document)",
+        f"{catalog_path}: No schema found.",
+        "6 of 7 TOML files failed.",
+    ]
+
+    # The default catalog is found outside of the repository folder:
+    (tmp_path / "pyproject.toml").write_text('[project]\nname = "x"\nversion = "1"')
+    monkeypatch.chdir(tmp_path)
+    run_toml_schema("--auto", "pyproject.toml")
+    captured = capsys.readouterr()
+    assert captured.out == "1 TOML files validated.\n"
+
+
+def test_main_no_catalog(
+    tmp_path: pathlib.Path,
+    capsys: pytest.CaptureFixture[str],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Test that --catalog is required when the default catalog is not found."""
+    # The package is installed without the schemastore folder:
+    site_path = tmp_path / "site"
+    shutil.copytree(
+        pathlib.Path(toml_schema.__file__).parent, site_path / "toml_schema"
+    )
+    result = subprocess.run(  # noqa: S603
+        [sys.executable, "-m", "toml_schema", "--auto", "."],
+        cwd=tmp_path,
+        env={**os.environ, "PYTHONPATH": str(site_path)},
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    assert result.returncode == 2
+    assert result.stderr.endswith(
+        "error: argument --catalog: required, the default catalog is not found: "
+        f"{site_path / 'schemastore' / 'catalog.toml'}\n"
+    )
+
+    def is_file(_path: pathlib.Path) -> bool:
+        return False
+
+    monkeypatch.setattr(pathlib.Path, "is_file", is_file)
+    with pytest.raises(SystemExit, match="2"):
+        run_toml_schema("--write-bundle", "x.bundle")
+    captured = capsys.readouterr()
+    assert "error: argument --catalog: required, the default catalog" in captured.err
+
+
+def test_main_bundle(
+    tmp_path: pathlib.Path,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    """Test writing a schema bundle and validating with it."""
+    for args in (
+        ["--write-bundle", "x.bundle", "main.schema.toml"],
+        ["--write-bundle", "x.bundle", "--bundle", "y.bundle"],
+    ):
+        with pytest.raises(SystemExit, match="2"):
+            run_toml_schema(*args)
+        captured = capsys.readouterr()
+        assert captured.err.endswith(
+            "error: argument --write-bundle: only allowed with argument --catalog\n"
+        )
+    with pytest.raises(SystemExit, match="2"):
+        run_toml_schema("--lint", "--bundle", "x.bundle", "main.schema.toml")
+    captured = capsys.readouterr()
+    assert captured.err.endswith(
+        "error: argument --lint: not allowed with argument --bundle\n"
+    )
+
+    catalog_path = tmp_path / "catalog.toml"
+    catalog_path.write_text('"user.schema.toml" = [ "user.toml" ]')
+    (tmp_path / "user.schema.toml").write_text('name = "string"')
+    bundle_path = tmp_path / "schemas.bundle"
+    run_toml_schema("--catalog", str(catalog_path), "--write-bundle", str(bundle_path))
+    captured = capsys.readouterr()
+    assert captured.out == f"1 schema files written to '{bundle_path}'.\n"
+
+    data_path = tmp_path / "data"
+    data_path.mkdir()
+    (data_path / "user.toml").write_text('name = "joe"')
+    run_toml_schema("--bundle", str(bundle_path), "--auto", str(data_path))
+    captured = capsys.readouterr()
+    assert captured.out == "1 TOML files validated.\n"
+    run_toml_schema(
+        "--bundle", str(bundle_path), "user.schema.toml", str(data_path / "user.toml")
+    )
+    captured = capsys.readouterr()
+    assert captured.out == "TOML schema validated.\n"
+    with pytest.raises(SystemExit, match="1"):
+        run_toml_schema(
+            "--bundle",
+            str(bundle_path),
+            "main.schema.toml",
+            str(data_path / "user.toml"),
+        )
+    captured = capsys.readouterr()
+    assert captured.err == (
+        f"root: 'main.schema.toml' is not in the bundle '{bundle_path}'.\n"
+    )
+
+
+def test_main_lint(
+    tmp_path: pathlib.Path,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    """Test linting a schema with the main entry point."""
+    schema_path = tmp_path / "main.schema.toml"
+    for args, error in (
+        (["--lint"], "the following arguments are required: schema_file"),
+        (
+            ["--lint", "a.schema.toml", "a.toml"],
+            "argument --lint: not allowed with toml_file",
+        ),
+        (
+            ["--lint", "--auto", "."],
+            "argument --lint: not allowed with argument --auto",
+        ),
+    ):
+        with pytest.raises(SystemExit, match="2"):
+            run_toml_schema(*args)
+        captured = capsys.readouterr()
+        assert captured.err.endswith(f"toml-schema: error: {error}\n")
+
+    schema_path.write_text('name = "string"')
+    run_toml_schema("--lint", str(schema_path))
+    captured = capsys.readouterr()
+    assert captured.out == "No lint findings.\n"
+    assert captured.err == ""
+
+    schema_path.write_text("name = \"pattern = '^(a+)+$'\"")
+    with pytest.raises(SystemExit, match="1"):
+        run_toml_schema("--lint", str(schema_path))
+    captured = capsys.readouterr()
+    assert captured.out == ""
+    assert captured.err == (
+        "'name': Pattern '^(a+)+$' has nested quantifiers.\n1 lint findings.\n"
+    )
+
+
+def test_main_analyze(
+    tmp_path: pathlib.Path,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    """Test the static cost report with the main entry point."""
+    schema_path = tmp_path / "main.schema.toml"
+    json_path = tmp_path / "analyze.json"
+    for args, error in (
+        (["--analyze"], "the following arguments are required: schema_file"),
+        (
+            ["--budget", "nodes=1", "a.schema.toml", "a.toml"],
+            "argument --analyze: not allowed with toml_file",
+        ),
+        (
+            ["--analyze", "--auto", "."],
+            "argument --analyze: not allowed with argument --auto",
+        ),
+        (
+            ["--lint", "--analyze", "a.schema.toml"],
+            "argument --lint: not allowed with argument --analyze",
+        ),
+        (
+            ["--budget", "size=1", "a.schema.toml"],
+            "argument --budget: invalid budget: 'size=1', expected METRIC=LIMIT "
+            "with a metric of: nodes, depth, fan-out, key-regexes, checks",
+        ),
+        (
+            ["--budget", "nodes=x", "a.schema.toml"],
+            "argument --budget: invalid budget: 'nodes=x', expected METRIC=LIMIT "
+            "with a metric of: nodes, depth, fan-out, key-regexes, checks",
+        ),
+    ):
+        with pytest.raises(SystemExit, match="2"):
+            run_toml_schema(*args)
+        captured = capsys.readouterr()
+        assert captured.err.endswith(f"toml-schema: error: {error}\n")
+
+    schema_path.write_text('name = { union = [ "integer", "string" ] }')
+    run_toml_schema("--analyze", str(schema_path))
+    captured = capsys.readouterr()
+    assert captured.out.splitlines()[:3] == [
+        "       nodes  4  (distinct schema nodes)",
+        "       depth  1  (maximum depth of document keys)",
+        "     fan-out  2  (worst-case product of union options along a path)",
+    ]
+    assert captured.out.endswith("       2        2  name\n       1        1  root\n")
+    assert captured.err == ""
+
+    run_toml_schema(
+        "--analyze-json", str(json_path), "--budget", "fan-out=2", str(schema_path)
+    )
+    captured = capsys.readouterr()
+    assert captured.out == "Schema is within budget.\n"
+    assert captured.err == ""
+    json_report: dict[str, object] = json.loads(json_path.read_text())
+    assert json_report["metrics"] == {
+        "nodes": 4,
+        "depth": 1,
+        "fan-out": 2,
+        "key-regexes": 0,
+        "checks": 2,
+    }
+
+    with pytest.raises(SystemExit, match="1"):
+        run_toml_schema(
+            "--budget", "fan-out=1", "--budget", "nodes=9", str(schema_path)
+        )
+    captured = capsys.readouterr()
+    assert captured.out == ""
+    assert captured.err == (
+        "Schema worst-case product of union options along a path (fan-out) is 2, "
+        "over the budget of 1.\n"
+    )
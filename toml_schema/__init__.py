@@ -2,7 +2,13 @@
 # SPDX-License-Identifier: MIT
 # SPDX-FileCopyrightText: 2025 Udi Fuchs
 
+import importlib
+import sys
+from typing import TYPE_CHECKING
+
 from ._toml_schema import (
+    Budget,
+    SchemaBudgetExceeded,
     SchemaError,
     Table,
     TOMLValue,
@@ -12,15 +18,106 @@ from ._toml_schema import (
     loads,
 )
 
+if TYPE_CHECKING:
+    from ._adapter import ValueAdapter
+    from ._analyze import PathCost, SchemaReport, analyze
+    from ._async import FileResult, afrom_file, avalidate_file, avalidate_files
+    from ._bundle import Bundle, write_bundle
+    from ._catalog import Catalog
+    from ._generate import DocumentGenerator
+    from ._graph import SchemaGraph
+    from ._json_schema import JSONSchemaConverter, from_json_schema
+    from ._lint import LintFinding, lint
+    from ._memo import ValidationMemo
+    from ._optimize import OptimizeResult, optimize
+    from ._profile import NodeStats, Profiler
+    from ._reader import validate_load, validate_loads
+    from ._sample import SampleResult, validate_sample
+
 __version__ = "0.1-dev"
 
+# The modules of the names which are imported only when they are first used,
+# so that importing toml_schema costs no more than its core module:
+_LAZY_MODULES = {
+    "Bundle": "._bundle",
+    "Catalog": "._catalog",
+    "DocumentGenerator": "._generate",
+    "FileResult": "._async",
+    "JSONSchemaConverter": "._json_schema",
+    "LintFinding": "._lint",
+    "NodeStats": "._profile",
+    "OptimizeResult": "._optimize",
+    "PathCost": "._analyze",
+    "Profiler": "._profile",
+    "SampleResult": "._sample",
+    "SchemaGraph": "._graph",
+    "SchemaReport": "._analyze",
+    "ValidationMemo": "._memo",
+    "ValueAdapter": "._adapter",
+    "afrom_file": "._async",
+    "analyze": "._analyze",
+    "avalidate_file": "._async",
+    "avalidate_files": "._async",
+    "from_json_schema": "._json_schema",
+    "lint": "._lint",
+    "optimize": "._optimize",
+    "validate_load": "._reader",
+    "validate_loads": "._reader",
+    "validate_sample": "._sample",
+    "write_bundle": "._bundle",
+}
+
+
+def __getattr__(name: str) -> object:
+    """Import a name of an optional module when it is first used."""
+    module_name = _LAZY_MODULES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value: object = getattr(importlib.import_module(module_name, __name__), name)
+    setattr(sys.modules[__name__], name, value)
+    return value
+
+
+def __dir__() -> list[str]:
+    """List the names of the package, including the names not imported yet."""
+    return sorted({*object.__dir__(sys.modules[__name__]), *__all__})
+
+
 __all__ = (
+    "Budget",
+    "Bundle",
+    "Catalog",
+    "DocumentGenerator",
+    "FileResult",
+    "JSONSchemaConverter",
+    "LintFinding",
+    "NodeStats",
+    "OptimizeResult",
+    "PathCost",
+    "Profiler",
+    "SampleResult",
+    "SchemaBudgetExceeded",
     "SchemaError",
+    "SchemaGraph",
+    "SchemaReport",
     "TOMLValue",
     "Table",
+    "ValidationMemo",
+    "ValueAdapter",
     "__version__",
+    "afrom_file",
+    "analyze",
+    "avalidate_file",
+    "avalidate_files",
     "from_file",
+    "from_json_schema",
     "from_toml_table",
+    "lint",
     "load",
     "loads",
+    "optimize",
+    "validate_load",
+    "validate_loads",
+    "validate_sample",
+    "write_bundle",
 )
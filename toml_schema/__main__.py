@@ -5,49 +5,483 @@
 import argparse
 import pathlib
 import sys
+from typing import TYPE_CHECKING, Optional, cast
 
 if sys.version_info >= (3, 11):
     import tomllib
 else:
     import tomli as tomllib
 
-from . import SchemaError, TOMLValue, __version__, from_file
+from . import __version__
+from ._analyze import METRICS, SchemaReport, analyze
+from ._toml_schema import (
+    Budget,
+    SchemaBudgetExceeded,
+    SchemaError,
+    Table,
+    TOMLValue,
+    from_file,
+)
+
+# The other optional modules are imported only by the functions which use them,
+# so that the command line does not wait for modules it does not need:
+if TYPE_CHECKING:
+    from ._bundle import Bundle
+    from ._catalog import Catalog
+    from ._profile import Profiler
+    from ._sample import SampleResult
+
+# The catalog of the schemastore folder, next to the package folder. It is
+# only found in the source tree, since it is not installed with the package:
+DEFAULT_CATALOG = str(
+    pathlib.Path(__file__).resolve().parent.parent / "schemastore" / "catalog.toml"
+)
 
 
 class Settings:
     """Settings from command line arguments."""
 
-    schema_file: str
-    toml_file: str
+    schema_file: Optional[str]
+    toml_file: Optional[str]
+    auto: list[str]
+    catalog: str
+    bundle: Optional[str]
+    write_bundle: Optional[str]
+    path: Optional[str]
+    fail_fast: bool
+    max_nodes: Optional[int]
+    max_depth: Optional[int]
+    max_seconds: Optional[float]
+    sample: bool
+    profile: bool
+    profile_json: Optional[str]
+    lint: bool
+    analyze: bool
+    analyze_json: Optional[str]
+    budget: list[tuple[str, int]]
 
     def __init__(self) -> None:
         parser = argparse.ArgumentParser()
+        no_paths: list[str] = []
         parser.add_argument(
             "--version", action="version", version=f"toml-schema {__version__}"
         )
-        parser.add_argument("schema_file")
-        parser.add_argument("toml_file")
+        parser.add_argument(
+            "--path",
+            metavar="DOTTED_KEY",
+            help="validate only the subtree at DOTTED_KEY, such as tool.ruff",
+        )
+        parser.add_argument(
+            "--fail-fast",
+            action="store_true",
+            help="validate toml_file while it is read, and stop at the first error",
+        )
+        parser.add_argument(
+            "--max-nodes",
+            type=int,
+            metavar="N",
+            help="stop validating toml_file after visiting N schema nodes",
+        )
+        parser.add_argument(
+            "--max-depth",
+            type=int,
+            metavar="N",
+            help="stop validating toml_file nested deeper than N tables and arrays",
+        )
+        parser.add_argument(
+            "--max-seconds",
+            type=float,
+            metavar="SECONDS",
+            help="stop validating toml_file after SECONDS",
+        )
+        parser.add_argument(
+            "--sample",
+            action="store_true",
+            help="validate only the first, the last and a random sample "
+            "of the items of large arrays",
+        )
+        parser.add_argument(
+            "--profile",
+            action="store_true",
+            help="print a hot-path report of the validation",
+        )
+        parser.add_argument(
+            "--profile-json",
+            metavar="JSON_FILE",
+            help="dump the validation profile as JSON",
+        )
+        parser.add_argument(
+            "--lint",
+            action="store_true",
+            help="check schema_file for performance problems, instead of validating",
+        )
+        parser.add_argument(
+            "--analyze",
+            action="store_true",
+            help="print a static cost report of schema_file, instead of validating",
+        )
+        parser.add_argument(
+            "--analyze-json",
+            metavar="JSON_FILE",
+            help="dump the static cost report of schema_file as JSON",
+        )
+        no_budgets: list[tuple[str, int]] = []
+        parser.add_argument(
+            "--budget",
+            action="append",
+            default=no_budgets,
+            type=parse_budget,
+            metavar="METRIC=LIMIT",
+            help="fail if a metric of the cost report of schema_file is over LIMIT, "
+            f"metrics: {', '.join(METRICS)}",
+        )
+        parser.add_argument(
+            "--auto",
+            action="append",
+            default=no_paths,
+            metavar="PATH",
+            help="validate the TOML files in PATH with schemas selected by the catalog",
+        )
+        parser.add_argument(
+            "--catalog",
+            default=DEFAULT_CATALOG,
+            metavar="CATALOG_FILE",
+            help="schema catalog for --auto "
+            "(default: schemastore/catalog.toml of the source tree)",
+        )
+        parser.add_argument(
+            "--bundle",
+            metavar="BUNDLE_FILE",
+            help="load the schemas from BUNDLE_FILE, with its catalog for --auto",
+        )
+        parser.add_argument(
+            "--write-bundle",
+            metavar="BUNDLE_FILE",
+            help="write the schemas of the catalog to BUNDLE_FILE and exit",
+        )
+        parser.add_argument("schema_file", nargs="?")
+        parser.add_argument("toml_file", nargs="?")
         parser.parse_args(namespace=self)
+        self.check_arguments(parser)
+
+    def check_arguments(self, parser: argparse.ArgumentParser) -> None:
+        """Exit with a usage error if the arguments do not go together."""
+        self.check_validation_mode(parser)
+        if self.write_bundle is not None:
+            if (
+                self.schema_file is not None
+                or len(self.auto) > 0
+                or self.bundle is not None
+                or self.lint
+                or self.analyzing
+            ):
+                parser.error(
+                    "argument --write-bundle: only allowed with argument --catalog"
+                )
+        elif len(self.auto) > 0:
+            if self.schema_file is not None:
+                parser.error("argument --auto: not allowed with schema_file")
+            if self.lint or self.analyzing:
+                option = "--lint" if self.lint else "--analyze"
+                parser.error(f"argument {option}: not allowed with argument --auto")
+        elif self.lint or self.analyzing:
+            self.check_schema_only(parser)
+        elif self.schema_file is None or self.toml_file is None:
+            missing = ["toml_file"] if self.schema_file is not None else []
+            if self.schema_file is None:
+                missing = ["schema_file", "toml_file"]
+            parser.error(f"the following arguments are required: {', '.join(missing)}")
+        needs_catalog = self.write_bundle is not None or (
+            len(self.auto) > 0 and self.bundle is None
+        )
+        if needs_catalog and self.catalog == DEFAULT_CATALOG:
+            self.check_default_catalog(parser)
+
+    def check_default_catalog(self, parser: argparse.ArgumentParser) -> None:
+        """Require --catalog if the default catalog is not found."""
+        if not pathlib.Path(DEFAULT_CATALOG).is_file():
+            parser.error(
+                "argument --catalog: required, the default catalog "
+                f"is not found: {DEFAULT_CATALOG}"
+            )
+
+    def check_validation_mode(self, parser: argparse.ArgumentParser) -> None:
+        """Check the arguments of --fail-fast and --sample, if they are given."""
+        if self.fail_fast:
+            self.check_fail_fast(parser)
+        if self.sample:
+            self.check_sample(parser)
+
+    def check_fail_fast(self, parser: argparse.ArgumentParser) -> None:
+        """Check the arguments of --fail-fast, which validates the whole file."""
+        if self.path is not None:
+            parser.error("argument --fail-fast: not allowed with argument --path")
+        if self.validation_budget is not None:
+            parser.error(
+                "argument --fail-fast: not allowed with arguments "
+                "--max-nodes, --max-depth and --max-seconds"
+            )
+        if self.profile or self.profile_json is not None:
+            option = "--profile" if self.profile else "--profile-json"
+            parser.error(f"argument --fail-fast: not allowed with argument {option}")
+
+    def check_sample(self, parser: argparse.ArgumentParser) -> None:
+        """Check the arguments of --sample, which validates a single TOML file."""
+        if self.fail_fast:
+            parser.error("argument --sample: not allowed with argument --fail-fast")
+        if len(self.auto) > 0:
+            parser.error("argument --sample: not allowed with argument --auto")
+        if self.profile or self.profile_json is not None:
+            option = "--profile" if self.profile else "--profile-json"
+            parser.error(f"argument --sample: not allowed with argument {option}")
+
+    def check_schema_only(self, parser: argparse.ArgumentParser) -> None:
+        """Check the arguments of --lint and --analyze, which take only schema_file."""
+        option = "--lint" if self.lint else "--analyze"
+        if self.lint and self.analyzing:
+            parser.error("argument --lint: not allowed with argument --analyze")
+        if self.schema_file is None:
+            parser.error("the following arguments are required: schema_file")
+        if self.toml_file is not None:
+            parser.error(f"argument {option}: not allowed with toml_file")
+        if self.bundle is not None:
+            parser.error(f"argument {option}: not allowed with argument --bundle")
+
+    @property
+    def validation_budget(self) -> Optional[Budget]:
+        """The budget of validating a TOML file, or None if it has no limits."""
+        budget = Budget(self.max_nodes, self.max_depth, self.max_seconds)
+        return None if budget == Budget() else budget
+
+    @property
+    def analyzing(self) -> bool:
+        """True if the schema is analyzed, instead of validating a TOML file."""
+        return self.analyze or self.analyze_json is not None or len(self.budget) > 0
+
+
+def parse_budget(budget: str) -> tuple[str, int]:
+    """Parse a budget argument of the form METRIC=LIMIT."""
+    metric, _, limit = budget.partition("=")
+    if metric not in METRICS or not limit.isdigit():
+        raise argparse.ArgumentTypeError(
+            f"invalid budget: '{budget}', expected METRIC=LIMIT with a metric of: "
+            f"{', '.join(METRICS)}"
+        )
+    return metric, int(limit)
+
+
+def load_schema(
+    schema_file: str, *, lazy_files: bool = False, bundle: Optional["Bundle"] = None
+) -> Table:
+    """Load a schema file, exiting if it is not a valid TOML file."""
+    if bundle is not None:
+        return bundle.load_schema(schema_file)
+    try:
+        return from_file(schema_file, lazy_files=lazy_files)
+    except tomllib.TOMLDecodeError as ex:
+        print(f"Error reading '{schema_file}': {ex}", file=sys.stderr)
+        raise SystemExit(1) from ex
+
+
+def lint_schema(schema_file: str) -> None:
+    """Print the performance problems found in a schema file."""
+    from ._lint import lint
+
+    findings = lint(load_schema(schema_file))
+    for finding in findings:
+        print(finding, file=sys.stderr)
+    if len(findings) > 0:
+        print(f"{len(findings)} lint findings.", file=sys.stderr)
+        raise SystemExit(1)
+    print("No lint findings.")
+
+
+def analyze_schema(settings: Settings) -> None:
+    """Print the static cost report of a schema file, and check the budgets."""
+    report: SchemaReport = analyze(load_schema(cast(str, settings.schema_file)))
+    if settings.analyze:
+        print(report.report())
+    if settings.analyze_json is not None:
+        with pathlib.Path(settings.analyze_json).open("w") as json_file:
+            json_file.write(report.to_json())
+    errors = report.over_budget(dict(settings.budget))
+    for error in errors:
+        print(error, file=sys.stderr)
+    if len(errors) > 0:
+        raise SystemExit(1)
+    if len(settings.budget) > 0:
+        print("Schema is within budget.")
+
+
+def write_profile(profiler: "Profiler", settings: Settings) -> None:
+    """Write the profiling results requested in the settings."""
+    if settings.profile:
+        print(profiler.report())
+    if settings.profile_json is not None:
+        with pathlib.Path(settings.profile_json).open("w") as json_file:
+            json_file.write(profiler.to_json())
+
+
+def validate_file(
+    catalog: "Catalog",
+    toml_path: pathlib.Path,
+    settings: Settings,
+    profiler: Optional["Profiler"],
+) -> Optional[str]:
+    """Validate a TOML file with the schema selected by the catalog.
+
+    Return the error message, or None if the TOML file is valid.
+    """
+    try:
+        toml_bytes = toml_path.read_bytes()
+        first_line = toml_bytes.split(b"\n", 1)[0].decode(errors="replace")
+        schema_path = catalog.schema_path(str(toml_path), first_line)
+        if schema_path is None:
+            return "No schema found."
+        try:
+            schema_table = catalog.load_schema(schema_path)
+        except (tomllib.TOMLDecodeError, UnicodeDecodeError) as ex:
+            return f"Error reading '{schema_path}': {ex}"
+        try:
+            if settings.fail_fast:
+                from ._reader import validate_loads
+
+                validate_loads(schema_table, toml_bytes.decode())
+                return None
+            toml_table: dict[str, TOMLValue] = tomllib.loads(toml_bytes.decode())
+        except (tomllib.TOMLDecodeError, UnicodeDecodeError) as ex:
+            return f"Error reading '{toml_path}': {ex}"
+        schema_table.validate_with(
+            toml_table,
+            path=settings.path,
+            profiler=profiler,
+            budget=settings.validation_budget,
+        )
+    except (SchemaError, SchemaBudgetExceeded, OSError) as ex:
+        return str(ex)
+    return None
+
+
+def validate_toml_file(
+    schema_table: Table, settings: Settings, profiler: Optional["Profiler"]
+) -> Optional["SampleResult"]:
+    """Validate the TOML file given in the settings, exiting if it is not valid TOML.
+
+    Return the result of the validation by sampling, or None if it was not sampled.
+    """
+    toml_file = cast(str, settings.toml_file)
+    toml_table: Optional[dict[str, TOMLValue]] = None
+    try:
+        with pathlib.Path(toml_file).open("rb") as toml_binary_file:
+            if settings.fail_fast:
+                from ._reader import validate_load
+
+                validate_load(schema_table, toml_binary_file)
+            else:
+                toml_table = tomllib.load(toml_binary_file)
+    except tomllib.TOMLDecodeError as ex:
+        print(f"Error reading '{toml_file}': {ex}", file=sys.stderr)
+        raise SystemExit(1) from ex
+    if toml_table is not None and settings.sample:
+        from ._sample import validate_sample
+
+        return validate_sample(
+            schema_table,
+            toml_table,
+            path=settings.path,
+            budget=settings.validation_budget,
+        )
+    if toml_table is not None:
+        schema_table.validate_with(
+            toml_table,
+            path=settings.path,
+            profiler=profiler,
+            budget=settings.validation_budget,
+        )
+    return None
+
+
+def validate_auto(
+    settings: Settings, profiler: Optional["Profiler"], bundle: Optional["Bundle"]
+) -> None:
+    """Validate all TOML files found with the schemas selected by the catalog."""
+    from ._catalog import Catalog
+
+    if bundle is not None:
+        catalog = bundle.as_catalog()
+    else:
+        catalog = Catalog.from_file(settings.catalog)
+    error_count = 0
+    file_count = 0
+    for auto_path in settings.auto:
+        for toml_path in catalog.find_files(auto_path):
+            file_count += 1
+            error = validate_file(catalog, toml_path, settings, profiler)
+            if error is not None:
+                print(f"{toml_path}: {error}", file=sys.stderr)
+                error_count += 1
+    if error_count > 0:
+        print(f"{error_count} of {file_count} TOML files failed.", file=sys.stderr)
+        raise SystemExit(1)
+    print(f"{file_count} TOML files validated.")
+
+
+def open_bundle(settings: Settings) -> Optional["Bundle"]:
+    """Open the schema bundle given in the settings, if any."""
+    if settings.bundle is None:
+        return None
+    from ._bundle import Bundle
+
+    return Bundle(settings.bundle)
 
 
 def main() -> None:
     """toml-schema main entry-point."""
     try:
         settings = Settings()
+        if settings.lint:
+            lint_schema(cast(str, settings.schema_file))
+            return
+        if settings.analyzing:
+            analyze_schema(settings)
+            return
+        if settings.write_bundle is not None:
+            from ._bundle import write_bundle
+
+            names = write_bundle(settings.write_bundle, settings.catalog)
+            print(f"{len(names)} schema files written to '{settings.write_bundle}'.")
+            return
+        bundle = open_bundle(settings)
+        profiler = None
+        if settings.profile or settings.profile_json is not None:
+            from ._profile import Profiler
+
+            profiler = Profiler()
         try:
-            schema_table = from_file(settings.schema_file)
-        except tomllib.TOMLDecodeError as ex:
-            print(f"Error reading '{settings.schema_file}': {ex}", file=sys.stderr)
-            raise SystemExit(1) from ex
-        try:
-            with pathlib.Path(settings.toml_file).open("rb") as toml_file:
-                toml_table: dict[str, TOMLValue] = tomllib.load(toml_file)
-        except tomllib.TOMLDecodeError as ex:
-            print(f"Error reading '{settings.toml_file}': {ex}", file=sys.stderr)
-            raise SystemExit(1) from ex
-        schema_table.validate(toml_table)
+            if len(settings.auto) > 0:
+                validate_auto(settings, profiler, bundle)
+                return
+            # Only the schema files needed by the path are loaded:
+            schema_table = load_schema(
+                cast(str, settings.schema_file),
+                lazy_files=settings.path is not None,
+                bundle=bundle,
+            )
+            sample_result = validate_toml_file(schema_table, settings, profiler)
+        finally:
+            if profiler is not None:
+                write_profile(profiler, settings)
+            if bundle is not None:
+                bundle.close()
+        if sample_result is not None and sample_result.sampled:
+            print(
+                "TOML schema validated by sampling: "
+                f"{sample_result.checked_items} of {sample_result.items} "
+                "array items checked."
+            )
+            return
         print("TOML schema validated.")
-    except (SchemaError, OSError) as ex:
+    except (SchemaError, SchemaBudgetExceeded, OSError) as ex:
         print(str(ex), file=sys.stderr)
         raise SystemExit(1) from ex
 
@@ -0,0 +1,66 @@
+"""toml-schema: Adapter of document values which are not plain tomllib output."""
+# SPDX-License-Identifier: MIT
+# SPDX-FileCopyrightText: 2025 Udi Fuchs
+
+import datetime
+from collections.abc import Mapping, Sequence
+from typing import Optional, cast
+
+from ._toml_schema import SchemaElement, TOMLValue
+from ._walk import Walker
+
+
+class ValueAdapter:
+    """Adapt document values for validation, without copying the document.
+
+    With an adapter, tables can be any Mapping, arrays any Sequence, and scalars
+    instances of subclasses of the tomllib types, such as the values of a tomlkit
+    document. Values of the exact tomllib types are validated as usual, and only
+    other values are adapted. Subclasses can override table, array and scalar
+    to adapt other types.
+    """
+
+    def table(self, value: object) -> Optional[Mapping[str, TOMLValue]]:
+        """Get a value as a table, or None if it is not a table."""
+        if isinstance(value, Mapping):
+            return cast(Mapping[str, TOMLValue], value)
+        return None
+
+    def array(self, value: object) -> Optional[Sequence[TOMLValue]]:
+        """Get a value as an array, or None if it is not an array."""
+        if isinstance(value, Sequence) and not isinstance(value, (str, bytes)):
+            return cast(Sequence[TOMLValue], value)
+        return None
+
+    def scalar(self, value: object) -> TOMLValue:
+        """Get a scalar value as its tomllib type, or unchanged if it has none."""
+        # A datetime is also a date, and a bool is an int which can not be subclassed:
+        plain_value: object = value
+        if isinstance(value, str):
+            plain_value = str.__str__(value)
+        elif isinstance(value, int) and not isinstance(value, bool):
+            plain_value = int.__int__(value)
+        elif isinstance(value, float):
+            plain_value = float.__float__(value)
+        elif isinstance(value, datetime.datetime):
+            plain_value = datetime.datetime.combine(
+                value.date(), value.timetz(), tzinfo=value.tzinfo
+            )
+        elif isinstance(value, datetime.date):
+            plain_value = datetime.date(value.year, value.month, value.day)
+        elif isinstance(value, datetime.time):
+            plain_value = datetime.time(
+                value.hour,
+                value.minute,
+                value.second,
+                value.microsecond,
+                value.tzinfo,
+                fold=value.fold,
+            )
+        return cast(TOMLValue, plain_value)
+
+    def validate(
+        self, schema: SchemaElement, value: TOMLValue, /, *, context: str = ""
+    ) -> None:
+        """Validate value with schema, adapting the values which need it."""
+        Walker().validate(schema, value, context=context, adapter=self)
@@ -0,0 +1,259 @@
+"""toml-schema: Static cost model of schemas."""
+# SPDX-License-Identifier: MIT
+# SPDX-FileCopyrightText: 2025 Udi Fuchs
+
+import dataclasses
+import json
+from typing import Optional, cast
+
+from ._toml_schema import (
+    Array,
+    File,
+    Pattern,
+    Ref,
+    SchemaElement,
+    Table,
+    Union,
+    _type_name,
+)
+
+# The metrics which can have a budget, with their descriptions:
+METRICS = {
+    "nodes": "distinct schema nodes",
+    "depth": "maximum depth of document keys",
+    "fan-out": "worst-case product of union options along a path",
+    "key-regexes": "maximum regexes evaluated for an unknown key of a table",
+    "checks": "maximum schema nodes tried for the value of a document key",
+}
+
+# The maximum number of routes walked by analyze, since the routes through
+# references shared by many keys or union options grow exponentially:
+MAX_ROUTES = 100_000
+
+
+@dataclasses.dataclass
+class PathCost:
+    """Worst-case cost of validating the value of a document key.
+
+    The path is the dotted path of the key in the document. Keys matched by
+    special keys are shown as the special key, and array items as '[]'.
+    """
+
+    path: str
+    # Number of schema nodes tried for the value, over all the union options:
+    checks: int = 0
+    # Largest product of the sizes of the unions on the way to the value:
+    fan_out: int = 1
+    # True if the schema under the path refers back to itself:
+    recursive: bool = False
+
+
+@dataclasses.dataclass
+class SchemaReport:
+    """Static estimate of the cost of validating documents with a schema."""
+
+    node_counts: dict[str, int]
+    # Regexes evaluated for an unknown key, for each table path with special keys:
+    key_regexes: dict[str, int]
+    paths: dict[str, PathCost]
+    # True if the walk stopped at the maximum routes, and the metrics are lower bounds:
+    truncated: bool = False
+
+    def metrics(self) -> dict[str, int]:
+        """The worst value of each metric."""
+        return {
+            "nodes": sum(self.node_counts.values()),
+            "depth": max(_path_depth(path) for path in self.paths),
+            "fan-out": max(cost.fan_out for cost in self.paths.values()),
+            "key-regexes": max(self.key_regexes.values(), default=0),
+            "checks": max(cost.checks for cost in self.paths.values()),
+        }
+
+    def over_budget(self, budgets: dict[str, int]) -> list[str]:
+        """Describe the metrics which are over their budget."""
+        metrics = self.metrics()
+        errors = [
+            f"Schema {METRICS[name]} ({name}) is {metrics[name]}, "
+            f"over the budget of {budget}."
+            for name, budget in budgets.items()
+            if metrics[name] > budget
+        ]
+        if self.truncated and len(budgets) > 0:
+            errors.append(f"Schema has more than {MAX_ROUTES} routes to analyze.")
+        return errors
+
+    def report(self, limit: int = 20) -> str:
+        """Text report of the metrics and the most expensive paths."""
+        lines = [
+            f"{name:>12}  {value}  ({METRICS[name]})"
+            for name, value in self.metrics().items()
+        ]
+        if self.truncated:
+            lines.append(
+                f"Truncated after {MAX_ROUTES} routes, the metrics are lower bounds."
+            )
+        lines.append("")
+        lines.append(f"{'nodes':>8}  type")
+        lines.extend(
+            f"{count:>8}  {kind}"
+            for kind, count in sorted(self.node_counts.items(), key=_most_first)
+        )
+        lines.append("")
+        lines.append(f"{'checks':>8} {'fan-out':>8}  path")
+        lines.extend(
+            f"{cost.checks:>8} {cost.fan_out:>8}  {_path_name(cost)}"
+            for cost in self.sorted_paths()[:limit]
+        )
+        return "\n".join(lines)
+
+    def sorted_paths(self) -> list[PathCost]:
+        """Path costs sorted from the most expensive path."""
+        return sorted(self.paths.values(), key=_costly_first)
+
+    def to_json(self) -> str:
+        """Dump the report as JSON, with the paths sorted like the report."""
+        json_report: dict[str, object] = {
+            "metrics": self.metrics(),
+            "truncated": self.truncated,
+            "node_counts": self.node_counts,
+            "key_regexes": self.key_regexes,
+            "paths": [
+                cast(dict[str, object], dataclasses.asdict(cost))
+                for cost in self.sorted_paths()
+            ],
+        }
+        return json.dumps(json_report, indent=2)
+
+
+def _most_first(item: tuple[str, int]) -> tuple[int, str]:
+    return (-item[1], item[0])
+
+
+def _costly_first(cost: PathCost) -> tuple[int, int, str]:
+    return (-cost.checks, -cost.fan_out, cost.path)
+
+
+def _path_depth(path: str) -> int:
+    return 0 if path == "" else path.count(".") + path.count("[]") + 1
+
+
+def _path_name(cost: PathCost) -> str:
+    path = "root" if cost.path == "" else cost.path
+    return f"{path} (recursive)" if cost.recursive else path
+
+
+def analyze(schema: Table) -> SchemaReport:
+    """Estimate the worst-case cost of validating documents with a schema.
+
+    Every option of every union is assumed to be tried. References are
+    followed, except references back into a schema node on the same path.
+    Schema files referenced with file are included if they are loaded.
+    The walk stops after MAX_ROUTES routes, and the report is marked truncated.
+    """
+    analyzer = _Analyzer()
+    analyzer.count_nodes(schema)
+    analyzer.walk(schema, "", 1)
+    return SchemaReport(
+        analyzer.node_counts,
+        analyzer.key_regexes,
+        analyzer.paths,
+        truncated=analyzer.routes > MAX_ROUTES,
+    )
+
+
+class _Analyzer:
+    def __init__(self) -> None:
+        self.node_counts: dict[str, int] = {}
+        self.key_regexes: dict[str, int] = {}
+        self.paths: dict[str, PathCost] = {}
+        # The ids of the referenced nodes on the current path:
+        self.stack: list[int] = []
+        # The number of calls to walk, which is bounded by MAX_ROUTES:
+        self.routes = 0
+
+    def count_nodes(self, schema: SchemaElement) -> None:
+        counted: set[int] = set()
+        pending = [schema]
+        while len(pending) > 0:
+            node = pending.pop()
+            if id(node) in counted:
+                continue
+            counted.add(id(node))
+            kind = _type_name(type(node))
+            self.node_counts[kind] = self.node_counts.get(kind, 0) + 1
+            if isinstance(node, Table):
+                pending.extend(node.values())
+            elif isinstance(node, (Array, Union)):
+                pending.extend(node)
+            elif isinstance(node, (Ref, File)) and node._ref_schema is not None:
+                pending.append(node._ref_schema)
+
+    def walk(self, schema: SchemaElement, path: str, fan_out: int) -> None:
+        """Walk every route of the schema for the document value at path."""
+        self.routes += 1
+        if self.routes > MAX_ROUTES:
+            return
+        if isinstance(schema, (Ref, File)):
+            self.walk_ref(schema._ref_schema, path, fan_out)
+            return
+        cost = self.path_cost(path)
+        cost.fan_out = max(cost.fan_out, fan_out)
+        if isinstance(schema, Union):
+            for option in schema:
+                self.walk(option, path, fan_out * len(schema))
+            return
+        cost.checks += 1
+        if isinstance(schema, Array):
+            for item_schema in schema:
+                if not hasattr(item_schema, "_array_option"):
+                    self.walk(item_schema, f"{path}[]", fan_out)
+        elif isinstance(schema, Table):
+            self.walk_table(schema, path, fan_out)
+
+    def walk_ref(
+        self, target: Optional[SchemaElement], path: str, fan_out: int
+    ) -> None:
+        if target is None:  # Lazy file which is not loaded.
+            self.path_cost(path)
+            return
+        if id(target) in self.stack:
+            self.path_cost(path).recursive = True
+            return
+        self.stack.append(id(target))
+        self.walk(target, path, fan_out)
+        self.stack.pop()
+
+    def walk_table(self, table: Table, path: str, fan_out: int) -> None:
+        key_regexes = 0
+        for schema_key, schema_value in table.items():
+            if schema_key.hidden:
+                continue
+            if schema_key.pattern is not None:
+                key_regexes += 1
+            elif schema_key.ref is not None and schema_key._ref_schema is not None:
+                key_regexes += _count_patterns(schema_key._ref_schema)
+            key_name = schema_key.name
+            if schema_key.pattern is not None or schema_key.ref is not None:
+                key_name = str(schema_key)
+            key_path = key_name if path == "" else f"{path}.{key_name}"
+            self.walk(schema_value, key_path, fan_out)
+        if key_regexes > 0:
+            self.key_regexes[path] = max(self.key_regexes.get(path, 0), key_regexes)
+
+    def path_cost(self, path: str) -> PathCost:
+        cost = self.paths.get(path)
+        if cost is None:
+            cost = PathCost(path)
+            self.paths[path] = cost
+        return cost
+
+
+def _count_patterns(schema: SchemaElement) -> int:
+    """Count the patterns evaluated by validating a key with a reference key."""
+    if isinstance(schema, Pattern):
+        return 1
+    if isinstance(schema, Union):
+        return sum(_count_patterns(option) for option in schema)
+    if isinstance(schema, Ref) and schema._ref_schema is not None:
+        return _count_patterns(schema._ref_schema)
+    return 0
@@ -0,0 +1,125 @@
+"""toml-schema: asyncio API for loading schemas and validating files."""
+# SPDX-License-Identifier: MIT
+# SPDX-FileCopyrightText: 2025 Udi Fuchs
+
+import asyncio
+import concurrent.futures
+import dataclasses
+import os
+import pathlib
+import sys
+from collections.abc import AsyncGenerator, Iterable
+from typing import Optional, Union
+
+if sys.version_info >= (3, 11):
+    import tomllib
+else:
+    import tomli as tomllib
+
+from ._toml_schema import SchemaError, Table, TOMLValue, from_file
+
+PathType = Union[str, os.PathLike[str]]
+
+
+@dataclasses.dataclass(frozen=True)
+class FileResult:
+    """Result of validating a TOML file."""
+
+    path: pathlib.Path
+    # SchemaError, tomllib.TOMLDecodeError, UnicodeDecodeError or OSError.
+    # None if the file is valid.
+    error: Optional[Exception] = None
+
+    @property
+    def valid(self) -> bool:
+        """True if the file was validated successfully."""
+        return self.error is None
+
+
+def _parse_and_validate(schema: Table, toml_bytes: bytes) -> None:
+    toml_table: dict[str, TOMLValue] = tomllib.loads(toml_bytes.decode())
+    schema.validate(toml_table)
+
+
+async def afrom_file(
+    toml_filename: str, *, executor: Optional[concurrent.futures.Executor] = None
+) -> Table:
+    """Load a TOML schema file, and the schema files it references, in an executor.
+
+    If executor is None, the default executor of the event loop is used.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, from_file, toml_filename)
+
+
+async def avalidate_file(
+    schema: Table,
+    path: PathType,
+    *,
+    executor: Optional[concurrent.futures.Executor] = None,
+) -> None:
+    """Validate a TOML file without blocking the event loop.
+
+    Reading the file, and parsing and validating it, are run as separate
+    executor jobs, so the I/O of one file can overlap the validation of another.
+    If executor is None, the default executor of the event loop is used.
+
+    Any concurrent.futures.Executor can be used. A ProcessPoolExecutor gets
+    a pickled copy of the schema for each file, so the schema files that are
+    loaded lazily are loaded again by each job. Schemas loaded from a Bundle
+    keep its memory map, and cannot be pickled: they need a thread executor.
+    """
+    loop = asyncio.get_running_loop()
+    toml_bytes = await loop.run_in_executor(executor, pathlib.Path(path).read_bytes)
+    await loop.run_in_executor(executor, _parse_and_validate, schema, toml_bytes)
+
+
+async def _validate_result(
+    schema: Table, path: PathType, executor: Optional[concurrent.futures.Executor]
+) -> FileResult:
+    try:
+        await avalidate_file(schema, path, executor=executor)
+    except (SchemaError, tomllib.TOMLDecodeError, UnicodeDecodeError, OSError) as ex:
+        return FileResult(pathlib.Path(path), ex)
+    return FileResult(pathlib.Path(path))
+
+
+async def avalidate_files(
+    schema: Table,
+    paths: Iterable[PathType],
+    *,
+    executor: Optional[concurrent.futures.Executor] = None,
+    concurrency: int = 8,
+) -> AsyncGenerator[FileResult, None]:
+    """Validate TOML files concurrently, yielding results in completion order.
+
+    At most concurrency files are in flight. Paths are taken from the iterable
+    only when there is room for them, and no new file is started while the
+    consumer is not asking for results. Closing the generator, or cancelling
+    its consumer, cancels all the files in flight. See avalidate_file for
+    the executors that can be used.
+    """
+    if concurrency < 1:
+        raise ValueError(f"concurrency must be at least 1: {concurrency}")
+    path_iter = iter(paths)
+    pending: set[asyncio.Task[FileResult]] = set()
+    try:
+        while True:
+            for path in path_iter:
+                pending.add(
+                    asyncio.ensure_future(_validate_result(schema, path, executor))
+                )
+                if len(pending) >= concurrency:
+                    break
+            if len(pending) == 0:
+                return
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                yield task.result()
+    finally:
+        for task in pending:
+            task.cancel()
+        if len(pending) > 0:
+            await asyncio.wait(pending)
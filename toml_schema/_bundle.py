@@ -0,0 +1,288 @@
+"""toml-schema: Memory-mapped bundle of schema files."""
+# SPDX-License-Identifier: MIT
+# SPDX-FileCopyrightText: 2025 Udi Fuchs
+
+import dataclasses
+import json
+import mmap
+import os
+import pathlib
+import posixpath
+import struct
+import sys
+from typing import Optional, cast
+
+if sys.version_info >= (3, 11):
+    import tomllib
+else:
+    import tomli as tomllib
+
+from ._catalog import Catalog, read_catalog
+from ._files import file_nodes
+from ._toml_schema import (
+    _TYPE_CLASSES,
+    Array,
+    SchemaElement,
+    SchemaError,
+    SchemaKey,
+    Table,
+    TOMLValue,
+    Union,
+    _type_name,
+    from_toml_table,
+)
+
+# A bundle file starts with this line, followed by the length of its JSON header.
+# The header has the catalog and the offset and size of each schema file, which
+# is stored as the JSON of its compiled schema elements:
+MAGIC = b"toml-schema bundle 1\n"
+_HEADER_SIZE = struct.Struct(">Q")
+
+# The JSON of a schema element is a list. A table is ["table", keys], where
+# each key is [key, fields, schema], and fields are the fields of the SchemaKey,
+# or null if the key is a plain key. An array is ["array", schemas], a union
+# is ["union", mode, schemas], and any other element is [type, fields]:
+_Node = list[object]
+
+
+def _read_toml(toml_path: pathlib.Path) -> dict[str, TOMLValue]:
+    with toml_path.open("rb") as toml_file:
+        toml_table: dict[str, TOMLValue] = tomllib.load(toml_file)
+    return toml_table
+
+
+def _init_fields(element: SchemaElement) -> dict[str, object]:
+    """Get the public init fields of a schema element, which are not defaults."""
+    fields: tuple[dataclasses.Field[object], ...] = dataclasses.fields(element)
+    values = {
+        field.name: cast(object, getattr(element, field.name)) for field in fields
+    }
+    return {
+        field.name: values[field.name]
+        for field in fields
+        if field.init
+        and not field.name.startswith("_")
+        and values[field.name] != field.default
+    }
+
+
+def _encode(schema: SchemaElement) -> _Node:
+    """Get the JSON of a compiled schema element, without following references."""
+    if isinstance(schema, Table):
+        base_address = "" if schema._address == "" else f"{schema._address}."
+        keys: list[_Node] = []
+        for schema_key, schema_value in schema.items():
+            # The key as written in the schema file is the end of the address:
+            key = schema_value._address[len(base_address) :]
+            key_fields: Optional[dict[str, object]] = _init_fields(schema_key)
+            if key_fields == {"name": key}:
+                key_fields = None
+            keys.append([key, key_fields, _encode(schema_value)])
+        return ["table", keys]
+    if isinstance(schema, Union):
+        return ["union", schema.mode, [_encode(option) for option in schema]]
+    if isinstance(schema, Array):
+        return ["array", [_encode(value) for value in schema]]
+    return [_type_name(type(schema)), _init_fields(schema)]
+
+
+def _decode(node: _Node, address: str) -> SchemaElement:
+    """Create a schema element from its JSON, without compiling any TOML."""
+    if node[0] == "table":
+        return _decode_table(cast(list[_Node], node[1]), address, None)
+    if node[0] in ("array", "union"):
+        schemas = [
+            _decode(value, sys.intern(f"{address}[{index}]"))
+            for index, value in enumerate(cast(list[_Node], node[-1]))
+        ]
+        if node[0] == "array":
+            return Array(schemas, _address=address)
+        return Union(cast(str, node[1]), schemas, _address=address)
+    type_class = _TYPE_CLASSES[cast(str, node[0])]
+    return type_class(_address=address, **cast(dict[str, object], node[1]))
+
+
+def _decode_table(
+    keys: list[_Node], address: str, toml_filename: Optional[str]
+) -> Table:
+    base_address = "" if address == "" else f"{address}."
+    schema_table: dict[SchemaKey, SchemaElement] = {}
+    for key, key_fields, schema_value in keys:
+        if key_fields is None:
+            schema_key = SchemaKey(name=cast(str, key), _address=address)
+        else:
+            # The fields were written from a SchemaKey, so their types are right:
+            fields = cast(dict[str, object], key_fields)
+            schema_key = SchemaKey(_address=address, **fields)  # type: ignore[arg-type]
+        schema_table[schema_key] = _decode(
+            cast(_Node, schema_value), sys.intern(f"{base_address}{key}")
+        )
+    return Table(
+        schema_table,
+        toml_filename=toml_filename,
+        is_root=toml_filename is not None,
+        _address=address,
+    )
+
+
+def _bundle_name(base_dir: pathlib.Path, toml_path: pathlib.Path, context: str) -> str:
+    """Get the name of a schema file in a bundle, relative to base_dir."""
+    name = pathlib.Path(os.path.relpath(toml_path.resolve(), base_dir.resolve()))
+    if name.parts[0] == "..":
+        raise SchemaError(
+            f"Schema file '{toml_path}' is not in the folder of the catalog.", context
+        )
+    return name.as_posix()
+
+
+def write_bundle(bundle_filename: str, catalog_filename: str) -> list[str]:
+    """Write the schema files of a catalog into a single bundle file.
+
+    The schema files they reference with file are also written. Every schema
+    file must be in the folder of the catalog, or in its sub-folders. Schema
+    files are compiled, with their references, before they are written.
+    Return the names of the schema files in the bundle.
+    """
+    catalog = read_catalog(catalog_filename)
+    base_dir = pathlib.Path(catalog_filename).parent
+    schemas: dict[str, Table] = {}
+    for schema_filename in catalog:
+        schema_path = base_dir / schema_filename
+        try:
+            toml_table = _read_toml(schema_path)
+        except tomllib.TOMLDecodeError as ex:
+            raise SchemaError(f"Error reading '{schema_path}': {ex}", "") from None
+        pending = [
+            (
+                _bundle_name(base_dir, schema_path, ""),
+                from_toml_table(toml_table, toml_filename=str(schema_path)),
+            )
+        ]
+        while len(pending) > 0:
+            name, schema = pending.pop()
+            if name in schemas:
+                continue
+            schemas[name] = schema
+            for file in file_nodes(schema):
+                ref_path = cast(pathlib.Path, file._path)
+                ref_name = _bundle_name(base_dir, ref_path, file._address)
+                pending.append((ref_name, cast(Table, file._ref_schema)))
+
+    payloads = [
+        json.dumps(_encode(schemas[name]), separators=(",", ":")).encode()
+        for name in sorted(schemas)
+    ]
+    offsets: dict[str, tuple[int, int]] = {}
+    offset = 0
+    for name, payload in zip(sorted(schemas), payloads):
+        offsets[name] = (offset, len(payload))
+        offset += len(payload)
+    header_table: dict[str, object] = {"catalog": catalog, "schemas": offsets}
+    header = json.dumps(header_table).encode()
+    with pathlib.Path(bundle_filename).open("wb") as bundle_file:
+        bundle_file.write(MAGIC)
+        bundle_file.write(_HEADER_SIZE.pack(len(header)))
+        bundle_file.write(header)
+        for payload in payloads:
+            bundle_file.write(payload)
+    return sorted(schemas)
+
+
+class Bundle:
+    """Bundle of schema files, written with write_bundle.
+
+    The bundle file is memory-mapped, and only its header is read when it is
+    opened. The schema elements of each schema file are created from the bundle
+    when it is first needed, and so are those of the schema files it references
+    with file. No TOML is parsed, and no schema type or key is compiled again.
+    Schema files are named by their path relative to the folder of the catalog.
+    """
+
+    def __init__(self, bundle_filename: str) -> None:
+        self.bundle_filename = bundle_filename
+        with pathlib.Path(bundle_filename).open("rb") as bundle_file:
+            prefix = bundle_file.read(len(MAGIC) + _HEADER_SIZE.size)
+            if len(prefix) < len(MAGIC) + _HEADER_SIZE.size or not prefix.startswith(
+                MAGIC
+            ):
+                raise SchemaError(f"'{bundle_filename}' is not a schema bundle.", "")
+            self._mmap = mmap.mmap(bundle_file.fileno(), 0, access=mmap.ACCESS_READ)
+        (header_size,) = cast(tuple[int], _HEADER_SIZE.unpack_from(prefix, len(MAGIC)))
+        try:
+            header = cast(
+                dict[str, dict[str, list[object]]],
+                json.loads(self._mmap[len(prefix) : len(prefix) + header_size]),
+            )
+            self.catalog = cast(dict[str, list[str]], dict(header["catalog"]))
+            self._offsets = cast(dict[str, tuple[int, int]], dict(header["schemas"]))
+        except (ValueError, KeyError, TypeError):
+            # A truncated or corrupt header, which is not valid JSON of the
+            # catalog and the offsets:
+            self._mmap.close()
+            raise SchemaError(
+                f"'{bundle_filename}' is not a schema bundle.", ""
+            ) from None
+        self._start = len(prefix) + header_size
+        self._schemas: dict[str, Table] = {}
+
+    def __contains__(self, name: str) -> bool:
+        return posixpath.normpath(name) in self._offsets
+
+    def __enter__(self) -> "Bundle":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close the bundle file.
+
+        Schema files which were not loaded can no longer be loaded, and
+        a SchemaError is raised by the file references to them.
+        """
+        self._mmap.close()
+
+    def load_schema(self, name: str) -> Table:
+        """Get a schema. The elements of each schema file are created only once."""
+        name = posixpath.normpath(name)
+        schema = self._schemas.get(name)
+        if schema is None:
+            if name not in self._offsets:
+                raise SchemaError(
+                    f"'{name}' is not in the bundle '{self.bundle_filename}'.", ""
+                )
+            if self._mmap.closed:
+                raise SchemaError(f"Bundle '{self.bundle_filename}' is closed.", "")
+            offset, size = self._offsets[name]
+            start = self._start + offset
+            node = cast(_Node, json.loads(self._mmap[start : start + size]))
+            schema = _decode_table(cast(list[_Node], node[1]), "", name)
+            for file in file_nodes(schema):
+                object.__setattr__(file, "_loader", self._load_file)
+            self._schemas[name] = schema
+        return schema
+
+    def _load_file(self, toml_path: pathlib.Path) -> Table:
+        return self.load_schema(toml_path.as_posix())
+
+    def as_catalog(self) -> Catalog:
+        """Get the catalog of the bundle, which loads its schemas from the bundle.
+
+        Schema files which are not in the bundle, for example those given by a
+        schema directive, are loaded from the file system.
+        """
+        return _BundleCatalog(self)
+
+
+class _BundleCatalog(Catalog):
+    def __init__(self, bundle: Bundle) -> None:
+        super().__init__(bundle.catalog)
+        self.bundle = bundle
+
+    def has_schema(self, schema_path: pathlib.Path) -> bool:
+        return schema_path.as_posix() in self.bundle or super().has_schema(schema_path)
+
+    def load_schema(self, schema_path: pathlib.Path) -> Table:
+        if schema_path.as_posix() in self.bundle:
+            return self.bundle.load_schema(schema_path.as_posix())
+        return super().load_schema(schema_path)
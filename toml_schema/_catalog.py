@@ -0,0 +1,154 @@
+"""toml-schema: Catalog of schemas selected by TOML filename."""
+# SPDX-License-Identifier: MIT
+# SPDX-FileCopyrightText: 2025 Udi Fuchs
+
+import fnmatch
+import os
+import pathlib
+import re
+import sys
+from collections.abc import Iterator, Mapping, Sequence
+from typing import Optional
+
+if sys.version_info >= (3, 11):
+    import tomllib
+else:
+    import tomli as tomllib
+
+from ._toml_schema import Table, TOMLValue, from_file, from_toml_table
+
+# A catalog maps each schema filename to a list of TOML filename glob patterns:
+CATALOG_SCHEMA = from_toml_table({"*": ["string"]})
+
+# Schema directive in the first line of a TOML file, as in: #:schema ./my.schema.toml
+SCHEMA_DIRECTIVE = re.compile(r"#:schema\s+(\S(?:.*\S)?)\s*")
+
+
+def schema_directive(first_line: str) -> Optional[str]:
+    """Get the schema path from the directive in the first line of a TOML file."""
+    match = SCHEMA_DIRECTIVE.fullmatch(first_line.rstrip("\r\n"))
+    return None if match is None else match.group(1)
+
+
+def read_catalog(catalog_filename: str) -> dict[str, list[str]]:
+    """Read the glob patterns of each schema file from a catalog TOML file."""
+    with pathlib.Path(catalog_filename).open("rb") as catalog_file:
+        toml_table: dict[str, TOMLValue] = tomllib.load(catalog_file)
+    CATALOG_SCHEMA.validate(toml_table)
+    return {
+        schema_filename: [str(glob) for glob in globs]
+        for schema_filename, globs in toml_table.items()
+        if isinstance(globs, list)
+    }
+
+
+class Catalog:
+    """Catalog of schema files, selected by the filenames of TOML files.
+
+    Schema files are relative to base_dir. Glob patterns are matched against the
+    name of the TOML file. Literal filenames take precedence over wildcard
+    patterns, otherwise the first matching pattern wins. Schemas are compiled
+    lazily, once per schema file, when they are first needed. The schema files
+    they reference are also loaded only when first needed for validation.
+    """
+
+    def __init__(
+        self, catalog: Mapping[str, Sequence[str]], /, *, base_dir: str = "."
+    ) -> None:
+        self.base_dir = pathlib.Path(base_dir)
+        # Precomputed glob index. Literal filenames are looked up in a dict and
+        # all other patterns are combined into a single regular expression:
+        self._names: dict[str, pathlib.Path] = {}
+        self._pattern_schemas: dict[str, pathlib.Path] = {}
+        regexes: list[str] = []
+        for schema_filename, globs in catalog.items():
+            schema_path = self.base_dir / schema_filename
+            for glob in globs:
+                if any(char in glob for char in "*?["):
+                    group = f"g{len(regexes)}"
+                    regexes.append(f"(?P<{group}>{fnmatch.translate(glob)})")
+                    self._pattern_schemas[group] = schema_path
+                else:
+                    self._names.setdefault(glob, schema_path)
+        self._regex = None if len(regexes) == 0 else re.compile("|".join(regexes))
+        self._schemas: dict[pathlib.Path, Table] = {}
+
+    @classmethod
+    def from_file(cls, catalog_filename: str) -> "Catalog":
+        """Load a catalog from a TOML file. Schema files are relative to it."""
+        return cls(
+            read_catalog(catalog_filename),
+            base_dir=str(pathlib.Path(catalog_filename).parent),
+        )
+
+    def match(self, toml_filename: str) -> Optional[pathlib.Path]:
+        """Get the schema file for a TOML filename, using the glob patterns."""
+        name = pathlib.PurePath(toml_filename).name
+        schema_path = self._names.get(name)
+        if schema_path is None and self._regex is not None:
+            match = self._regex.match(name)
+            if match is not None and match.lastgroup is not None:
+                schema_path = self._pattern_schemas[match.lastgroup]
+        return schema_path
+
+    def schema_path(
+        self, toml_filename: str, first_line: str = ""
+    ) -> Optional[pathlib.Path]:
+        """Get the schema file for a TOML file.
+
+        A schema directive in the first line of the TOML file takes precedence
+        over the glob patterns. The directive path is relative to the TOML file.
+        If it is not an existing file, but is named like a JSON schema in
+        schemastore (for example 'pyproject.json'), the schema with the same
+        name in the catalog folder is used (for example 'pyproject.schema.toml').
+        """
+        directive = schema_directive(first_line)
+        if directive is None:
+            return self.match(toml_filename)
+        schema_path = pathlib.Path(toml_filename).parent / directive
+        if not schema_path.is_file() and directive.endswith(".json"):
+            json_name = pathlib.PurePosixPath(directive).name
+            catalog_path = self.base_dir / f"{json_name[:-5]}.schema.toml"
+            if self.has_schema(catalog_path):
+                return catalog_path
+        return schema_path
+
+    def has_schema(self, schema_path: pathlib.Path) -> bool:
+        """Check if a schema file exists."""
+        return schema_path.is_file()
+
+    def load_schema(self, schema_path: pathlib.Path) -> Table:
+        """Get a compiled schema. Each schema file is compiled only once."""
+        resolved_path = schema_path.resolve()
+        schema = self._schemas.get(resolved_path)
+        if schema is None:
+            schema = from_file(str(schema_path), lazy_files=True)
+            self._schemas[resolved_path] = schema
+        return schema
+
+    def schema_for(self, toml_filename: str, first_line: str = "") -> Optional[Table]:
+        """Get the compiled schema for a TOML file, or None if it has no schema."""
+        schema_path = self.schema_path(toml_filename, first_line)
+        return None if schema_path is None else self.load_schema(schema_path)
+
+    def find_files(self, path: str) -> Iterator[pathlib.Path]:
+        """Find the TOML files that have a schema, recursively in sorted order.
+
+        Hidden folders, such as '.git', are skipped.
+        """
+        if pathlib.Path(path).is_file():
+            yield pathlib.Path(path)
+            return
+        for dir_path, dir_names, file_names in os.walk(path):
+            dir_names[:] = sorted(name for name in dir_names if name[0] != ".")
+            for file_name in sorted(file_names):
+                if not file_name.endswith(".toml"):
+                    continue
+                toml_path = pathlib.Path(dir_path) / file_name
+                if self.match(file_name) is not None:
+                    yield toml_path
+                    continue
+                with toml_path.open(encoding="utf-8", errors="replace") as toml_file:
+                    first_line = toml_file.readline()
+                if schema_directive(first_line) is not None:
+                    yield toml_path
@@ -0,0 +1,141 @@
+"""toml-schema: Loader of the schema files referenced with file."""
+# SPDX-License-Identifier: MIT
+# SPDX-FileCopyrightText: 2025 Udi Fuchs
+
+import concurrent.futures
+import pathlib
+import sys
+from collections.abc import Iterator
+from typing import Optional, cast
+
+if sys.version_info >= (3, 11):
+    import tomllib
+else:
+    import tomli as tomllib
+
+from ._toml_schema import (
+    Array,
+    File,
+    SchemaElement,
+    SchemaError,
+    Table,
+    Union,
+    from_file,
+)
+
+# The file references of each schema file, with the resolved paths they refer to:
+FileReferences = dict[pathlib.Path, list[tuple[File, pathlib.Path]]]
+
+# The parent path and the file reference which first found each loaded path:
+_FoundBy = dict[pathlib.Path, tuple[pathlib.Path, File]]
+
+
+def file_nodes(schema: SchemaElement) -> Iterator[File]:
+    """Find the file references in a schema, without following any reference."""
+    if isinstance(schema, File):
+        yield schema
+    elif isinstance(schema, Table):
+        for schema_value in schema.values():
+            yield from file_nodes(schema_value)
+    elif isinstance(schema, (Array, Union)):
+        for schema_value in schema:
+            yield from file_nodes(schema_value)
+
+
+def load_files(
+    root_path: pathlib.Path,
+    tables: dict[pathlib.Path, Table],
+    file_refs: FileReferences,
+) -> None:
+    """Load the schema files referenced by tables[root_path], directly or not.
+
+    References are found breadth first, and the new schema files of each level
+    are read and compiled concurrently in a thread pool. Schema files are
+    deduplicated by resolved path, and the tables already in tables are reused.
+    The loaded tables and the file references are added to tables and file_refs.
+    """
+    found_by: _FoundBy = {}
+    level = [root_path]
+    executor: Optional[concurrent.futures.ThreadPoolExecutor] = None
+    try:
+        while len(level) > 0:
+            new_paths: _FoundBy = {}
+            for path in level:
+                file_refs[path] = [
+                    (file, cast(pathlib.Path, file._path).resolve())
+                    for file in file_nodes(tables[path])
+                ]
+                for file, ref_path in file_refs[path]:
+                    if ref_path not in tables and ref_path not in new_paths:
+                        new_paths[ref_path] = (path, file)
+            if len(new_paths) > 0 and executor is None:
+                executor = concurrent.futures.ThreadPoolExecutor()
+            futures = {
+                ref_path: cast(concurrent.futures.Executor, executor).submit(
+                    from_file, str(ref_path), lazy_files=True
+                )
+                for ref_path in new_paths
+            }
+            found_by.update(new_paths)
+            for ref_path, future in futures.items():
+                error = future.exception()
+                if isinstance(error, (SchemaError, tomllib.TOMLDecodeError, OSError)):
+                    raise _chain_error(error, ref_path, found_by) from None
+                tables[ref_path] = future.result()
+            level = list(futures)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+
+def _chain_error(
+    error: Exception, path: pathlib.Path, found_by: _FoundBy
+) -> SchemaError:
+    """Wrap error with the context of every file reference leading to path."""
+    while path in found_by:
+        path, file = found_by[path]
+        error = SchemaError(f"Error reading '{file.file}': {error}", file._address)
+    return cast(SchemaError, error)
+
+
+def check_cycles(
+    root_path: pathlib.Path, root_filename: str, file_refs: FileReferences
+) -> None:
+    """Raise an error with the chain of filenames, if there is a reference cycle.
+
+    The error context is the address, in the root schema, of the first file
+    reference in the chain.
+    """
+    checked: set[pathlib.Path] = set()
+
+    def check(path: pathlib.Path, chain: list[tuple[File, pathlib.Path]]) -> None:
+        for file, ref_path in file_refs[path]:
+            if ref_path == root_path or any(ref_path == p for _, p in chain):
+                filenames = [root_filename, *(f.file for f, _ in chain), file.file]
+                first_file = file if len(chain) == 0 else chain[0][0]
+                raise SchemaError(
+                    f"File reference cycle: {' -> '.join(filenames)}",
+                    first_file._address,
+                )
+            if ref_path not in checked:
+                check(ref_path, [*chain, (file, ref_path)])
+        checked.add(path)
+
+    check(root_path, [])
+
+
+def link_files(tables: dict[pathlib.Path, Table], file_refs: FileReferences) -> None:
+    """Point every file reference to the table of the schema file it refers to."""
+    for refs in file_refs.values():
+        for file, ref_path in refs:
+            object.__setattr__(file, "_ref_schema", tables[ref_path])
+
+
+def load_file_references(root: Table, toml_filename: str) -> None:
+    """Load all the schema files referenced by the root table of toml_filename."""
+    root_path = pathlib.Path(toml_filename).resolve()
+    tables = {root_path: root}
+    file_refs: FileReferences = {}
+    load_files(root_path, tables, file_refs)
+    check_cycles(root_path, toml_filename, file_refs)
+    link_files(tables, file_refs)
@@ -0,0 +1,861 @@
+"""toml-schema: Generation of random documents which conform to a schema."""
+# SPDX-License-Identifier: MIT
+# SPDX-FileCopyrightText: 2025 Udi Fuchs
+
+import datetime
+import json
+import random
+import re
+import string
+import sys
+from collections.abc import Callable, Iterator
+from typing import Optional, cast
+
+if sys.version_info >= (3, 11):
+    import tomllib
+else:
+    import tomli as tomllib
+
+from ._toml_schema import (
+    BARE_KEY_CHARS,
+    AnyValue,
+    Array,
+    Boolean,
+    Date,
+    Enum,
+    File,
+    Float,
+    Integer,
+    LocalDateTime,
+    MaxItems,
+    MinItems,
+    OffsetDateTime,
+    Pattern,
+    Ref,
+    SchemaElement,
+    SchemaError,
+    String,
+    Table,
+    Time,
+    TOMLValue,
+    Union,
+    UniqueItems,
+)
+
+# Containers with a smaller budget of bytes get only their required keys and items:
+_MIN_BUDGET = 64
+# The share of the budget of a container which is given to each repeated item:
+_ITEM_SHARE = 16
+# The budget of a union value, which is generated in memory:
+_UNION_BUDGET = 1024
+# The number of tries to generate a string of a pattern, a union value,
+# a unique array item or a new key:
+_TRIES = 100
+_MAX_DEPTH = 64
+# The highest number of repeats of a pattern item for '*', '+' and '{n,}':
+_MAX_REPEAT = 8
+
+# The characters of generated strings, and of negated character classes:
+_ALPHABET = string.ascii_letters + string.digits + "-_.:/@ "
+_WORD_CHARS = string.ascii_letters + string.digits + "_"
+_ESCAPE_CHARS = {
+    "d": string.digits,
+    "D": "".join(char for char in _ALPHABET if char not in string.digits),
+    "w": _WORD_CHARS,
+    "W": "".join(char for char in _ALPHABET if char not in _WORD_CHARS),
+    "s": " ",
+    "S": _ALPHABET.replace(" ", ""),
+    "n": "\n",
+    "t": "\t",
+}
+# Escapes of positions, which are ignored when sampling:
+_ANCHOR_ESCAPES = frozenset("AZbB")
+
+# Values which violate most schemas, tried after the values specific to a schema:
+_WRONG_VALUES: tuple[TOMLValue, ...] = (
+    True,
+    -1,
+    0.5,
+    "?",
+    datetime.date(2000, 1, 1),
+    [],
+    {},
+)
+
+_EPOCH = datetime.datetime(2000, 1, 1)  # noqa: DTZ001
+# The generated dates and times are in the 30 years after _EPOCH:
+_DATE_RANGE_SECONDS = 30 * 365 * 24 * 3600
+
+_Sampler = Callable[[random.Random], str]
+
+
+def _empty_sampler(_random: random.Random) -> str:
+    return ""
+
+
+def _chars_sampler(chars: str) -> _Sampler:
+    return lambda rng: rng.choice(chars)
+
+
+class _PatternParser:
+    """Parser of a regular expression into a sampler of strings, which may match it.
+
+    Only the common syntax is supported, and lookarounds and anchors are ignored,
+    so the sampled strings must be checked with the regular expression.
+    """
+
+    def __init__(self, pattern: str) -> None:
+        self.pattern = pattern
+        self.index = 0
+
+    def parse(self) -> _Sampler:
+        return self._alternation()
+
+    def _peek(self) -> str:
+        return self.pattern[self.index : self.index + 1]
+
+    def _next(self) -> str:
+        char = self._peek()
+        self.index += 1
+        return char
+
+    def _alternation(self) -> _Sampler:
+        options = [self._sequence()]
+        while self._peek() == "|":
+            self.index += 1
+            options.append(self._sequence())
+        if len(options) == 1:
+            return options[0]
+        return lambda rng: rng.choice(options)(rng)
+
+    def _sequence(self) -> _Sampler:
+        items: list[_Sampler] = []
+        while self._peek() not in ("", "|", ")"):
+            items.append(self._quantifier(self._atom()))
+        return lambda rng: "".join(item(rng) for item in items)
+
+    def _quantifier(self, item: _Sampler) -> _Sampler:
+        char = self._peek()
+        if char == "*":
+            low, high, length = 0, _MAX_REPEAT, 1
+        elif char == "+":
+            low, high, length = 1, _MAX_REPEAT, 1
+        elif char == "?":
+            low, high, length = 0, 1, 1
+        else:
+            match = re.match(r"\{(\d+)(,?)(\d*)\}", self.pattern[self.index :])
+            if match is None:
+                return item
+            low = int(match[1])
+            high = int(match[3]) if match[3] else low + _MAX_REPEAT if match[2] else low
+            length = len(match[0])
+        self.index += length
+        if self._peek() in ("?", "+"):  # Lazy or possessive quantifier.
+            self.index += 1
+        return lambda rng: "".join(item(rng) for _ in range(rng.randint(low, high)))
+
+    def _atom(self) -> _Sampler:  # noqa: PLR0911
+        char = self._next()
+        if char == "(":
+            return self._group()
+        if char == "[":
+            return self._class()
+        if char == ".":
+            return _chars_sampler(_ALPHABET)
+        if char in ("^", "$"):
+            return _empty_sampler
+        if char == "\\":
+            escaped = self._next()
+            if escaped in _ANCHOR_ESCAPES:
+                return _empty_sampler
+            return _chars_sampler(_ESCAPE_CHARS.get(escaped, escaped))
+        return _chars_sampler(char)
+
+    def _group(self) -> _Sampler:
+        lookaround = re.match(r"\?<?[=!]", self.pattern[self.index :])
+        extension = re.match(r"\?(P<\w+>|[aiLmsux-]*:)", self.pattern[self.index :])
+        if lookaround is not None:
+            self.index += len(lookaround[0])
+        elif extension is not None:
+            self.index += len(extension[0])
+        sampler = self._alternation()
+        self._next()  # The closing parenthesis.
+        return _empty_sampler if lookaround is not None else sampler
+
+    def _class(self) -> _Sampler:
+        negated = self._peek() == "^"
+        if negated:
+            self.index += 1
+        members: list[str] = []
+        char = self._next()
+        # A closing bracket at the start of the class is a member:
+        while char not in ("", "]") or (char == "]" and len(members) == 0):
+            if char == "\\":
+                escaped = self._next()
+                char = _ESCAPE_CHARS.get(escaped, escaped)
+            next_chars = self.pattern[self.index : self.index + 2]
+            if (
+                len(char) == 1
+                and next_chars[:1] == "-"
+                and next_chars[1:] not in ("", "]")
+            ):
+                self.index += 1
+                end = self._next()
+                if end == "\\":
+                    end = self._next()
+                char = "".join(chr(code) for code in range(ord(char), ord(end) + 1))
+            members.append(char)
+            char = self._next()
+        chars = "".join(members)
+        if negated:
+            chars = "".join(char for char in _ALPHABET if char not in chars)
+        return _chars_sampler(chars if chars != "" else _ALPHABET)
+
+
+def _toml_string(value: str) -> str:
+    # The escapes of JSON strings are valid in TOML, which also escapes DEL:
+    return json.dumps(value, ensure_ascii=False).replace("\x7f", "\\u007f")
+
+
+def _toml_key(name: str) -> str:
+    if name != "" and all(char in BARE_KEY_CHARS for char in name):
+        return name
+    return _toml_string(name)
+
+
+def _toml_value(value: TOMLValue) -> str:
+    """Format a value as an inline TOML value."""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, str):
+        return _toml_string(value)
+    if isinstance(value, (int, float)):
+        return repr(value)
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, list):
+        return f"[{', '.join(_toml_value(item) for item in value)}]"
+    items = (f"{_toml_key(key)} = {_toml_value(item)}" for key, item in value.items())
+    return f"{{{', '.join(items)}}}"
+
+
+def _parse_value(text: str) -> TOMLValue:
+    """Parse the text of an inline TOML value."""
+    document: dict[str, TOMLValue] = tomllib.loads(f"value = {text}")
+    return document["value"]
+
+
+def _key_context(context: str, name: str) -> str:
+    return name if context == "" else f"{context}.{name}"
+
+
+def _resolve(schema: SchemaElement) -> SchemaElement:
+    """Get the schema referenced by ref and file schemas."""
+    while isinstance(schema, (Ref, File)):
+        schema = schema._target()
+    return schema
+
+
+def _array_item(array: Array) -> SchemaElement:
+    return next(schema for schema in array if not hasattr(schema, "_array_option"))
+
+
+def _array_options(array: Array) -> tuple[int, Optional[int], bool]:
+    """Get the min-items, max-items and unique-items options of an array."""
+    min_items = 0
+    max_items: Optional[int] = None
+    unique_items = False
+    for schema in array:
+        if isinstance(schema, MinItems):
+            min_items = schema.min_items
+        elif isinstance(schema, MaxItems):
+            max_items = schema.max_items
+        elif isinstance(schema, UniqueItems):
+            unique_items = schema.unique_items
+    return min_items, max_items, unique_items
+
+
+# A table entry is a key, its schema and the violation of its value:
+_Entry = tuple[str, SchemaElement, str]
+
+
+class DocumentGenerator:
+    """Generator of random TOML documents, which conform to a schema.
+
+    The documents are generated as chunks of text, so that documents of any
+    size can be written without holding them in memory. Only the text of
+    union values and of the items of unique-items arrays is kept in memory.
+
+    The size of a document is a budget of bytes, which is shared between
+    its tables and arrays. Containers grow by adding array items and keys of
+    wildcard and pattern keys, until their share is used. Documents of schemas
+    without such containers may be smaller than the requested size.
+
+    A document can be generated with a violation: a single point where it does
+    not conform to the schema, such as a wrong value, a missing required key or
+    an array with too many items. The error which validating the document
+    raises is then recorded in the violation attribute.
+    """
+
+    def __init__(self, schema: Table, /, *, seed: int = 0) -> None:
+        self.schema = schema
+        self.random = random.Random(seed)  # noqa: S311
+        # The error of the last document generated with a violation:
+        self.violation: Optional[SchemaError] = None
+        self._written = 0
+        self._depth = 0
+        self._samplers: dict[str, _Sampler] = {}
+
+    def generate(
+        self, size: int = 1000, /, *, violation: bool = False
+    ) -> Iterator[str]:
+        """Generate the text of a random document of about size bytes, in chunks.
+
+        If violation is True, the document has a single random violation of
+        the schema. ValueError is raised if the schema cannot be violated,
+        or if no value can be generated for some part of the schema.
+        """
+        self.violation = None
+        self._written = 0
+        self._depth = 0
+        yield from self._table_body(
+            self.schema, (), "", size, "inner" if violation else ""
+        )
+
+    def _share(self, start: int, budget: int, count: int) -> int:
+        """Get the share of each of count values, in what is left of a budget."""
+        return max(0, budget - (self._written - start)) // count
+
+    def _put(self, text: str) -> str:
+        """Count the bytes of the text of a chunk."""
+        self._written += len(text.encode())
+        return text
+
+    def _table_body(
+        self,
+        table: Table,
+        header: tuple[str, ...],
+        context: str,
+        budget: int,
+        violation: str,
+    ) -> Iterator[str]:
+        """Generate the keys of a table, followed by its sub-tables."""
+        self._enter(context)
+        start = self._written
+        entries = self._table_entries(table, context, budget, violation)
+        used = {name for name, _, _ in entries}
+        sections = [entry for entry in entries if self._is_section(entry[1], entry[2])]
+        remaining = len(entries)
+        for name, schema, entry_violation in entries:
+            if any(name == section[0] for section in sections):
+                continue
+            share = self._share(start, budget, remaining)
+            remaining -= 1
+            yield self._put(f"{_toml_key(name)} = ")
+            yield from self._inline(
+                schema, _key_context(context, name), share, entry_violation
+            )
+            yield self._put("\n")
+        # Inline extra keys are added until the first extra key of a sub-table:
+        while budget >= _MIN_BUDGET and self._written - start < budget:
+            extra = self._extra_key(table, context, used)
+            if extra is None:
+                break
+            name, schema = extra
+            if self._is_section(schema, ""):
+                sections.append((name, schema, ""))
+                break
+            yield self._put(f"{_toml_key(name)} = ")
+            yield from self._inline(
+                schema, _key_context(context, name), budget // _ITEM_SHARE, ""
+            )
+            yield self._put("\n")
+        for name, schema, entry_violation in sections:
+            share = self._share(start, budget, max(remaining, 1))
+            remaining -= 1
+            yield from self._section(
+                schema, (*header, name), context, share, entry_violation
+            )
+        while budget >= _MIN_BUDGET and self._written - start < budget:
+            extra = self._extra_key(table, context, used, section=True)
+            if extra is None:
+                break
+            name, schema = extra
+            yield from self._section(
+                schema, (*header, name), context, budget // _ITEM_SHARE, ""
+            )
+        self._depth -= 1
+
+    def _section(
+        self,
+        schema: SchemaElement,
+        header: tuple[str, ...],
+        context: str,
+        budget: int,
+        violation: str,
+    ) -> Iterator[str]:
+        """Generate a sub-table or an array of tables."""
+        key_context = _key_context(context, header[-1])
+        schema = _resolve(schema)
+        if isinstance(schema, Table):
+            yield self._put(f"\n[{'.'.join(_toml_key(key) for key in header)}]\n")
+            yield from self._table_body(schema, header, key_context, budget, violation)
+        else:
+            array = cast(Array, schema)
+            yield from self._array(array, header, key_context, budget, violation)
+
+    def _inline(
+        self, schema: SchemaElement, context: str, budget: int, violation: str
+    ) -> Iterator[str]:
+        """Generate an inline value."""
+        if violation == "type":
+            yield self._put(self._wrong_value(schema, context))
+            return
+        schema = _resolve(schema)
+        if isinstance(schema, Table):
+            yield from self._inline_table(schema, context, budget, violation)
+        elif isinstance(schema, Array):
+            yield from self._array(schema, None, context, budget, violation)
+        elif isinstance(schema, Union):
+            # The bytes of the union value were counted when it was generated:
+            yield self._union_value(schema, context)
+        else:
+            yield self._put(_toml_value(self._leaf_value(schema)))
+
+    def _inline_table(
+        self, table: Table, context: str, budget: int, violation: str
+    ) -> Iterator[str]:
+        self._enter(context)
+        start = self._written
+        entries = self._table_entries(table, context, budget, violation)
+        used = {name for name, _, _ in entries}
+        separator = ""
+        yield self._put("{")
+        for remaining, (name, schema, entry_violation) in zip(
+            range(len(entries), 0, -1), entries
+        ):
+            share = self._share(start, budget, remaining)
+            yield self._put(f"{separator}{_toml_key(name)} = ")
+            yield from self._inline(
+                schema, _key_context(context, name), share, entry_violation
+            )
+            separator = ", "
+        while budget >= _MIN_BUDGET and self._written - start < budget:
+            extra = self._extra_key(table, context, used)
+            if extra is None:
+                break
+            name, schema = extra
+            yield self._put(f"{separator}{_toml_key(name)} = ")
+            yield from self._inline(
+                schema, _key_context(context, name), budget // _ITEM_SHARE, ""
+            )
+            separator = ", "
+        yield self._put("}")
+        self._depth -= 1
+
+    def _table_entries(
+        self, table: Table, context: str, budget: int, violation: str
+    ) -> list[_Entry]:
+        """Choose the keys of a table, and apply its violation."""
+        entries: list[_Entry] = []
+        for schema_key, schema in table.items():
+            if (
+                schema_key.hidden
+                or schema_key.pattern is not None
+                or schema_key.ref is not None
+                or any(name == schema_key.name for name, _, _ in entries)
+            ):
+                continue
+            if schema_key.required or (
+                budget >= _MIN_BUDGET and self.random.random() < 0.5
+            ):
+                entries.append((schema_key.name, schema, ""))
+        if violation != "inner":
+            return entries
+        options = self._table_violations(table, context)
+        if len(options) == 0:
+            raise ValueError(f"No violation of the schema is possible in: {table}")
+        kind, name, schema = self.random.choice(options)
+        entries = [entry for entry in entries if entry[0] != name]
+        if kind == "missing":
+            self.violation = SchemaError(f"Missing required key: {name}", context)
+        elif kind == "unknown":
+            entries.append((name, AnyValue(), ""))
+            self.violation = table._key_error(name, context)
+        else:
+            key_context = _key_context(context, name)
+            kinds = self._violations(schema, key_context)
+            entries.append((name, schema, self.random.choice(kinds)))
+        return entries
+
+    def _table_violations(
+        self, table: Table, context: str
+    ) -> list[tuple[str, str, SchemaElement]]:
+        """Get the possible violations of a table, as kind, key name and schema.
+
+        The kinds are a missing required key, an unknown key, and a violation
+        of the value of a key.
+        """
+        options: list[tuple[str, str, SchemaElement]] = []
+        names: set[str] = set()
+        for schema_key, schema in table.items():
+            if (
+                schema_key.hidden
+                or schema_key.pattern is not None
+                or schema_key.ref is not None
+                or schema_key.name in names
+            ):
+                continue
+            names.add(schema_key.name)
+            if schema_key.required:
+                options.append(("missing", schema_key.name, schema))
+            key_context = _key_context(context, schema_key.name)
+            if len(self._wrong_values(schema, key_context)) > 0:
+                options.append(("key", schema_key.name, schema))
+        for name in ("unknown-key", "?", ""):
+            try:
+                table._key_schema(name, context)
+            except SchemaError:  # noqa: PERF203
+                options.append(("unknown", name, AnyValue()))
+                break
+        extra = self._extra_key(table, context, names)
+        if extra is not None:
+            name, schema = extra
+            if len(self._wrong_values(schema, _key_context(context, name))) > 0:
+                options.append(("key", name, schema))
+        return options
+
+    def _extra_key(
+        self, table: Table, context: str, used: set[str], *, section: bool = False
+    ) -> Optional[tuple[str, SchemaElement]]:
+        """Get a new key of a wildcard, pattern or reference key, and its schema.
+
+        If section is True, only a key of a sub-table or an array of tables
+        is returned. Return None if no such key was found, and add the key
+        to used otherwise.
+        """
+        special_keys = [
+            schema_key
+            for schema_key in table
+            if not schema_key.hidden
+            and (schema_key.pattern is not None or schema_key.ref is not None)
+        ]
+        if len(special_keys) == 0:
+            return None
+        for _ in range(_TRIES):
+            schema_key = self.random.choice(special_keys)
+            if schema_key.pattern is not None:
+                name = self._pattern_string(schema_key.pattern)
+            else:
+                name = self._ref_key_name(schema_key._ref_schema, context)
+            if name is None or name in used or table.get_sub_schema(name) is not None:
+                continue
+            schema = table._key_schema(name, context)
+            if section and not self._is_section(schema, ""):
+                continue
+            used.add(name)
+            return name, schema
+        return None
+
+    def _ref_key_name(
+        self, schema: Optional[SchemaElement], context: str
+    ) -> Optional[str]:
+        if schema is None:  # pragma: no cover
+            return None
+        try:
+            text = "".join(self._inline(schema, context, _MIN_BUDGET, ""))
+        except ValueError:
+            return None
+        name = _parse_value(text)
+        return name if isinstance(name, str) else None
+
+    def _is_section(self, schema: SchemaElement, violation: str) -> bool:
+        """Check if a value of schema is generated as a sub-table or array of tables."""
+        if violation == "type":
+            return False
+        schema = _resolve(schema)
+        if isinstance(schema, Table):
+            return True
+        if not isinstance(schema, Array):
+            return False
+        min_items, max_items, _ = _array_options(schema)
+        return (
+            isinstance(_resolve(_array_item(schema)), Table)
+            and violation != "item:type"
+            and max_items != 0
+            and not (violation == "min-items" and min_items == 1)
+        )
+
+    def _array(
+        self,
+        array: Array,
+        header: Optional[tuple[str, ...]],
+        context: str,
+        budget: int,
+        violation: str,
+    ) -> Iterator[str]:
+        """Generate an array, inline or as an array of tables if header is given."""
+        self._enter(context)
+        start = self._written
+        item_schema = _array_item(array)
+        unique_items = _array_options(array)[2]
+        minimum, maximum, violation_index = self._array_limits(
+            array, header, context, violation
+        )
+        seen: set[str] = set()
+        first_item = ""
+        prefix = ""
+        if header is None:
+            yield self._put("[")
+        index = 0
+        while index < minimum or (
+            (maximum is None or index < maximum)
+            and budget >= _MIN_BUDGET
+            and self._written - start < budget
+        ):
+            item_context = f"{context}[{index}]"
+            chunks = self._array_item(
+                item_schema,
+                header,
+                item_context,
+                budget // _ITEM_SHARE,
+                violation[5:] if index == violation_index else "",
+            )
+            if header is not None:
+                prefix = f"\n[[{'.'.join(_toml_key(key) for key in header)}]]\n"
+            elif index > 0:
+                prefix = ", "
+            if unique_items:
+                text = self._unique_item(chunks, item_schema, item_context, seen)
+                if text is None:
+                    if index >= minimum:
+                        break
+                    raise ValueError(f"Cannot generate unique items for: {array}")
+                first_item = text if index == 0 else first_item
+                chunks = iter((text,))
+            yield self._put(prefix)
+            yield from chunks
+            index += 1
+        if violation == "unique-items":
+            yield self._put(prefix if header is not None else ", ")
+            yield self._put(first_item)
+        if header is None:
+            yield self._put("]")
+        self._depth -= 1
+
+    def _array_limits(
+        self,
+        array: Array,
+        header: Optional[tuple[str, ...]],
+        context: str,
+        violation: str,
+    ) -> tuple[int, Optional[int], int]:
+        """Get the least and most items of an array, and the index of its violation.
+
+        The violations of the options of the array are recorded here.
+        """
+        min_items, max_items, _ = _array_options(array)
+        minimum, maximum = min_items, max_items
+        if violation == "min-items":
+            minimum = maximum = min_items - 1
+            self.violation = SchemaError(
+                f"Array has less than {min_items} items.", context
+            )
+        elif violation == "max-items":
+            minimum = maximum = cast(int, max_items) + 1
+            self.violation = SchemaError(
+                f"Array has more than {max_items} items.", context
+            )
+        elif violation == "unique-items":
+            # A copy of the first item is added after the items:
+            minimum = max(1, min_items - 1)
+            maximum = None if max_items is None else max_items - 1
+            self.violation = SchemaError("Array has duplicate values.", context)
+        if header is not None:
+            minimum = max(minimum, 1)
+        violation_index = -1
+        if violation.startswith("item:"):
+            violation_index = self.random.randrange(
+                4 if maximum is None else min(4, maximum)
+            )
+            minimum = max(minimum, violation_index + 1)
+        return minimum, maximum, violation_index
+
+    def _array_item(
+        self,
+        schema: SchemaElement,
+        header: Optional[tuple[str, ...]],
+        context: str,
+        budget: int,
+        violation: str,
+    ) -> Iterator[str]:
+        """Generate an array item, inline or as the body of a table in an array."""
+        if header is None:
+            return self._inline(schema, context, budget, violation)
+        table = cast(Table, _resolve(schema))
+        return self._table_body(table, header, context, budget, violation)
+
+    def _unique_item(
+        self,
+        chunks: Iterator[str],
+        schema: SchemaElement,
+        context: str,
+        seen: set[str],
+    ) -> Optional[str]:
+        """Generate the text of an item which is not in seen, or return None."""
+        for _ in range(_TRIES):
+            text = "".join(chunks)
+            if text not in seen:
+                seen.add(text)
+                return text
+            chunks = self._inline(schema, context, _MIN_BUDGET, "")
+        return None
+
+    def _union_value(self, union: Union, context: str) -> str:
+        """Generate the text of a value which matches a union."""
+        for _ in range(_TRIES):
+            if union.mode == "none" or self.random.random() < 0.5:
+                text = _toml_value(self.random.choice(_WRONG_VALUES))
+            else:
+                try:
+                    option = self.random.choice(union)
+                    text = "".join(self._inline(option, context, _UNION_BUDGET, ""))
+                except ValueError:
+                    continue
+            try:
+                union.validate(_parse_value(text), context="")
+            except SchemaError:
+                continue
+            return text
+        raise ValueError(f"Cannot generate a value for: {union}")
+
+    def _leaf_value(self, schema: SchemaElement) -> TOMLValue:  # noqa: C901, PLR0911
+        if isinstance(schema, String):
+            low = schema.min_len
+            if low is None:
+                low = 1 if schema.max_len is None else min(1, schema.max_len)
+            high = low + 11 if schema.max_len is None else schema.max_len
+            length = self.random.randint(low, high)
+            return "".join(self.random.choices(string.ascii_lowercase, k=length))
+        if isinstance(schema, Enum):
+            return self.random.choice(schema.enum)
+        if isinstance(schema, Pattern):
+            value = self._pattern_string(schema.pattern)
+            if value is None:
+                raise ValueError(f"Cannot generate a value for: {schema}")
+            return value
+        if isinstance(schema, Integer):
+            low = 0 if schema.min is None else schema.min
+            if schema.min is None and schema.max is not None:
+                low = min(low, schema.max)
+            high = low + 1000 if schema.max is None else schema.max
+            return self.random.randint(low, high)
+        if isinstance(schema, Float):
+            low_float = 0.0 if schema.min is None else schema.min
+            if schema.min is None and schema.max is not None:
+                low_float = min(low_float, schema.max)
+            high_float = low_float + 1000.0 if schema.max is None else schema.max
+            value_float = round(self.random.uniform(low_float, high_float), 3)
+            return min(max(value_float, low_float), high_float)
+        if isinstance(schema, Boolean):
+            return self.random.random() < 0.5
+        if isinstance(schema, (OffsetDateTime, LocalDateTime, Date, Time)):
+            return self._date_time_value(schema)
+        if isinstance(schema, AnyValue):
+            return self.random.choice((self.random.randrange(1000), "any", True))
+        raise ValueError(f"Cannot generate a value for: {schema}")
+
+    def _date_time_value(self, schema: SchemaElement) -> TOMLValue:
+        seconds = self.random.randrange(_DATE_RANGE_SECONDS)
+        date_time = _EPOCH + datetime.timedelta(seconds=seconds)
+        if isinstance(schema, OffsetDateTime):
+            return date_time.replace(tzinfo=datetime.timezone.utc)
+        if isinstance(schema, LocalDateTime):
+            return date_time
+        if isinstance(schema, Date):
+            return date_time.date()
+        return date_time.time()
+
+    def _pattern_string(self, pattern: str) -> Optional[str]:
+        """Sample a string which matches pattern, or return None."""
+        sampler = self._samplers.get(pattern)
+        if sampler is None:
+            sampler = _PatternParser(pattern).parse()
+            self._samplers[pattern] = sampler
+        regex = re.compile(pattern)
+        for _ in range(_TRIES):
+            value = sampler(self.random)
+            if regex.match(value) is not None:
+                return value
+        return None
+
+    def _violations(self, schema: SchemaElement, context: str) -> list[str]:
+        """Get the kinds of violations of a value of schema.
+
+        The kinds are a value of a wrong type or range, "type", the violation
+        of a key of a table, "inner", and the violations of an array.
+        """
+        kinds = ["type"] if len(self._wrong_values(schema, context)) > 0 else []
+        schema = _resolve(schema)
+        if isinstance(schema, Table):
+            if len(self._table_violations(schema, context)) > 0:
+                kinds.append("inner")
+        elif isinstance(schema, Array):
+            kinds += self._array_violations(schema, context)
+        return kinds
+
+    def _array_violations(self, array: Array, context: str) -> list[str]:
+        """Get the kinds of violations of an array.
+
+        The kinds are the violations of its options, and the violations of
+        one of its items, prefixed by "item:".
+        """
+        min_items, max_items, unique_items = _array_options(array)
+        kinds = []
+        if min_items > 0:
+            kinds.append("min-items")
+        if max_items is not None:
+            kinds.append("max-items")
+        if unique_items and (max_items is None or max_items >= 2):
+            kinds.append("unique-items")
+        if max_items != 0:
+            item_schema = _array_item(array)
+            kinds += [
+                f"item:{kind}"
+                for kind in self._violations(item_schema, f"{context}[0]")
+            ]
+        return kinds
+
+    def _wrong_values(
+        self, schema: SchemaElement, context: str
+    ) -> list[tuple[TOMLValue, SchemaError]]:
+        """Get values which violate schema, with their errors."""
+        candidates: list[TOMLValue] = []
+        resolved = _resolve(schema)
+        if isinstance(resolved, (Integer, Float)):
+            one = 1 if isinstance(resolved, Integer) else 1.0
+            if resolved.min is not None:
+                candidates.append(resolved.min - one)
+            if resolved.max is not None:
+                candidates.append(resolved.max + one)
+        elif isinstance(resolved, String):
+            if resolved.min_len is not None and resolved.min_len > 0:
+                candidates.append("")
+            if resolved.max_len is not None:
+                candidates.append("x" * (resolved.max_len + 1))
+        wrong_values = []
+        for value in (*candidates, *_WRONG_VALUES):
+            try:
+                schema.validate(value, context=context)
+            except SchemaError as ex:  # noqa: PERF203
+                wrong_values.append((value, ex))
+        return wrong_values
+
+    def _wrong_value(self, schema: SchemaElement, context: str) -> str:
+        value, self.violation = self.random.choice(self._wrong_values(schema, context))
+        return _toml_value(value)
+
+    def _enter(self, context: str) -> None:
+        self._depth += 1
+        if self._depth > _MAX_DEPTH:
+            raise ValueError(f"Schema is too deep to generate a document: {context}")
@@ -0,0 +1,111 @@
+"""toml-schema: Schema file graph with incremental recompilation."""
+# SPDX-License-Identifier: MIT
+# SPDX-FileCopyrightText: 2025 Udi Fuchs
+
+import pathlib
+import threading
+from collections.abc import Iterable
+
+from ._files import FileReferences, check_cycles, link_files, load_files
+from ._toml_schema import Table, from_file
+
+
+class SchemaGraph:
+    """Root schema file and the schema files it references, directly or not.
+
+    Each schema file is compiled once, and all the file references to it share
+    its table. update() recompiles the schema files that changed, and the schema
+    files which reference them, directly or not. The other tables are shared
+    with the new graph, since none of their file references change. The new
+    graph is fully built off to the side, and is published with a single
+    assignment, so a validation with schema sees either the old graph or
+    the new one, and never a mix of them.
+    """
+
+    def __init__(self, toml_filename: str) -> None:
+        self.toml_filename = toml_filename
+        self.root_path = pathlib.Path(toml_filename).resolve()
+        self._lock = threading.Lock()
+        self._tables = {self.root_path: from_file(toml_filename, lazy_files=True)}
+        self._file_refs: FileReferences = {}
+        load_files(self.root_path, self._tables, self._file_refs)
+        check_cycles(self.root_path, toml_filename, self._file_refs)
+        link_files(self._tables, self._file_refs)
+
+    @property
+    def schema(self) -> Table:
+        """The root schema table."""
+        return self._tables[self.root_path]
+
+    @property
+    def tables(self) -> dict[pathlib.Path, Table]:
+        """Tables of all the schema files in the graph, by resolved path."""
+        return dict(self._tables)
+
+    def update(self, changed_paths: Iterable[str]) -> set[pathlib.Path]:
+        """Recompile the changed schema files, and the files which reference them.
+
+        Paths which are not in the graph are ignored. Schema files which are
+        no longer referenced are dropped. If a schema file fails to compile,
+        the error is raised and the graph is left unchanged.
+        Return the resolved paths of the changed schema files in the graph.
+        """
+        with self._lock:
+            changed = {
+                pathlib.Path(path).resolve() for path in changed_paths
+            } & self._tables.keys()
+            if len(changed) == 0:
+                return changed
+            recompiled = self._referencing(changed)
+            tables = {
+                path: table
+                for path, table in self._tables.items()
+                if path not in recompiled
+            }
+            file_refs = {
+                path: refs
+                for path, refs in self._file_refs.items()
+                if path not in recompiled
+            }
+            shared = set(tables)
+            for path in sorted(recompiled):
+                # The path may have been loaded as a reference of another path:
+                if path not in tables:
+                    tables[path] = from_file(str(path), lazy_files=True)
+                    load_files(path, tables, file_refs)
+            reachable = self._reachable(file_refs)
+            tables = {path: tables[path] for path in reachable}
+            file_refs = {path: file_refs[path] for path in reachable}
+            check_cycles(self.root_path, self.toml_filename, file_refs)
+            # The file references of the shared tables are left as they are:
+            link_files(
+                tables,
+                {path: refs for path, refs in file_refs.items() if path not in shared},
+            )
+            self._file_refs = file_refs
+            self._tables = tables
+        return changed
+
+    def _referencing(self, changed: set[pathlib.Path]) -> set[pathlib.Path]:
+        """Get the changed paths, and the paths which reference them."""
+        referencing = set(changed)
+        pending = list(changed)
+        while len(pending) > 0:
+            changed_path = pending.pop()
+            for path, refs in self._file_refs.items():
+                if path not in referencing and any(
+                    ref_path == changed_path for _, ref_path in refs
+                ):
+                    referencing.add(path)
+                    pending.append(path)
+        return referencing
+
+    def _reachable(self, file_refs: FileReferences) -> set[pathlib.Path]:
+        reachable = {self.root_path}
+        pending = [self.root_path]
+        while len(pending) > 0:
+            for _, ref_path in file_refs[pending.pop()]:
+                if ref_path not in reachable:
+                    reachable.add(ref_path)
+                    pending.append(ref_path)
+        return reachable
@@ -0,0 +1,666 @@
+"""toml-schema: Converter of JSON schemas to TOML schemas."""
+# SPDX-License-Identifier: MIT
+# SPDX-FileCopyrightText: 2025 Udi Fuchs
+
+import copy
+import io
+import pathlib
+from typing import Optional, cast
+
+from ._generate import _toml_key, _toml_string
+from ._toml_schema import SchemaError, Table, loads
+
+JSON_IGNORE = (
+    "$schema",
+    "$id",
+    "$comment",
+    "title",
+    "description",
+    "markdownDescription",
+    "x-intellij-html-description",
+    "x-intellij-language-injection",
+    "x-taplo",
+    "x-taplo-info",
+    "x-tombi-table-keys-order",
+    "x-tombi-toml-version",
+    "x-tombi-array-values-order",
+    "examples",
+    "default",
+    "deprecated",
+    "$$description",  # Used by https://github.com/pypa/setuptools/config/setuptools.schema.json
+)
+JSON_TODO = (
+    "dependencies",
+    "minProperties",  # Shows up only in json object.
+)
+
+# Regex patterns taken from:
+# https://github.com/horejsek/python-fastjsonschema/blob/master/fastjsonschema/draft04.py
+EMAIL_PATTERN = r"^(?!.*\.\..*@)[^@.][^@]*(?<!\.)@[^@]+\.[^@]+\Z"
+URI_PATTERN = r"^\w+:(\/?\/?)[^\s]+\Z"
+
+
+def _json_object(key: str, value: object) -> dict[str, object]:
+    """Narrow a JSON value to a JSON object."""
+    if not isinstance(value, dict):
+        raise SchemaError(f"Not a JSON object: {value}", key)
+    return cast(dict[str, object], value)
+
+
+def _json_list(key: str, value: object) -> list[object]:
+    """Narrow a JSON value to a JSON array."""
+    if not isinstance(value, list):
+        raise SchemaError(f"Not a JSON array: {value}", key)
+    return cast(list[object], value)
+
+
+def _json_str(key: str, value: object) -> str:
+    """Narrow a JSON value to a JSON string."""
+    if not isinstance(value, str):
+        raise SchemaError(f"Not a JSON string: {value}", key)
+    return value
+
+
+def _check_string_type(key: str, json_object: dict[str, object], rule: str) -> None:
+    """Pop the type of a string rule, which can only be string."""
+    if "type" in json_object:
+        json_type = json_object.pop("type")
+        if json_type != "string":
+            raise SchemaError(f"'{rule}' of type: {json_type}", key)
+
+
+def _toml_pattern(key: str, json_object: dict[str, object]) -> str:
+    pattern = _json_str(key, json_object.pop("pattern"))
+    _check_string_type(key, json_object, "pattern")
+    if "\n" in pattern:
+        pattern = pattern.replace("\n", "\\n")
+    if "'" in pattern:
+        # repr() quotes with '"' when there is no '"' in the pattern:
+        pattern = repr(pattern)[1:-1].replace(r"\'", "'")
+        return f'''"""\n    pattern = \'\'\'{pattern}\'\'\'\n"""'''
+    return f'"""\n    pattern = {pattern!r}\n"""'
+
+
+def _toml_property_key(key: str, name: str, *, required: bool) -> str:
+    """Get the TOML key of a JSON property, which is a single key of that name."""
+    if name == "*":
+        raise SchemaError("Property name '*' is a wildcard in TOML schemas.", key)
+    if required or name == "union" or "=" in name:
+        # The name is quoted in the key options, so it is not parsed as TOML:
+        required_str = "true" if required else "false"
+        return _toml_string(f"{_toml_key(name)} = {{ required = {required_str} }}")
+    return _toml_key(name)
+
+
+def _toml_enum(key: str, json_enum: object) -> str:
+    enum_list = _json_list(key, json_enum)
+    enum_values = [value for value in enum_list if isinstance(value, str)]
+    if len(enum_values) != len(enum_list):
+        raise SchemaError(f"'enum' is not a list of strings: {enum_list}", key)
+    enum_str = "\n".join(f"    {_toml_string(value)}," for value in enum_values)
+    # The escapes of the values are escaped again in the multi-line string:
+    enum_str = enum_str.replace("\\", "\\\\")
+    return f'"""enum = [\n{enum_str}\n]"""'
+
+
+def _toml_const(key: str, const: object) -> str:
+    if not isinstance(const, str):
+        raise SchemaError(f"'const' is not a string: {const}", key)
+    if "'" in const or not const.isprintable():
+        return _toml_string(f"enum = [ {_toml_string(const)} ]")
+    return _toml_string(f"enum = [ '{const}' ]")
+
+
+class JSONSchemaConverter:
+    """Convert a JSON schema to the text of a TOML schema.
+
+    The issues found in the JSON schema are counted, and their messages are
+    collected in messages, up to the verbose level: 1 for rules which are not
+    handled in the TOML schema, 2 for warnings, 3 for information and 4 for
+    debugging. Unsupported rules raise SchemaError, with the TOML key as context.
+
+    References to other JSON schemas under uri_base become references to their
+    TOML schema files, which are listed in file_list. Subclasses can fix the
+    unusual rules of specific JSON schemas with the handle methods.
+    """
+
+    def __init__(
+        self, json_filename: str = "", *, uri_base: Optional[str], verbose: int = 1
+    ) -> None:
+        self.filename = json_filename
+        self.uri_base = uri_base
+        self.verbose = verbose
+        self.issues = {"info": 0, "warning": 0, "todo": 0}
+        self.messages: list[str] = []
+        self.formats: dict[str, str] = {}
+        # The JSON schema files referenced by this file:
+        self.file_list: list[str] = []
+        self.toml_file: Optional[io.StringIO] = None
+
+    def to_toml(self, json_object: dict[str, object]) -> str:
+        """Convert a JSON schema to the text of a TOML schema.
+
+        The keys of json_object are popped as they are converted.
+        """
+        self.toml_file = io.StringIO()
+        try:
+            json_type = self.get_toml_element("", json_object, inline=False)
+            if json_object != {}:
+                raise SchemaError(f"Extra keys: {json_object}", "")
+            if json_type is not None:
+                raise SchemaError(f"JSON schema is not an object: {json_type}", "")
+
+            if len(self.formats) > 0:
+                self.toml_file.write('\n["format = { hidden = true }"]\n')
+                for key, format_value in self.formats.items():
+                    self.toml_file.write(f"\n{key} = {format_value}\n")
+            return self.toml_file.getvalue()
+        finally:
+            # The buffer is dropped, so that the converter can be pickled:
+            self.toml_file = None
+
+    def debug(self, text: str) -> None:
+        """Details of the conversion."""
+        if self.verbose >= 4:
+            self.messages.append(f"DEBUG: {self.filename}: {text}")
+
+    def info(self, text: str) -> None:
+        """Issues in the JSON schema that are safe to ignore."""
+        self.issues["info"] += 1
+        if self.verbose >= 3:
+            self.messages.append(f"INFO: {self.filename}: {text}")
+
+    def warning(self, text: str) -> None:
+        """Issues in the JSON schema that might make it behave not as intended."""
+        self.issues["warning"] += 1
+        if self.verbose >= 2:
+            self.messages.append(f"WARNING: {self.filename}: {text}")
+
+    def todo(self, text: str) -> None:
+        """JSON schema rules that are suspicious or not handled in the TOML schema."""
+        self.issues["todo"] += 1
+        if self.verbose >= 1:
+            self.messages.append(f"TODO: {self.filename}: {text}")
+
+    # Handlers of the unusual rules of specific JSON schemas, for subclasses:
+
+    def handle_element(self, key: str, json_object: dict[str, object]) -> None:
+        """Fix the rules of an element, before it is converted."""
+
+    def handle_properties(self, key: str, json_properties: dict[str, object]) -> None:
+        """Fix the properties of a table, before they are converted."""
+
+    def handle_defs(self, key: str, json_defs: Optional[dict[str, object]]) -> None:
+        """Fix the definitions of a table, before they are converted."""
+
+    def handle_missing_type(self, key: str) -> Optional[str]:  # noqa: ARG002
+        """Get the TOML type of an element without a type, or None to skip it."""
+        return None
+
+    def get_toml_element(  # noqa: C901, PLR0911
+        self, key: str, json_object: dict[str, object], *, inline: bool
+    ) -> Optional[str]:
+        """Get the TOML type of a JSON element.
+
+        None is returned for a table which is written as a section of the TOML
+        schema, and for an element without a type.
+        """
+        self.debug(f"get {key}")
+        for ignore in JSON_IGNORE:
+            if ignore in json_object:
+                json_object.pop(ignore)
+        for ignore in JSON_TODO:
+            if ignore in json_object:
+                value = json_object.pop(ignore)
+                self.todo(f"{key}: Ignoring key: {ignore}, value: {value}")
+
+        self.handle_element(key, json_object)
+
+        if "enum" in json_object:
+            _check_string_type(key, json_object, "enum")
+            return _toml_enum(key, json_object.pop("enum"))
+
+        if "const" in json_object:
+            toml_const = _toml_const(key, json_object.pop("const"))
+            _check_string_type(key, json_object, "const")
+            return toml_const
+
+        if "pattern" in json_object:
+            return _toml_pattern(key, json_object)
+
+        toml_union = self.get_toml_union(key, json_object)
+        if toml_union is not None:
+            return toml_union
+
+        if "type" in json_object:
+            return self.get_toml_type(key, json_object, inline=inline)
+
+        if "$ref" in json_object:
+            return self.get_toml_ref(key, json_object)
+
+        self.todo(f"{key}: Missing type in: {json_object}")
+        return self.handle_missing_type(key)
+
+    def get_toml_type(
+        self, key: str, json_object: dict[str, object], *, inline: bool
+    ) -> Optional[str]:
+        json_type = json_object.pop("type")
+        if "$ref" in json_object:
+            ref = json_object.pop("$ref")
+            self.todo(f"{key}: Redundant $ref ignored: {ref}")
+        if isinstance(json_type, list):
+            if "null" in json_type:
+                del json_type[json_type.index("null")]
+            if len(json_type) > 1:
+                union_str = ", ".join(f'"{typ}"' for typ in json_type)
+                return f"{{ union = [ {union_str} ] }}"
+            if len(json_type) < 1:
+                raise SchemaError(f"JSON type array is empty: {json_type}", key)
+            json_type = json_type[0]
+
+        if json_type == "object":
+            return self.get_toml_table(key, json_object, inline=inline)
+        if json_type == "array":
+            return self.get_toml_array(key, json_object)
+
+        if json_type == "number":
+            json_type = "float"
+
+        return self.get_toml_type_options(key, _json_str(key, json_type), json_object)
+
+    def get_toml_type_options(  # noqa: C901, PLR0912
+        self, key: str, json_type: str, json_object: dict[str, object]
+    ) -> str:
+        options = []
+        if "minLength" in json_object:
+            min_len = json_object.pop("minLength")
+            options.append(f"min-len = {min_len}")
+        if "maxLength" in json_object:
+            max_len = json_object.pop("maxLength")
+            options.append(f"max-len = {max_len}")
+        minimum: Optional[float] = None
+        maximum: Optional[float] = None
+        if "minimum" in json_object:
+            json_minimum = json_object.pop("minimum")
+            if not isinstance(json_minimum, (int, float)):
+                raise SchemaError(
+                    f"Minimum with non-numeric value: {json_minimum}", key
+                )
+            minimum = json_minimum
+            if json_type == "integer" and not isinstance(minimum, int):
+                self.info(f"{key}: Minimum with non-integer value: {minimum}")
+                minimum = int(minimum)
+        if "maximum" in json_object:
+            json_maximum = json_object.pop("maximum")
+            if not isinstance(json_maximum, (int, float)):
+                raise SchemaError(
+                    f"Maximum with non-numeric value: {json_maximum}", key
+                )
+            maximum = json_maximum
+            if json_type == "integer" and not isinstance(maximum, int):
+                self.info(f"{key}: Maximum with non-integer value: {maximum}")
+                maximum = int(maximum)
+        if "format" in json_object:
+            json_format = _json_str(key, json_object.pop("format"))
+            if json_format == "email":
+                self.formats["email"] = f'''"pattern = {EMAIL_PATTERN!r}"'''
+                return '''"ref = 'format.email'"'''
+            if json_format == "uri":
+                self.formats["uri"] = f'''"pattern = {URI_PATTERN!r}"'''
+                return '''"ref = 'format.uri'"'''
+            # The format value is not part of the json schema specification.
+            if json_type == "string":
+                self.info(f"{key}: Adding generic string format rule: {json_format}")
+                self.formats[json_format] = '''"pattern = '^.*$'"'''
+                return f'''"ref = 'format.{json_format}'"'''
+            if json_format == "uint8":
+                minimum = 0 if minimum is None else max(minimum, 0)
+                maximum = 0xFF if maximum is None else min(maximum, 0xFF)
+            elif json_format == "uint16":
+                minimum = 0 if minimum is None else max(minimum, 0)
+                maximum = 0xFFFF if maximum is None else min(maximum, 0xFFFF)
+            elif json_format == "uint":
+                minimum = 0 if minimum is None else max(minimum, 0)
+            else:
+                self.todo(f"{key}: Ignoring format: {json_format}")
+
+        if minimum is not None:
+            options.append(f"min = {minimum}")
+        if maximum is not None:
+            options.append(f"max = {maximum}")
+        if len(options) > 0:
+            options_str = ", ".join(options)
+            return f'"{json_type} = {{ {options_str} }}"'
+        return f'"{json_type}"'
+
+    def get_toml_ref(self, key: str, json_object: dict[str, object]) -> str:
+        json_ref_value = json_object.pop("$ref")
+        if isinstance(json_ref_value, list):  # Special case for converted injected ref.
+            return _json_str(key, cast(list[object], json_ref_value)[0])
+        ref = _json_str(key, json_ref_value)
+        if ref.startswith("#/"):
+            keys = ref.split("/")[1:]
+            if keys[0] in ("definitions", "$defs"):
+                keys = [key for key in keys[1:] if key != "properties"]
+                toml_key = ".".join(keys)
+                return f'''"ref = 'defs.{toml_key}'"'''
+            if keys[0] == "properties":
+                keys = [key for key in keys if key != "properties"]
+                toml_key = ".".join(keys)
+                return f'''"ref = '{toml_key}'"'''
+        if self.uri_base is not None and ref.startswith(self.uri_base):
+            json_ref = ref[len(self.uri_base) + 1 :]
+            self.file_list.append(json_ref)
+            self.debug(f"{key}: Queued file for loading: {json_ref}")
+            toml_ref = pathlib.Path(json_ref).with_suffix(".schema.toml")
+            return f'''"file = '{toml_ref}'"'''
+        raise SchemaError(f"Unsupported reference: {ref}", key)
+
+    def get_toml_table(  # noqa: C901, PLR0912, PLR0915
+        self, key: str, json_table_object: dict[str, object], *, inline: bool
+    ) -> Optional[str]:
+        required_list = [
+            _json_str(key, name)
+            for name in _json_list(key, json_table_object.pop("required", []))
+        ]
+
+        properties: Optional[dict[str, object]] = None
+        pattern_properties: Optional[dict[str, object]] = None
+        if "patternProperties" in json_table_object:
+            pattern_properties = _json_object(
+                key, json_table_object.pop("patternProperties")
+            )
+        if "properties" in json_table_object:
+            properties = _json_object(key, json_table_object.pop("properties"))
+        if "additionalProperties" in json_table_object:
+            ap = json_table_object.pop("additionalProperties")
+            if ap is not False:
+                if pattern_properties is None:
+                    pattern_properties = {}
+                if ap is True:
+                    pattern_properties['"*"'] = {"type": "any-value"}
+                else:
+                    pattern_properties['"*"'] = ap
+        else:
+            if pattern_properties is None:
+                pattern_properties = {}
+            self.warning(f"{key}: No additionalProperties. Defaults to true.")
+            pattern_properties['"*"'] = {"type": "any-value"}
+
+        if "propertyNames" in json_table_object:
+            prop_names = _json_object(key, json_table_object.pop("propertyNames"))
+            if (
+                properties is not None
+                or pattern_properties is None
+                or len(pattern_properties) != 1
+            ):
+                raise SchemaError(
+                    "'propertyNames' with more than one property rule.", key
+                )
+            old_key = next(iter(pattern_properties))
+            json_value = pattern_properties[old_key]
+            if old_key not in ('"*"', ".+", "^.*$"):
+                prop_names = {
+                    "allOf": [
+                        {"pattern": old_key},
+                        prop_names,
+                    ]
+                }
+            if "$ref" in prop_names or "format" in prop_names:
+                # "$ref" can be used directly:
+                toml_key = self.get_toml_element(key, prop_names, inline=True)
+                pattern_properties = {cast(str, toml_key): json_value}
+            else:
+                # Create a "defs.key-def" and reference it in the key:
+                if '"defs = { hidden = true }"' in key:
+                    key_def = "key-def"
+                    base_key = key.replace('"defs = { hidden = true }"', "defs")
+                else:
+                    key_def = '"key-def = { hidden = true }"'
+                    base_key = key
+                pattern_properties = {
+                    key_def: prop_names,
+                    # Mark injected TOML ref by using a list:
+                    f'''"ref = '{base_key}.key-def'"''': json_value,
+                }
+        elif pattern_properties is not None:
+            pattern_properties = {
+                pat_key if pat_key == '"*"' else f'"pattern = {pat_key!r}"': value
+                for pat_key, value in pattern_properties.items()
+            }
+
+        json_defs: Optional[dict[str, object]] = None
+        if "definitions" in json_table_object:
+            json_defs = _json_object(key, json_table_object.pop("definitions"))
+        if "$defs" in json_table_object:
+            if json_defs is not None:
+                raise SchemaError("'definitions' and '$defs' both defined.", key)
+            json_defs = _json_object(key, json_table_object.pop("$defs"))
+
+        self.handle_defs(key, json_defs)
+
+        if json_table_object != {}:
+            raise SchemaError(f"Extra values: {json_table_object}", key)
+
+        return self.get_toml_table_from_properties(
+            key,
+            properties,
+            pattern_properties,
+            json_defs,
+            inline=inline,
+            required_list=required_list,
+        )
+
+    def get_toml_table_from_properties(  # noqa: C901, PLR0912, PLR0913
+        self,
+        key: str,
+        json_properties: Optional[dict[str, object]],
+        json_pattern_properties: Optional[dict[str, object]],
+        json_defs: Optional[dict[str, object]],
+        *,
+        inline: bool,
+        required_list: list[str],
+    ) -> Optional[str]:
+        inline_types = {}
+        if not inline and key != "":
+            cast(io.StringIO, self.toml_file).write(f"\n[{key}]\n")
+
+        if json_properties is not None:
+            self.handle_properties(key, json_properties)
+
+        def is_table(json_value: object) -> bool:
+            if isinstance(json_value, dict) and "type" in json_value:
+                json_type = cast(dict[str, object], json_value)["type"]
+                if json_type == "object":
+                    return True
+                if isinstance(json_type, list) and "object" in json_type:
+                    return True
+            return False
+
+        def property_key(name: str) -> str:
+            required = name in required_list
+            if required:
+                required_list.remove(name)
+            return _toml_property_key(key, name, required=required)
+
+        def process_sub_key(sub_key_str: str, json_value: object) -> None:
+            full_key = sub_key_str if key == "" else f"{key}.{sub_key_str}"
+            json_object = _json_object(full_key, json_value)
+            json_type = self.get_toml_element(full_key, json_object, inline=inline)
+            if json_type is not None:
+                if inline:
+                    inline_types[sub_key_str] = json_type
+                else:
+                    cast(io.StringIO, self.toml_file).write(
+                        f"{sub_key_str} = {json_type}\n"
+                    )
+            if json_object != {}:
+                raise SchemaError(f"Extra keys: {json_object}", full_key)
+
+        if json_properties is None and json_pattern_properties is None:
+            self.todo(f"{key}: Empty table.")
+            return None
+
+        # Tables are converted after the other keys, since they start a section:
+        # The property names are quoted, the pattern keys are already TOML keys:
+        for tables in (False, True):
+            if json_properties is not None:
+                for name, json_value in json_properties.items():
+                    if is_table(json_value) == tables:
+                        process_sub_key(property_key(name), json_value)
+            if json_pattern_properties is not None:
+                for sub_key, json_value in json_pattern_properties.items():
+                    if is_table(json_value) == tables:
+                        process_sub_key(sub_key, json_value)
+
+        if json_defs is not None:
+            self.get_toml_table_from_properties(
+                '"defs = { hidden = true }"',
+                json_properties=json_defs,
+                json_pattern_properties=None,
+                json_defs=None,
+                inline=False,
+                required_list=[],
+            )
+
+        if len(required_list) != 0:
+            raise SchemaError(f"Extra required: {required_list}", key)
+        if inline:
+            inline_str = ", ".join(
+                f"{key} = {value}" for key, value in inline_types.items()
+            )
+            return f"{{ {inline_str} }}"
+        return None
+
+    def get_toml_array(self, key: str, json_object: dict[str, object]) -> str:
+        if "items" in json_object:
+            json_items = json_object.pop("items")
+        else:
+            self.warning(f"{key}: Array without items")
+            json_items = {"type": "any-value"}
+        if isinstance(json_items, list):
+            raise SchemaError(f"No support for 'items' list: {json_items}", key)
+        json_items = _json_object(f"{key}[0]", json_items)
+        toml_type = self.get_toml_element(f"{key}[0]", json_items, inline=True)
+
+        options = []
+        if "minItems" in json_object:
+            min_items = json_object.pop("minItems")
+            options.append(f'"min-items = {min_items}"')
+        if "maxItems" in json_object:
+            max_items = json_object.pop("maxItems")
+            options.append(f'"max-items = {max_items}"')
+        if "uniqueItems" in json_object:
+            unique_items = json_object.pop("uniqueItems")
+            options.append(f'"unique-items = {str(unique_items).lower()}"')
+        if "additionalItems" in json_object:
+            add_items = json_object.pop("additionalItems")
+            if add_items is not False:
+                raise SchemaError(f"Unsupported additionalItems = {add_items}", key)
+        if json_object != {}:
+            raise SchemaError(f"Extra keys: {json_object}", key)
+        if len(options) > 0:
+            return f"[ {toml_type}, {', '.join(options)} ]"
+        return f"[ {toml_type} ]"
+
+    def _one_of_mode(self, key: str, union_list: list[object]) -> str:
+        """Get the union mode of oneOf, which is any if the options cannot overlap."""
+        union_objects = [_json_object(key, element) for element in union_list]
+        if not all("type" in element for element in union_objects):
+            self.info(f"{key}: Check if oneOf could be replaced with anyOf.")
+            return "one"
+        union_types = [element["type"] for element in union_objects]
+        # The types are compared as text, since a type can be a list of types:
+        type_names = {str(union_type) for union_type in union_types}
+        if len(union_types) == len(type_names):
+            # All types are different:
+            self.info(f"{key}: oneOf is treated as anyOf: {union_types}")
+            return "any"
+        if type_names == {"string"} and all(
+            "enum" in element for element in union_objects
+        ):
+            union_enums = [
+                str(enum_value)
+                for element in union_objects
+                for enum_value in _json_list(key, element["enum"])
+            ]
+            if len(union_enums) == len(set(union_enums)):
+                # All types are enum strings with different values:
+                self.debug(f"{key}: oneOf is treated as anyOf: {union_enums}")
+                return "any"
+        self.info(f"{key}: Check if oneOf could be replaced with anyOf.")
+        return "one"
+
+    def get_toml_union(  # noqa: C901, PLR0912
+        self, key: str, json_object: dict[str, object]
+    ) -> Optional[str]:
+        if "anyOf" in json_object:
+            union_list = _json_list(key, json_object.pop("anyOf"))
+            union_mode = "any"
+        elif "oneOf" in json_object:
+            # anyOf and oneOf are almost identical when used as unions.
+            union_list = _json_list(key, json_object.pop("oneOf"))
+            union_mode = self._one_of_mode(key, union_list)
+        elif "allOf" in json_object:
+            union_list = _json_list(key, json_object.pop("allOf"))
+            union_mode = "all"
+        elif "not" in json_object:
+            union_list = [json_object.pop("not")]
+            union_mode = "none"
+        else:
+            return None
+
+        if "type" in json_object:
+            json_type = json_object.pop("type")
+            self.warning(f"{key}: Redundant type in anyOf ignored: {json_type}")
+        if "required" in json_object:
+            required = json_object.pop("required")
+            raise SchemaError(f"'required' in union not supported: {required}", key)
+        union_types: list[Optional[str]] = []
+        if union_mode == "none":
+            json_not = _json_object(key, union_list[0])
+            typ = self.get_toml_element(key, json_not, inline=True)
+            union_types.append(typ)
+        else:
+            has_null = False
+            for i, json_value in enumerate(union_list):
+                json_item = _json_object(f"{key}[{i}]", json_value)
+                typ = self.get_toml_element(f"{key}[{i}]", json_item, inline=True)
+                if typ == '"null"' or typ is None:
+                    has_null = True
+                else:
+                    union_types.append(typ)
+                if json_item != {}:
+                    raise SchemaError(f"Extra keys: {json_item}", f"{key}[{i}]")
+            if len(union_types) == 1:
+                # Do not show info message if has_null as these are by products of:
+                # https://github.com/GREsau/schemars/issues/344
+                if has_null:
+                    self.debug(f"{key}: Union with length 1: {union_types}")
+                else:
+                    self.info(f"{key}: Union with length 1: {union_types}")
+                return cast(str, union_types[0])
+        union_str = ",\n    ".join(cast(list[str], union_types))
+        if union_mode == "any":
+            return f"{{ union = [\n    {union_str},\n] }}"
+        return f'{{ "union = {union_mode!r}" = [\n    {union_str},\n] }}'
+
+
+def from_json_schema(
+    json_object: dict[str, object],
+    /,
+    *,
+    uri_base: Optional[str] = None,
+    toml_filename: Optional[str] = None,
+) -> Table:
+    """Create a schema table from a JSON schema.
+
+    No file is read or written. References to other JSON schemas under uri_base
+    become references to their TOML schema files, relative to toml_filename,
+    which are loaded only when they are first needed for validation.
+    Without uri_base such references are not supported.
+    json_object is left unchanged.
+    """
+    converter = JSONSchemaConverter(uri_base=uri_base, verbose=0)
+    toml_text = converter.to_toml(copy.deepcopy(json_object))
+    return loads(toml_text, toml_filename=toml_filename, lazy_files=True)
@@ -0,0 +1,392 @@
+"""toml-schema: Linter for schema performance problems."""
+# SPDX-License-Identifier: MIT
+# SPDX-FileCopyrightText: 2025 Udi Fuchs
+
+import dataclasses
+import re
+from typing import Optional, cast
+
+from ._optimize import _exact_type, _value_type
+from ._toml_schema import (
+    AnyValue,
+    Array,
+    File,
+    Pattern,
+    Ref,
+    SchemaElement,
+    SchemaKey,
+    Table,
+    Union,
+)
+
+# Characters used for checking which characters a regex atom can match:
+_ALPHABET = "".join(chr(code) for code in range(32, 127)) + "\t\n"
+
+# Strings that a pattern must match to be considered a wildcard for all keys:
+_WILDCARD_PROBES = ("", "a", "Z", "0", "-", "_", ".", " ", "key-name_1", "é")
+
+_ZERO_WIDTH_ATOMS = frozenset(("^", "$", r"\A", r"\Z", r"\b", r"\B"))
+
+# Lengths of escapes which are longer than a single character:
+_ESCAPE_LENGTHS = {"x": 3, "u": 5, "U": 9}
+
+
+@dataclasses.dataclass(frozen=True)
+class LintFinding:
+    """Potential performance problem found in a schema."""
+
+    schema_file: str
+    address: str
+    message: str
+
+    def __str__(self) -> str:
+        address = "root" if self.address == "" else f"'{self.address}'"
+        if self.schema_file != "":
+            address = f"{self.schema_file}:{address}"
+        return f"{address}: {self.message}"
+
+
+def lint(schema: Table, /, *, max_ref_depth: int = 4) -> list[LintFinding]:
+    """Find potential performance problems in a schema.
+
+    The schema is checked for:
+    - Patterns with nested quantifiers or overlapping alternatives under
+      a quantifier, which can backtrack catastrophically.
+    - Special keys which are fully shadowed by earlier wildcard keys.
+    - Union options which can never be the option that accepts a value.
+    - Chains of more than max_ref_depth references.
+
+    Schema files referenced with file are checked if they are loaded.
+    """
+    linter = _Linter(max_ref_depth)
+    linter.rebuild_addresses(schema)
+    linter.lint_node(schema)
+    return linter.findings
+
+
+class _Linter:
+    def __init__(self, max_ref_depth: int) -> None:
+        self.max_ref_depth = max_ref_depth
+        self.findings: list[LintFinding] = []
+        self.schema_file = ""
+        self.visited: set[int] = set()
+        # Rebuilt addresses of schema nodes, for schemas loaded without addresses:
+        self.addresses: dict[int, str] = {}
+
+    def report(self, schema: SchemaElement, message: str) -> None:
+        address = self.addresses.get(id(schema), schema._address)
+        self.findings.append(LintFinding(self.schema_file, address, message))
+
+    def rebuild_addresses(self, schema: SchemaElement) -> None:
+        if isinstance(schema, Table) and not schema._has_addresses:
+            self.addresses.update(schema.addresses())
+
+    def lint_node(self, schema: SchemaElement) -> None:
+        if id(schema) in self.visited:
+            return
+        self.visited.add(id(schema))
+        if isinstance(schema, Table):
+            self.lint_keys(schema)
+            for schema_value in schema.values():
+                self.lint_node(schema_value)
+        elif isinstance(schema, (Array, Union)):
+            if isinstance(schema, Union):
+                self.lint_union(schema)
+            for schema_value in schema:
+                self.lint_node(schema_value)
+        elif isinstance(schema, Pattern):
+            self.lint_pattern(schema, schema.pattern)
+        elif isinstance(schema, Ref):
+            self.lint_ref(schema)
+        elif isinstance(schema, File) and schema._ref_schema is not None:
+            parent_file = self.schema_file
+            self.schema_file = schema.file
+            self.rebuild_addresses(schema._ref_schema)
+            self.lint_node(schema._ref_schema)
+            self.schema_file = parent_file
+
+    def lint_keys(self, table: Table) -> None:
+        """Check the special keys, which are matched in the order of the table."""
+        pattern_keys: list[SchemaKey] = []
+        for schema_key in table:
+            if schema_key.pattern is None and schema_key.ref is None:
+                continue
+            shadow_key = next(
+                (key for key in pattern_keys if _shadows(key, schema_key)), None
+            )
+            if shadow_key is not None:
+                self.report(
+                    schema_key, f"Key {schema_key} is shadowed by {shadow_key}."
+                )
+            if schema_key.pattern is not None:
+                self.lint_pattern(schema_key, schema_key.pattern)
+                pattern_keys.append(schema_key)
+
+    def lint_union(self, union: Union) -> None:
+        """Check for options subsumed by earlier options of 'any' or 'one' unions.
+
+        A value accepted by such an option is accepted by the earlier option
+        first, or by both options, which fails a 'one' union.
+        """
+        if union.mode not in ("any", "one"):
+            return
+        targets = [_ref_target(option) for option in union]
+        for index, target in enumerate(targets):
+            for earlier in targets[:index]:
+                if isinstance(earlier, AnyValue) or (
+                    _exact_type(earlier) is not None
+                    and _value_type(target) is _exact_type(earlier)
+                ):
+                    self.report(
+                        union[index],
+                        f"Union option {union[index]} is unreachable after {earlier}.",
+                    )
+                    break
+
+    def lint_pattern(self, schema: SchemaElement, pattern: str) -> None:
+        nodes = _RegexScanner(pattern).scan()
+        if _has_nested_quantifiers(nodes):
+            self.report(schema, f"Pattern '{pattern}' has nested quantifiers.")
+        if _has_overlapping_repeat(nodes):
+            self.report(
+                schema,
+                f"Pattern '{pattern}' repeats alternatives which overlap.",
+            )
+
+    def lint_ref(self, ref: Ref) -> None:
+        chain = [ref]
+        target = ref._ref_schema
+        while isinstance(target, Ref):
+            if any(target is other for other in chain):
+                # Cycles are reported only by the references in them:
+                if target is ref:
+                    refs = " -> ".join(other.ref for other in chain)
+                    self.report(ref, f"Reference cycle: {refs}")
+                return
+            chain.append(target)
+            target = target._ref_schema
+        if len(chain) > self.max_ref_depth:
+            self.report(
+                ref,
+                f"Reference chain of {len(chain)} refs is deeper than "
+                f"{self.max_ref_depth}.",
+            )
+
+
+def _ref_target(schema: SchemaElement) -> SchemaElement:
+    """Follow a chain of references, stopping at a cycle."""
+    chain = [schema]
+    while isinstance(schema, Ref) and schema._ref_schema is not None:
+        schema = schema._ref_schema
+        if any(schema is other for other in chain):
+            break
+        chain.append(schema)
+    return schema
+
+
+def _shadows(pattern_key: SchemaKey, schema_key: SchemaKey) -> bool:
+    """Check if a pattern key matches all the keys matched by a later special key.
+
+    This is only decided for wildcard pattern keys, and for later pattern keys
+    which match a single literal key.
+    """
+    regex = cast(re.Pattern[str], pattern_key._regex)
+    if all(regex.match(probe) is not None for probe in _WILDCARD_PROBES):
+        return True
+    literal = re.fullmatch(r"\^([\w-]*)\$", schema_key.pattern or "")
+    return literal is not None and regex.match(literal.group(1)) is not None
+
+
+@dataclasses.dataclass
+class _Node:
+    """Atom or group of a regular expression, with its quantifier."""
+
+    # Regex of a single character atom, or "" for a group:
+    text: str
+    # Alternatives of a group, each a sequence of nodes:
+    branches: list[list["_Node"]] = dataclasses.field(default_factory=list)
+    min_count: int = 1
+    max_count: Optional[int] = 1
+    zero_width: bool = False
+    # Atomic groups and possessive quantifiers never backtrack:
+    atomic: bool = False
+
+    @property
+    def repeated(self) -> bool:
+        """True if the node has an unbounded quantifier which can backtrack."""
+        return self.max_count is None and not self.atomic
+
+    def chars(self) -> frozenset[str]:
+        """Characters of the alphabet that the node can start with."""
+        if len(self.branches) > 0 or self.text == "":
+            return frozenset().union(*(_first_chars(b) for b in self.branches))
+        try:
+            regex = re.compile(self.text)
+        except re.error:  # Backreference.
+            return frozenset(_ALPHABET)
+        return frozenset(char for char in _ALPHABET if regex.fullmatch(char))
+
+    def nullable(self) -> bool:
+        """True if the node can match the empty string."""
+        return (
+            self.min_count == 0
+            or self.zero_width
+            or any(all(node.nullable() for node in b) for b in self.branches)
+        )
+
+
+def _first_chars(branch: list[_Node]) -> frozenset[str]:
+    chars: frozenset[str] = frozenset()
+    for node in branch:
+        chars |= node.chars()
+        if not node.nullable():
+            break
+    return chars
+
+
+def _has_nested_quantifiers(branches: list[list[_Node]]) -> bool:
+    """Check for a repeated group with an undelimited unbounded quantifier inside.
+
+    Repeating a(b+) is safe, since each repetition must start with 'a',
+    which 'b+' cannot match. Repeating (b+c?) is ambiguous.
+    """
+    for branch in branches:
+        for node in branch:
+            if node.repeated and any(_is_ambiguous(b) for b in node.branches):
+                return True
+            if not node.atomic and _has_nested_quantifiers(node.branches):
+                return True
+    return False
+
+
+def _is_ambiguous(branch: list[_Node]) -> bool:
+    repeated_chars = _repeated_chars(branch)
+    return repeated_chars is not None and not any(
+        not node.nullable() and not (_all_chars(node) & repeated_chars)
+        for node in branch
+    )
+
+
+def _repeated_chars(branch: list[_Node]) -> Optional[frozenset[str]]:
+    """Characters matched by unbounded quantifiers in branch, None if there are none."""
+    repeated_chars: Optional[frozenset[str]] = None
+    for node in branch:
+        if node.repeated:
+            repeated_chars = (repeated_chars or frozenset()) | _all_chars(node)
+        elif not node.atomic:
+            for node_branch in node.branches:
+                chars = _repeated_chars(node_branch)
+                if chars is not None:
+                    repeated_chars = (repeated_chars or frozenset()) | chars
+    return repeated_chars
+
+
+def _all_chars(node: _Node) -> frozenset[str]:
+    if len(node.branches) == 0:
+        return node.chars()
+    return frozenset().union(
+        *(_all_chars(child) for branch in node.branches for child in branch)
+    )
+
+
+def _has_overlapping_repeat(branches: list[list[_Node]]) -> bool:
+    """Check for a repeated group whose alternatives can start the same way."""
+    for branch in branches:
+        for node in branch:
+            if node.repeated and len(node.branches) > 1:
+                first_chars = [_first_chars(b) for b in node.branches]
+                if any(
+                    chars & other
+                    for index, chars in enumerate(first_chars)
+                    for other in first_chars[:index]
+                ):
+                    return True
+            if _has_overlapping_repeat(node.branches):
+                return True
+    return False
+
+
+class _RegexScanner:
+    """Scanner of a valid regular expression into groups and atoms."""
+
+    def __init__(self, pattern: str) -> None:
+        self.pattern = pattern
+        self.pos = 0
+
+    def scan(self) -> list[list[_Node]]:
+        branches: list[list[_Node]] = [[]]
+        while self.pos < len(self.pattern):
+            char = self.pattern[self.pos]
+            if char == ")":
+                break
+            self.pos += 1
+            if char == "|":
+                branches.append([])
+            elif not (
+                char in "*+?{"
+                and len(branches[-1]) > 0
+                and self.quantify(branches[-1][-1], char)
+            ):
+                branches[-1].append(self.atom(char))
+        return branches
+
+    def quantify(self, node: _Node, char: str) -> bool:
+        """Set the quantifier of node, or return False if char is a literal."""
+        if char == "{":
+            count = re.compile(r"(\d*)(,?)(\d*)\}").match(self.pattern, self.pos)
+            if count is None or count.group(0) == "}":
+                return False
+            self.pos = count.end()
+            min_str, comma, max_str = cast(tuple[str, str, str], count.groups())
+            node.min_count = int(min_str or "0")
+            node.max_count = (
+                int(max_str) if max_str != "" else None if comma else node.min_count
+            )
+        else:
+            node.min_count = 0 if char in "*?" else 1
+            node.max_count = 1 if char == "?" else None
+        suffix = self.pattern[self.pos : self.pos + 1]
+        if suffix in ("?", "+"):
+            self.pos += 1
+            node.atomic = node.atomic or suffix == "+"
+        return True
+
+    def atom(self, char: str) -> _Node:
+        start = self.pos - 1
+        if char == "(":
+            return self.group()
+        if char == "[":
+            if self.pattern.startswith("^", self.pos):
+                self.pos += 1
+            if self.pattern.startswith("]", self.pos):
+                self.pos += 1
+            while self.pattern[self.pos] != "]":
+                self.pos += 2 if self.pattern[self.pos] == "\\" else 1
+            self.pos += 1
+        elif char == "\\":
+            escape = self.pattern[self.pos]
+            if escape == "N":
+                self.pos = self.pattern.index("}", self.pos) + 1
+            else:
+                self.pos += _ESCAPE_LENGTHS.get(escape, 1)
+        text = self.pattern[start : self.pos]
+        return _Node(text, zero_width=text in _ZERO_WIDTH_ATOMS)
+
+    def group(self) -> _Node:
+        node = _Node("")
+        if self.pattern.startswith("?", self.pos):
+            extension = re.compile(
+                r"\?(?:P<\w+>|<\w+>|<?[=!]|>|[aiLmsux-]*[:)]|P=\w+\)|#[^)]*\))"
+            ).match(self.pattern, self.pos)
+            prefix = "" if extension is None else extension.group(0)
+            self.pos += len(prefix)
+            if prefix.endswith(")"):  # Flags, comment or backreference.
+                backreference = prefix.startswith("?P=")
+                return _Node(
+                    f"({prefix}" if backreference else "", zero_width=not backreference
+                )
+            node.zero_width = prefix.startswith(("?=", "?!", "?<=", "?<!"))
+            node.atomic = prefix == "?>"
+        node.branches = self.scan()
+        self.pos += 1
+        return node
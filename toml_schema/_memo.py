@@ -0,0 +1,190 @@
+"""toml-schema: Memoized validation of repeated subtrees."""
+# SPDX-License-Identifier: MIT
+# SPDX-FileCopyrightText: 2025 Udi Fuchs
+
+import datetime
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Optional, cast
+
+from ._toml_schema import (
+    AnyValue,
+    Boolean,
+    Budget,
+    Date,
+    File,
+    Float,
+    Integer,
+    LocalDateTime,
+    OffsetDateTime,
+    Ref,
+    SchemaElement,
+    SchemaError,
+    String,
+    Time,
+    TOMLValue,
+)
+from ._walk import _PLAIN_TYPES, Walker
+
+if TYPE_CHECKING:
+    from ._adapter import ValueAdapter
+
+# The validate methods whose results are not cached: references, which only
+# forward to their target, and type checks, which are faster than a lookup:
+_UNCACHED_VALIDATE = frozenset(
+    cls.validate
+    for cls in (
+        Ref,
+        File,
+        AnyValue,
+        String,
+        Integer,
+        Float,
+        Boolean,
+        OffsetDateTime,
+        LocalDateTime,
+        Date,
+        Time,
+    )
+)
+
+# Scalars of these types are their own keys, since they are never equal to
+# a value of another type. Numbers are keyed with their type, since 1 == True:
+_SELF_KEY_TYPES = frozenset((str, datetime.datetime, datetime.date, datetime.time))
+
+# The cached result of a schema node: the node itself, which is compared since
+# node ids can be reused, and the message and relative context of its error:
+_Result = tuple[SchemaElement, Optional[tuple[str, str]]]
+
+
+class ValidationMemo(Walker):
+    """Validate with a cache of the results of repeated subtrees.
+
+    Results are keyed on the schema node and the structure of the value,
+    including the types of its scalars. A value which was already validated
+    with the same schema node is not validated again. A cached error is raised
+    again with the context of the new value. The results of the plain type
+    checks are not cached, since they are faster than a lookup.
+
+    The cache is cleared for each validation, unless keep is True. At most
+    max_size results and max_size value structures are kept, and the least
+    recently used ones are evicted first.
+    """
+
+    def __init__(self, *, keep: bool = False, max_size: int = 100_000) -> None:
+        super().__init__()
+        self.keep = keep
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._results: OrderedDict[tuple[int, object], _Result] = OrderedDict()
+        # Interned structures of tables and arrays, so that the structure of
+        # a value is hashed from the ids of its elements and not all its subtree:
+        self._structures: OrderedDict[object, int] = OrderedDict()
+        self._next_structure_id = 0
+        # The keys of the tables and arrays of the current document, by value id:
+        self._value_keys: dict[int, Optional[object]] = {}
+
+    def __len__(self) -> int:
+        """Get the number of cached results."""
+        return len(self._results)
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of the visited nodes which were found in the cache."""
+        visits = self.hits + self.misses
+        return 0.0 if visits == 0 else self.hits / visits
+
+    def clear(self) -> None:
+        """Clear the cache, but not the hit and miss counters."""
+        self._results.clear()
+        self._structures.clear()
+
+    def validate(
+        self,
+        schema: SchemaElement,
+        value: TOMLValue,
+        /,
+        *,
+        context: str = "",
+        adapter: Optional["ValueAdapter"] = None,
+        budget: Optional[Budget] = None,
+    ) -> None:
+        """Validate value with schema, using the results cached for its subtrees."""
+        if not self.keep:
+            self.clear()
+        try:
+            super().validate(
+                schema, value, context=context, adapter=adapter, budget=budget
+            )
+        finally:
+            self._value_keys.clear()
+
+    def visit(self, schema: SchemaElement, value: TOMLValue, context: str) -> None:
+        """Validate value with a single schema node, unless its result is cached."""
+        if type(schema).validate in _UNCACHED_VALIDATE:
+            super().visit(schema, value, context)
+            return
+        value_key = self._value_key(value)
+        if value_key is None:  # Adapted values are not cached.
+            super().visit(schema, value, context)
+            return
+        key = (id(schema), value_key)
+        result = self._results.get(key)
+        if result is not None and result[0] is schema:
+            self.hits += 1
+            self._results.move_to_end(key)
+            if result[1] is not None:
+                message, relative_context = result[1]
+                error_context = context + relative_context
+                raise SchemaError(message, error_context.lstrip("."))
+            return
+        self.misses += 1
+        try:
+            super().visit(schema, value, context)
+        except SchemaError as ex:
+            relative_context = ex.context[len(context) :]
+            if context == "" and relative_context[:1] not in ("", "["):
+                relative_context = f".{relative_context}"
+            self._store(key, (schema, (ex.message, relative_context)))
+            raise
+        self._store(key, (schema, None))
+
+    def _store(self, key: tuple[int, object], result: _Result) -> None:
+        self._results[key] = result
+        if len(self._results) > self.max_size:
+            self._results.popitem(last=False)
+
+    def _value_key(self, value: TOMLValue) -> Optional[object]:
+        """Get the key of the structure of a value, or None if it is not plain."""
+        value_type = type(value)
+        if value_type in _SELF_KEY_TYPES:
+            return value
+        if value_type is not dict and value_type is not list:
+            return (value_type, value) if value_type in _PLAIN_TYPES else None
+        value_id = id(value)
+        if value_id in self._value_keys:
+            return self._value_keys[value_id]
+        structure: object
+        if value_type is dict:
+            table = cast(dict[str, TOMLValue], value)
+            element_keys = tuple(map(self._value_key, table.values()))
+            structure = (dict, tuple(table), element_keys)
+        else:
+            element_keys = tuple(map(self._value_key, cast(list[TOMLValue], value)))
+            structure = (list, element_keys)
+        value_key = None if None in element_keys else self._intern(structure)
+        self._value_keys[value_id] = value_key
+        return value_key
+
+    def _intern(self, structure: object) -> int:
+        structure_id = self._structures.get(structure)
+        if structure_id is not None:
+            self._structures.move_to_end(structure)
+            return structure_id
+        # Ids are never reused, so the results of an evicted structure are not hit:
+        structure_id = self._next_structure_id
+        self._next_structure_id += 1
+        self._structures[structure] = structure_id
+        if len(self._structures) > self.max_size:
+            self._structures.popitem(last=False)
+        return structure_id
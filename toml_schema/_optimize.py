@@ -0,0 +1,344 @@
+"""toml-schema: Optimizer of compiled schemas."""
+# SPDX-License-Identifier: MIT
+# SPDX-FileCopyrightText: 2025 Udi Fuchs
+
+import dataclasses
+import datetime
+from collections.abc import Hashable, Sequence
+from typing import Optional, cast
+
+from ._toml_schema import (
+    AnyValue,
+    Array,
+    Boolean,
+    Date,
+    Enum,
+    File,
+    Float,
+    Integer,
+    Pattern,
+    Ref,
+    SchemaElement,
+    SchemaError,
+    SchemaKey,
+    String,
+    Table,
+    Time,
+    TOMLValue,
+    Union,
+)
+
+# Refs are only inlined if their validate method was not customized:
+_REF_VALIDATE = Ref.validate
+
+# Types without options, which only check the exact type of the value:
+_EXACT_TYPES: tuple[tuple[SchemaElement, type], ...] = (
+    (String(), str),
+    (Integer(), int),
+    (Float(), float),
+    (Boolean(), bool),
+    (Date(), datetime.date),
+    (Time(), datetime.time),
+)
+
+# Types which accept only values of a single type, possibly with more checks:
+_VALUE_TYPES: tuple[tuple[type, type], ...] = (
+    (String, str),
+    (Enum, str),
+    (Pattern, str),
+    (Integer, int),
+    (Float, float),
+)
+
+
+def _exact_type(schema: SchemaElement) -> Optional[type]:
+    for exact_schema, value_type in _EXACT_TYPES:
+        if schema == exact_schema:
+            return value_type
+    return None
+
+
+def _value_type(schema: SchemaElement) -> Optional[type]:
+    for schema_type, value_type in _VALUE_TYPES:
+        if type(schema) is schema_type:
+            return value_type
+    return _exact_type(schema)
+
+
+class TypeSet(Union):
+    """Union of types without options, validated by the type of the value."""
+
+    __slots__ = ("types",)
+
+    def __init__(
+        self, schema_list: Sequence[SchemaElement], /, *, _address: str = ""
+    ) -> None:
+        super().__init__("any", schema_list, _address=_address)
+        self.types = frozenset(
+            cast(type, _exact_type(schema_option)) for schema_option in self
+        )
+
+    def validate(self, value: TOMLValue, /, *, context: str) -> None:
+        """Validate the type of value."""
+        if type(value) not in self.types:
+            self._check_valid_count(value, 0, context)
+
+
+def count_nodes(schema: SchemaElement) -> int:
+    """Count the distinct schema nodes, following references."""
+    counted: set[int] = set()
+    pending = [schema]
+    while len(pending) > 0:
+        node = pending.pop()
+        if id(node) in counted:
+            continue
+        counted.add(id(node))
+        if isinstance(node, Table):
+            pending.extend(node.values())
+        elif isinstance(node, (Array, Union)):
+            pending.extend(node)
+        elif isinstance(node, (Ref, File)) and node._ref_schema is not None:
+            pending.append(node._ref_schema)
+    return len(counted)
+
+
+@dataclasses.dataclass(frozen=True)
+class OptimizeResult:
+    """Optimized schema, with the node counts before and after optimizing."""
+
+    schema: Table
+    nodes_before: int
+    nodes_after: int
+
+
+def optimize(schema: Table, /, *, inline_refs: bool = True) -> OptimizeResult:
+    """Optimize a schema, without changing the values it accepts.
+
+    The optimized schema:
+    - Flattens nested 'any' unions.
+    - Merges the types without options of 'any' unions into a TypeSet.
+    - Drops the options of 'any' unions which are subsumed by other options,
+      or replaces the whole union if any of its options is 'any-value'.
+    - Inlines references to types which are not containers, if inline_refs.
+    - Shares one node between all the identical sub-schemas.
+
+    The original schema is not modified. Error messages of the optimized
+    schema might differ, and its nodes keep the address of their first copy.
+    """
+    optimizer = _Optimizer(inline_refs=inline_refs and Ref.validate is _REF_VALIDATE)
+    optimized = cast(Table, optimizer.rebuild(schema))
+    optimizer.link_refs()
+    return OptimizeResult(optimized, count_nodes(schema), count_nodes(optimized))
+
+
+class _Optimizer:
+    def __init__(self, *, inline_refs: bool) -> None:
+        self.inline_refs = inline_refs
+        # The rebuilt node of each original node, by id:
+        self.rebuilt: dict[int, SchemaElement] = {}
+        # The shared node of each structure, and the structure of each shared node:
+        self.shared: dict[Hashable, SchemaElement] = {}
+        self.structures: dict[int, Hashable] = {}
+        # The new references with the original nodes they refer to:
+        self.refs: list[tuple[SchemaElement, SchemaElement]] = []
+        self.originals: list[SchemaElement] = []
+
+    def rebuild(self, schema: SchemaElement) -> SchemaElement:
+        """Rebuild an optimized copy of schema."""
+        rebuilt = self.rebuilt.get(id(schema))
+        if rebuilt is None:
+            rebuilt = self._share(self._rebuild(schema))
+            self.rebuilt[id(schema)] = rebuilt
+            # Keep the original alive, so that its id is not reused:
+            self.originals.append(schema)
+        return rebuilt
+
+    def link_refs(self) -> None:
+        """Point the new references to their rebuilt targets."""
+        while len(self.refs) > 0:
+            ref, target = self.refs.pop()
+            object.__setattr__(ref, "_ref_schema", self.rebuild(target))
+
+    def _rebuild(self, schema: SchemaElement) -> SchemaElement:
+        if isinstance(schema, Table):
+            table = Table(
+                {
+                    self._rebuild_key(key): self.rebuild(value)
+                    for key, value in schema.items()
+                },
+                is_root=False,
+                _address=schema._address,
+            )
+            table.toml_filename = schema.toml_filename
+            return table
+        if isinstance(schema, Array):
+            return Array(
+                [self.rebuild(value) for value in schema], _address=schema._address
+            )
+        if isinstance(schema, Union):
+            return self._rebuild_union(schema)
+        if isinstance(schema, Ref):
+            return self._rebuild_ref(schema)
+        if isinstance(schema, File):
+            return self._rebuild_file(schema)
+        return schema
+
+    def _rebuild_key(self, key: SchemaKey) -> SchemaKey:
+        target = key._ref_schema
+        if target is None:
+            return key
+        # The hash of a reference key with a target fails:
+        new_key = dataclasses.replace(key)
+        self.structures[id(new_key)] = self._key_structure(key)
+        self.refs.append((new_key, target))
+        return new_key
+
+    def _rebuild_union(self, union: Union) -> SchemaElement:
+        if union.mode == "any":
+            return self._rebuild_any_union(union)
+        try:
+            return Union(
+                union.mode,
+                [self.rebuild(option) for option in union],
+                _address=union._address,
+            )
+        except SchemaError:  # Optimized options became duplicates.
+            return union
+
+    def _rebuild_ref(self, ref: Ref) -> SchemaElement:
+        inline_target = self._inline_target(ref)
+        if inline_target is not None:
+            return self.rebuild(inline_target)
+        target = cast(SchemaElement, ref._ref_schema)
+        new_ref = Ref(ref=ref.ref, _address=ref._address)
+        self.structures[id(new_ref)] = (Ref, ref.ref, id(target))
+        self.refs.append((new_ref, target))
+        return new_ref
+
+    def _rebuild_file(self, file: File) -> SchemaElement:
+        target = file._ref_schema
+        if target is None:  # Lazy file which is not loaded yet.
+            self.structures[id(file)] = (File, id(file))
+            return file
+        new_file = File(file=file.file, _address=file._address)
+        object.__setattr__(new_file, "_path", file._path)
+        self.structures[id(new_file)] = (File, file.file, id(target))
+        self.refs.append((new_file, target))
+        return new_file
+
+    def _inline_target(self, ref: Ref) -> Optional[SchemaElement]:
+        """Get the target of a reference to a type which is not a container."""
+        if not self.inline_refs:
+            return None
+        target = ref._ref_schema
+        while isinstance(target, Ref):
+            target = target._ref_schema
+        if isinstance(target, (Table, Array, Union, File)):
+            return None
+        return target
+
+    def _rebuild_any_union(self, union: Union) -> SchemaElement:
+        options = self._flat_options(union)
+        if any(isinstance(option, AnyValue) for option in options):
+            return AnyValue(_address=union._address)
+        exact_types = {_exact_type(option) for option in options} - {None}
+        optimized: list[SchemaElement] = []
+        type_set: list[SchemaElement] = []
+        type_set_index = 0
+        for option in options:
+            if _exact_type(option) is not None:
+                if len(type_set) == 0:
+                    type_set_index = len(optimized)
+                    optimized.append(option)
+                type_set.append(option)
+            elif _value_type(option) not in exact_types:
+                optimized.append(option)
+        if len(type_set) > 1:
+            optimized[type_set_index] = self._share(
+                TypeSet(type_set, _address=union._address)
+            )
+        if len(optimized) == 1:
+            return optimized[0]
+        return Union("any", optimized, _address=union._address)
+
+    def _flat_options(self, union: Union) -> list[SchemaElement]:
+        """Rebuild the options of an 'any' union, flattening nested 'any' unions."""
+        options: list[SchemaElement] = []
+        for option in union:
+            rebuilt = self.rebuild(option)
+            for rebuilt_option in (
+                rebuilt
+                if isinstance(rebuilt, Union) and rebuilt.mode == "any"
+                else [rebuilt]
+            ):
+                # Identical options are shared nodes:
+                if not any(rebuilt_option is other for other in options):
+                    options.append(rebuilt_option)
+        return options
+
+    def _share(self, schema: SchemaElement) -> SchemaElement:
+        """Get the shared node for the structure of schema."""
+        structure = self._structure(schema)
+        shared = self.shared.setdefault(structure, schema)
+        if shared is schema:
+            self.structures[id(schema)] = structure
+        else:
+            self.structures.pop(id(schema), None)
+        return shared
+
+    def _structure(self, schema: SchemaElement) -> Hashable:
+        """Hashable structure of a rebuilt node, with the structure of its children.
+
+        References are identified by their target, so they are not followed.
+        """
+        structure = self.structures.get(id(schema))
+        if structure is not None:
+            return structure
+        if isinstance(schema, Table):
+            return (
+                Table,
+                schema.toml_filename,
+                tuple(
+                    (self._key_structure(key), self._structure(value))
+                    for key, value in schema.items()
+                ),
+            )
+        if isinstance(schema, Union):
+            return (
+                type(schema),
+                schema.mode,
+                tuple(self._structure(option) for option in schema),
+            )
+        if isinstance(schema, Array):
+            return (Array, tuple(self._structure(value) for value in schema))
+        if isinstance(schema, (Ref, File)):  # Original reference, not rebuilt.
+            return (type(schema), id(schema))
+        fields: tuple[dataclasses.Field[object], ...] = dataclasses.fields(schema)
+        return (
+            type(schema),
+            tuple(
+                _hashable(cast(object, getattr(schema, field.name)))
+                for field in fields
+                if not field.name.startswith("_")
+            ),
+        )
+
+    def _key_structure(self, key: SchemaKey) -> Hashable:
+        structure = self.structures.get(id(key))
+        if structure is not None:
+            return structure
+        return (
+            key.name,
+            key.required,
+            key.hidden,
+            key.pattern,
+            key.ref,
+            key.union,
+            id(key._ref_schema),
+        )
+
+
+def _hashable(value: object) -> Hashable:
+    if isinstance(value, list):
+        return tuple(cast(list[object], value))
+    return cast(Hashable, value)
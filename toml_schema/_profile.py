@@ -0,0 +1,110 @@
+"""toml-schema: Validation profiler."""
+# SPDX-License-Identifier: MIT
+# SPDX-FileCopyrightText: 2025 Udi Fuchs
+
+import dataclasses
+import json
+import time
+from typing import cast
+
+from ._toml_schema import SchemaElement, TOMLValue, Union, _type_name
+from ._walk import Walker
+
+
+@dataclasses.dataclass
+class NodeStats:
+    """Profiling statistics of a single schema node."""
+
+    schema_file: str
+    address: str
+    kind: str
+    calls: int = 0
+    cumulative: float = 0.0
+    self_time: float = 0.0
+    union_tried: int = 0
+    union_failed: int = 0
+
+    @property
+    def node(self) -> str:
+        """Node name in the form '[schema_file:]address (kind)'."""
+        address = "root" if self.address == "" else self.address
+        if self.schema_file != "":
+            address = f"{self.schema_file}:{address}"
+        return f"{address} ({self.kind})"
+
+
+def _hot_first(stats: NodeStats) -> tuple[float, int, str]:
+    return (-stats.self_time, -stats.calls, stats.node)
+
+
+class Profiler(Walker):
+    """Record per schema node statistics of validation runs.
+
+    Nodes are identified by their schema file and address. Times are in seconds.
+    The statistics accumulate over all the validations using this profiler.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.stats: dict[tuple[str, str, str], NodeStats] = {}
+        # Time spent in the children of each node on the visit stack:
+        self._children_time: list[float] = []
+
+    def visit(self, schema: SchemaElement, value: TOMLValue, context: str) -> None:
+        """Validate value with a single schema node and record its timing."""
+        self._children_time.append(0.0)
+        start = time.perf_counter()
+        try:
+            super().visit(schema, value, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            children_time = self._children_time.pop()
+            if len(self._children_time) > 0:
+                self._children_time[-1] += elapsed
+            stats = self._node_stats(schema)
+            stats.calls += 1
+            stats.cumulative += elapsed
+            stats.self_time += elapsed - children_time
+
+    def union_option(self, union: Union, *, failed: bool) -> None:
+        """Count the union options tried and failed."""
+        stats = self._node_stats(union)
+        stats.union_tried += 1
+        if failed:
+            stats.union_failed += 1
+
+    def _node_stats(self, schema: SchemaElement) -> NodeStats:
+        kind = _type_name(type(schema))
+        address = self.address(schema)
+        key = (self.schema_file, address, kind)
+        stats = self.stats.get(key)
+        if stats is None:
+            stats = NodeStats(self.schema_file, address, kind)
+            self.stats[key] = stats
+        return stats
+
+    def sorted_stats(self) -> list[NodeStats]:
+        """Node statistics sorted from the hottest node by self time."""
+        return sorted(self.stats.values(), key=_hot_first)
+
+    def report(self, limit: int = 20) -> str:
+        """Hot-path report of the nodes with the largest self time."""
+        lines = [
+            f"{'calls':>8} {'cumul ms':>10} {'self ms':>10} {'tried':>7} "
+            f"{'failed':>7}  node"
+        ]
+        lines.extend(
+            f"{stats.calls:>8} {stats.cumulative * 1000:>10.3f} "
+            f"{stats.self_time * 1000:>10.3f} {stats.union_tried:>7} "
+            f"{stats.union_failed:>7}  {stats.node}"
+            for stats in self.sorted_stats()[:limit]
+        )
+        return "\n".join(lines)
+
+    def to_json(self) -> str:
+        """Dump all node statistics as JSON, sorted like the report."""
+        json_stats = [
+            cast(dict[str, object], dataclasses.asdict(stats))
+            for stats in self.sorted_stats()
+        ]
+        return json.dumps(json_stats, indent=2)
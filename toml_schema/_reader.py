@@ -0,0 +1,381 @@
+"""toml-schema: Validating reader of TOML documents."""
+# SPDX-License-Identifier: MIT
+# SPDX-FileCopyrightText: 2025 Udi Fuchs
+
+import re
+import sys
+from collections.abc import Iterable
+from typing import BinaryIO, Optional, cast
+
+if sys.version_info >= (3, 11):
+    import tomllib
+else:
+    import tomli as tomllib
+
+from ._toml_schema import (
+    AnyValue,
+    Array,
+    File,
+    Ref,
+    SchemaElement,
+    Table,
+    TOMLValue,
+)
+
+# The validate methods which the reader follows. Any other schema, including a
+# schema with a method patched after import, is validated after the document
+# is read:
+_TABLE_VALIDATE = Table.validate
+_ARRAY_VALIDATE = Array.validate
+_REF_VALIDATE = Ref.validate
+_FILE_VALIDATE = File.validate
+_ANY_VALUE_VALIDATE = AnyValue.validate
+
+# Tokens which change the state of the section splitter: multiline string
+# delimiters, single line strings, brackets and comments:
+_TOKEN = re.compile(r'"""|\'\'\'|"(?:[^"\\\n]|\\.)*"|\'[^\'\n]*\'|[\[\]{}#]')
+_MULTILINE_BASIC_END = re.compile(r'(?:[^"\\]|\\.|"(?!""))*"""', re.DOTALL)
+# Table header with bare keys, which is split without tomllib:
+_BARE_HEADER = re.compile(
+    r"[ \t]*(\[\[?)[ \t]*([A-Za-z0-9_-]+(?:[ \t]*\.[ \t]*[A-Za-z0-9_-]+)*)"
+    r"[ \t]*(\]\]?)[ \t]*\r?\n?"
+)
+
+
+class _Splitter:
+    """Split the lines of a TOML document into sections, one for each table header.
+
+    Only multiline strings, brackets and comments are tracked, which is enough
+    to tell a table header from a line inside a multiline value.
+    """
+
+    def __init__(self) -> None:
+        # The delimiter of the multiline string which is open:
+        self.delimiter: Optional[str] = None
+        # The depth of the open arrays and inline tables:
+        self.depth = 0
+
+    def is_header(self, line: str) -> bool:
+        """Check if line, which was not scanned yet, starts a new section."""
+        return (
+            self.delimiter is None
+            and self.depth == 0
+            and line.lstrip(" \t").startswith("[")
+        )
+
+    def scan(self, line: str) -> None:
+        """Update the state with a line of the document."""
+        pos = 0
+        if self.delimiter is not None:
+            pos = self._string_end(line, 0)
+        while pos >= 0:
+            match = _TOKEN.search(line, pos)
+            if match is None:
+                return
+            lexeme = match.group()
+            pos = match.end()
+            if lexeme in ('"""', "'''"):
+                self.delimiter = lexeme
+                pos = self._string_end(line, pos)
+            elif lexeme == "#":
+                return
+            elif lexeme in ("[", "{"):
+                self.depth += 1
+            elif lexeme in ("]", "}"):
+                self.depth -= 1
+
+    def _string_end(self, line: str, pos: int) -> int:
+        """Get the end of the open multiline string, or -1 if it is not in line."""
+        delimiter = cast(str, self.delimiter)
+        if delimiter == '"""':
+            match = _MULTILINE_BASIC_END.match(line, pos)
+            if match is None:
+                return -1
+            end = match.end()
+        else:
+            end = line.find("'''", pos)
+            if end < 0:
+                return -1
+            end += 3
+        # Up to two quotes before the closing delimiter are part of the string:
+        for _ in range(2):
+            if line.startswith(delimiter[0], end):
+                end += 1
+        self.delimiter = None
+        return end
+
+
+class _ConflictError(Exception):
+    """A section can not be merged into the document."""
+
+
+class _Reader:
+    """Build a TOML document section by section, and validate each section."""
+
+    def __init__(self, schema: Table, *, skip_any_values: bool) -> None:
+        self.schema = schema
+        self.skip_any_values = skip_any_values
+        self.splitter = _Splitter()
+        self.document: dict[str, TOMLValue] = {}
+        # All the lines read, for parsing the document again after an error:
+        self.lines: list[str] = []
+        self.section_start = 0
+        # The first section has the keys of the root table, without a header:
+        self.root_section = True
+        # After a conflict the document is parsed and validated when it is complete:
+        self.deferred_document = False
+        # The tables created by table headers, and the arrays of tables, by id:
+        self.implicit_tables: set[int] = set()
+        self.explicit_tables: set[int] = set()
+        self.table_arrays: set[int] = set()
+        # The schema of each table created by a table header, or None if its
+        # schema is not a table schema, by id:
+        self.table_schemas: dict[int, Optional[Table]] = {}
+        # The tables under an any-value schema, if their sections are skipped:
+        self.skipped_tables: set[int] = set()
+        # The checks which need the complete document:
+        self.table_checks: list[tuple[Table, dict[str, TOMLValue], str]] = []
+        self.array_checks: list[tuple[Array, list[TOMLValue], str]] = []
+        self.deferred_values: list[tuple[SchemaElement, TOMLValue, str]] = []
+        if type(schema).validate is _TABLE_VALIDATE:
+            self.table_schemas[id(self.document)] = schema
+            self.table_checks.append((schema, self.document, ""))
+        else:
+            self.table_schemas[id(self.document)] = None
+            self.deferred_values.append((schema, self.document, ""))
+
+    def feed(self, lines: Iterable[str]) -> None:
+        """Read lines of the document."""
+        for line in lines:
+            if self.splitter.is_header(line):
+                self._read_section()
+            self.splitter.scan(line)
+            self.lines.append(line)
+
+    def close(self) -> dict[str, TOMLValue]:
+        """Read the last section and run the checks of the complete document."""
+        self._read_section()
+        if self.deferred_document:
+            document: dict[str, TOMLValue] = tomllib.loads("".join(self.lines))
+            self.schema.validate(document)
+            return document
+        for table_schema, table, context in self.table_checks:
+            table_schema._check_keys(table, context)
+        for array_schema, array, context in self.array_checks:
+            for schema in array_schema:
+                array_schema._check_option(schema, array, context)
+        for schema, value, context in self.deferred_values:
+            schema.validate(value, context=context)
+        return self.document
+
+    def _read_section(self) -> None:
+        """Parse, merge and validate the lines since the last section."""
+        start = self.section_start
+        self.section_start = len(self.lines)
+        root_section = self.root_section
+        self.root_section = False
+        if self.deferred_document or start == len(self.lines):
+            return
+        try:
+            if root_section:
+                keys: list[str] = []
+                is_array = False
+            else:
+                keys, is_array = _header_keys(self.lines[start])
+            table, schema, context = self._open_table(keys, is_array=is_array)
+            if id(table) in self.skipped_tables:
+                return
+            section: dict[str, TOMLValue] = tomllib.loads("".join(self.lines[start:]))
+        except (tomllib.TOMLDecodeError, _ConflictError):
+            self._parse_lines()
+            return
+        body = section
+        for key in keys:
+            value = body[key]
+            if type(value) is list:
+                value = cast(list[TOMLValue], value)[-1]
+            body = cast(dict[str, TOMLValue], value)
+        if any(key in table for key in body):
+            self._parse_lines()
+            return
+        table.update(body)
+        if schema is not None:
+            key_schemas = [schema._key_schema(key, context) for key in body]
+            for (key, value), key_schema in zip(body.items(), key_schemas):
+                key_context = key if context == "" else f"{context}.{key}"
+                key_schema.validate(value, context=key_context)
+
+    def _parse_lines(self) -> None:
+        """Parse the lines read with tomllib, which raises the exact TOML error.
+
+        If the lines are valid TOML, the rest of the document is only read,
+        and the complete document is validated at the end.
+        """
+        tomllib.loads("".join(self.lines))
+        self.deferred_document = True
+
+    def _open_table(
+        self, keys: list[str], *, is_array: bool
+    ) -> tuple[dict[str, TOMLValue], Optional[Table], str]:
+        """Create the table of a table header in the document.
+
+        Return the table, with its schema if it is validated, and its context.
+        """
+        table = self.document
+        context = ""
+        for index, key in enumerate(keys):
+            last = index == len(keys) - 1
+            schema = self.table_schemas[id(table)]
+            key_schema = None if schema is None else schema._key_schema(key, context)
+            context = key if context == "" else f"{context}.{key}"
+            value = table.get(key)
+            if value is None:
+                value = self._new_value(
+                    table, key, key_schema, context, is_array=last and is_array
+                )
+            elif id(value) not in self.implicit_tables and (
+                id(value) not in self.table_arrays or (last and not is_array)
+            ):
+                raise _ConflictError
+            if id(value) in self.table_arrays:
+                array = cast(list[TOMLValue], value)
+                if last:
+                    array.append(self._new_item(array, f"{context}[{len(array)}]"))
+                context = f"{context}[{len(array) - 1}]"
+                table = cast(dict[str, TOMLValue], array[-1])
+            elif last and (is_array or id(value) in self.explicit_tables):
+                raise _ConflictError
+            else:
+                table = cast(dict[str, TOMLValue], value)
+        self.explicit_tables.add(id(table))
+        return table, self.table_schemas[id(table)], context
+
+    def _new_value(
+        self,
+        table: dict[str, TOMLValue],
+        key: str,
+        key_schema: Optional[SchemaElement],
+        context: str,
+        *,
+        is_array: bool,
+    ) -> TOMLValue:
+        """Create a table, or an array of tables, for a key of a table header."""
+        value: TOMLValue = [] if is_array else {}
+        table[key] = value
+        if is_array:
+            self.table_arrays.add(id(value))
+        else:
+            self.implicit_tables.add(id(value))
+        # The schema of a table, or of the items of an array of tables:
+        schema: Optional[Table] = None
+        if id(table) in self.skipped_tables:
+            self.skipped_tables.add(id(value))
+        elif key_schema is not None:
+            target = _target(key_schema)
+            validate = type(target).validate
+            if self.skip_any_values and validate is _ANY_VALUE_VALIDATE:
+                self.skipped_tables.add(id(value))
+            elif is_array and validate is _ARRAY_VALIDATE:
+                schema = _item_schema(cast(Array, target))
+                if schema is not None:
+                    array = cast(list[TOMLValue], value)
+                    self.array_checks.append((cast(Array, target), array, context))
+            elif not is_array and validate is _TABLE_VALIDATE:
+                schema = cast(Table, target)
+                self.table_checks.append(
+                    (schema, cast(dict[str, TOMLValue], value), context)
+                )
+            if schema is None and id(value) not in self.skipped_tables:
+                self.deferred_values.append((key_schema, value, context))
+        self.table_schemas[id(value)] = schema
+        return value
+
+    def _new_item(self, array: list[TOMLValue], context: str) -> dict[str, TOMLValue]:
+        """Create a table for an array of tables."""
+        table: dict[str, TOMLValue] = {}
+        if id(array) in self.skipped_tables:
+            self.skipped_tables.add(id(table))
+        schema = self.table_schemas[id(array)]
+        self.table_schemas[id(table)] = schema
+        if schema is not None:
+            self.table_checks.append((schema, table, context))
+        return table
+
+
+def _target(schema: SchemaElement) -> SchemaElement:
+    """Follow the references of a schema."""
+    while True:
+        validate = type(schema).validate
+        if validate is _REF_VALIDATE:
+            schema = cast(Ref, schema)._target()
+        elif validate is _FILE_VALIDATE:
+            schema = cast(File, schema)._target()
+        else:
+            return schema
+
+
+def _item_schema(array: Array) -> Optional[Table]:
+    """Get the table schema of the items of an array schema, if it has one."""
+    item_schema = _target(
+        next(schema for schema in array if not hasattr(schema, "_array_option"))
+    )
+    if type(item_schema).validate is _TABLE_VALIDATE:
+        return cast(Table, item_schema)
+    return None
+
+
+def _header_keys(line: str) -> tuple[list[str], bool]:
+    """Get the keys of a table header line, and if it is an array of tables."""
+    match = _BARE_HEADER.fullmatch(line)
+    if match is not None:
+        opening, dotted_key, closing = cast(tuple[str, str, str], match.groups())
+        if len(opening) == len(closing):
+            return [key.strip(" \t") for key in dotted_key.split(".")], len(
+                opening
+            ) == 2
+    header: dict[str, TOMLValue] = tomllib.loads(line)
+    keys: list[str] = []
+    is_array = False
+    while len(header) > 0:
+        key, value = next(iter(header.items()))
+        keys.append(key)
+        if type(value) is list:
+            is_array = True
+            value = cast(list[TOMLValue], value)[-1]
+        header = cast(dict[str, TOMLValue], value)
+    return keys, is_array
+
+
+def validate_load(
+    schema: Table, toml_file: BinaryIO, /, *, skip_any_values: bool = False
+) -> dict[str, TOMLValue]:
+    """Read a TOML document from a binary I/O stream and validate it while reading.
+
+    See validate_loads.
+    """
+    reader = _Reader(schema, skip_any_values=skip_any_values)
+    reader.feed(line.decode() for line in toml_file)
+    return reader.close()
+
+
+def validate_loads(
+    schema: Table, toml_str: str, /, *, skip_any_values: bool = False
+) -> dict[str, TOMLValue]:
+    """Read a TOML document from a string and validate it while reading.
+
+    The document is read section by section, where each table header starts a
+    new section. Each section is validated as soon as it is read, and the first
+    error stops the reading. The missing required keys, the array options and
+    the values under a union are checked when the document is complete.
+    The errors are the errors of schema.validate, but if a document has more
+    than one error, another error might be found first.
+
+    If skip_any_values is True, the sections of tables which the schema marks
+    as any-value are not parsed, and these tables are left empty.
+    Return the document.
+    """
+    lines = toml_str.split("\n")
+    reader = _Reader(schema, skip_any_values=skip_any_values)
+    reader.feed(f"{line}\n" for line in lines[:-1])
+    reader.feed(lines[-1:])
+    return reader.close()
@@ -0,0 +1,129 @@
+"""toml-schema: Incremental revalidation of edited documents."""
+# SPDX-License-Identifier: MIT
+# SPDX-FileCopyrightText: 2025 Udi Fuchs
+
+from collections.abc import Iterable
+from typing import Optional, cast
+
+from ._toml_schema import File, Ref, SchemaElement, Table, TOMLValue
+from ._walk import _FILE_VALIDATE, _REF_VALIDATE, _TABLE_VALIDATE
+
+# Tree of the changed keys of a document. A key which maps to None was changed
+# with its whole subtree, and a key which maps to a tree has changes under it:
+_Changes = dict[str, Optional["_Changes"]]
+
+
+def _same(old_value: TOMLValue, value: TOMLValue) -> bool:
+    """Check if two values are equal and have the same types.
+
+    The types are compared, since 1, 1.0 and True are equal but are not
+    validated the same.
+    """
+    if old_value is value:
+        return True
+    if type(old_value) is not type(value):
+        return False
+    if type(value) is dict:
+        old_table = cast(dict[str, TOMLValue], old_value)
+        return old_table.keys() == value.keys() and all(
+            _same(old_table[key], element) for key, element in value.items()
+        )
+    if type(value) is list:
+        old_array = cast(list[TOMLValue], old_value)
+        return len(old_array) == len(value) and all(
+            _same(old_element, element)
+            for old_element, element in zip(old_array, value)
+        )
+    return old_value == value
+
+
+def _diff(
+    old_value: TOMLValue,
+    value: TOMLValue,
+    path: tuple[str, ...],
+    changes: list[tuple[str, ...]],
+) -> None:
+    """Add the paths of the changed values to changes.
+
+    Tables are compared key by key. Any other changed value, including an array,
+    is a single change.
+    """
+    if type(old_value) is not dict or type(value) is not dict:
+        if not _same(old_value, value):
+            changes.append(path)
+        return
+    old_table = cast(dict[str, TOMLValue], old_value)
+    for key, element in value.items():
+        if key in old_table:
+            _diff(old_table[key], element, (*path, key), changes)
+        else:
+            changes.append((*path, key))
+    # A removed key is only checked against the required keys of its table:
+    changes.extend((*path, key) for key in old_table if key not in value)
+
+
+def changed_paths(old_value: TOMLValue, value: TOMLValue) -> list[tuple[str, ...]]:
+    """Get the key paths of the values which differ between two documents."""
+    changes: list[tuple[str, ...]] = []
+    _diff(old_value, value, (), changes)
+    return changes
+
+
+def _change_tree(paths: Iterable[tuple[str, ...]]) -> Optional[_Changes]:
+    """Get the tree of the changed keys, or None if the whole document changed."""
+    tree: _Changes = {}
+    for path in paths:
+        if len(path) == 0:
+            return None
+        node = tree
+        for key in path[:-1]:
+            sub_tree = node.setdefault(key, {})
+            if sub_tree is None:
+                break
+            node = sub_tree
+        else:
+            node[path[-1]] = None
+    return tree
+
+
+def _validate_changes(
+    schema: SchemaElement, value: TOMLValue, changes: _Changes, context: str
+) -> None:
+    """Validate only the changes in value, and the tables which contain them."""
+    while True:
+        validate = type(schema).validate
+        if validate is _REF_VALIDATE:
+            schema = cast(Ref, schema)._target()
+        elif validate is _FILE_VALIDATE:
+            schema = cast(File, schema)._target()
+        else:
+            break
+    # Changes under any other schema, such as a union or an array, are
+    # validated with the whole subtree of the schema:
+    if validate is not _TABLE_VALIDATE or type(value) is not dict:
+        schema.validate(value, context=context)
+        return
+    table = cast(Table, schema)
+    table._check_keys(value, context)
+    # The keys are visited in the order of validate, so the first error is the same:
+    for key, element in value.items():
+        if key not in changes:
+            continue
+        key_schema = table._key_schema(key, context)
+        key_context = key if context == "" else f"{context}.{key}"
+        key_changes = changes[key]
+        if key_changes is None:
+            key_schema.validate(element, context=key_context)
+        else:
+            _validate_changes(key_schema, element, key_changes, key_context)
+
+
+def revalidate(
+    schema: Table, value: TOMLValue, paths: Iterable[tuple[str, ...]]
+) -> None:
+    """Validate value, which differs from a valid document only at the key paths."""
+    changes = _change_tree(paths)
+    if changes is None:
+        schema.validate(value)
+    else:
+        _validate_changes(schema, value, changes, "")
@@ -0,0 +1,111 @@
+"""toml-schema: Validation of a sample of the items of large arrays."""
+# SPDX-License-Identifier: MIT
+# SPDX-FileCopyrightText: 2025 Udi Fuchs
+
+import dataclasses
+import random
+from collections.abc import Sequence
+from typing import Optional
+
+from ._toml_schema import (
+    Array,
+    Budget,
+    SchemaElement,
+    Table,
+    TOMLValue,
+    UniqueItems,
+)
+from ._walk import Walker
+
+
+@dataclasses.dataclass
+class SampleResult:
+    """Result of a validation by sampling, which found no errors.
+
+    Only the arrays which were visited are counted. The arrays inside items
+    which were skipped are not visited at all.
+    """
+
+    arrays: int = 0
+    sampled_arrays: int = 0
+    items: int = 0
+    checked_items: int = 0
+
+    @property
+    def sampled(self) -> bool:
+        """True if some array items were not checked, so the value may be invalid."""
+        return self.checked_items < self.items
+
+
+class _Sampler(Walker):
+    """Walker which checks only a sample of the items of large arrays."""
+
+    def __init__(self, *, head: int, tail: int, size: int, seed: int) -> None:
+        super().__init__()
+        self.head = head
+        self.tail = tail
+        self.size = size
+        self.random = random.Random(seed)  # noqa: S311
+        self.result = SampleResult()
+
+    def _walk_array(self, array: Array, value: TOMLValue, context: str) -> None:
+        array_value = self._array_value(array, value, context)
+        indexes = self._sample_indexes(len(array_value))
+        self.result.arrays += 1
+        self.result.items += len(array_value)
+        self.result.checked_items += len(indexes)
+        sample: Sequence[TOMLValue] = array_value
+        if len(indexes) < len(array_value):
+            self.result.sampled_arrays += 1
+            sample = [array_value[index] for index in indexes]
+        self._enter(context)
+        try:
+            for schema in array:
+                # Unique items are checked only among the sampled items:
+                option_value = (
+                    sample if isinstance(schema, UniqueItems) else array_value
+                )
+                if not array._check_option(schema, option_value, context):
+                    for index, element in zip(indexes, sample):
+                        self.visit(schema, element, f"{context}[{index}]")
+        finally:
+            self._depth -= 1
+
+    def _sample_indexes(self, length: int) -> Sequence[int]:
+        """Get the sorted indexes of the items to check in an array of length."""
+        if length <= self.head + self.tail + self.size:
+            return range(length)
+        middle = self.random.sample(range(self.head, length - self.tail), self.size)
+        return [*range(self.head), *sorted(middle), *range(length - self.tail, length)]
+
+
+def validate_sample(  # noqa: PLR0913
+    schema: Table,
+    value: TOMLValue,
+    /,
+    *,
+    head: int = 100,
+    tail: int = 100,
+    size: int = 1000,
+    seed: int = 0,
+    path: Optional[str] = None,
+    budget: Optional[Budget] = None,
+) -> SampleResult:
+    """Validate value, checking only a sample of the items of large arrays.
+
+    The min-items and max-items options of every array are checked. In arrays
+    of more than head + tail + size items, only the first head items, the last
+    tail items and a random sample of size items of the rest are validated,
+    and unique-items is checked only among them. The sample is random,
+    but it is the same for the same seed and value.
+
+    Raise SchemaError if an error is found. Otherwise return the result,
+    whose sampled flag tells if some items were not checked.
+    """
+    sampler = _Sampler(head=head, tail=tail, size=size, seed=seed)
+    sub_schema: SchemaElement = schema
+    context = ""
+    if path is not None:
+        sub_schema, value, context = schema.resolve_path(value, path)
+    sampler.validate(sub_schema, value, context=context, budget=budget)
+    return sampler.result
@@ -2,17 +2,23 @@
 # SPDX-License-Identifier: MIT
 # SPDX-FileCopyrightText: 2025 Udi Fuchs
 
+import collections
 import dataclasses
 import datetime
 import pathlib
 import re
 import sys
-from collections.abc import Mapping, Sequence
+from collections.abc import Callable, Iterable, Mapping, Sequence
 from typing import TYPE_CHECKING, BinaryIO, Optional, cast
 
 if TYPE_CHECKING:
     from typing import TypeAlias
 
+    from ._adapter import ValueAdapter
+    from ._memo import ValidationMemo
+    from ._profile import Profiler
+    from ._walk import Walker
+
 if sys.version_info >= (3, 11):
     import tomllib
 else:
@@ -36,6 +42,40 @@ class SchemaError(Exception):
         return f"{context}: {self.message}"
 
 
+@dataclasses.dataclass
+class SchemaBudgetExceeded(Exception):  # noqa: N818
+    """Validation was stopped, since a limit of its budget was reached.
+
+    This is not a SchemaError, so it is never taken as the failure of
+    a union option, and the value is neither valid nor invalid.
+    """
+
+    message: str
+    context: str
+
+    def __str__(self) -> str:
+        context = "root" if self.context == "" else f"'{self.context}'"
+        return f"{context}: {self.message}"
+
+
+@dataclasses.dataclass(frozen=True)
+class Budget:
+    """Limits of a single validation.
+
+    max_nodes limits the number of schema nodes visited, max_depth the nesting
+    of the tables and arrays of the document, and max_seconds the time.
+    A limit of None is not checked.
+    """
+
+    max_nodes: Optional[int] = None
+    max_depth: Optional[int] = None
+    max_seconds: Optional[float] = None
+
+
+# Schema elements are slotted dataclasses, without an instance dict, if supported:
+_SLOTS: dict[str, bool] = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+
 def _type_name(cls: type) -> str:
     """Generate type name from class name."""
     cls_name = cls.__name__
@@ -53,8 +93,28 @@ def _format_attr(attr: object) -> str:
 class SchemaElement:
     """Base class for schema elements."""
 
+    # The _address slot is added by the subclasses, since the slots of
+    # a base class would conflict with the layout of dict and list:
+    __slots__ = ()
+
     _address: str = dataclasses.field(default="", compare=False)
 
+    def __getstate__(self) -> dict[str, object]:
+        """Get the attributes of the element, including its slots, for pickle."""
+        instance_dict = cast(
+            Optional[dict[str, object]], getattr(self, "__dict__", None)
+        )
+        state: dict[str, object] = {} if instance_dict is None else dict(instance_dict)
+        for cls in type(self).__mro__:
+            for name in cast(tuple[str, ...], getattr(cls, "__slots__", ())):
+                state[name] = cast(object, getattr(self, name))
+        return state
+
+    def __setstate__(self, state: dict[str, object]) -> None:
+        """Set the attributes of the frozen element, when it is unpickled."""
+        for name, value in state.items():
+            object.__setattr__(self, name, value)
+
     def __str__(self) -> str:
         # Omit default fields in object string representation. Based on:
         # https://stackoverflow.com/questions/72161257/exclude-default-fields-from-python-dataclass-repr
@@ -78,6 +138,22 @@ class SchemaElement:
         """Validate value for this type."""
         raise NotImplementedError
 
+    def _type_error(self, value: TOMLValue, context: str) -> SchemaError:
+        """Create the error for a value that does not match this type."""
+        return SchemaError(f"Value {_format_attr(value)} is not: {self}", context)
+
+    def resolve_path(
+        self,
+        value: TOMLValue,  # noqa: ARG002
+        path: str,
+        /,
+        *,
+        context: str = "",
+    ) -> tuple["SchemaElement", TOMLValue, str]:
+        """Get the schema, value and context of the subtree at a dotted path."""
+        key = path.split(".", 1)[0]
+        raise SchemaError(f"Path key '{key}' not in a table: {self}", context)
+
     def register_root(self, root: "Table") -> None:
         """Register the root table of this element."""
         if not hasattr(self, "ref"):
@@ -101,6 +177,10 @@ class SchemaElement:
             schema = next_schema
         object.__setattr__(self, "_ref_schema", schema)
 
+    def drop_addresses(self) -> None:
+        """Drop the addresses of this element and its children."""
+        object.__setattr__(self, "_address", "")
+
 
 # TOML bare key chars copied from: cpython/Lib/tomllib/_parser.py
 # fmt: off
@@ -131,7 +211,7 @@ def _bool_field_required() -> bool:
     raise ValueError("Required field missing.")  # pragma: no cover
 
 
-@dataclasses.dataclass(frozen=True)
+@dataclasses.dataclass(frozen=True, **_SLOTS)
 class SchemaKey(SchemaElement):
     """Schema for table keys."""
 
@@ -141,8 +221,14 @@ class SchemaKey(SchemaElement):
     pattern: Optional[str] = None
     ref: Optional[str] = None
     union: Optional[str] = None
-    _regex: Optional[re.Pattern[str]] = dataclasses.field(init=False, default=None)
-    _ref_schema: Optional[SchemaElement] = dataclasses.field(init=False, default=None)
+    # The compiled fields are derived from the others. They are not compared,
+    # so that the hash of the key does not change when its reference is set:
+    _regex: Optional[re.Pattern[str]] = dataclasses.field(
+        init=False, default=None, compare=False
+    )
+    _ref_schema: Optional[SchemaElement] = dataclasses.field(
+        init=False, default=None, compare=False
+    )
 
     def __post_init__(self) -> None:
         if self.name == "*":
@@ -204,7 +290,7 @@ class SchemaKey(SchemaElement):
         return f'"{escape_quotes}"'
 
 
-@dataclasses.dataclass(frozen=True)
+@dataclasses.dataclass(frozen=True, **_SLOTS)
 class String(SchemaElement):
     """String schema type."""
 
@@ -214,24 +300,21 @@ class String(SchemaElement):
     def validate(self, value: TOMLValue, /, *, context: str) -> None:
         """Validate value for string type."""
         if type(value) is not str:
-            raise SchemaError(f"Value {_format_attr(value)} is not: {self}", context)
+            raise self._type_error(value, context)
         if self.min_len is not None and len(value) < self.min_len:
             raise SchemaError(f"len({value!r}) < {self.min_len}", context)
         if self.max_len is not None and len(value) > self.max_len:
             raise SchemaError(f"len({value!r}) > {self.max_len}", context)
 
 
-@dataclasses.dataclass(frozen=True)
+@dataclasses.dataclass(frozen=True, **_SLOTS)
 class Enum(SchemaElement):
     """Enumerated string schema type."""
 
     enum: list[str] = dataclasses.field(default_factory=_list_str_field_required)
 
     def __post_init__(self) -> None:
-        if any(
-            sum(1 for elem_2 in self.enum if elem_1 == elem_2) > 1
-            for elem_1 in self.enum
-        ):
+        if len(set(self.enum)) < len(self.enum):
             raise SchemaError(
                 f"'enum' must not have duplicates: {self.enum}", self._address
             )
@@ -247,7 +330,7 @@ class Enum(SchemaElement):
             raise SchemaError(f"'{value}' not in: {self.enum}", context)
 
 
-@dataclasses.dataclass(frozen=True)
+@dataclasses.dataclass(frozen=True, **_SLOTS)
 class Pattern(SchemaElement):
     """Regular expression pattern for string schema type."""
 
@@ -274,7 +357,7 @@ class Pattern(SchemaElement):
             )
 
 
-@dataclasses.dataclass(frozen=True)
+@dataclasses.dataclass(frozen=True, **_SLOTS)
 class Float(SchemaElement):
     """Float schema type."""
 
@@ -284,14 +367,14 @@ class Float(SchemaElement):
     def validate(self, value: TOMLValue, /, *, context: str) -> None:
         """Validate value for float type."""
         if type(value) is not float:
-            raise SchemaError(f"Value {_format_attr(value)} is not: {self}", context)
+            raise self._type_error(value, context)
         if self.min is not None and value < self.min:
             raise SchemaError(f"Value out of range: {value} < {self.min}", context)
         if self.max is not None and value > self.max:
             raise SchemaError(f"Value out of range: {value} > {self.max}", context)
 
 
-@dataclasses.dataclass(frozen=True)
+@dataclasses.dataclass(frozen=True, **_SLOTS)
 class Integer(SchemaElement):
     """Integer schema type."""
 
@@ -301,64 +384,70 @@ class Integer(SchemaElement):
     def validate(self, value: TOMLValue, /, *, context: str) -> None:
         """Validate value for integer type."""
         if type(value) is not int:
-            raise SchemaError(f"Value {_format_attr(value)} is not: {self}", context)
+            raise self._type_error(value, context)
         if self.min is not None and value < self.min:
             raise SchemaError(f"Value out of range: {value} < {self.min}", context)
         if self.max is not None and value > self.max:
             raise SchemaError(f"Value out of range: {value} > {self.max}", context)
 
 
+@dataclasses.dataclass(frozen=True, **_SLOTS)
 class Boolean(SchemaElement):
     """Boolean schema type."""
 
     def validate(self, value: TOMLValue, /, *, context: str) -> None:
         """Validate value for boolean type."""
         if type(value) is not bool:
-            raise SchemaError(f"Value {_format_attr(value)} is not: {self}", context)
+            raise self._type_error(value, context)
 
 
+@dataclasses.dataclass(frozen=True, **_SLOTS)
 class OffsetDateTime(SchemaElement):
     """Offset date-time schema type."""
 
     def validate(self, value: TOMLValue, /, *, context: str) -> None:
         """Validate value for offset date-time type."""
         if type(value) is not datetime.datetime:
-            raise SchemaError(f"Value {_format_attr(value)} is not: {self}", context)
+            raise self._type_error(value, context)
         local_time = value.utcoffset() is None
         if local_time:
             raise SchemaError(f"'offset-date-time' has no offset: {value}", context)
 
 
+@dataclasses.dataclass(frozen=True, **_SLOTS)
 class LocalDateTime(SchemaElement):
     """Local date-time schema type."""
 
     def validate(self, value: TOMLValue, /, *, context: str) -> None:
         """Validate value for local date-time type."""
         if type(value) is not datetime.datetime:
-            raise SchemaError(f"Value {_format_attr(value)} is not: {self}", context)
+            raise self._type_error(value, context)
         local_time = value.utcoffset() is None
         if not local_time:
             raise SchemaError(f"'local-date-time' is not local: {value}", context)
 
 
+@dataclasses.dataclass(frozen=True, **_SLOTS)
 class Date(SchemaElement):
     """Date schema type."""
 
     def validate(self, value: TOMLValue, /, *, context: str) -> None:
         """Validate value for local date type."""
         if type(value) is not datetime.date:
-            raise SchemaError(f"Value {_format_attr(value)} is not: {self}", context)
+            raise self._type_error(value, context)
 
 
+@dataclasses.dataclass(frozen=True, **_SLOTS)
 class Time(SchemaElement):
     """Time schema type."""
 
     def validate(self, value: TOMLValue, /, *, context: str) -> None:
         """Validate value for local time type."""
         if type(value) is not datetime.time:
-            raise SchemaError(f"Value {_format_attr(value)} is not: {self}", context)
+            raise self._type_error(value, context)
 
 
+@dataclasses.dataclass(frozen=True, **_SLOTS)
 class AnyValue(SchemaElement):
     """Wildcard schema type."""
 
@@ -366,9 +455,23 @@ class AnyValue(SchemaElement):
         """Validating value for any-value type is always successful."""
 
 
+def _new_table(cls: type["Table"]) -> "Table":
+    """Create an empty table, which gets its items and attributes from pickle."""
+    return dict.__new__(cls)
+
+
 class Table(SchemaElement, dict[SchemaKey, SchemaElement]):
     """Table schema container."""
 
+    __slots__ = (
+        "_address",
+        "_closed",
+        "_has_addresses",
+        "_key_schemas",
+        "_required_keys",
+        "toml_filename",
+    )
+
     def __init__(
         self,
         schema_table: Mapping[SchemaKey, SchemaElement],
@@ -382,20 +485,19 @@ class Table(SchemaElement, dict[SchemaKey, SchemaElement]):
         dict.__init__(self, schema_table)
 
         self.toml_filename = toml_filename
+        # False if the addresses of the nodes were dropped by from_toml_table:
+        self._has_addresses = True
+        self._precompute_keys()
         if is_root:
             self.register_root(self)
         elif toml_filename is not None:  # pragma: no cover
             raise RuntimeError("toml_filename should only be specified if is_root.")
 
+        same_keys = collections.Counter(
+            (key.name, key.pattern, key.hidden) for key in self
+        )
         key_count = {
-            str(key_1): sum(
-                1
-                for key_2 in self
-                if key_1.name == key_2.name
-                and key_1.pattern == key_2.pattern
-                and key_1.hidden == key_2.hidden
-            )
-            for key_1 in self
+            str(key): same_keys[key.name, key.pattern, key.hidden] for key in self
         }
         if any(count > 1 for count in key_count.values()):
             raise SchemaError(
@@ -404,11 +506,111 @@ class Table(SchemaElement, dict[SchemaKey, SchemaElement]):
                 self._address,
             )
 
+    def _precompute_keys(self) -> None:
+        """Precompute the keys, for reconciling document keys with set operations.
+
+        The table is closed if it has no pattern or reference keys.
+        """
+        self._required_keys = frozenset(key.name for key in self if key.required)
+        self._closed = all(key.pattern is None and key.ref is None for key in self)
+        self._key_schemas: dict[str, SchemaElement] = {}
+        for schema_key, schema_value in self.items():
+            if not schema_key.hidden and schema_key.pattern is None:
+                self._key_schemas.setdefault(schema_key.name, schema_value)
+
+    def __reduce__(self) -> tuple[object, ...]:
+        # The items are restored by __setstate__, instead of item by item with
+        # __setitem__, so that the precomputed keys are not computed again:
+        return (_new_table, (type(self),), self.__getstate__())
+
+    def __getstate__(self) -> dict[str, object]:
+        return {**SchemaElement.__getstate__(self), "_items": dict(self)}
+
+    def __setstate__(self, state: dict[str, object]) -> None:
+        super().update(cast(dict[SchemaKey, SchemaElement], state["_items"]))
+        SchemaElement.__setstate__(
+            self, {name: value for name, value in state.items() if name != "_items"}
+        )
+
+    if not TYPE_CHECKING:  # pragma: no branch
+        # A table is a dict, so its precomputed keys are updated when it is
+        # changed. Type checkers keep the signatures of the dict methods:
+
+        def __setitem__(self, *args: object, **kwargs: object) -> None:
+            super().__setitem__(*args, **kwargs)
+            self._precompute_keys()
+
+        def __delitem__(self, *args: object, **kwargs: object) -> None:
+            super().__delitem__(*args, **kwargs)
+            self._precompute_keys()
+
+        def __ior__(self, *args: object, **kwargs: object) -> "Table":  # noqa: PYI034
+            super().__ior__(*args, **kwargs)
+            self._precompute_keys()
+            return self
+
+        def clear(self, *args: object, **kwargs: object) -> None:
+            super().clear(*args, **kwargs)
+            self._precompute_keys()
+
+        def pop(self, *args: object, **kwargs: object) -> object:
+            result = super().pop(*args, **kwargs)
+            self._precompute_keys()
+            return result
+
+        def popitem(self, *args: object, **kwargs: object) -> object:
+            result = super().popitem(*args, **kwargs)
+            self._precompute_keys()
+            return result
+
+        def setdefault(self, *args: object, **kwargs: object) -> object:
+            result = super().setdefault(*args, **kwargs)
+            self._precompute_keys()
+            return result
+
+        def update(self, *args: object, **kwargs: object) -> None:
+            super().update(*args, **kwargs)
+            self._precompute_keys()
+
     def register_root(self, root: "Table") -> None:
         for schema_key, schema_value in self.items():
             schema_key.register_root(root)
             schema_value.register_root(root)
 
+    def drop_addresses(self) -> None:
+        SchemaElement.drop_addresses(self)
+        self._has_addresses = False
+        for schema_key, schema_value in self.items():
+            schema_key.drop_addresses()
+            schema_value.drop_addresses()
+
+    def addresses(self) -> dict[int, str]:
+        """Rebuild the addresses of the nodes of the table, by node id.
+
+        This is needed for schemas loaded with addresses=False. The address of
+        a special key is its normalized form, for example 'pattern = '^.*$''
+        for the wildcard key '*'. Schema files referenced with file are not
+        included.
+        """
+        addresses: dict[int, str] = {}
+        pending: list[tuple[SchemaElement, str]] = [(self, self._address)]
+        while len(pending) > 0:
+            schema, address = pending.pop()
+            addresses.setdefault(id(schema), address)
+            if isinstance(schema, Table):
+                base_address = "" if address == "" else f"{address}."
+                for schema_key, schema_value in schema.items():
+                    addresses.setdefault(id(schema_key), address)
+                    pending.append(
+                        (schema_value, f"{base_address}{_key_address(schema_key)}")
+                    )
+            elif isinstance(schema, (Array, Union)):
+                pending.extend(
+                    (schema_value, f"{address}[{index}]")
+                    for index, schema_value in enumerate(schema)
+                )
+        return addresses
+
     def __str__(self) -> str:
         values = [f"{key} = {value}" for key, value in self.items()]
         return "{ }" if len(values) == 0 else f"{{ {', '.join(values)} }}"
@@ -430,41 +632,156 @@ class Table(SchemaElement, dict[SchemaKey, SchemaElement]):
                     and schema_key.pattern is None
                 ):
                     return schema_value
-        for schema_key, schema_value in self.items():
-            if not get_hidden and schema_key.hidden:
-                continue
-            if key == schema_key.name and schema_key.pattern is None:
-                return schema_value
-        return None
+        return self._key_schemas.get(key)
 
     def validate(self, value: TOMLValue, /, *, context: str = "") -> None:
         """Validate table and its elements."""
         if type(value) is not dict:
-            raise SchemaError(f"Value {_format_attr(value)} is not: {self}", context)
+            raise self._type_error(value, context)
+        self._check_keys(value, context)
         for key, element in value.items():
-            # Check if key is in schema:
-            schema = self.get_sub_schema(key)
-            if schema is None:
-                # Check if key matches any wildcard or reference schema key:
-                for schema_key, schema_value in self.items():
-                    if schema_key.special_match(key):
-                        schema = schema_value
-                        break
-                else:
-                    if len(str(self)) > 80:
-                        # No point showing schema if it is very long:
-                        raise SchemaError(f"Key '{key}' not in schema.", context)
-                    raise SchemaError(f"Key '{key}' not in schema: {self}", context)
-
+            schema = self._key_schema(key, context)
             key_context = key if context == "" else f"{context}.{key}"
             schema.validate(element, context=key_context)
 
-        for schema_key in self:
-            if schema_key.required and schema_key.name not in value:
-                raise SchemaError(f"Missing required key: {schema_key.name}", context)
+    def validate_with(  # noqa: PLR0913
+        self,
+        value: TOMLValue,
+        /,
+        *,
+        context: str = "",
+        path: Optional[str] = None,
+        profiler: Optional["Profiler"] = None,
+        adapter: Optional["ValueAdapter"] = None,
+        memo: Optional["ValidationMemo"] = None,
+        budget: Optional[Budget] = None,
+    ) -> None:
+        """Validate table with a path, a profiler, an adapter, a memo or a budget.
+
+        If a dotted path is given, such as "tool.ruff", only that subtree of value
+        is validated, with contexts relative to the full value.
+        If a profiler is given, validation is instrumented and recorded by it.
+        If an adapter is given, values which are not plain tomllib output, such as
+        the values of a tomlkit document, are adapted by it.
+        If a memo is given, repeated subtrees of value are validated only once.
+        A profiler and a memo cannot be given together.
+        If a budget is given, SchemaBudgetExceeded is raised when any of its
+        limits is reached.
+        Validation with anything but a path is done by a walker, so that
+        the plain validate methods are not slowed down by these options.
+        """
+        if profiler is not None and memo is not None:
+            raise ValueError("A profiler and a memo cannot be used together.")
+        schema: SchemaElement = self
+        if path is not None:
+            schema, value, context = self.resolve_path(value, path, context=context)
+        walker: Optional[Walker] = profiler if profiler is not None else memo
+        if walker is None:
+            if adapter is None and budget is None:
+                schema.validate(value, context=context)
+                return
+            # Imported here, since the walker module depends on this module:
+            from . import _walk
+
+            walker = _walk.Walker()
+        walker.validate(schema, value, context=context, adapter=adapter, budget=budget)
+
+    def revalidate(
+        self,
+        old_value: TOMLValue,
+        value: TOMLValue,
+        /,
+        *,
+        previous_error: Optional[SchemaError] = None,
+    ) -> None:
+        """Validate value, which is an edit of old_value, by checking only the edits.
+
+        The changed values are validated with their schemas, and the tables which
+        contain them are checked for required and unknown keys. Changes under
+        a union or an array are validated with the whole union or array.
+        The result is the result of validate(value), if old_value was valid.
+        If validation of old_value failed, give its error as previous_error,
+        and value is validated in full.
+        """
+        # Imported here, since the revalidation module depends on this module:
+        from ._revalidate import changed_paths, revalidate
+
+        if previous_error is not None:
+            self.validate(value)
+        else:
+            revalidate(self, value, changed_paths(old_value, value))
+
+    def revalidate_paths(
+        self,
+        value: TOMLValue,
+        changed: Iterable[str],
+        /,
+        *,
+        previous_error: Optional[SchemaError] = None,
+    ) -> None:
+        """Validate value, which was valid before the keys at changed were edited.
+
+        The changed keys are dotted paths, such as "tool.ruff.line-length",
+        of the values which were added, removed or modified. The path "" is
+        the whole document. See revalidate.
+        """
+        from ._revalidate import revalidate
+
+        if previous_error is not None:
+            self.validate(value)
+        else:
+            paths = (() if path == "" else tuple(path.split(".")) for path in changed)
+            revalidate(self, value, paths)
+
+    def resolve_path(
+        self, value: TOMLValue, path: str, /, *, context: str = ""
+    ) -> tuple[SchemaElement, TOMLValue, str]:
+        # Any mapping is accepted, for documents validated with an adapter:
+        if not isinstance(value, Mapping):
+            raise self._type_error(value, context)
+        keys = path.split(".", 1)
+        schema = self._key_schema(keys[0], context)
+        if keys[0] not in value:
+            raise SchemaError(f"Missing path key: {keys[0]}", context)
+        key_context = keys[0] if context == "" else f"{context}.{keys[0]}"
+        if len(keys) == 1:
+            return schema, value[keys[0]], key_context
+        return schema.resolve_path(value[keys[0]], keys[1], context=key_context)
+
+    def _key_schema(self, key: str, context: str) -> SchemaElement:
+        """Get the schema of a document key, or raise if the key is not allowed."""
+        # Check if key is in schema:
+        schema = self._key_schemas.get(key)
+        if schema is not None:
+            return schema
+        # Check if key matches any wildcard or reference schema key:
+        for schema_key, schema_value in self.items():
+            if schema_key.special_match(key):
+                return schema_value
+        raise self._key_error(key, context)
 
+    def _key_error(self, key: str, context: str) -> SchemaError:
+        if len(str(self)) > 80:
+            # No point showing schema if it is very long:
+            return SchemaError(f"Key '{key}' not in schema.", context)
+        return SchemaError(f"Key '{key}' not in schema: {self}", context)
+
+    def _check_keys(self, value: Mapping[str, TOMLValue], context: str) -> None:
+        """Check for missing required keys, and unknown keys if table is closed.
+
+        This is done with set operations, before any value is validated.
+        """
+        if not self._required_keys <= value.keys():
+            missing = next(
+                key.name for key in self if key.required and key.name not in value
+            )
+            raise SchemaError(f"Missing required key: {missing}", context)
+        if self._closed and not value.keys() <= self._key_schemas.keys():
+            unknown = next(key for key in value if key not in self._key_schemas)
+            raise self._key_error(unknown, context)
 
-@dataclasses.dataclass(frozen=True)
+
+@dataclasses.dataclass(frozen=True, **_SLOTS)
 class Ref(SchemaElement):
     """Schema for referencing other schema keys."""
 
@@ -473,44 +790,88 @@ class Ref(SchemaElement):
 
     def validate(self, value: TOMLValue, /, *, context: str) -> None:
         """Validate value with the reference type."""
+        self._target().validate(value, context=context)
+
+    def resolve_path(
+        self, value: TOMLValue, path: str, /, *, context: str = ""
+    ) -> tuple[SchemaElement, TOMLValue, str]:
+        return self._target().resolve_path(value, path, context=context)
+
+    def _target(self) -> SchemaElement:
         if self._ref_schema is None:  # pragma: no cover
             # If this exception is reached there is a bug in Table's register_root:
             raise RuntimeError(f"'{self._address}': _ref_schema is None.")
-        self._ref_schema.validate(value, context=context)
+        return self._ref_schema
 
 
-@dataclasses.dataclass(frozen=True)
+@dataclasses.dataclass(frozen=True, **_SLOTS)
 class File(SchemaElement):
     """Schema for referencing other schema files."""
 
     file: str = dataclasses.field(default_factory=_str_field_required)
     _ref_schema: Optional[SchemaElement] = dataclasses.field(init=False, default=None)
+    # Path of the schema file, relative to the working directory:
+    _path: Optional[pathlib.Path] = dataclasses.field(
+        init=False, default=None, compare=False
+    )
+    # False if the schema file should be loaded without addresses:
+    _addresses: bool = dataclasses.field(init=False, default=True, compare=False)
+    # Loader of the schema file from somewhere else than the file system:
+    _loader: Optional[Callable[[pathlib.Path], Table]] = dataclasses.field(
+        init=False, default=None, compare=False
+    )
 
     def register_root(self, root: Table) -> None:
+        # The schema file itself is loaded by the root table, or lazily:
         if root.toml_filename is None:
             raise SchemaError(
                 "Schema has file reference. Must specify TOML filename.", self._address
             )
-        toml_path = pathlib.Path(root.toml_filename).parent
+        toml_path = pathlib.Path(root.toml_filename).parent / self.file
+        object.__setattr__(self, "_path", toml_path)
+
+    def drop_addresses(self) -> None:
+        # The file reference keeps its address, for errors reading the file:
+        object.__setattr__(self, "_addresses", False)
+        if self._ref_schema is not None:
+            self._ref_schema.drop_addresses()
+
+    def _load(self, toml_path: pathlib.Path) -> SchemaElement:
         try:
-            schema = from_file(str(toml_path / self.file))
+            if self._loader is not None:
+                schema = self._loader(toml_path)
+            else:
+                schema = from_file(
+                    str(toml_path), lazy_files=True, addresses=self._addresses
+                )
         except (SchemaError, tomllib.TOMLDecodeError, OSError) as ex:
             raise SchemaError(
                 f"Error reading '{self.file}': {ex}", self._address
             ) from None
         object.__setattr__(self, "_ref_schema", schema)
+        return schema
 
     def validate(self, value: TOMLValue, /, *, context: str) -> None:
         """Validate value with the reference schema file."""
-        if self._ref_schema is None:
+        self._target().validate(value, context=context)
+
+    def resolve_path(
+        self, value: TOMLValue, path: str, /, *, context: str = ""
+    ) -> tuple[SchemaElement, TOMLValue, str]:
+        return self._target().resolve_path(value, path, context=context)
+
+    def _target(self) -> SchemaElement:
+        if self._ref_schema is not None:
+            return self._ref_schema
+        if self._path is None:
             # If this exception is reached there is a bug in Table's register_root:
             raise RuntimeError(
                 f"'{self._address}': _ref_schema is None."
             )  # pragma: no cover
-        self._ref_schema.validate(value, context=context)
+        return self._load(self._path)
 
 
-@dataclasses.dataclass(frozen=True)
+@dataclasses.dataclass(frozen=True, **_SLOTS)
 class MinItems(SchemaElement):
     """Schema for min-items option in arrays."""
 
@@ -518,7 +879,7 @@ class MinItems(SchemaElement):
     _array_option: bool = True
 
 
-@dataclasses.dataclass(frozen=True)
+@dataclasses.dataclass(frozen=True, **_SLOTS)
 class MaxItems(SchemaElement):
     """Schema for max-items option in arrays."""
 
@@ -526,7 +887,7 @@ class MaxItems(SchemaElement):
     _array_option: bool = True
 
 
-@dataclasses.dataclass(frozen=True)
+@dataclasses.dataclass(frozen=True, **_SLOTS)
 class UniqueItems(SchemaElement):
     """Schema for unique-items option in arrays."""
 
@@ -537,6 +898,8 @@ class UniqueItems(SchemaElement):
 class Array(SchemaElement, list[SchemaElement]):
     """Array schema container."""
 
+    __slots__ = ("_address",)
+
     def __init__(
         self,
         schema_list: Sequence[SchemaElement],
@@ -559,6 +922,11 @@ class Array(SchemaElement, list[SchemaElement]):
         for schema_value in self:
             schema_value.register_root(root)
 
+    def drop_addresses(self) -> None:
+        SchemaElement.drop_addresses(self)
+        for schema_value in self:
+            schema_value.drop_addresses()
+
     def __str__(self) -> str:
         schemas = [str(schema) for schema in self]
         return f"[ {', '.join(schemas)} ]"
@@ -571,32 +939,42 @@ class Array(SchemaElement, list[SchemaElement]):
     def validate(self, value: TOMLValue, /, *, context: str) -> None:
         """Validate array and its elements."""
         if type(value) is not list:
-            raise SchemaError(f"Value {_format_attr(value)} is not: {self}", context)
+            raise self._type_error(value, context)
         for schema in self:
-            if isinstance(schema, MinItems):
-                if len(value) < schema.min_items:
-                    raise SchemaError(
-                        f"Array has less than {schema.min_items} items.", context
-                    )
-            elif isinstance(schema, MaxItems):
-                if len(value) > schema.max_items:
-                    raise SchemaError(
-                        f"Array has more than {schema.max_items} items.", context
-                    )
-            elif isinstance(schema, UniqueItems):
-                if schema.unique_items and any(
-                    sum(1 for elem_2 in value if elem_1 == elem_2) > 1
-                    for elem_1 in value
-                ):
-                    raise SchemaError("Array has duplicate values.", context)
-            else:
+            if not self._check_option(schema, value, context):
                 for index, element in enumerate(value):
                     schema.validate(element, context=f"{context}[{index}]")
 
+    @staticmethod
+    def _check_option(
+        schema: SchemaElement, value: Sequence[TOMLValue], context: str
+    ) -> bool:
+        """Check an array option. Return False if schema is not an option."""
+        if isinstance(schema, MinItems):
+            if len(value) < schema.min_items:
+                raise SchemaError(
+                    f"Array has less than {schema.min_items} items.", context
+                )
+        elif isinstance(schema, MaxItems):
+            if len(value) > schema.max_items:
+                raise SchemaError(
+                    f"Array has more than {schema.max_items} items.", context
+                )
+        elif isinstance(schema, UniqueItems):
+            if schema.unique_items and any(
+                sum(1 for elem_2 in value if elem_1 == elem_2) > 1 for elem_1 in value
+            ):
+                raise SchemaError("Array has duplicate values.", context)
+        else:
+            return False
+        return True
+
 
 class Union(SchemaElement, list[SchemaElement]):
     """Union schema container."""
 
+    __slots__ = ("_address", "mode")
+
     def __init__(
         self,
         mode: str,
@@ -620,6 +998,11 @@ class Union(SchemaElement, list[SchemaElement]):
         for schema_value in self:
             schema_value.register_root(root)
 
+    def drop_addresses(self) -> None:
+        SchemaElement.drop_addresses(self)
+        for schema_value in self:
+            schema_value.drop_addresses()
+
     def __str__(self) -> str:
         schemas = [str(schema) for schema in self]
         return f"""{{ union = [ {", ".join(schemas)} ] }}"""
@@ -643,7 +1026,12 @@ class Union(SchemaElement, list[SchemaElement]):
                 if self.mode == "any":
                     return
                 valid_count += 1
+        self._check_valid_count(value, valid_count, context)
 
+    def _check_valid_count(
+        self, value: TOMLValue, valid_count: int, context: str
+    ) -> None:
+        """Check the number of valid options after all options were tried."""
         if self.mode == "one" and valid_count == 1:
             return
         if self.mode == "all" and valid_count == len(self):
@@ -663,6 +1051,42 @@ class Union(SchemaElement, list[SchemaElement]):
         raise SchemaError(f"Value {value} {error_message} in: {self}", context)
 
 
+def _key_address(schema_key: SchemaKey) -> str:
+    if (
+        schema_key.pattern is None
+        and schema_key.ref is None
+        and not schema_key.required
+        and not schema_key.hidden
+    ):
+        return schema_key.name
+    return str(schema_key)[1:-1]  # Without the quotes of the special key.
+
+
+# The schema types by their name. With slots, the dataclass decorator replaces
+# each class, so SchemaElement.__subclasses__() could also list the originals:
+_TYPE_CLASSES: dict[str, type[SchemaElement]] = {
+    _type_name(type_class): type_class
+    for type_class in (
+        String,
+        Enum,
+        Pattern,
+        Float,
+        Integer,
+        Boolean,
+        OffsetDateTime,
+        LocalDateTime,
+        Date,
+        Time,
+        AnyValue,
+        Ref,
+        File,
+        MinItems,
+        MaxItems,
+        UniqueItems,
+    )
+}
+
+
 def _create_key(key: str, _address: str) -> SchemaKey:
     if "=" not in key:  # Key is certainly not a TOML string.
         if key == "union":
@@ -697,14 +1121,13 @@ def _create_key(key: str, _address: str) -> SchemaKey:
 
 def _create_schema_basic_type(toml_type: str, _address: str) -> SchemaElement:
     if "=" not in toml_type:  # toml_type is certainly not a TOML string.
-        # Loops ONLY over direct subclasses of SchemaElement:
-        for type_class in SchemaElement.__subclasses__():
-            if (
-                _type_name(type_class) == toml_type
-                and toml_type in TYPES_SCHEMA_TABLE
-                and isinstance(TYPES_SCHEMA_TABLE[toml_type], dict)
-            ):
-                return type_class(_address=_address)  # optionless types like "string".
+        type_class = _TYPE_CLASSES.get(toml_type)
+        if (
+            type_class is not None
+            and toml_type in TYPES_SCHEMA_TABLE
+            and isinstance(TYPES_SCHEMA_TABLE[toml_type], dict)
+        ):
+            return type_class(_address=_address)  # optionless types like "string".
         raise SchemaError(f"'{toml_type}' is not a valid keyword type.", _address)
 
     return _create_schema_from_toml_string(toml_type, _address, TYPES_SCHEMA)
@@ -731,22 +1154,21 @@ def _create_schema_from_toml_string(
     # Get type name. For "Float = { min = 3.3' }" it would be "Float".
     type_name = next(iter(toml_type_toml))
 
-    # Loops ONLY over direct subclasses of SchemaElement:
-    for type_class in SchemaElement.__subclasses__():
-        if _type_name(type_class) == type_name:
-            # It is not possible to static check the call parameters typing.
-            # But the types schema validation guarantees the typing dynamically.
-            if isinstance(toml_type_toml[type_name], dict):
-                # Table option, for example: "integer = { min = 0, max = 255 }"
-                type_dict = cast(dict[str, TOMLValue], toml_type_toml[type_name])
-            else:
-                # Key-value option, for example: "pattern = '^[a-z]*$'"
-                type_dict = toml_type_toml
-
-            type_params: dict[str, TOMLValue] = {
-                key.replace("-", "_"): value for key, value in type_dict.items()
-            }
-            return type_class(_address=_address, **type_params)
+    type_class = _TYPE_CLASSES.get(type_name)
+    if type_class is not None:
+        # It is not possible to static check the call parameters typing.
+        # But the types schema validation guarantees the typing dynamically.
+        if isinstance(toml_type_toml[type_name], dict):
+            # Table option, for example: "integer = { min = 0, max = 255 }"
+            type_dict = cast(dict[str, TOMLValue], toml_type_toml[type_name])
+        else:
+            # Key-value option, for example: "pattern = '^[a-z]*$'"
+            type_dict = toml_type_toml
+
+        type_params: dict[str, TOMLValue] = {
+            key.replace("-", "_"): value for key, value in type_dict.items()
+        }
+        return type_class(_address=_address, **type_params)
 
     # The schema validation guarantees that this exception would never be reached:
     raise RuntimeError(
@@ -767,7 +1189,7 @@ def _create_schema(toml_value: TOMLValue, _address: str) -> SchemaElement:
                 raise SchemaError("Union value must be a list.", _address)
             # Create schema union:
             schema_union = [
-                _create_schema(value, _address=f"{_address}[{index}]")
+                _create_schema(value, _address=sys.intern(f"{_address}[{index}]"))
                 for index, value in enumerate(toml_union)
             ]
             union_mode = cast(str, schema_keys[0].union)
@@ -779,7 +1201,7 @@ def _create_schema(toml_value: TOMLValue, _address: str) -> SchemaElement:
     if isinstance(toml_value, list):
         # Create schema array:
         schema_list = [
-            _create_schema_in_array(value, _address=f"{_address}[{index}]")
+            _create_schema_in_array(value, _address=sys.intern(f"{_address}[{index}]"))
             for index, value in enumerate(toml_value)
         ]
         return Array(schema_list, _address=_address)
@@ -809,21 +1231,38 @@ def from_toml_table(
     *,
     toml_filename: Optional[str] = None,
     is_root: bool = True,
+    lazy_files: bool = False,
+    addresses: bool = True,
     _address: str = "",
 ) -> Table:
-    """Create a schema table from a TOML table."""
+    """Create a schema table from a TOML table.
+
+    If lazy_files is True, referenced schema files are only loaded when they are
+    first needed for validation, and errors reading them are raised then.
+    If addresses is False, the addresses of the schema nodes are dropped after
+    the schema is created, to save memory. Table.addresses() rebuilds them.
+    """
     base_address = "" if _address == "" else f"{_address}."
     schema_table = {
         _create_key(key, _address): _create_schema(
-            value, _address=f"{base_address}{key}"
+            value, _address=sys.intern(f"{base_address}{key}")
         )
         for key, value in toml_table.items()
     }
     if any(key.union is not None for key in schema_table):
         raise SchemaError("'union' cannot be a schema key", _address)
-    return Table(
+    table = Table(
         schema_table, toml_filename=toml_filename, is_root=is_root, _address=_address
     )
+    # Without a TOML filename the schema cannot have file references:
+    if is_root and not lazy_files and toml_filename is not None:
+        # Imported here, since the loader module depends on this module:
+        from ._files import load_file_references
+
+        load_file_references(table, toml_filename)
+    if is_root and not addresses:
+        table.drop_addresses()
+    return table
 
 
 TYPES_SCHEMA_TABLE: dict[str, TOMLValue] = {
@@ -879,29 +1318,65 @@ KEY_SCHEMA_TABLE: dict[str, TOMLValue] = {
     },
 }
 
-KEY_SCHEMA = from_toml_table(KEY_SCHEMA_TABLE)
 # Work around the fact that "union" cannot be a schema key:
-KEY_SCHEMA[SchemaKey(name="union")] = Union(
-    "any",
-    [
-        Enum(enum=["any", "all", "one", "none"]),
-        Table({SchemaKey(name="required"): Boolean()}, is_root=False),
-    ],
+KEY_SCHEMA = Table(
+    {
+        **from_toml_table(KEY_SCHEMA_TABLE),
+        SchemaKey(name="union"): Union(
+            "any",
+            [
+                Enum(enum=["any", "all", "one", "none"]),
+                Table({SchemaKey(name="required"): Boolean()}, is_root=False),
+            ],
+        ),
+    },
+    is_root=False,
 )
 
 
-def from_file(toml_filename: str) -> Table:
+def from_file(
+    toml_filename: str, *, lazy_files: bool = False, addresses: bool = True
+) -> Table:
     with pathlib.Path(toml_filename).open("rb") as toml_file:
-        return load(toml_file, toml_filename=toml_filename)
+        return load(
+            toml_file,
+            toml_filename=toml_filename,
+            lazy_files=lazy_files,
+            addresses=addresses,
+        )
 
 
-def load(toml_file: BinaryIO, /, *, toml_filename: Optional[str] = None) -> Table:
+def load(
+    toml_file: BinaryIO,
+    /,
+    *,
+    toml_filename: Optional[str] = None,
+    lazy_files: bool = False,
+    addresses: bool = True,
+) -> Table:
     """Load TOML schema from a binary I/O stream."""
     toml_table: dict[str, TOMLValue] = tomllib.load(toml_file)
-    return from_toml_table(toml_table, toml_filename=toml_filename)
+    return from_toml_table(
+        toml_table,
+        toml_filename=toml_filename,
+        lazy_files=lazy_files,
+        addresses=addresses,
+    )
 
 
-def loads(toml_str: str, /, *, toml_filename: Optional[str] = None) -> Table:
+def loads(
+    toml_str: str,
+    /,
+    *,
+    toml_filename: Optional[str] = None,
+    lazy_files: bool = False,
+    addresses: bool = True,
+) -> Table:
     """Load TOML schema from a string."""
     toml_table: dict[str, TOMLValue] = tomllib.loads(toml_str)
-    return from_toml_table(toml_table, toml_filename=toml_filename)
+    return from_toml_table(
+        toml_table,
+        toml_filename=toml_filename,
+        lazy_files=lazy_files,
+        addresses=addresses,
+    )
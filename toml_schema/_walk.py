@@ -0,0 +1,250 @@
+"""toml-schema: Instrumented validation walker."""
+# SPDX-License-Identifier: MIT
+# SPDX-FileCopyrightText: 2025 Udi Fuchs
+
+import datetime
+import sys
+import time
+from collections.abc import Mapping, Sequence
+from typing import TYPE_CHECKING, Optional, cast
+
+from ._toml_schema import (
+    Array,
+    Budget,
+    File,
+    Ref,
+    SchemaBudgetExceeded,
+    SchemaElement,
+    SchemaError,
+    Table,
+    TOMLValue,
+    Union,
+)
+
+if TYPE_CHECKING:
+    from ._adapter import ValueAdapter
+
+# The validate methods which are known to the walker. Any other method, including
+# a method patched after import, is treated as a leaf:
+_TABLE_VALIDATE = Table.validate
+_ARRAY_VALIDATE = Array.validate
+_UNION_VALIDATE = Union.validate
+_REF_VALIDATE = Ref.validate
+_FILE_VALIDATE = File.validate
+
+# The types of tomllib values, which are never adapted:
+_PLAIN_TYPES = frozenset(
+    (
+        str,
+        int,
+        float,
+        bool,
+        datetime.datetime,
+        datetime.date,
+        datetime.time,
+        list,
+        dict,
+    )
+)
+
+# The number of visited nodes between checks of the time budget:
+_TIME_CHECK_INTERVAL = 1024
+
+
+class Walker:
+    """Validate a document by visiting every schema node explicitly.
+
+    The walker follows the same rules as SchemaElement.validate, but all the
+    recursion goes through visit(). Subclasses can override visit() to observe
+    or bound the validation, without any cost to the plain validate methods.
+    Schema elements with a customized validate method are visited as leaves.
+    A validation can be limited by a budget, which is checked on every visit
+    with a single comparison, and on every table and array.
+    """
+
+    def __init__(self) -> None:
+        # The schema file of the visited node. Empty for the root schema file.
+        self.schema_file = ""
+        # Rebuilt addresses of schema nodes, for schemas loaded without addresses:
+        self.addresses: dict[int, str] = {}
+        # Adapter of the values which are not plain tomllib output:
+        self.adapter: Optional[ValueAdapter] = None
+        self.budget: Optional[Budget] = None
+        # The budget counters. The budget is checked when nodes reaches next_check:
+        self._nodes = 0
+        self._next_check = sys.maxsize
+        self._deadline: Optional[float] = None
+        self._depth = 0
+        self._max_depth = sys.maxsize
+
+    def address(self, schema: SchemaElement) -> str:
+        """Get the address of a schema node, even if it was dropped."""
+        return self.addresses.get(id(schema), schema._address)
+
+    def validate(
+        self,
+        schema: SchemaElement,
+        value: TOMLValue,
+        /,
+        *,
+        context: str = "",
+        adapter: Optional["ValueAdapter"] = None,
+        budget: Optional[Budget] = None,
+    ) -> None:
+        """Validate value with schema, adapting its values if an adapter is given.
+
+        If a budget is given, SchemaBudgetExceeded is raised when any of its
+        limits is reached.
+        """
+        self.adapter = adapter
+        self._start_budget(budget)
+        self._rebuild_addresses(schema)
+        self.visit(schema, value, context)
+
+    def visit(self, schema: SchemaElement, value: TOMLValue, context: str) -> None:
+        """Validate value with a single schema node."""
+        self._nodes += 1
+        if self._nodes >= self._next_check:
+            self._check_budget(context)
+        validate = type(schema).validate
+        if validate is _TABLE_VALIDATE:
+            self._walk_table(cast(Table, schema), value, context)
+        elif validate is _ARRAY_VALIDATE:
+            self._walk_array(cast(Array, schema), value, context)
+        elif validate is _UNION_VALIDATE:
+            self._walk_union(cast(Union, schema), value, context)
+        elif validate is _REF_VALIDATE:
+            self.visit(cast(Ref, schema)._target(), value, context)
+        elif validate is _FILE_VALIDATE:
+            self._walk_file(cast(File, schema), value, context)
+        elif self.adapter is not None and type(value) not in _PLAIN_TYPES:
+            schema.validate(self.adapter.scalar(value), context=context)
+        else:
+            schema.validate(value, context=context)
+
+    def union_option(self, union: Union, *, failed: bool) -> None:
+        """Observe the outcome of trying a union option."""
+
+    def _walk_table(self, table: Table, value: TOMLValue, context: str) -> None:
+        table_value = self._table_value(table, value, context)
+        table._check_keys(table_value, context)
+        self._enter(context)
+        try:
+            for key, element in table_value.items():
+                schema = table._key_schema(key, context)
+                key_context = key if context == "" else f"{context}.{key}"
+                self.visit(schema, element, key_context)
+        finally:
+            self._depth -= 1
+
+    def _walk_array(self, array: Array, value: TOMLValue, context: str) -> None:
+        array_value = self._array_value(array, value, context)
+        self._enter(context)
+        try:
+            for schema in array:
+                if not array._check_option(schema, array_value, context):
+                    for index, element in enumerate(array_value):
+                        self.visit(schema, element, f"{context}[{index}]")
+        finally:
+            self._depth -= 1
+
+    def _start_budget(self, budget: Optional[Budget]) -> None:
+        self.budget = budget
+        self._nodes = 0
+        self._depth = 0
+        self._next_check = sys.maxsize
+        self._deadline = None
+        self._max_depth = sys.maxsize
+        if budget is None:
+            return
+        if budget.max_depth is not None:
+            self._max_depth = budget.max_depth
+        if budget.max_seconds is not None:
+            self._deadline = time.perf_counter() + budget.max_seconds
+        self._schedule_check()
+
+    def _schedule_check(self) -> None:
+        """Set the node count of the next check of the budget."""
+        budget = cast(Budget, self.budget)
+        self._next_check = sys.maxsize
+        if budget.max_nodes is not None:
+            self._next_check = budget.max_nodes + 1
+        if self._deadline is not None:
+            self._next_check = min(self._next_check, self._nodes + _TIME_CHECK_INTERVAL)
+
+    def _check_budget(self, context: str) -> None:
+        budget = cast(Budget, self.budget)
+        if budget.max_nodes is not None and self._nodes > budget.max_nodes:
+            raise SchemaBudgetExceeded(
+                f"Validation visited more than {budget.max_nodes} schema nodes.",
+                context,
+            )
+        if self._deadline is not None and time.perf_counter() > self._deadline:
+            raise SchemaBudgetExceeded(
+                f"Validation took more than {budget.max_seconds} seconds.", context
+            )
+        self._schedule_check()
+
+    def _enter(self, context: str) -> None:
+        """Enter a table or an array of the document."""
+        self._depth += 1
+        if self._depth > self._max_depth:
+            raise SchemaBudgetExceeded(
+                f"Document is nested deeper than {self._max_depth} levels.", context
+            )
+
+    def _table_value(
+        self, table: Table, value: TOMLValue, context: str
+    ) -> Mapping[str, TOMLValue]:
+        """Get the value of a table, adapted if needed, or raise a type error."""
+        if type(value) is dict:
+            return value
+        table_value = None if self.adapter is None else self.adapter.table(value)
+        if table_value is None:
+            raise table._type_error(value, context)
+        return table_value
+
+    def _array_value(
+        self, array: Array, value: TOMLValue, context: str
+    ) -> Sequence[TOMLValue]:
+        """Get the value of an array, adapted if needed, or raise a type error."""
+        if type(value) is list:
+            return value
+        array_value = None if self.adapter is None else self.adapter.array(value)
+        if array_value is None:
+            raise array._type_error(value, context)
+        return array_value
+
+    def _walk_union(self, union: Union, value: TOMLValue, context: str) -> None:
+        valid_count = 0
+        for schema_option in union:
+            try:
+                self.visit(schema_option, value, context)
+            except SchemaError:  # noqa: PERF203
+                self.union_option(union, failed=True)
+                if union.mode == "none":
+                    return
+            else:
+                self.union_option(union, failed=False)
+                if union.mode == "any":
+                    return
+                valid_count += 1
+        union._check_valid_count(value, valid_count, context)
+
+    def _walk_file(self, file: File, value: TOMLValue, context: str) -> None:
+        parent_file = self.schema_file
+        self.schema_file = file.file
+        try:
+            schema = file._target()
+            self._rebuild_addresses(schema)
+            self.visit(schema, value, context)
+        finally:
+            self.schema_file = parent_file
+
+    def _rebuild_addresses(self, schema: SchemaElement) -> None:
+        if (
+            isinstance(schema, Table)
+            and not schema._has_addresses
+            and id(schema) not in self.addresses
+        ):
+            self.addresses.update(schema.addresses())
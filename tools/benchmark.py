@@ -0,0 +1,327 @@
+"""Benchmark schema build and validation, and compare the results of two revisions.
+
+Only the public API of toml_schema is used, so that the benchmarks can run
+on older revisions: the revisions command runs this file with each revision
+checked out in a temporary git worktree.
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import json
+import os
+import pathlib
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import timeit
+from collections.abc import Iterator
+from typing import Any, Callable
+
+import toml_schema
+
+if sys.version_info >= (3, 11):
+    import tomllib
+else:
+    import tomli as tomllib
+
+PYPROJECT_SCHEMA = "schemastore/pyproject.schema.toml"
+
+# A change is significant if it is larger than the threshold,
+# and larger than this many times the noise of the two runs:
+NOISE_FACTOR = 3.0
+
+
+def load_toml(toml_path: pathlib.Path) -> dict[str, Any] | None:
+    """Load a TOML file, or return None if it is not valid TOML."""
+    try:
+        return tomllib.loads(toml_path.read_text())
+    except tomllib.TOMLDecodeError:
+        return None
+
+
+def validate_all(schema: toml_schema.Table, documents: list[dict[str, Any]]) -> None:
+    for document in documents:
+        validate_one(schema, document)
+
+
+def validate_one(schema: toml_schema.Table, document: dict[str, Any]) -> None:
+    with contextlib.suppress(toml_schema.SchemaError):
+        schema.validate(document)
+
+
+# Each benchmark setup returns the function to time:
+Benchmark = Callable[[], Callable[[], object]]
+
+
+def build_benchmark(schema_path: pathlib.Path) -> Benchmark:
+    def setup() -> Callable[[], object]:
+        return lambda: toml_schema.from_file(str(schema_path))
+
+    return setup
+
+
+def validate_benchmark(corpus_path: pathlib.Path) -> Benchmark:
+    def setup() -> Callable[[], object]:
+        schema = toml_schema.from_file(PYPROJECT_SCHEMA)
+        documents = map(load_toml, sorted(corpus_path.glob("**/*.toml")))
+        corpus = [document for document in documents if document is not None]
+        return lambda: validate_all(schema, corpus)
+
+    return setup
+
+
+def table_lookup() -> Callable[[], object]:
+    """A table of 100 keys, 100 pattern keys and a wildcard."""
+    keys = "\n".join(f'key{index} = "integer"' for index in range(100))
+    patterns = "\n".join(
+        f'"pattern = \'^p{index}_\'" = "integer"' for index in range(100)
+    )
+    schema = toml_schema.loads(f'{keys}\n{patterns}\n"*" = "integer"')
+    document: dict[str, Any] = {f"key{index}": index for index in range(100)}
+    document.update({f"p{index}_x": index for index in range(100)})
+    document.update({f"other{index}": index for index in range(100)})
+    return lambda: schema.validate(document)
+
+
+def union_dispatch() -> Callable[[], object]:
+    """Tables matching the last of five table options of a union."""
+    options = ", ".join(f"{{ kind = \"enum = ['k{index}']\" }}" for index in range(5))
+    schema = toml_schema.loads(f"items = [ {{ union = [ {options} ] }} ]")
+    document: dict[str, Any] = {"items": [{"kind": "k4"}] * 100}
+    return lambda: schema.validate(document)
+
+
+def pattern_match() -> Callable[[], object]:
+    schema = toml_schema.loads("names = [ \"pattern = '^[a-z][a-z0-9_-]*$'\" ]")
+    document: dict[str, Any] = {"names": [f"name_{index}" for index in range(100)]}
+    return lambda: schema.validate(document)
+
+
+def unique_items() -> Callable[[], object]:
+    schema = toml_schema.loads('values = [ "integer", "unique-items = true" ]')
+    document: dict[str, Any] = {"values": list(range(200))}
+    return lambda: schema.validate(document)
+
+
+def error_rendering() -> Callable[[], object]:
+    """An error deep in a union, which is raised and rendered to a string."""
+    schema = toml_schema.loads(
+        'a.b.c = [ { union = [ "integer", { d = "string" }, [ "boolean" ] ] } ]'
+    )
+    document: dict[str, Any] = {"a": {"b": {"c": [1, 2, {"d": 3}]}}}
+
+    def render() -> str:
+        try:
+            schema.validate(document)
+        except toml_schema.SchemaError as ex:
+            return str(ex)
+        return ""
+
+    return render
+
+
+def benchmarks() -> dict[str, Benchmark]:
+    result: dict[str, Benchmark] = {
+        "micro:table-lookup": table_lookup,
+        "micro:union-dispatch": union_dispatch,
+        "micro:pattern-match": pattern_match,
+        "micro:unique-items": unique_items,
+        "micro:error-rendering": error_rendering,
+    }
+    for schema_path in sorted(pathlib.Path("schemastore").glob("*.schema.toml")):
+        result[f"build:{schema_path.name}"] = build_benchmark(schema_path)
+    for corpus_path in sorted(pathlib.Path("examples").iterdir()):
+        if corpus_path.is_dir():
+            result[f"validate:{corpus_path.name}"] = validate_benchmark(corpus_path)
+    return result
+
+
+def measure(func: Callable[[], object], repeat: int) -> list[float]:
+    """Get the seconds per call of repeat runs, each of at least 0.2 seconds."""
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return [seconds / number for seconds in timer.repeat(repeat, number)]
+
+
+def git_revision() -> str | None:
+    """Get the git revision of the working directory, or None outside of git."""
+    result = subprocess.run(  # noqa: S603
+        ["git", "rev-parse", "HEAD"],  # noqa: S607
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    return result.stdout.strip() if result.returncode == 0 else None
+
+
+def run(name_filter: str, repeat: int) -> dict[str, Any]:
+    results = {}
+    for name, setup in benchmarks().items():
+        if name_filter not in name:
+            continue
+        samples = measure(setup(), repeat)
+        results[name] = {"median": statistics.median(samples), "samples": samples}
+        print(f"{name:45} {statistics.median(samples) * 1e6:>12.1f} us", flush=True)
+    return {
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "results": results,
+    }
+
+
+def noise(samples: list[float]) -> float:
+    """The median absolute deviation of the samples, relative to their median."""
+    median = statistics.median(samples)
+    return statistics.median(abs(sample - median) for sample in samples) / median
+
+
+def compare(old: dict[str, Any], new: dict[str, Any], threshold: float) -> int:
+    """Print the changes between two runs, and return the number of regressions."""
+    print(f"{old['revision']} -> {new['revision']}")
+    print(f"{'benchmark':45} {'old us':>10} {'new us':>10} {'change':>8} {'noise':>7}")
+    regressions = 0
+    for name, new_result in new["results"].items():
+        old_result = old["results"].get(name)
+        if old_result is None:
+            continue
+        change = new_result["median"] / old_result["median"] - 1.0
+        run_noise = noise(old_result["samples"]) + noise(new_result["samples"])
+        verdict = ""
+        if abs(change) > max(threshold, NOISE_FACTOR * run_noise):
+            verdict = "regression" if change > 0 else "improvement"
+            regressions += change > 0
+        print(
+            f"{name:45} {old_result['median'] * 1e6:>10.1f} "
+            f"{new_result['median'] * 1e6:>10.1f} {change:>+8.1%} "
+            f"{run_noise:>7.1%} {verdict}"
+        )
+    print(f"{regressions} regressions.")
+    return regressions
+
+
+@contextlib.contextmanager
+def worktree(revision: str, temp_dir: str) -> Iterator[pathlib.Path]:
+    """Check out a git revision in a temporary worktree."""
+    path = pathlib.Path(temp_dir) / revision.replace("/", "_")
+    subprocess.run(  # noqa: S603
+        ["git", "worktree", "add", "--detach", str(path), revision],  # noqa: S607
+        check=True,
+    )
+    try:
+        yield path
+    finally:
+        subprocess.run(  # noqa: S603
+            ["git", "worktree", "remove", "--force", str(path)],  # noqa: S607
+            check=True,
+        )
+
+
+def run_worktree(path: pathlib.Path, name_filter: str, repeat: int) -> dict[str, Any]:
+    """Run this file in a worktree, with the toml_schema of the worktree."""
+    json_path = path.with_suffix(".json")
+    subprocess.run(  # noqa: S603
+        [
+            sys.executable,
+            __file__,
+            "run",
+            f"--json={json_path}",
+            f"--filter={name_filter}",
+            f"--repeat={repeat}",
+        ],
+        cwd=path,
+        env={**os.environ, "PYTHONPATH": str(path)},
+        check=True,
+    )
+    results: dict[str, Any] = json.loads(json_path.read_text())
+    return results
+
+
+def merge(runs: list[dict[str, Any]]) -> dict[str, Any]:
+    """Pool the samples of several runs of the same revision."""
+    merged = runs[0]
+    for name, result in merged["results"].items():
+        for other in runs[1:]:
+            result["samples"] += other["results"][name]["samples"]
+        result["median"] = statistics.median(result["samples"])
+    return merged
+
+
+def run_revisions(
+    revisions: tuple[str, str], name_filter: str, repeat: int, rounds: int
+) -> tuple[dict[str, Any], dict[str, Any]]:
+    """Run the benchmarks of two git revisions, alternating them for rounds.
+
+    The samples of all the rounds of a revision are pooled, so that the noise
+    includes the drift of the machine between the runs, and not only within them.
+    """
+    runs: tuple[list[dict[str, Any]], list[dict[str, Any]]] = ([], [])
+    with tempfile.TemporaryDirectory() as temp_dir:
+        old_dir = pathlib.Path(temp_dir) / "old"
+        new_dir = pathlib.Path(temp_dir) / "new"
+        old_dir.mkdir()
+        new_dir.mkdir()
+        with (
+            worktree(revisions[0], str(old_dir)) as old_path,
+            worktree(revisions[1], str(new_dir)) as new_path,
+        ):
+            for _ in range(rounds):
+                runs[0].append(run_worktree(old_path, name_filter, repeat))
+                runs[1].append(run_worktree(new_path, name_filter, repeat))
+    return merge(runs[0]), merge(runs[1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    run_parser = subparsers.add_parser("run", help="run the benchmarks")
+    run_parser.add_argument("--json", metavar="JSON_FILE", help="write the results")
+    compare_parser = subparsers.add_parser("compare", help="compare two results")
+    compare_parser.add_argument("old_json")
+    compare_parser.add_argument("new_json")
+    revisions_parser = subparsers.add_parser(
+        "revisions", help="run and compare the benchmarks of two git revisions"
+    )
+    revisions_parser.add_argument("old_revision")
+    revisions_parser.add_argument("new_revision")
+    revisions_parser.add_argument(
+        "--rounds", type=int, default=3, help="alternating runs of each revision"
+    )
+    for subparser in (run_parser, revisions_parser):
+        subparser.add_argument("--filter", default="", help="run matching benchmarks")
+        subparser.add_argument("--repeat", type=int, default=5)
+    for subparser in (compare_parser, revisions_parser):
+        subparser.add_argument(
+            "--threshold",
+            type=float,
+            default=0.05,
+            help="smallest relative change reported (default: %(default)s)",
+        )
+    args = parser.parse_args()
+
+    if args.command == "run":
+        results = run(args.filter, args.repeat)
+        if args.json is not None:
+            with pathlib.Path(args.json).open("w") as json_file:
+                json.dump(results, json_file, indent=2)
+                json_file.write("\n")
+        return
+    if args.command == "compare":
+        old = json.loads(pathlib.Path(args.old_json).read_text())
+        new = json.loads(pathlib.Path(args.new_json).read_text())
+    else:
+        old, new = run_revisions(
+            (args.old_revision, args.new_revision),
+            args.filter,
+            args.repeat,
+            args.rounds,
+        )
+    if compare(old, new, args.threshold) > 0:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Measure the memory of the compiled schemas in schemastore with tracemalloc."""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import pathlib
+import tracemalloc
+
+import toml_schema
+from toml_schema._optimize import count_nodes
+
+
+def schema_memory(
+    schema_path: pathlib.Path, *, addresses: bool, repeat: int = 3
+) -> tuple[int, int]:
+    """Get the memory in bytes and the node count of a compiled schema.
+
+    The smallest size of a few runs is taken, since the first runs also count
+    the growth of global caches, like the regex cache and the interned strings.
+    """
+    sizes: list[int] = []
+    nodes = 0
+    for _ in range(repeat):
+        gc.collect()
+        tracemalloc.start()
+        try:
+            schema = toml_schema.from_file(str(schema_path), addresses=addresses)
+            gc.collect()
+            size, _ = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        sizes.append(size)
+        nodes = count_nodes(schema)
+        # The next run must not share the interned addresses of this schema:
+        del schema
+    return min(sizes), nodes
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("schema_dir", nargs="?", default="schemastore")
+    args = parser.parse_args()
+
+    print(f"{'schema':40} {'nodes':>6} {'KiB':>10} {'no addr KiB':>12}")
+    total_size = 0
+    total_no_addresses = 0
+    for schema_path in sorted(pathlib.Path(args.schema_dir).glob("*.schema.toml")):
+        size, nodes = schema_memory(schema_path, addresses=True)
+        no_addresses, _ = schema_memory(schema_path, addresses=False)
+        total_size += size
+        total_no_addresses += no_addresses
+        print(
+            f"{schema_path.name:40} {nodes:>6} {size / 1024:>10.1f} "
+            f"{no_addresses / 1024:>12.1f}"
+        )
+    print(
+        f"{'total':40} {'':>6} {total_size / 1024:>10.1f} "
+        f"{total_no_addresses / 1024:>12.1f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""Compare toml-schema with validate-pyproject on the pyproject.toml examples."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import pathlib
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from typing import Any, Callable
+
+from validate_pyproject import api
+
+import toml_schema
+from tools.benchmark import git_revision, load_toml
+
+SCHEMA_FILE = "schemastore/pyproject.schema.toml"
+
+# A minimal document, validated once to compile the validate-pyproject schema:
+MINIMAL_PYPROJECT: dict[str, Any] = {"project": {"name": "example", "version": "1"}}
+
+# Each tool is started in a fresh interpreter, which validates a document:
+COLD_START_CODE = {
+    "toml-schema": (
+        "import toml_schema\n"
+        f"toml_schema.from_file({SCHEMA_FILE!r}).validate({MINIMAL_PYPROJECT!r})\n"
+    ),
+    "validate-pyproject": (
+        f"from validate_pyproject import api\napi.Validator()({MINIMAL_PYPROJECT!r})\n"
+    ),
+}
+
+
+def load_corpus(example_dir: pathlib.Path) -> list[dict[str, Any]]:
+    """Load the TOML files of the examples, skipping the files which are not TOML."""
+    documents = map(load_toml, sorted(example_dir.glob("**/*.toml")))
+    return [document for document in documents if document is not None]
+
+
+def cold_start(tool: str, repeat: int) -> float:
+    """Get the median time of starting python, loading the schema and validating."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", COLD_START_CODE[tool]], check=True)  # noqa: S603
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def load_toml_schema() -> Callable[[dict[str, Any]], object]:
+    return toml_schema.from_file(SCHEMA_FILE).validate
+
+
+def load_validate_pyproject() -> Callable[[dict[str, Any]], object]:
+    validator = api.Validator()
+    # The schema is compiled on the first validation:
+    validator(MINIMAL_PYPROJECT)
+    return validator
+
+
+LOADERS = {
+    "toml-schema": load_toml_schema,
+    "validate-pyproject": load_validate_pyproject,
+}
+
+
+def schema_load(tool: str, repeat: int) -> float:
+    """Get the median time of loading the schema, in a running interpreter."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        LOADERS[tool]()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def is_valid(
+    validate: Callable[[dict[str, Any]], object], document: dict[str, Any]
+) -> bool:
+    try:
+        validate(document)
+    # SchemaError, and the errors of validate-pyproject, which are ValueErrors:
+    except (toml_schema.SchemaError, ValueError):
+        return False
+    return True
+
+
+def validate_corpus(
+    validate: Callable[[dict[str, Any]], object], corpus: list[dict[str, Any]]
+) -> int:
+    """Validate all the documents, and return the number of invalid documents."""
+    return sum(not is_valid(validate, document) for document in corpus)
+
+
+def throughput(
+    tool: str, corpus: list[dict[str, Any]], repeat: int
+) -> tuple[float, int]:
+    """Get the steady-state documents per second, and the number of invalid ones.
+
+    The fastest of the runs is taken, after a warm-up run.
+    """
+    validate = LOADERS[tool]()
+    invalid = validate_corpus(validate, corpus)
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        validate_corpus(validate, corpus)
+        times.append(time.perf_counter() - start)
+    return len(corpus) / min(times), invalid
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("example_dir", nargs="?", default="examples")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", metavar="JSON_FILE", help="write the results")
+    args = parser.parse_args()
+
+    corpus = load_corpus(pathlib.Path(args.example_dir))
+    results: dict[str, dict[str, float | int]] = {}
+    print(
+        f"{'tool':20} {'cold start ms':>14} {'load ms':>10} "
+        f"{'docs/s':>10} {'invalid':>8}"
+    )
+    for tool in LOADERS:
+        cold = cold_start(tool, args.repeat)
+        load = schema_load(tool, args.repeat)
+        docs_per_second, invalid = throughput(tool, corpus, args.repeat)
+        results[tool] = {
+            "cold_start_seconds": cold,
+            "load_seconds": load,
+            "documents_per_second": docs_per_second,
+            "invalid_documents": invalid,
+        }
+        print(
+            f"{tool:20} {cold * 1000:>14.1f} {load * 1000:>10.1f} "
+            f"{docs_per_second:>10.0f} {invalid:>8}"
+        )
+    print(f"{len(corpus)} documents.")
+
+    if args.json is not None:
+        record = {
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "documents": len(corpus),
+            "results": results,
+        }
+        with pathlib.Path(args.json).open("w") as json_file:
+            json.dump(record, json_file, indent=2)
+            json_file.write("\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Content-addressed store of fetched JSON schemas."""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import pathlib
+import subprocess
+import tarfile
+import tempfile
+import urllib.parse
+
+
+def default_store_path() -> pathlib.Path:
+    cache_home = os.environ.get("XDG_CACHE_HOME", pathlib.Path.home() / ".cache")
+    return pathlib.Path(cache_home) / "toml-schema" / "json-schemas"
+
+
+class SchemaStore:
+    """Local store of JSON schemas, keyed by URI.
+
+    The contents are kept in objects/ under their SHA-256 hash, and the index/
+    directory records the hash of each URI, one file per URI. Every file is
+    written to a temporary file and renamed, so that converters in several
+    processes can share the store.
+    """
+
+    def __init__(self, path: pathlib.Path) -> None:
+        self.path = path
+        (path / "objects").mkdir(parents=True, exist_ok=True)
+        (path / "index").mkdir(exist_ok=True)
+
+    def _index_path(self, uri: str) -> pathlib.Path:
+        return self.path / "index" / urllib.parse.quote(uri, safe="")
+
+    def _write(self, path: pathlib.Path, content: bytes) -> None:
+        with tempfile.NamedTemporaryFile(dir=self.path, delete=False) as temp_file:
+            temp_file.write(content)
+        pathlib.Path(temp_file.name).replace(path)
+
+    def get(self, uri: str) -> bytes | None:
+        """Get the content of a URI, or None if it is not in the store."""
+        try:
+            digest = self._index_path(uri).read_text()
+        except FileNotFoundError:
+            return None
+        content = (self.path / "objects" / digest).read_bytes()
+        if hashlib.sha256(content).hexdigest() != digest:
+            raise Exception(f"{uri}: Content does not match hash {digest}")
+        return content
+
+    def put(self, uri: str, content: bytes) -> str:
+        """Store the content of a URI, and return its hash."""
+        digest = hashlib.sha256(content).hexdigest()
+        object_path = self.path / "objects" / digest
+        if not object_path.exists():
+            self._write(object_path, content)
+        self._write(self._index_path(uri), digest.encode())
+        return digest
+
+    def download(self, uri: str) -> bytes:
+        """Download a URI with wget, and store its content."""
+        with tempfile.TemporaryDirectory(dir=self.path) as temp_dir:
+            temp_path = pathlib.Path(temp_dir) / "download"
+            subprocess.run(  # noqa: S603
+                ["wget", f"--output-document={temp_path}", uri],  # noqa: S607
+                check=True,
+            )
+            content = temp_path.read_bytes()
+        self.put(uri, content)
+        return content
+
+    def seed(self, source: pathlib.Path, uri_base: str) -> int:
+        """Store the JSON files of a directory or a tarball as the files of uri_base.
+
+        Return the number of files stored.
+        """
+        count = 0
+        if source.is_dir():
+            for json_path in sorted(source.glob("*.json")):
+                self.put(f"{uri_base}/{json_path.name}", json_path.read_bytes())
+                count += 1
+            return count
+        with tarfile.open(source) as tar_file:
+            for member in tar_file.getmembers():
+                if not member.isfile() or not member.name.endswith(".json"):
+                    continue
+                json_file = tar_file.extractfile(member)
+                assert json_file is not None
+                name = pathlib.PurePosixPath(member.name).name
+                self.put(f"{uri_base}/{name}", json_file.read())
+                count += 1
+        return count